@@ -1,6 +1,6 @@
 import streamlit as st
 from config.app_config import app_config
-from streamlit_float import *
+from streamlit_float import float_init
 
 
 app_config()
@@ -0,0 +1,55 @@
+"""
+Run the benchmark suite:
+
+    python -m benchmarks [-k FILTER] [--quick] [--save PATH | --no-save]
+                         [--compare BASELINE.json] [--threshold 0.2]
+
+Results are saved to benchmarks/results/ and compared with the previous
+run (or --compare); the exit code is 1 if a benchmark failed or got slower
+than the threshold.
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks import bench_api_keys, bench_imports, bench_registry, bench_scan, bench_simulation  # noqa: F401 (registers)
+from benchmarks.harness import BENCHMARKS, REGRESSION_THRESHOLD, compare, latest_result, run, save
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Project A.N.I. benchmarks.")
+    parser.add_argument("-k", "--filter", default="", help="Only benchmarks whose key contains this")
+    parser.add_argument("--quick", action="store_true", help="Fewer rounds")
+    parser.add_argument("--save", default=None, help="Results file (default: benchmarks/results/...)")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--compare", default=None, help="Baseline results file (default: previous run)")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    selected = [b for b in BENCHMARKS if not args.filter or any(args.filter in b.key(p) for p in b.params)]
+    if args.filter:
+        for bench in selected:
+            bench.params = [p for p in bench.params if args.filter in bench.key(p)]
+
+    baseline_path = args.compare or latest_result()
+    document = run(selected, quick=args.quick)
+
+    if not args.no_save:
+        print(f"\nSaved {save(document, args.save)}")
+
+    if document["failed"]:
+        print(f"\n{len(document['failed'])} benchmark(s) failed")
+        return 1
+
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            regressions = compare(json.load(f), document, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
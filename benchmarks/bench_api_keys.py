@@ -0,0 +1,30 @@
+"""APIKeyStats counters (updated on every Gemini request, read by every sidebar render)."""
+
+from core.api_key_manager import APIKeyStats
+
+from benchmarks.harness import benchmark
+
+
+def _stats(requests: int) -> APIKeyStats:
+    stats = APIKeyStats(key_id="1234")
+    for _ in range(requests):
+        stats.add_request(tokens_used=500)
+    return stats
+
+
+@benchmark("api_keys")
+def add_request(_):
+    stats = APIKeyStats(key_id="1234")
+    return lambda: stats.add_request(tokens_used=500)
+
+
+@benchmark("api_keys", params=[10, 100, 2000])
+def get_rpm(requests):
+    stats = _stats(requests)
+    return stats.get_rpm
+
+
+@benchmark("api_keys", params=[10, 100, 2000])
+def get_daily_requests(requests):
+    stats = _stats(requests)
+    return stats.get_daily_requests
@@ -0,0 +1,16 @@
+"""Cold import of the app's entry modules, each in a fresh interpreter."""
+
+from benchmarks.harness import benchmark
+from benchmarks.importtime import profile_import
+
+MODULES = [
+    "config.app_config",
+    "core.agent",
+    "services.db_service",
+    "components.registry_table",
+]
+
+
+@benchmark("imports", params=MODULES, rounds=3, number=1)
+def cold_import(module):
+    return lambda: profile_import(module)
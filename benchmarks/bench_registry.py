@@ -0,0 +1,23 @@
+"""Registry reads against the Supabase stand-in, at growing table sizes."""
+
+from benchmarks.harness import benchmark
+from benchmarks.servers import registry_rows, standin_env
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+@benchmark("registry", params=SIZES, rounds=3, number=1)
+def get_unique_tracked_plants(rows):
+    env = standin_env()
+    env.supabase.tables.pop("plants_registry", None)
+    env.supabase.seed_registry(rows)
+
+    from services.db_service import get_unique_tracked_plants
+    return get_unique_tracked_plants
+
+
+@benchmark("registry", params=SIZES, rounds=3)
+def build_registry_dataframe(rows):
+    from components.registry_table import build_registry_dataframe
+    data = registry_rows(rows)
+    return lambda: build_registry_dataframe(data)
@@ -0,0 +1,63 @@
+"""End-to-end scan (analyze -> upload -> save) against the local stand-ins."""
+
+import asyncio
+import itertools
+import json
+from io import BytesIO
+
+from PIL import Image
+
+from benchmarks.harness import benchmark
+from benchmarks.servers import standin_env
+
+
+def _upload(color) -> BytesIO:
+    image = BytesIO()
+    Image.new("RGB", (640, 480), color).save(image, format="JPEG")
+    image.name, image.type = "scan.jpg", "image/jpeg"
+    return image
+
+
+@benchmark("scan", params=["analyze", "end_to_end"], rounds=5, number=5)
+def scan(stage):
+    standin_env()
+    from core.agent import ask_gemini
+    from services.db_service import save_plant_to_db, upload_image_to_supabase
+
+    image = _upload("green")
+
+    def analyze():
+        return json.loads(ask_gemini(image))
+
+    def end_to_end():
+        result = analyze()
+        url = upload_image_to_supabase(image)
+        save_plant_to_db(result["plant_name"], url, result, farm_name="Benchmark")
+
+    return analyze if stage == "analyze" else end_to_end
+
+
+@benchmark("scan", params=["analyze_async", "multi_angle_map_reduce"], rounds=3, number=2)
+def scan_new_event_loop(stage):
+    # Every call is a separate asyncio.run / blocking call, as in a live
+    # server: the pooled clients must keep working across event loops
+    standin_env()
+    from core.agent import analyze_multi_angle_images, ask_gemini_async
+
+    image = _upload("green")
+    shades = itertools.count()
+
+    def analyze_async():
+        return json.loads(asyncio.run(ask_gemini_async(image)))
+
+    def multi_angle_map_reduce():
+        # New photos every call, so no angle is answered from the per-image cache
+        shade = next(shades) % 200
+        angles = [_upload((40 + shade, 120 + i * 40, 40)) for i in range(3)]
+        result = analyze_multi_angle_images(angles, map_reduce=True) or {}
+        analyzed = result.get("multi_angle_observations", {}).get("angles_analyzed")
+        if analyzed != len(angles):
+            raise RuntimeError(f"map-reduce analyzed {analyzed} of {len(angles)} angles")
+        return result
+
+    return analyze_async if stage == "analyze_async" else multi_angle_map_reduce
@@ -0,0 +1,59 @@
+"""Digital twin hot paths: growth slider steps and plant library lookups."""
+
+from components.growth_simulator import GrowthSimulator
+from components.plant_library import get_disease_key, get_plant_config
+from standins import fixtures
+
+from benchmarks.harness import benchmark
+
+PLANT_NAMES = ["Tomato", "tomato plant", "Solanum lycopersicum", "Rice (Oryza sativa)",
+               "sweet corn", "Unknown weed", "Kangkong", "chili pepper"]
+
+# Health statuses as Gemini writes them -> expected DISEASE_PATTERNS key
+DISEASE_NAMES = {
+    "Early Blight": "blight", "Powdery_mildew": "powdery_mildew", "Nitrogen deficiency": "yellowing",
+    "Wilting": "wilt", "Fusarium wilting": "wilt", "Drooping": "wilt",
+    "Rotting stem": "rot", "Decayed fruit": "rot", "Blighted leaves": "blight",
+    "Yellowed leaves": "yellowing", "Rusty spots": "rust", "Healthy": "leaf_spot",
+}
+
+
+@benchmark("simulation", params=[10, 50, 100])
+def get_modified_structure(percentage):
+    simulator = GrowthSimulator(fixtures.plant_structure(fixtures.PLANTS[0]))
+    return lambda: simulator.get_modified_structure(percentage)
+
+
+@benchmark("simulation")
+def slider_scrub(_):
+    """One pass over the growth slider (0-100 %), as when a farmer drags it."""
+    simulator = GrowthSimulator(fixtures.plant_structure(fixtures.PLANTS[0]))
+
+    def scrub():
+        for percentage in range(0, 101, 5):
+            simulator.get_modified_structure(percentage)
+    return scrub
+
+
+@benchmark("plant_library", params=["exact", "alias", "miss"])
+def get_plant_config_lookup(kind):
+    name = {"exact": "rice", "alias": "Solanum lycopersicum (Tomato)", "miss": "Unknown weed"}[kind]
+    return lambda: get_plant_config(name)
+
+
+@benchmark("plant_library")
+def get_plant_config_mixed(_):
+    def lookups():
+        for name in PLANT_NAMES:
+            get_plant_config(name)
+    return lookups
+
+
+@benchmark("plant_library")
+def get_disease_key_mixed(_):
+    def lookups():
+        for name, expected in DISEASE_NAMES.items():
+            key = get_disease_key(name)
+            if key != expected:
+                raise RuntimeError(f"get_disease_key({name!r}) is {key!r}, expected {expected!r}")
+    return lookups
@@ -0,0 +1,200 @@
+"""
+Benchmark Harness
+A small timeit-style runner: benchmarks register with @benchmark, results
+are written as JSON and compared against an earlier run to flag slowdowns.
+
+A benchmark function receives its parameter, does any setup, and returns
+the zero-argument callable to time:
+
+    @benchmark("simulation", params=[25, 100])
+    def growth_step(percentage):
+        simulator = GrowthSimulator(structure)
+        return lambda: simulator.get_modified_structure(percentage)
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# ============================================================================
+# RUN SETTINGS
+# ============================================================================
+
+MIN_ROUND_S = 0.05          # Calls per round are scaled up until a round takes this long
+MAX_NUMBER = 100_000        # ... but never more calls than this per round
+DEFAULT_ROUNDS = 7
+QUICK_ROUNDS = 3
+REGRESSION_THRESHOLD = 0.20  # Median slower by more than this = regression
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+@dataclass
+class Benchmark:
+    group: str
+    name: str
+    func: Callable[[Any], Callable[[], Any]]
+    params: List[Any] = field(default_factory=lambda: [None])
+    rounds: Optional[int] = None     # Fixed rounds (slow benchmarks)
+    number: Optional[int] = None     # Fixed calls per round (skip calibration)
+
+    def key(self, param) -> str:
+        return f"{self.group}/{self.name}" + ("" if param is None else f"[{param}]")
+
+
+BENCHMARKS: List[Benchmark] = []
+
+# Shared resources (e.g. the stand-in servers), closed after the run
+resources = ExitStack()
+
+
+def benchmark(group: str, params: Optional[list] = None, rounds: Optional[int] = None,
+              number: Optional[int] = None):
+    """Register a benchmark (see the module docstring)."""
+    def register(func):
+        BENCHMARKS.append(Benchmark(group, func.__name__, func, params or [None], rounds, number))
+        return func
+    return register
+
+
+# ============================================================================
+# TIMING
+# ============================================================================
+
+def _calibrate(call: Callable[[], Any]) -> int:
+    """Calls per round so one round lasts at least MIN_ROUND_S."""
+    number = 1
+    while number < MAX_NUMBER:
+        started = time.perf_counter()
+        for _ in range(number):
+            call()
+        if time.perf_counter() - started >= MIN_ROUND_S:
+            return number
+        number *= 10
+    return MAX_NUMBER
+
+
+def measure(bench: Benchmark, param, quick: bool = False) -> Dict[str, float]:
+    """Per-call timings (seconds) over several rounds."""
+    call = bench.func(param)
+    number = bench.number or _calibrate(call)
+    rounds = bench.rounds or (QUICK_ROUNDS if quick else DEFAULT_ROUNDS)
+
+    times = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(number):
+            call()
+        times.append((time.perf_counter() - started) / number)
+
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "rounds": rounds,
+        "number": number,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), timeout=10).stdout.strip()
+    except Exception:
+        return ""
+
+
+def run(selected: List[Benchmark], quick: bool = False) -> dict:
+    """Run benchmarks and return the results document."""
+    results, failed = {}, []
+    with resources:
+        for bench in selected:
+            for param in bench.params:
+                key = bench.key(param)
+                try:
+                    results[key] = measure(bench, param, quick)
+                    print(f"{key:<55} {format_time(results[key]['median']):>10}  "
+                          f"(±{format_time(results[key]['stdev'])}, {results[key]['rounds']}x{results[key]['number']})")
+                except Exception as e:
+                    print(f"{key:<55} FAILED: {type(e).__name__}: {e}")
+                    failed.append(key)
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "quick": quick,
+        },
+        "results": results,
+        "failed": failed,
+    }
+
+
+# ============================================================================
+# STORAGE AND COMPARISON
+# ============================================================================
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def save(document: dict, path: Optional[str] = None) -> str:
+    """Write results (default: results/<date>-<commit>.json) and return the path."""
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(RESULTS_DIR, f"{stamp}-{document['meta']['commit'] or 'local'}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    return path
+
+
+def latest_result(exclude: Optional[str] = None) -> Optional[str]:
+    """Most recent saved results file, if any."""
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    files = sorted(
+        os.path.join(RESULTS_DIR, name) for name in os.listdir(RESULTS_DIR)
+        if name.endswith(".json") and os.path.join(RESULTS_DIR, name) != exclude
+    )
+    return files[-1] if files else None
+
+
+def compare(baseline: dict, current: dict, threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """
+    Print a median-to-median comparison.
+
+    Returns:
+        Keys of the benchmarks that got slower than the threshold
+    """
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('commit') or '?'} ({baseline['meta'].get('created_at')}):")
+    for key, result in current["results"].items():
+        before = baseline["results"].get(key)
+        if not before:
+            print(f"  {key:<55} new")
+            continue
+        ratio = result["median"] / before["median"] if before["median"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  << REGRESSION"
+            regressions.append(key)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"  {key:<55} {format_time(before['median']):>10} -> {format_time(result['median']):>10}"
+              f"  x{ratio:.2f}{flag}")
+    return regressions
@@ -0,0 +1,110 @@
+"""
+Import Time Profile
+Imports a module in a fresh interpreter with -X importtime and reports
+the slowest imports it pulled in (cumulative time, including children):
+
+    python -m benchmarks.importtime core.agent pages.registry [--top 15]
+
+Use it to find heavy dependencies that a page or module imports eagerly
+but only needs on some code paths (google.genai, supabase, pandas, PIL,
+numpy), and to check that deferring them took them off the startup path.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# "import time:       412 |       1873 |   google.genai.types"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S.*)$")
+
+
+@dataclass
+class ImportEntry:
+    name: str
+    self_s: float
+    cumulative_s: float
+    depth: int
+
+
+@dataclass
+class ImportProfile:
+    module: str
+    wall_s: float                       # Whole interpreter run, startup included
+    entries: List[ImportEntry] = field(default_factory=list)
+
+    @property
+    def total_s(self) -> float:
+        """Cumulative import time of the module itself."""
+        return next((e.cumulative_s for e in self.entries if e.name == self.module), 0.0)
+
+    def slowest(self, top: int = 15, packages_only: bool = True) -> List[ImportEntry]:
+        """Slowest imports by cumulative time (top-level packages by default)."""
+        entries = [e for e in self.entries if not packages_only or "." not in e.name or e.name == self.module]
+        return sorted(entries, key=lambda e: e.cumulative_s, reverse=True)[:top]
+
+
+def _parse(stderr: str) -> List[ImportEntry]:
+    entries = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append(ImportEntry(name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6,
+                                       (len(indent) - 1) // 2))
+    return entries
+
+
+def profile_import(module: str) -> ImportProfile:
+    """
+    Import a module in a new interpreter and collect its import times.
+
+    Args:
+        module: Dotted module name, e.g. "core.agent"
+
+    Returns:
+        ImportProfile of that one cold import
+    """
+    # The repo's top-level types/ package shadows the standard library one,
+    # so the child imports it first and only then puts the repo on the path
+    paths = [ROOT] + [p for p in sys.path if p and os.path.abspath(p) != ROOT]
+    code = f"import types, sys; sys.path[:] = {paths!r}; import {module}"
+
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-I", "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, cwd=os.path.dirname(ROOT))
+    wall_s = time.perf_counter() - started
+
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise RuntimeError(f"Importing {module} failed: {error}")
+    return ImportProfile(module, wall_s, _parse(result.stderr))
+
+
+def print_profile(profile: ImportProfile, top: int = 15):
+    print(f"\n{profile.module}: {profile.total_s * 1000:.0f} ms import, "
+          f"{profile.wall_s * 1000:.0f} ms with interpreter startup")
+    print(f"  {'cumulative':>10}  {'self':>8}  package")
+    for entry in profile.slowest(top):
+        print(f"  {entry.cumulative_s * 1000:8.1f}ms  {entry.self_s * 1000:6.1f}ms  {entry.name}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cold import time of app modules.")
+    parser.add_argument("modules", nargs="+", help="Dotted module names, e.g. core.agent")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list per module")
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        print_profile(profile_import(module), args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
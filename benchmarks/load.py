@@ -0,0 +1,616 @@
+"""
+Load Generator
+Runs the app with `streamlit run` against the Gemini and Supabase stand-ins
+and drives it with many concurrent simulated users over Streamlit's own
+websocket protocol, to find how many sessions one server can carry:
+
+    python -m benchmarks.load [--sessions 20] [--duration 60] [--ramp-up 10]
+                              [--mix scan=1,registry=2,twin=2] [--think-ms 500]
+                              [--gemini-latency-ms 800] [--seed-rows 2000]
+                              [--json PATH]
+
+Each session behaves like one browser tab running a scenario in a loop:
+
+    scan      Home -> SCAN NOW -> camera capture -> Analyze (upload, Gemini
+              stream, save) -> back to the dashboard
+    registry  Open the Registry page
+    twin      Upload a photo on the Digital Twin page, Clone & Simulate once,
+              then scrub the growth slider
+
+Reported: interactions per second, p50/p95/p99 latency of every step (the
+time from the rerun request to the script finishing), server memory per
+session (Linux only) and the depth of the Gemini request queue.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.Common_pb2 import UploadedFileInfo
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+from tornado.websocket import websocket_connect
+
+from standins.environment import StandinEnvironment, standin_environment
+from standins.gemini_server import GeminiStandinConfig
+
+# ============================================================================
+# SETTINGS
+# ============================================================================
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+DEFAULT_MIX = "scan=1,registry=2,twin=2"
+SERVER_START_TIMEOUT_S = 60
+RERUN_TIMEOUT_S = 120
+QUEUE_SAMPLE_INTERVAL_S = 0.05
+MEMORY_SAMPLE_INTERVAL_S = 1.0
+SCRUB_STEPS = list(range(0, 101, 10))
+
+# Page url paths (st.Page derives them from the file names; "" is the default page)
+HOME_PAGE = ""
+REGISTRY_PAGE = "registry"
+TWIN_PAGE = "view_digital_twin"
+
+_FINAL_STATUSES = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_WITH_COMPILE_ERROR)
+
+
+# ============================================================================
+# APP SERVER
+# ============================================================================
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _toml(secrets: Dict[str, str]) -> str:
+    return "".join(f"{key} = {json.dumps(value)}\n" for key, value in secrets.items())
+
+
+class AppServer:
+    """`streamlit run app.py` in a subprocess, with secrets for the stand-ins."""
+
+    def __init__(self, secrets: Dict[str, str]):
+        self.port = _free_port()
+        self._dir = tempfile.TemporaryDirectory(prefix="ani-load-")
+        self._secrets_path = os.path.join(self._dir.name, "secrets.toml")
+        with open(self._secrets_path, "w", encoding="utf-8") as f:
+            f.write(_toml(secrets))
+        self._log = open(os.path.join(self._dir.name, "server.log"), "w+", encoding="utf-8")
+        self.process: Optional[subprocess.Popen] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", APP_PATH,
+             "--global.developmentMode=false", "--server.headless=true",
+             "--server.address=127.0.0.1", f"--server.port={self.port}",
+             "--server.fileWatcherType=none", "--server.runOnSave=false",
+             "--server.enableXsrfProtection=false", "--browser.gatherUsageStats=false",
+             f"--secrets.files={self._secrets_path}", "--logger.level=error"],
+            cwd=ROOT, stdout=self._log, stderr=subprocess.STDOUT,
+        )
+        deadline = time.monotonic() + SERVER_START_TIMEOUT_S
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"streamlit exited with code {self.process.returncode}:\n{self.log_tail()}")
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=0.5):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError(f"streamlit did not start within {SERVER_START_TIMEOUT_S}s:\n{self.log_tail()}")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self._log.close()
+        self._dir.cleanup()
+
+    def rss_bytes(self) -> Optional[int]:
+        """Resident memory of the server process (Linux /proc; None elsewhere)."""
+        try:
+            with open(f"/proc/{self.process.pid}/status", "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except (OSError, AttributeError):
+            pass
+        return None
+
+    def log_tail(self, lines: int = 30) -> str:
+        self._log.flush()
+        self._log.seek(0)
+        return "".join(self._log.readlines()[-lines:])
+
+
+# ============================================================================
+# BROWSER SESSION
+# ============================================================================
+
+class BrowserSession:
+    """
+    One browser tab: a websocket connection that requests reruns with widget
+    values, the way the Streamlit frontend does.
+    """
+
+    def __init__(self, server_url: str):
+        self.server_url = server_url
+        self.session_id = ""
+        self.page = HOME_PAGE
+        self.widgets: Dict[str, str] = {}           # user key or label -> widget id
+        self.values: Dict[str, WidgetState] = {}    # Widget values sent with every rerun
+        self.exceptions: List[str] = []             # st.exception elements from the last run
+        self._ws = None
+
+    async def open(self):
+        ws_url = self.server_url.replace("http://", "ws://") + "/_stcore/stream"
+        self._ws = await websocket_connect(ws_url, max_message_size=256 * 1024 * 1024)
+
+    def close(self):
+        if self._ws is not None:
+            self._ws.close()
+            self._ws = None
+
+    # ------------------------------------------------------------------
+    # Messages
+    # ------------------------------------------------------------------
+
+    async def _send(self, msg: BackMsg):
+        await self._ws.write_message(msg.SerializeToString(), binary=True)
+
+    async def _receive(self) -> ForwardMsg:
+        data = await asyncio.wait_for(self._ws.read_message(), RERUN_TIMEOUT_S)
+        if data is None:
+            raise ConnectionError("websocket closed by the server")
+        msg = ForwardMsg()
+        msg.ParseFromString(data)
+
+        kind = msg.WhichOneof("type")
+        if kind == "new_session":
+            self.session_id = msg.new_session.initialize.session_id
+        elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+            self._index_element(msg.delta.new_element)
+        elif kind == "page_not_found":
+            self.exceptions.append(f"page not found: {msg.page_not_found.page_name}")
+        return msg
+
+    def _index_element(self, element):
+        element_type = element.WhichOneof("type")
+        if element_type == "exception":
+            self.exceptions.append(f"{element.exception.type}: {element.exception.message}")
+            return
+        proto = getattr(element, element_type, None)
+        widget_id = getattr(proto, "id", "")
+        if not widget_id.startswith("$$ID-"):
+            return
+        # Ids are "$$ID-<hash>-<key>"; keyless widgets end in "-None"
+        user_key = widget_id.rsplit("-", 1)[-1]
+        if user_key != "None":
+            self.widgets[user_key] = widget_id
+        if getattr(proto, "label", ""):
+            self.widgets[proto.label] = widget_id
+
+    # ------------------------------------------------------------------
+    # Interactions
+    # ------------------------------------------------------------------
+
+    def widget_id(self, name: str) -> str:
+        """Id of a widget from the last run, by user key or label."""
+        if name not in self.widgets:
+            raise LookupError(f"widget {name!r} not on page {self.page or 'home'!r}")
+        return self.widgets[name]
+
+    async def rerun(self, page: Optional[str] = None, trigger: Optional[str] = None) -> float:
+        """
+        Request a rerun and wait for it (and any st.rerun it causes) to finish.
+
+        Args:
+            page: Switch to this page url path (widget values are dropped)
+            trigger: Widget name of a button to press during this run
+
+        Returns:
+            Seconds from the request to the final script_finished
+        """
+        if page is not None and page != self.page:
+            self.page = page
+            self.values.clear()
+
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.page_name = self.page
+        state.widget_states.widgets.extend(self.values.values())
+        if trigger is not None:
+            state.widget_states.widgets.add(id=self.widget_id(trigger), trigger_value=True)
+
+        self.widgets.clear()
+        self.exceptions = []
+        started = time.perf_counter()
+        await self._send(msg)
+        while True:
+            reply = await self._receive()
+            if reply.WhichOneof("type") == "script_finished" and reply.script_finished in _FINAL_STATUSES:
+                return time.perf_counter() - started
+
+    async def click(self, name: str) -> float:
+        return await self.rerun(trigger=name)
+
+    async def set_slider(self, name: str, value: float) -> float:
+        widget_id = self.widget_id(name)
+        self.values[widget_id] = WidgetState(id=widget_id)
+        self.values[widget_id].double_array_value.data.append(value)
+        return await self.rerun()
+
+    async def upload(self, name: str, filename: str, data: bytes, content_type: str = "image/jpeg") -> float:
+        """Upload a file to a file_uploader / camera_input and rerun with it."""
+        widget_id = self.widget_id(name)
+
+        request = BackMsg()
+        request.file_urls_request.request_id = uuid.uuid4().hex
+        request.file_urls_request.session_id = self.session_id
+        request.file_urls_request.file_names.append(filename)
+        await self._send(request)
+        while True:
+            reply = await self._receive()
+            if (reply.WhichOneof("type") == "file_urls_response"
+                    and reply.file_urls_response.response_id == request.file_urls_request.request_id):
+                break
+        if reply.file_urls_response.error_msg:
+            raise RuntimeError(reply.file_urls_response.error_msg)
+        urls = reply.file_urls_response.file_urls[0]
+
+        boundary = uuid.uuid4().hex
+        body = (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+        await AsyncHTTPClient().fetch(HTTPRequest(
+            self.server_url + urls.upload_url, method="PUT", body=body,
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        ))
+
+        state = WidgetState(id=widget_id)
+        state.file_uploader_state_value.uploaded_file_info.append(UploadedFileInfo(
+            id=1, name=filename, size=len(data), file_id=urls.file_id, file_urls=urls,
+        ))
+        state.file_uploader_state_value.max_file_id = 1
+        self.values[widget_id] = state
+        return await self.rerun()
+
+
+# ============================================================================
+# SCENARIOS
+# ============================================================================
+
+def photo(rng: random.Random, size: int = 480) -> bytes:
+    """A random plant-ish JPEG (different every call, so no cache answers it)."""
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", (size, size), (rng.randint(60, 140), rng.randint(90, 180), rng.randint(40, 90)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x, y, r = rng.randint(0, size), rng.randint(0, size), rng.randint(5, 40)
+        draw.ellipse((x - r, y - r, x + r, y + r),
+                     fill=(rng.randint(20, 120), rng.randint(100, 220), rng.randint(20, 100)))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=80)
+    return buffer.getvalue()
+
+
+async def scan_scenario(session: BrowserSession, record: Callable[[str, float], None], rng: random.Random):
+    record("scan:home", await session.rerun(page=HOME_PAGE))
+    record("scan:open_camera", await session.click("SCAN NOW! 📸"))
+    record("scan:capture", await session.upload("📸 Tap to Scan", "capture.jpg", photo(rng)))
+    record("scan:analyze", await session.click("🔍 Analyze Plant"))
+    session.values.clear()
+
+
+async def registry_scenario(session: BrowserSession, record: Callable[[str, float], None], rng: random.Random):
+    record("registry:open", await session.rerun(page=REGISTRY_PAGE))
+
+
+async def twin_scenario(session: BrowserSession, record: Callable[[str, float], None], rng: random.Random):
+    if "single_growth_progress_slider" not in session.widgets:
+        record("twin:open", await session.rerun(page=TWIN_PAGE))
+        record("twin:upload", await session.upload("single_image_uploader", "plant.jpg", photo(rng)))
+        record("twin:clone", await session.click("single_clone_btn"))
+    steps = SCRUB_STEPS if rng.random() < 0.5 else SCRUB_STEPS[::-1]
+    for value in steps:
+        record("twin:scrub", await session.set_slider("single_growth_progress_slider", value))
+
+
+SCENARIOS = {
+    "scan": scan_scenario,
+    "registry": registry_scenario,
+    "twin": twin_scenario,
+}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """'scan=1,registry=2' -> {'scan': 1.0, 'registry': 2.0}"""
+    weights = {}
+    for part in filter(None, (p.strip() for p in mix.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name!r} (choose from {', '.join(SCENARIOS)})")
+        weights[name] = float(weight or 1)
+    if not weights or sum(weights.values()) <= 0:
+        raise ValueError("The mix needs at least one scenario with a positive weight")
+    return weights
+
+
+def assign_scenarios(sessions: int, weights: Dict[str, float]) -> List[str]:
+    """Spread sessions over the scenarios in proportion to the weights."""
+    total = sum(weights.values())
+    assigned, counts = [], defaultdict(int)
+    for i in range(sessions):
+        # Pick the scenario furthest below its share so far
+        name = max(weights, key=lambda n: weights[n] / total * (i + 1) - counts[n])
+        counts[name] += 1
+        assigned.append(name)
+    return assigned
+
+
+# ============================================================================
+# RUN AND REPORT
+# ============================================================================
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+@dataclass
+class LoadReport:
+    sessions: int
+    scenarios: Dict[str, int]
+    duration_s: float = 0.0
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    error_samples: List[str] = field(default_factory=list)
+    queue_depths: List[int] = field(default_factory=list)
+    gemini_requests: int = 0
+    gemini_rate_limited: int = 0
+    rss_baseline: Optional[int] = None
+    rss_peak: Optional[int] = None
+    rss_loaded: Optional[int] = None
+
+    def record_error(self, step: str, message: str):
+        self.errors[step] += 1
+        if len(self.error_samples) < 10:
+            self.error_samples.append(f"{step}: {message}")
+
+    def summary(self) -> dict:
+        interactions = sum(len(v) for v in self.latencies.values())
+        steps = {}
+        for step, values in sorted(self.latencies.items()):
+            steps[step] = {
+                "count": len(values),
+                "errors": self.errors.get(step, 0),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "p99": _percentile(values, 99),
+                "max": max(values),
+            }
+        memory = None
+        if self.rss_baseline is not None and self.rss_loaded is not None:
+            memory = {
+                "baseline_mb": self.rss_baseline / 2 ** 20,
+                "loaded_mb": self.rss_loaded / 2 ** 20,
+                "peak_mb": (self.rss_peak or self.rss_loaded) / 2 ** 20,
+                "per_session_mb": max(0, self.rss_loaded - self.rss_baseline) / 2 ** 20 / max(1, self.sessions),
+            }
+        return {
+            "sessions": self.sessions,
+            "scenarios": self.scenarios,
+            "duration_s": self.duration_s,
+            "interactions": interactions,
+            "throughput_per_s": interactions / self.duration_s if self.duration_s else 0.0,
+            "errors": sum(self.errors.values()),
+            "error_samples": self.error_samples,
+            "steps": steps,
+            "gemini": {
+                "requests": self.gemini_requests,
+                "rate_limited": self.gemini_rate_limited,
+                "queue_mean": statistics.mean(self.queue_depths) if self.queue_depths else 0.0,
+                "queue_p95": _percentile(self.queue_depths, 95) if self.queue_depths else 0,
+                "queue_max": max(self.queue_depths, default=0),
+            },
+            "memory": memory,
+        }
+
+
+def print_report(summary: dict):
+    mix = ", ".join(f"{name} x{count}" for name, count in summary["scenarios"].items())
+    print(f"\n{summary['sessions']} sessions ({mix}) for {summary['duration_s']:.1f}s")
+    print(f"{summary['interactions']} interactions, {summary['throughput_per_s']:.2f}/s, "
+          f"{summary['errors']} errors\n")
+    print(f"{'step':<20} {'count':>6} {'errors':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for step, s in summary["steps"].items():
+        print(f"{step:<20} {s['count']:>6} {s['errors']:>6} {s['p50'] * 1000:>7.0f}ms "
+              f"{s['p95'] * 1000:>7.0f}ms {s['p99'] * 1000:>7.0f}ms {s['max'] * 1000:>7.0f}ms")
+
+    gemini = summary["gemini"]
+    print(f"\nGemini: {gemini['requests']} requests ({gemini['rate_limited']} rate limited), "
+          f"queue depth mean {gemini['queue_mean']:.1f} / p95 {gemini['queue_p95']} / max {gemini['queue_max']}")
+    memory = summary["memory"]
+    if memory:
+        print(f"Server memory: {memory['baseline_mb']:.0f}MB idle -> {memory['loaded_mb']:.0f}MB loaded "
+              f"(peak {memory['peak_mb']:.0f}MB), {memory['per_session_mb']:.1f}MB per session")
+    else:
+        print("Server memory: not available on this platform")
+    for sample in summary["error_samples"]:
+        print(f"  ! {sample}")
+
+
+async def _session_loop(server: AppServer, scenario: str, report: LoadReport, deadline: float,
+                        think_s: float, rng: random.Random, sessions: List[BrowserSession]):
+    session = BrowserSession(server.url)
+    sessions.append(session)
+    step = f"{scenario}:connect"
+
+    def record(name: str, seconds: float):
+        nonlocal step
+        step = name
+        report.latencies[name].append(seconds)
+        for message in session.exceptions:
+            report.record_error(name, message)
+
+    try:
+        await session.open()
+        while time.monotonic() < deadline:
+            try:
+                await SCENARIOS[scenario](session, record, rng)
+            except (LookupError, RuntimeError, asyncio.TimeoutError) as e:
+                report.record_error(step, f"{type(e).__name__}: {e}")
+                session.widgets.clear()
+                session.values.clear()
+            if think_s:
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * think_s)
+    except Exception as e:
+        report.record_error(step, f"{type(e).__name__}: {e}")
+
+
+async def _sample(env: StandinEnvironment, server: AppServer, report: LoadReport, stop: asyncio.Event):
+    next_memory = 0.0
+    while not stop.is_set():
+        report.queue_depths.append(env.gemini.stats.in_flight)
+        now = time.monotonic()
+        if now >= next_memory:
+            next_memory = now + MEMORY_SAMPLE_INTERVAL_S
+            rss = server.rss_bytes()
+            if rss is not None:
+                report.rss_peak = max(report.rss_peak or 0, rss)
+        await asyncio.sleep(QUEUE_SAMPLE_INTERVAL_S)
+
+
+async def run_load(env: StandinEnvironment, server: AppServer, sessions: int, duration_s: float,
+                   weights: Dict[str, float], ramp_up_s: float = 0.0, think_s: float = 0.0,
+                   seed: int = 0) -> LoadReport:
+    """
+    Run the sessions against a started server.
+
+    Args:
+        env: The stand-ins the server talks to
+        server: The running app server
+        sessions: Number of concurrent browser sessions
+        duration_s: How long to keep generating load (after ramp-up starts)
+        weights: Scenario mix, e.g. {"scan": 1, "registry": 2}
+        ramp_up_s: Spread session starts over this many seconds
+        think_s: Mean pause between scenario iterations
+
+    Returns:
+        The filled LoadReport
+    """
+    assigned = assign_scenarios(sessions, weights)
+    report = LoadReport(sessions, {name: assigned.count(name) for name in weights})
+
+    # Warm the server (imports, caches) so the baseline is an idle but loaded app
+    warm = BrowserSession(server.url)
+    await warm.open()
+    await warm.rerun(page=HOME_PAGE)
+    await warm.rerun(page=REGISTRY_PAGE)
+    warm.close()
+    await asyncio.sleep(1)
+    report.rss_baseline = server.rss_bytes()
+    requests_before, limited_before = env.gemini.stats.requests, env.gemini.stats.rate_limited
+
+    stop = asyncio.Event()
+    sampler = asyncio.ensure_future(_sample(env, server, report, stop))
+    started = time.monotonic()
+    deadline = started + duration_s
+    open_sessions: List[BrowserSession] = []
+    tasks = []
+    for i, scenario in enumerate(assigned):
+        if ramp_up_s and sessions > 1:
+            await asyncio.sleep(max(0.0, started + ramp_up_s * i / (sessions - 1) - time.monotonic()))
+        tasks.append(asyncio.ensure_future(_session_loop(
+            server, scenario, report, deadline, think_s, random.Random(seed * 100_003 + i), open_sessions
+        )))
+    await asyncio.gather(*tasks)
+    report.duration_s = time.monotonic() - started
+
+    # Memory while every session (and its session_state) is still connected
+    report.rss_loaded = server.rss_bytes()
+    stop.set()
+    await sampler
+    for session in open_sessions:
+        session.close()
+
+    report.gemini_requests = env.gemini.stats.requests - requests_before
+    report.gemini_rate_limited = env.gemini.stats.rate_limited - limited_before
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Multi-session load test of the Streamlit app.")
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent browser sessions")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of load")
+    parser.add_argument("--ramp-up", type=float, default=10, help="Seconds over which sessions start")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights, e.g. scan=1,registry=2,twin=2")
+    parser.add_argument("--think-ms", type=float, default=500, help="Mean pause between iterations")
+    parser.add_argument("--gemini-latency-ms", type=float, default=800)
+    parser.add_argument("--gemini-jitter-ms", type=float, default=200)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of a Gemini 429")
+    parser.add_argument("--seed-rows", type=int, default=2000, help="plants_registry rows to create")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="Also write the summary to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        weights = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    gemini_config = GeminiStandinConfig(
+        latency_ms=args.gemini_latency_ms, jitter_ms=args.gemini_jitter_ms,
+        rate_limit_rate=args.rate_limit_rate, seed=args.seed,
+    )
+    with standin_environment(gemini_config, seed_rows=args.seed_rows) as env:
+        server = AppServer(env.secrets)
+        try:
+            server.start()
+            print(f"App on {server.url}, Gemini stand-in on {env.gemini_url}, Supabase stand-in on {env.supabase_url}")
+            report = asyncio.run(run_load(
+                env, server, args.sessions, args.duration, weights,
+                ramp_up_s=args.ramp_up, think_s=args.think_ms / 1000, seed=args.seed,
+            ))
+        finally:
+            server.stop()
+
+    summary = report.summary()
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nSaved {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
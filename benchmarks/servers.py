@@ -0,0 +1,29 @@
+"""Shared stand-in servers for the benchmarks (started on first use)."""
+
+from typing import List, Optional
+
+from standins.environment import StandinEnvironment, standin_environment
+from standins.gemini_server import GeminiStandinConfig
+from standins.supabase_server import SupabaseStandin
+
+from benchmarks.harness import resources
+
+# Gemini answers instantly: the benchmark measures the app's own overhead
+GEMINI_CONFIG = GeminiStandinConfig(latency_ms=0)
+
+_env: Optional[StandinEnvironment] = None
+
+
+def standin_env() -> StandinEnvironment:
+    """The running stand-ins (app secrets point at them)."""
+    global _env
+    if _env is None:
+        _env = resources.enter_context(standin_environment(GEMINI_CONFIG))
+    return _env
+
+
+def registry_rows(count: int) -> List[dict]:
+    """plants_registry rows as the API returns them, without a server."""
+    store = SupabaseStandin()
+    store.seed_registry(count)
+    return store.tables["plants_registry"]
@@ -0,0 +1,24 @@
+import streamlit as st
+from core.agent import ani_agent_stream
+from core.history_management import get_conversation_memory
+
+def render_ani_chat():
+    """Chat with A.N.I.; answers stream in as they are generated."""
+    st.divider()
+    st.markdown("### 💬 Ask A.N.I.")
+
+    memory = get_conversation_memory()
+    for message in memory.messages:
+        with st.chat_message("user" if message["role"] == "user" else "assistant"):
+            st.markdown(message["content"])
+
+    question = st.chat_input("Ask about crops, pests, or how to use the app...")
+    if not question:
+        return
+
+    with st.chat_message("user"):
+        st.markdown(question)
+
+    # The turn is added to memory once the answer has finished streaming
+    with st.chat_message("assistant"):
+        st.write_stream(ani_agent_stream(question, memory))
@@ -0,0 +1,220 @@
+"""
+Batch Growth Simulator for Farm Planning
+Vectorized counterpart of GrowthSimulator: evaluates many plants across all
+27 water/sunlight/nutrient combinations and a growth-percentage grid in one
+NumPy pass, using the same stage and scenario tables.
+"""
+
+from dataclasses import dataclass
+from itertools import product
+from typing import Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from components.crop_model import CROP_MODELS, GROWTH_STAGES, get_crop_model
+from components.growth_simulator import SCENARIO_EFFECTS
+
+# ============================================================================
+# ARRAY TABLES - Built once at import
+# ============================================================================
+
+SCENARIO_TYPES = ("water", "sunlight", "nutrients")
+SCENARIO_LEVELS = ("low", "optimal", "high")
+
+STAGE_NAMES = tuple(GROWTH_STAGES)
+_STAGE_INDEX = {name: i for i, name in enumerate(STAGE_NAMES)}
+
+# Per-crop percentage -> stage index lookup, shape (crops, 101)
+CROP_KEYS = tuple(CROP_MODELS)
+_CROP_INDEX = {key: i for i, key in enumerate(CROP_KEYS)}
+CROP_STAGE_LUT = np.array([
+    [_STAGE_INDEX[stage] for stage in CROP_MODELS[key].stage_by_percentage]
+    for key in CROP_KEYS
+], dtype=np.int16)
+CROP_DAYS = np.array([CROP_MODELS[key].days_to_harvest for key in CROP_KEYS], dtype=np.float64)
+
+# Per-crop interpolated factors by percentage, shape (crops, 101)
+CROP_LEAF_LUT = np.array([CROP_MODELS[key].curve["leaf_factor"] for key in CROP_KEYS])
+CROP_FRUIT_LUT = np.array([CROP_MODELS[key].curve["fruit_factor"] for key in CROP_KEYS])
+CROP_HEIGHT_LUT = np.array([CROP_MODELS[key].curve["height_factor"] for key in CROP_KEYS])
+
+
+def _scenario_table(field: str, default: float) -> np.ndarray:
+    """Effect field as a (scenario type, level) array."""
+    return np.array([
+        [SCENARIO_EFFECTS[kind][level].get(field, default) for level in SCENARIO_LEVELS]
+        for kind in SCENARIO_TYPES
+    ])
+
+
+# All 27 combinations as level indices, shape (27, 3): water, sunlight, nutrients
+SCENARIO_GRID = np.array(list(product(range(len(SCENARIO_LEVELS)), repeat=len(SCENARIO_TYPES))))
+_TYPE_AXIS = np.arange(len(SCENARIO_TYPES))
+
+# Combined effects per combination, shape (27,) - same rules as apply_scenario_effects
+SCENARIO_GROWTH_MODIFIER = _scenario_table("growth_modifier", 1.0)[_TYPE_AXIS, SCENARIO_GRID].prod(axis=1)
+SCENARIO_HEALTH_IMPACT = _scenario_table("health_impact", 0.0)[_TYPE_AXIS, SCENARIO_GRID].sum(axis=1)
+SCENARIO_LEAF_DROOP = np.minimum(_scenario_table("leaf_droop", 0.0)[_TYPE_AXIS, SCENARIO_GRID].sum(axis=1), 0.5)
+SCENARIO_STRETCH = _scenario_table("stretch_factor", 1.0)[_TYPE_AXIS, SCENARIO_GRID].prod(axis=1)
+SCENARIO_LEAF_SIZE = _scenario_table("leaf_size_modifier", 1.0)[_TYPE_AXIS, SCENARIO_GRID].prod(axis=1)
+
+DEFAULT_GROWTH_GRID = np.arange(0, 101, 5)
+
+
+# ============================================================================
+# INPUT PREPARATION
+# ============================================================================
+
+@dataclass
+class PlantBatch:
+    """Per-plant inputs as parallel arrays, shape (plants,)."""
+    labels: List[str]
+    crop_index: np.ndarray
+    height_cm: np.ndarray
+    leaf_count: np.ndarray
+    fruit_count: np.ndarray
+    has_leaf_count: np.ndarray      # bool; the 2-leaf floor only applies to known counts
+
+    @classmethod
+    def from_structures(cls, structures: Sequence[Mapping],
+                        labels: Optional[Sequence[str]] = None) -> "PlantBatch":
+        """
+        Build a batch from Gemini plant structures (dicts or overlays).
+        Missing sizes default to 0, like an unset field in GrowthSimulator.
+        """
+        crop_index, height, leaves, fruits, has_leaves, names = [], [], [], [], [], []
+        for structure in structures:
+            identified = structure.get("identified_plant") or {}
+            arch = structure.get("plant_architecture") or {}
+            leaf_sys = structure.get("leaf_system") or {}
+            name = identified.get("common_name") or "Plant"
+
+            names.append(name)
+            crop_index.append(_CROP_INDEX[get_crop_model(name).key])
+            height.append(arch.get("height_cm") or 0)
+            leaves.append(leaf_sys.get("total_count") or 0)
+            has_leaves.append(leaf_sys.get("total_count") is not None)
+            fruits.append(arch.get("fruit_count") or 0)
+
+        return cls(
+            labels=list(labels) if labels is not None else names,
+            crop_index=np.array(crop_index, dtype=np.intp),
+            height_cm=np.array(height, dtype=np.float64),
+            leaf_count=np.array(leaves, dtype=np.float64),
+            fruit_count=np.array(fruits, dtype=np.float64),
+            has_leaf_count=np.array(has_leaves, dtype=bool)
+        )
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+# ============================================================================
+# BATCH SIMULATION
+# ============================================================================
+
+@dataclass
+class BatchResult:
+    """
+    Simulation output. Per-plant arrays have shape (plants, growth),
+    per-scenario arrays (27,), and combined arrays (plants, 27, growth).
+    """
+    batch: PlantBatch
+    growth_pct: np.ndarray
+    stage_index: np.ndarray
+    height_cm: np.ndarray
+    leaf_count: np.ndarray
+    fruit_count: np.ndarray
+    days_to_harvest: np.ndarray
+    growth_modifier: np.ndarray
+    health_impact: np.ndarray
+    adjusted_days_to_harvest: np.ndarray
+
+    def to_frame(self):
+        """
+        Tidy DataFrame with one row per (plant, scenario, growth %).
+        Columns: plant_index, plant, crop, water, sunlight, nutrients,
+        growth_pct, stage, height_cm, leaf_count, fruit_count,
+        growth_modifier, health_impact, days_to_harvest,
+        adjusted_days_to_harvest.
+        """
+        import pandas as pd
+
+        n_plants, n_scenarios, n_growth = self.adjusted_days_to_harvest.shape
+        plant_idx, scenario_idx, growth_idx = np.indices((n_plants, n_scenarios, n_growth)).reshape(3, -1)
+
+        # Categorical columns keep a million-row frame cheap to build
+        def categorical(codes, categories):
+            return pd.Categorical.from_codes(codes, categories=list(categories))
+
+        label_names, label_codes = np.unique(np.array(self.batch.labels, dtype=str), return_inverse=True)
+
+        return pd.DataFrame({
+            "plant_index": plant_idx,
+            "plant": categorical(label_codes[plant_idx], label_names),
+            "crop": categorical(self.batch.crop_index[plant_idx], CROP_KEYS),
+            "water": categorical(SCENARIO_GRID[scenario_idx, 0], SCENARIO_LEVELS),
+            "sunlight": categorical(SCENARIO_GRID[scenario_idx, 1], SCENARIO_LEVELS),
+            "nutrients": categorical(SCENARIO_GRID[scenario_idx, 2], SCENARIO_LEVELS),
+            "growth_pct": self.growth_pct[growth_idx],
+            "stage": categorical(self.stage_index[plant_idx, growth_idx], STAGE_NAMES),
+            "height_cm": self.height_cm[plant_idx, growth_idx],
+            "leaf_count": self.leaf_count[plant_idx, growth_idx],
+            "fruit_count": self.fruit_count[plant_idx, growth_idx],
+            "growth_modifier": self.growth_modifier[scenario_idx],
+            "health_impact": self.health_impact[scenario_idx],
+            "days_to_harvest": self.days_to_harvest[plant_idx, growth_idx],
+            "adjusted_days_to_harvest": self.adjusted_days_to_harvest.reshape(-1)
+        })
+
+
+def simulate_batch(plants, growth_pct: Iterable[int] = DEFAULT_GROWTH_GRID) -> BatchResult:
+    """
+    Simulate every plant at every growth percentage under all 27 scenarios.
+
+    Args:
+        plants: A PlantBatch, or a sequence of plant structures
+        growth_pct: Growth percentages to evaluate (0-100)
+
+    Returns:
+        BatchResult; height/leaf/fruit counts match GrowthSimulator for the
+        same inputs. adjusted_days_to_harvest divides the remaining days by
+        the scenario growth modifier (slower growth -> later harvest).
+    """
+    batch = plants if isinstance(plants, PlantBatch) else PlantBatch.from_structures(plants)
+    pct = np.clip(np.asarray(list(growth_pct), dtype=np.int64), 0, 100)
+
+    # (plants, growth)
+    crop_pct = (batch.crop_index[:, None], pct[None, :])
+    stage_index = CROP_STAGE_LUT[crop_pct]
+    height = np.floor(batch.height_cm[:, None] * CROP_HEIGHT_LUT[crop_pct])
+    leaves = np.floor(batch.leaf_count[:, None] * CROP_LEAF_LUT[crop_pct])
+    leaves = np.where(batch.has_leaf_count[:, None], np.maximum(2, leaves), leaves)
+    fruits = np.floor(batch.fruit_count[:, None] * CROP_FRUIT_LUT[crop_pct])
+
+    total_days = CROP_DAYS[batch.crop_index][:, None]
+    days_remaining = np.maximum(0, np.floor(total_days - (pct[None, :] / 100) * total_days))
+
+    # (plants, 27, growth)
+    adjusted = np.ceil(days_remaining[:, None, :] / SCENARIO_GROWTH_MODIFIER[None, :, None])
+
+    return BatchResult(
+        batch=batch,
+        growth_pct=pct,
+        stage_index=stage_index,
+        height_cm=height,
+        leaf_count=leaves,
+        fruit_count=fruits,
+        days_to_harvest=days_remaining,
+        growth_modifier=SCENARIO_GROWTH_MODIFIER,
+        health_impact=SCENARIO_HEALTH_IMPACT,
+        adjusted_days_to_harvest=adjusted
+    )
+
+
+def scenario_labels() -> List[dict]:
+    """The 27 scenario combinations in SCENARIO_GRID order."""
+    return [
+        {kind: SCENARIO_LEVELS[level] for kind, level in zip(SCENARIO_TYPES, row)}
+        for row in SCENARIO_GRID
+    ]
@@ -1,10 +1,21 @@
 import streamlit as st
-import json
 import time
-from core.agent import ask_gemini
+from core.agent import ScanFailed, ask_gemini_stream
 from services.db_service import upload_image_to_supabase, save_plant_to_db 
+from services.vision_service import find_recent_scan, remember_scan
 from components.registry_table import render_registry_table
 
+def _scan_preview(analysis_data: dict) -> str:
+    """Markdown for the scan fields received so far."""
+    lines = []
+    if analysis_data.get("plant_name"):
+        lines.append(f"🌿 **Plant:** {analysis_data['plant_name']}")
+    if analysis_data.get("health_status"):
+        lines.append(f"🩺 **Status:** {analysis_data['health_status']}")
+    if analysis_data.get("action_plan"):
+        lines.append(f"💊 **Rx:** {analysis_data['action_plan']}")
+    return "  \n".join(lines) or "⏳ Waiting for results..."
+
 def take_picture_view():
     st.markdown("""
     <style>
@@ -37,12 +48,26 @@ def take_picture_view():
                 if image_url:
                     st.write("🧠 Analyzing...")
                     img_file.seek(0) 
-                    ai_response = ask_gemini(img_file)
-                    
-                    clean_json = ai_response.replace("```json", "").replace("```", "").strip()
+                    preview = st.empty()
                     
                     try:
-                        analysis_data = json.loads(clean_json)
+                        # A near-identical photo from this device was just analyzed: reuse it
+                        device_id = st.session_state.get("user_id")
+                        fingerprint, duplicate = find_recent_scan(img_file, device_id)
+                        
+                        if duplicate:
+                            analysis_data = duplicate.analysis
+                            preview.markdown(_scan_preview(analysis_data))
+                            st.write(f"♻️ Same as your scan {duplicate.age_s:.0f}s ago, reusing its analysis")
+                        else:
+                            # Show fields as soon as Gemini has generated them
+                            analysis_data, problems = {}, None
+                            for analysis_data, problems in ask_gemini_stream(img_file):
+                                preview.markdown(_scan_preview(analysis_data))
+                            if problems:
+                                # Don't store or reuse a diagnosis made of placeholder values
+                                raise ScanFailed(f"Could not read {', '.join(problems)} from the photo")
+                            remember_scan(device_id, fingerprint, analysis_data)
                         
                         st.write("💾 Saving...")
                         save_plant_to_db(
@@ -65,6 +90,9 @@ def take_picture_view():
                         st.session_state.camera_open = False 
                         st.rerun()
                         
+                    except ScanFailed as e:
+                        status.update(label="❌ Could not analyze", state="error")
+                        st.error(str(e))
                     except Exception as e:
                         st.error(f"Error: {e}")
     render_registry_table()
\ No newline at end of file
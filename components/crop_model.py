@@ -0,0 +1,306 @@
+"""
+Crop Model Registry for the Digital Twin
+Single source of truth for growth stages and per-crop growth timing.
+Loaded and validated once at import; the growth simulator, plant library
+and 3D renderer all read stage data from here.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from components.name_index import AliasIndex
+
+# ============================================================================
+# GROWTH STAGES CONFIGURATION
+# ============================================================================
+
+GROWTH_STAGES = {
+    "seed": {
+        "name": "Seed/Germination",
+        "icon": "🌰",
+        "scale": 0.05,
+        "leaf_factor": 0.0,
+        "fruit_factor": 0.0,
+        "height_factor": 0.05,
+        "color_shift": 0.0,
+        "days_range": (0, 7),
+        "description": "Seed germinating underground"
+    },
+    "seedling": {
+        "name": "Seedling",
+        "icon": "🌱",
+        "scale": 0.2,
+        "leaf_factor": 0.15,
+        "fruit_factor": 0.0,
+        "height_factor": 0.15,
+        "color_shift": 0.1,  # Lighter green
+        "days_range": (7, 21),
+        "description": "First true leaves emerging"
+    },
+    "vegetative": {
+        "name": "Vegetative Growth",
+        "icon": "🌿",
+        "scale": 0.5,
+        "leaf_factor": 0.6,
+        "fruit_factor": 0.0,
+        "height_factor": 0.5,
+        "color_shift": 0.0,
+        "days_range": (21, 45),
+        "description": "Rapid leaf and stem development"
+    },
+    "flowering": {
+        "name": "Flowering",
+        "icon": "🌸",
+        "scale": 0.75,
+        "leaf_factor": 0.85,
+        "fruit_factor": 0.1,
+        "height_factor": 0.8,
+        "color_shift": 0.0,
+        "days_range": (45, 60),
+        "description": "Producing flowers for reproduction"
+    },
+    "fruiting": {
+        "name": "Fruiting",
+        "icon": "🍅",
+        "scale": 0.9,
+        "leaf_factor": 0.9,
+        "fruit_factor": 0.7,
+        "height_factor": 0.95,
+        "color_shift": 0.0,
+        "days_range": (60, 80),
+        "description": "Fruits developing and growing"
+    },
+    "mature": {
+        "name": "Mature/Harvest Ready",
+        "icon": "🌾",
+        "scale": 1.0,
+        "leaf_factor": 1.0,
+        "fruit_factor": 1.0,
+        "height_factor": 1.0,
+        "color_shift": 0.0,
+        "days_range": (80, 100),
+        "description": "Ready for harvest"
+    },
+    "senescence": {
+        "name": "Post-Harvest/Decline",
+        "icon": "🍂",
+        "scale": 0.9,
+        "leaf_factor": 0.7,
+        "fruit_factor": 0.3,
+        "height_factor": 0.95,
+        "color_shift": -0.2,  # Yellowing
+        "days_range": (100, 120),
+        "description": "Natural decline after harvest window"
+    }
+}
+
+REQUIRED_STAGE_FIELDS = (
+    "name", "icon", "scale", "leaf_factor", "fruit_factor",
+    "height_factor", "color_shift", "description"
+)
+
+# Stage factors blended between neighbouring stages (see CropModel.curve)
+CURVE_FIELDS = ("scale", "leaf_factor", "fruit_factor", "height_factor", "color_shift")
+
+# ============================================================================
+# PLANT-SPECIFIC GROWTH DATA
+# ============================================================================
+
+# Spread of days_to_harvest between plantings (coefficient of variation),
+# used by the harvest forecaster when a crop does not set "days_cv"
+DEFAULT_DAYS_CV = 0.12
+
+FULL_CYCLE = ["seed", "seedling", "vegetative", "flowering", "fruiting", "mature"]
+LEAFY_CYCLE = ["seed", "seedling", "vegetative", "mature"]
+
+PLANT_GROWTH_DATA = {
+    # Vegetables
+    "tomato": {"days_to_harvest": 70, "stages": FULL_CYCLE, "aliases": ["kamatis"]},
+    "pepper": {"days_to_harvest": 75, "stages": FULL_CYCLE, "aliases": ["sili", "chili"]},
+    "eggplant": {"days_to_harvest": 80, "stages": FULL_CYCLE, "aliases": ["talong"]},
+    "lettuce": {"days_to_harvest": 45, "stages": LEAFY_CYCLE, "aliases": ["litsugas"]},
+    "cabbage": {"days_to_harvest": 70, "stages": LEAFY_CYCLE, "aliases": ["repolyo"]},
+    "cauliflower": {"days_to_harvest": 80, "stages": LEAFY_CYCLE},
+    "broccoli": {"days_to_harvest": 65, "stages": LEAFY_CYCLE},
+    "carrot": {"days_to_harvest": 75, "stages": LEAFY_CYCLE, "aliases": ["karot"]},
+    "onion": {"days_to_harvest": 100, "stages": LEAFY_CYCLE, "aliases": ["sibuyas"]},
+    "cucumber": {"days_to_harvest": 55, "stages": FULL_CYCLE, "aliases": ["pipino"]},
+    "squash": {"days_to_harvest": 50, "stages": FULL_CYCLE, "aliases": ["kalabasa", "pumpkin"]},
+
+    # Philippine crops
+    "rice": {"days_to_harvest": 120, "days_cv": 0.08, "stages": FULL_CYCLE, "aliases": ["palay"]},
+    "corn": {"days_to_harvest": 90, "days_cv": 0.08, "stages": FULL_CYCLE, "aliases": ["mais", "maize"]},
+    "kangkong": {"days_to_harvest": 30, "days_cv": 0.2, "stages": LEAFY_CYCLE, "aliases": ["water spinach"]},
+    "pechay": {"days_to_harvest": 30, "days_cv": 0.2, "stages": LEAFY_CYCLE, "aliases": ["bok choy", "pak choi"]},
+    "sitaw": {"days_to_harvest": 55, "stages": FULL_CYCLE, "aliases": ["string beans", "yardlong bean"]},
+    "ampalaya": {"days_to_harvest": 60, "stages": FULL_CYCLE, "aliases": ["bitter gourd", "bitter melon"]},
+
+    # Default for unknown plants
+    "default": {"days_to_harvest": 60, "days_cv": 0.2, "stages": ["seed", "seedling", "vegetative", "flowering", "mature"]}
+}
+
+
+# ============================================================================
+# COMPILED CROP MODEL
+# ============================================================================
+
+@dataclass(frozen=True)
+class CropModel:
+    """Growth timing for one crop, with stage lookups precomputed."""
+    key: str
+    days_to_harvest: int
+    stages: Tuple[str, ...]
+    stage_boundaries: Tuple[Tuple[int, int], ...]  # (start_day, end_day) per stage
+    stage_by_percentage: Tuple[str, ...]  # index 0..100 -> stage name
+    days_cv: float = DEFAULT_DAYS_CV
+    # 1%-resolution table shipped to the renderer: each CURVE_FIELDS entry
+    # holds 101 interpolated values, plus "stage" and "stage_display"
+    curve: Dict[str, object] = field(default_factory=dict)
+
+    @classmethod
+    def compile(cls, key: str, data: dict) -> "CropModel":
+        """Validate raw growth data and precompute its lookup tables."""
+        days = data.get("days_to_harvest")
+        days_cv = data.get("days_cv", DEFAULT_DAYS_CV)
+        stages = tuple(data.get("stages", ()))
+
+        if not isinstance(days, int) or days <= 0:
+            raise ValueError(f"Crop '{key}': days_to_harvest must be a positive int, got {days!r}")
+        if not stages:
+            raise ValueError(f"Crop '{key}': at least one growth stage is required")
+        if not 0 <= days_cv < 1:
+            raise ValueError(f"Crop '{key}': days_cv must be in [0, 1), got {days_cv!r}")
+        unknown = [stage for stage in stages if stage not in GROWTH_STAGES]
+        if unknown:
+            raise ValueError(f"Crop '{key}': unknown growth stages {unknown}")
+
+        days_per_stage = days / len(stages)
+        boundaries = tuple(
+            (int(i * days_per_stage), int((i + 1) * days_per_stage))
+            for i in range(len(stages))
+        )
+        by_percentage = tuple(
+            cls._stage_for(stages, percentage) for percentage in range(101)
+        )
+        curve = {
+            name: tuple(round(cls._interpolate(stages, name, percentage), 4) for percentage in range(101))
+            for name in CURVE_FIELDS
+        }
+        curve["stage"] = by_percentage
+        curve["stage_display"] = {stage: GROWTH_STAGES[stage]["name"] for stage in stages}
+        return cls(key, days, stages, boundaries, by_percentage, days_cv, curve)
+
+    @staticmethod
+    def _stage_for(stages: Tuple[str, ...], percentage: float) -> str:
+        """Map a growth percentage onto evenly spaced stages."""
+        if percentage <= 0:
+            return stages[0]
+        if percentage >= 100:
+            return stages[-1]
+        stage_index = int((percentage / 100) * (len(stages) - 1))
+        return stages[min(stage_index, len(stages) - 1)]
+
+    @staticmethod
+    def _interpolate(stages: Tuple[str, ...], name: str, percentage: float) -> float:
+        """
+        Blend a stage factor towards the next stage.
+        Matches the discrete stage at the start of each stage's band.
+        """
+        if len(stages) == 1:
+            return GROWTH_STAGES[stages[0]][name]
+        position = min(max(percentage, 0), 100) / 100 * (len(stages) - 1)
+        index = min(int(position), len(stages) - 2)
+        start = GROWTH_STAGES[stages[index]][name]
+        end = GROWTH_STAGES[stages[index + 1]][name]
+        return start + (end - start) * (position - index)
+
+    def stage_at(self, percentage: float) -> str:
+        """Convert percentage (0-100) to growth stage."""
+        if isinstance(percentage, int) and 0 <= percentage <= 100:
+            return self.stage_by_percentage[percentage]
+        return self._stage_for(self.stages, percentage)
+
+    def factors_at(self, percentage: float) -> Dict[str, float]:
+        """Interpolated scale/leaf/fruit/height/color factors at a growth percentage."""
+        if isinstance(percentage, int) and 0 <= percentage <= 100:
+            return {name: self.curve[name][percentage] for name in CURVE_FIELDS}
+        return {name: self._interpolate(self.stages, name, percentage) for name in CURVE_FIELDS}
+
+    def percentage_for_stage(self, stage_name: str) -> float:
+        """
+        Middle of a stage's percentage band (inverse of stage_at).
+        Stages this crop skips map to the nearest stage it has.
+        """
+        order = list(GROWTH_STAGES)
+        target = order.index(stage_name) if stage_name in order else order.index("vegetative")
+        index = min(
+            range(len(self.stages)),
+            key=lambda i: abs(order.index(self.stages[i]) - target)
+        )
+        if len(self.stages) == 1:
+            return 100.0
+        return min(100.0, (index + 0.5) / (len(self.stages) - 1) * 100)
+
+    def days_remaining(self, percentage: float) -> int:
+        """Days left until harvest from a growth percentage."""
+        current_days = (percentage / 100) * self.days_to_harvest
+        return max(0, int(self.days_to_harvest - current_days))
+
+    def timeline(self) -> List[dict]:
+        """Stage timeline with display info and day ranges."""
+        timeline = []
+        for stage, (start_day, end_day) in zip(self.stages, self.stage_boundaries):
+            stage_info = GROWTH_STAGES[stage]
+            timeline.append({
+                "stage": stage,
+                "name": stage_info["name"],
+                "icon": stage_info["icon"],
+                "start_day": start_day,
+                "end_day": end_day,
+                "description": stage_info["description"]
+            })
+        return timeline
+
+
+def _validate_stages() -> None:
+    """Fail fast if a stage definition is missing a field the renderer needs."""
+    for stage_name, stage in GROWTH_STAGES.items():
+        missing = [field for field in REQUIRED_STAGE_FIELDS if field not in stage]
+        if missing:
+            raise ValueError(f"Growth stage '{stage_name}' is missing {missing}")
+
+
+def _compile_crop_models() -> Dict[str, CropModel]:
+    """Compile every entry in PLANT_GROWTH_DATA."""
+    _validate_stages()
+    return {key: CropModel.compile(key, data) for key, data in PLANT_GROWTH_DATA.items()}
+
+
+def _build_crop_index() -> AliasIndex:
+    """Index crop keys and aliases; table order sets match priority."""
+    index = AliasIndex()
+    for key, data in PLANT_GROWTH_DATA.items():
+        if key != "default":
+            index.add(key, [key] + data.get("aliases", []))
+    return index
+
+
+CROP_MODELS = _compile_crop_models()
+_CROP_INDEX = _build_crop_index()
+
+
+# ============================================================================
+# LOOKUP HELPERS
+# ============================================================================
+
+def get_crop_model(plant_name: str) -> CropModel:
+    """
+    Get the compiled crop model for a plant name or alias.
+    Falls back to the "default" model for unknown plants.
+    """
+    return CROP_MODELS[_CROP_INDEX.lookup(plant_name) or "default"]
+
+
+def get_stage_config(stage_name: str) -> dict:
+    """Get growth stage configuration, defaulting to "mature"."""
+    return GROWTH_STAGES.get((stage_name or "").lower(), GROWTH_STAGES["mature"])
@@ -3,7 +3,12 @@ import streamlit.components.v1 as components
 from typing import Optional
 import json
 
+from components.plant_library import resolve_plant_profile
+from components.structure_overlay import split_structure
+from core.tracing import traced
 
+
+@traced("render.3d_simulation")
 def render_3d_simulation(
     texture_data: Optional[str] = None, 
     plant_structure: Optional[dict] = None,
@@ -11,14 +16,19 @@ def render_3d_simulation(
 ) -> None:
     """
     Renders a botanically accurate 3D plant simulation using Three.js.
-    Supports specific plant types: cauliflower, cabbage, broccoli, lettuce, etc.
+    The builder is chosen from PLANT_LIBRARY via resolve_plant_profile, so
+    new crops only need a library entry and (optionally) a JS builder.
     Uses Gemini's analysis to generate realistic 3D geometry.
     """
     
     if plant_structure is None:
         plant_structure = get_default_structure()
     
-    plant_json = json.dumps(plant_structure)
+    # Growth/scenario overlays ship as base + delta and are merged in the browser
+    base_structure, structure_delta = split_structure(plant_structure)
+    plant_json = json.dumps(base_structure)
+    delta_json = json.dumps(structure_delta)
+    profile_json = json.dumps(resolve_plant_profile(plant_structure))
     
     three_js_html = f"""
     <!DOCTYPE html>
@@ -163,6 +173,38 @@ def render_3d_simulation(
                 color: #666;
                 margin-left: 8px;
             }}
+            #growth-timeline {{
+                position: absolute;
+                bottom: 45px;
+                left: 10px;
+                background: rgba(255,255,255,0.95);
+                padding: 8px 12px;
+                border-radius: 10px;
+                font-family: 'Segoe UI', sans-serif;
+                font-size: 11px;
+                color: #2E7D32;
+                box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+                display: none;
+                align-items: center;
+                gap: 8px;
+            }}
+            #growth-timeline.visible {{
+                display: flex;
+            }}
+            #timeline-slider {{
+                width: 120px;
+                cursor: pointer;
+            }}
+            #timeline-play {{
+                border: none;
+                background: #4CAF50;
+                color: white;
+                border-radius: 50%;
+                width: 24px;
+                height: 24px;
+                cursor: pointer;
+                font-size: 10px;
+            }}
             .pulse-warning {{
                 animation: pulse-red 1.5s ease-in-out infinite;
             }}
@@ -185,6 +227,12 @@ def render_3d_simulation(
                 <input type="range" id="progression-slider" min="0" max="100" value="50">
                 <span id="progression-value">50%</span>
             </div>
+            <div id="growth-timeline">
+                <button id="timeline-play" title="Play growth timeline">▶</button>
+                <span>🌱</span>
+                <input type="range" id="timeline-slider" min="0" max="100" step="1" value="100">
+                <span id="timeline-value">100%</span>
+            </div>
             <div id="disease-legend">
                 <div style="font-weight:600;margin-bottom:6px;color:#D32F2F;">⚠️ Affected Areas</div>
                 <div class="legend-item"><div class="legend-color" style="background:#FFEB3B;"></div>Early Stage</div>
@@ -199,7 +247,42 @@ def render_3d_simulation(
         <script src="https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/controls/OrbitControls.js"></script>
         
         <script>
-            const plantData = {plant_json};
+            // Merge the simulation delta over the scanned structure (one level deep)
+            function mergeOverlay(base, delta) {{
+                const merged = Object.assign({{}}, base);
+                for (const key of Object.keys(delta)) {{
+                    const baseVal = base[key];
+                    const deltaVal = delta[key];
+                    const bothObjects = baseVal && deltaVal && typeof baseVal === 'object' &&
+                        typeof deltaVal === 'object' && !Array.isArray(baseVal) && !Array.isArray(deltaVal);
+                    merged[key] = bothObjects ? Object.assign({{}}, baseVal, deltaVal) : deltaVal;
+                }}
+                return merged;
+            }}
+            
+            const baseData = {plant_json};
+            const plantData = mergeOverlay(baseData, {delta_json});
+            const plantProfile = {profile_json};
+            
+            // Deterministic Math.random while building, so a rebuild at another
+            // growth percentage keeps the same layout (mulberry32)
+            const PLANT_SEED = 20240611;
+            function withSeededRandom(seed, fn) {{
+                const nativeRandom = Math.random;
+                let state = seed >>> 0;
+                Math.random = function() {{
+                    state = (state + 0x6D2B79F5) >>> 0;
+                    let t = state;
+                    t = Math.imul(t ^ (t >>> 15), t | 1);
+                    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+                    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+                }};
+                try {{
+                    return fn();
+                }} finally {{
+                    Math.random = nativeRandom;
+                }}
+            }}
             
             // Helper function
             function get(obj, path, defaultVal) {{
@@ -367,10 +450,14 @@ def render_3d_simulation(
             const growthSystem = {{
                 enabled: false,
                 stage: 'mature',
+                stageDisplay: '',
+                percentage: 100,
                 scale: 1.0,
                 leafFactor: 1.0,
                 fruitFactor: 1.0,
+                heightFactor: 1.0,
                 colorShift: 0.0,
+                curve: null,
                 scenarioEffects: null,
                 
                 // Initialize from plant data
@@ -381,10 +468,14 @@ def render_3d_simulation(
                     if (growthData) {{
                         this.enabled = true;
                         this.stage = growthData.stage || 'mature';
-                        this.scale = growthData.scale || 1.0;
-                        this.leafFactor = growthData.leaf_factor || 1.0;
-                        this.fruitFactor = growthData.fruit_factor || 1.0;
-                        this.colorShift = growthData.color_shift || 0.0;
+                        this.stageDisplay = growthData.stage_display || '';
+                        this.percentage = growthData.percentage ?? 100;
+                        this.scale = growthData.scale ?? 1.0;
+                        this.leafFactor = growthData.leaf_factor ?? 1.0;
+                        this.fruitFactor = growthData.fruit_factor ?? 1.0;
+                        this.heightFactor = growthData.height_factor ?? 1.0;
+                        this.colorShift = growthData.color_shift ?? 0.0;
+                        this.curve = growthData.curve || null;
                     }}
                     
                     if (scenarioData) {{
@@ -392,6 +483,50 @@ def render_3d_simulation(
                     }}
                 }},
                 
+                // Read a curve field at any percentage; the table has 1% steps,
+                // fractional percentages blend the two neighbouring entries
+                sample: function(field, pct) {{
+                    const table = this.curve[field];
+                    const i = Math.floor(pct);
+                    const j = Math.min(100, i + 1);
+                    return table[i] + (table[j] - table[i]) * (pct - i);
+                }},
+                
+                // Move to another growth percentage using the shipped curve
+                setPercentage: function(pct) {{
+                    if (!this.curve) return;
+                    pct = Math.min(100, Math.max(0, pct));
+                    this.percentage = pct;
+                    this.stage = this.curve.stage[Math.floor(pct)];
+                    this.stageDisplay = this.curve.stage_display[this.stage] || '';
+                    this.scale = this.sample('scale', pct);
+                    this.leafFactor = this.sample('leaf_factor', pct);
+                    this.fruitFactor = this.sample('fruit_factor', pct);
+                    this.heightFactor = this.sample('height_factor', pct);
+                    this.colorShift = this.sample('color_shift', pct);
+                    this.applyToStructure();
+                }},
+                
+                // Same size rules as GrowthSimulator.apply_growth_modifiers,
+                // applied to the scanned (unsimulated) values
+                applyToStructure: function() {{
+                    const arch = baseData.plant_architecture;
+                    if (arch) {{
+                        const patch = {{}};
+                        if ('height_cm' in arch) patch.height_cm = Math.floor(arch.height_cm * this.heightFactor);
+                        if ('fruit_count' in arch) patch.fruit_count = Math.floor((arch.fruit_count || 0) * this.fruitFactor);
+                        plantData.plant_architecture = Object.assign({{}}, arch, patch);
+                    }}
+                    
+                    const leaves = baseData.leaf_system;
+                    if (leaves) {{
+                        const patch = {{}};
+                        if ('total_count' in leaves) patch.total_count = Math.max(2, Math.floor(leaves.total_count * this.leafFactor));
+                        if ('size_cm' in leaves) patch.size_cm = Math.floor((leaves.size_cm || 20) * this.scale);
+                        plantData.leaf_system = Object.assign({{}}, leaves, patch);
+                    }}
+                }},
+                
                 // Apply growth scale to a group
                 applyScale: function(group) {{
                     if (!this.enabled) return;
@@ -466,14 +601,22 @@ def render_3d_simulation(
             const progressionSlider = document.getElementById('progression-slider');
             const progressionValue = document.getElementById('progression-value');
             
+            const growthTimeline = document.getElementById('growth-timeline');
+            const timelineSlider = document.getElementById('timeline-slider');
+            const timelineValue = document.getElementById('timeline-value');
+            const timelinePlay = document.getElementById('timeline-play');
+            
             // Show plant name with growth stage
             const plantName = get(plantData, 'identified_plant.common_name', 'Plant');
-            const stageDisplay = get(plantData, 'growth_simulation.stage_display', '');
-            if (stageDisplay && stageDisplay !== 'Mature/Harvest Ready') {{
-                plantLabel.textContent = '🌿 ' + plantName + ' (' + stageDisplay + ')';
-            }} else {{
-                plantLabel.textContent = '🌿 ' + plantName;
+            function updatePlantLabel() {{
+                const stageDisplay = growthSystem.stageDisplay;
+                if (stageDisplay && stageDisplay !== 'Mature/Harvest Ready') {{
+                    plantLabel.textContent = '🌿 ' + plantName + ' (' + stageDisplay + ')';
+                }} else {{
+                    plantLabel.textContent = '🌿 ' + plantName;
+                }}
             }}
+            updatePlantLabel();
             
             const scene = new THREE.Scene();
             
@@ -515,18 +658,22 @@ def render_3d_simulation(
             // ===== SPECIALIZED PLANT BUILDERS =====
             
             // CAULIFLOWER / BROCCOLI / CABBAGE Builder
-            function buildBrassicaPlant(headType) {{
+            function buildBrassicaPlant(chars) {{
                 const group = new THREE.Group();
                 const leafSys = get(plantData, 'leaf_system', {{}});
                 const arch = get(plantData, 'plant_architecture', {{}});
                 
-                const leafCount = get(leafSys, 'total_count', 12);
+                // Prefer the head Gemini saw; fall back to the library's head type
+                const scannedHead = get(arch, 'head_type', 'none');
+                const headType = scannedHead !== 'none' ? scannedHead : (chars.head_type || 'none');
+                
+                const leafCount = get(leafSys, 'total_count', chars.leaf_count || 12);
                 const leafLayers = get(leafSys, 'leaf_layers', 3);
-                const primaryColor = get(leafSys, 'primary_color_hex', '#228B22');
-                const veinColor = get(leafSys, 'vein_color_hex', '#FFFFFF');
+                const primaryColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#228B22');
+                const veinColor = get(leafSys, 'vein_color_hex', chars.stem_color || '#FFFFFF');
                 const leafOrientation = get(leafSys, 'orientation', 'cupping');
                 const waviness = get(leafSys, 'waviness', 0.5);
-                const headColor = get(arch, 'head_color_hex', '#F5F5DC');
+                const headColor = get(arch, 'head_color_hex', chars.head_color || '#F5F5DC');
                 const headSizeRatio = get(arch, 'head_size_ratio', 0.3);
                 
                 // Central head (cauliflower/broccoli/cabbage)
@@ -729,17 +876,18 @@ def render_3d_simulation(
             }}
             
             // FRUITING PLANT Builder (tomato, pepper, eggplant, etc.)
-            function buildFruitingPlant() {{
+            function buildFruitingPlant(chars) {{
                 const group = new THREE.Group();
                 const leafSys = get(plantData, 'leaf_system', {{}});
                 const arch = get(plantData, 'plant_architecture', {{}});
                 const stemSys = get(plantData, 'stem_system', {{}});
                 
-                const primaryColor = get(leafSys, 'primary_color_hex', '#228B22');
-                const stemColor = get(stemSys, 'color_hex', '#2E8B57');
-                const fruitType = get(arch, 'fruit_type', 'tomato');
-                const fruitColor = get(arch, 'fruit_color_hex', '#FF6347');
-                const fruitCount = get(arch, 'fruit_count', 5);
+                const primaryColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#228B22');
+                const stemColor = get(stemSys, 'color_hex', chars.stem_color || '#2E8B57');
+                const scannedFruit = get(arch, 'fruit_type', 'none');
+                const fruitType = scannedFruit !== 'none' ? scannedFruit : (chars.fruit_type || 'tomato');
+                const fruitColor = get(arch, 'fruit_color_hex', chars.fruit_color || '#FF6347');
+                const fruitCount = growthSystem.getFruitCount(get(arch, 'fruit_count', chars.fruit_count || 5));
                 const fruitSize = get(arch, 'fruit_size', 0.08);
                 const plantHeight = get(arch, 'height_cm', 80) / 100 || 0.8;
                 
@@ -835,30 +983,30 @@ def render_3d_simulation(
                 return group;
             }}
             
-            // GRASS/GRAIN Builder (rice, corn, wheat, bamboo)
-            function buildGrassPlant() {{
+            // GRASS/GRAIN Builder (rice, corn, wheat, sugarcane, bamboo)
+            function buildGrainPlant(chars) {{
                 const group = new THREE.Group();
                 const arch = get(plantData, 'plant_architecture', {{}});
                 const leafSys = get(plantData, 'leaf_system', {{}});
                 
                 const plantHeight = get(arch, 'height_cm', 100) / 100 || 1.0;
-                const leafColor = get(leafSys, 'primary_color_hex', '#228B22');
-                const leafCount = get(leafSys, 'total_count', 8);
-                const plantName = get(plantData, 'identified_plant.common_name', '').toLowerCase();
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#228B22');
+                const leafCount = get(leafSys, 'total_count', chars.stem_count || 8);
+                const stalkRadius = (chars.stem_diameter || 0.02) / 2;
+                const grainColor = chars.grain_color || '#DAA520';
+                const isSpike = chars.grain_type === 'spike';
                 
-                const isCorn = plantName.includes('corn') || plantName.includes('maize');
-                const isRice = plantName.includes('rice') || plantName.includes('palay');
-                
-                if (isCorn) {{
+                if (chars.has_cob) {{
                     // Corn - thick stalk with large leaves
                     const stalkGeom = new THREE.CylinderGeometry(0.04, 0.05, plantHeight, 12);
-                    const stalkMat = new THREE.MeshStandardMaterial({{ color: 0x8BC34A, roughness: 0.7 }});
+                    const stalkMat = new THREE.MeshStandardMaterial({{ color: new THREE.Color(chars.stem_color || '#8BC34A'), roughness: 0.7 }});
                     const stalk = new THREE.Mesh(stalkGeom, stalkMat);
                     stalk.position.y = 0.15 + plantHeight / 2;
                     group.add(stalk);
                     
                     // Corn leaves - long and arching
-                    for (let i = 0; i < 8; i++) {{
+                    const cornLeaves = growthSystem.getLeafCount(chars.leaf_count || 8);
+                    for (let i = 0; i < cornLeaves; i++) {{
                         const leafGeom = createGrassLeaf(0.08, 0.5 + Math.random() * 0.2);
                         const leafMat = new THREE.MeshStandardMaterial({{
                             color: new THREE.Color(leafColor),
@@ -866,27 +1014,40 @@ def render_3d_simulation(
                             roughness: 0.6
                         }});
                         const leaf = new THREE.Mesh(leafGeom, leafMat);
-                        const angle = (i / 8) * Math.PI * 2;
-                        leaf.position.y = 0.3 + (i * 0.12);
+                        const angle = (i / cornLeaves) * Math.PI * 2;
+                        leaf.position.y = 0.3 + (i / cornLeaves) * plantHeight * 0.8;
                         leaf.rotation.y = angle;
                         leaf.rotation.z = 0.5 + Math.random() * 0.3;
                         group.add(leaf);
                     }}
                     
                     // Corn cob
-                    const cobGeom = new THREE.CylinderGeometry(0.05, 0.04, 0.2, 12);
-                    const cobMat = new THREE.MeshStandardMaterial({{ color: 0xFFD700, roughness: 0.5 }});
-                    const cob = new THREE.Mesh(cobGeom, cobMat);
-                    cob.position.set(0.08, plantHeight * 0.6, 0);
-                    cob.rotation.z = 0.3;
-                    group.add(cob);
+                    if (growthSystem.getFruitCount(1) > 0) {{
+                        const cobGeom = new THREE.CylinderGeometry(0.05, 0.04, 0.2, 12);
+                        const cobMat = new THREE.MeshStandardMaterial({{ color: new THREE.Color(chars.cob_color || '#FFD700'), roughness: 0.5 }});
+                        const cob = new THREE.Mesh(cobGeom, cobMat);
+                        cob.position.set(0.08, plantHeight * 0.6, 0);
+                        cob.rotation.z = 0.3;
+                        group.add(cob);
+                    }}
+                    
+                    // Tassel at the top of the stalk
+                    if (chars.has_tassel) {{
+                        const tasselMat = new THREE.MeshStandardMaterial({{ color: new THREE.Color(chars.tassel_color || '#D2691E'), roughness: 0.6 }});
+                        for (let t = 0; t < 5; t++) {{
+                            const spike = new THREE.Mesh(new THREE.CylinderGeometry(0.003, 0.004, 0.12, 4), tasselMat);
+                            spike.position.set(0, 0.15 + plantHeight + 0.05, 0);
+                            spike.rotation.z = (t - 2) * 0.25;
+                            group.add(spike);
+                        }}
+                    }}
                 }} else {{
-                    // Rice/wheat - thin stalks in a clump
+                    // Rice/wheat/cane - stalks in a clump
                     for (let i = 0; i < leafCount; i++) {{
                         const stalkHeight = plantHeight * (0.7 + Math.random() * 0.3);
-                        const stalkGeom = new THREE.CylinderGeometry(0.008, 0.012, stalkHeight, 6);
+                        const stalkGeom = new THREE.CylinderGeometry(stalkRadius * 0.8, stalkRadius * 1.2, stalkHeight, 6);
                         const stalkMat = new THREE.MeshStandardMaterial({{ 
-                            color: new THREE.Color(leafColor), 
+                            color: new THREE.Color(chars.has_grain_head === false ? (chars.stem_color || leafColor) : leafColor), 
                             roughness: 0.6 
                         }});
                         const stalk = new THREE.Mesh(stalkGeom, stalkMat);
@@ -901,20 +1062,20 @@ def render_3d_simulation(
                         stalk.rotation.z = (Math.random() - 0.5) * 0.15;
                         group.add(stalk);
                         
-                        // Rice grain head (panicle)
-                        if (isRice) {{
+                        // Grain head (drooping panicle or upright spike)
+                        if (chars.has_grain_head && growthSystem.getFruitCount(1) > 0) {{
                             const grainHead = new THREE.Group();
                             for (let g = 0; g < 5; g++) {{
                                 const grainGeom = new THREE.SphereGeometry(0.012, 8, 8);
                                 grainGeom.scale(1, 1.5, 1);
-                                const grainMat = new THREE.MeshStandardMaterial({{ color: 0xDAA520, roughness: 0.4 }});
+                                const grainMat = new THREE.MeshStandardMaterial({{ color: new THREE.Color(grainColor), roughness: 0.4 }});
                                 const grain = new THREE.Mesh(grainGeom, grainMat);
                                 grain.position.y = g * 0.02;
                                 grain.position.x = (Math.random() - 0.5) * 0.02;
                                 grainHead.add(grain);
                             }}
                             grainHead.position.set(stalk.position.x, 0.12 + stalkHeight, stalk.position.z);
-                            grainHead.rotation.z = 0.4;
+                            grainHead.rotation.z = isSpike ? 0.05 : 0.4;
                             group.add(grainHead);
                         }}
                     }}
@@ -924,12 +1085,12 @@ def render_3d_simulation(
             }}
             
             // VINE PLANT Builder (kangkong, sweet potato, cucumber vine)
-            function buildVinePlant() {{
+            function buildVinePlant(chars) {{
                 const group = new THREE.Group();
                 const leafSys = get(plantData, 'leaf_system', {{}});
                 
-                const leafColor = get(leafSys, 'primary_color_hex', '#228B22');
-                const leafShape = get(leafSys, 'shape', 'heart');
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#228B22');
+                const leafShape = get(leafSys, 'shape', chars.leaf_type || 'heart');
                 const leafCount = get(leafSys, 'total_count', 10);
                 
                 // Trailing vines
@@ -977,20 +1138,18 @@ def render_3d_simulation(
                 return group;
             }}
             
-            // ROOT VEGETABLE Builder (carrot, radish, onion)
-            function buildRootVegetable() {{
+            // ROOT VEGETABLE Builder (carrot, radish, onion, ginger)
+            function buildRootVegetable(chars) {{
                 const group = new THREE.Group();
                 const arch = get(plantData, 'plant_architecture', {{}});
                 const leafSys = get(plantData, 'leaf_system', {{}});
                 
-                const rootType = get(arch, 'root_type', 'taproot');
-                const rootColor = get(arch, 'root_color_hex', '#FF6600');
-                const leafColor = get(leafSys, 'primary_color_hex', '#228B22');
-                const plantName = get(plantData, 'identified_plant.common_name', '').toLowerCase();
+                const rootShape = chars.root_shape || get(arch, 'root_type', 'taproot');
+                const rootColor = get(arch, 'root_color_hex', chars.root_color || '#FF6600');
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#228B22');
                 
-                const isCarrot = plantName.includes('carrot');
-                const isOnion = plantName.includes('onion') || plantName.includes('sibuyas');
-                const isRadish = plantName.includes('radish') || plantName.includes('labanos');
+                const isCarrot = rootShape === 'taproot';
+                const isOnion = rootShape === 'bulb';
                 
                 // Root part (partially visible)
                 let rootGeom;
@@ -998,6 +1157,9 @@ def render_3d_simulation(
                     rootGeom = new THREE.ConeGeometry(0.06, 0.25, 12);
                 }} else if (isOnion) {{
                     rootGeom = new THREE.SphereGeometry(0.1, 16, 16);
+                }} else if (rootShape === 'rhizome') {{
+                    rootGeom = new THREE.SphereGeometry(0.08, 16, 16);
+                    rootGeom.scale(1.8, 0.6, 1);
                 }} else {{
                     rootGeom = new THREE.SphereGeometry(0.08, 16, 16);
                     rootGeom.scale(1, 1.3, 1);
@@ -1013,7 +1175,7 @@ def render_3d_simulation(
                 group.add(root);
                 
                 // Leaves/tops
-                const leafCount = isOnion ? 5 : 8;
+                const leafCount = growthSystem.getLeafCount(chars.leaf_count || (isOnion ? 5 : 8));
                 for (let i = 0; i < leafCount; i++) {{
                     const angle = (i / leafCount) * Math.PI * 2;
                     let leafGeom;
@@ -1049,13 +1211,13 @@ def render_3d_simulation(
             }}
             
             // HERB Builder (basil, mint, cilantro)
-            function buildHerbPlant() {{
+            function buildHerbPlant(chars) {{
                 const group = new THREE.Group();
                 const leafSys = get(plantData, 'leaf_system', {{}});
                 const arch = get(plantData, 'plant_architecture', {{}});
                 
-                const leafColor = get(leafSys, 'primary_color_hex', '#228B22');
-                const leafShape = get(leafSys, 'shape', 'oval');
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#228B22');
+                const leafShape = get(leafSys, 'shape', chars.leaf_type || 'oval');
                 const plantHeight = get(arch, 'height_cm', 30) / 100 || 0.3;
                 
                 // Central stems
@@ -1107,6 +1269,1035 @@ def render_3d_simulation(
                 return group;
             }}
             
+            // FRUIT TREE Builder (mango, avocado, citrus)
+            function buildFruitTree(chars) {{
+                const group = new THREE.Group();
+                const leafSys = get(plantData, 'leaf_system', {{}});
+                const arch = get(plantData, 'plant_architecture', {{}});
+
+                const trunkHeight = chars.trunk_height || 0.8;
+                const trunkRadius = (chars.trunk_diameter || 0.08) / 2;
+                const canopyRadius = chars.canopy_radius || 0.6;
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#1B5E20');
+                const fruitColor = get(arch, 'fruit_color_hex', chars.fruit_color || '#FFC107');
+                const fruitSize = chars.fruit_size || 0.1;
+                const leafCount = growthSystem.getLeafCount(chars.leaf_count || 40);
+                const fruitCount = growthSystem.getFruitCount(chars.fruit_count || 5);
+
+                // Trunk with a slight taper
+                const trunkMat = new THREE.MeshStandardMaterial({{
+                    color: new THREE.Color(chars.trunk_color || '#4A3728'),
+                    roughness: 0.95
+                }});
+                const trunk = new THREE.Mesh(
+                    new THREE.CylinderGeometry(trunkRadius * 0.7, trunkRadius, trunkHeight, 12),
+                    trunkMat
+                );
+                trunk.position.y = 0.12 + trunkHeight / 2;
+                trunk.castShadow = true;
+                group.add(trunk);
+
+                // Main scaffold branches into the canopy
+                const canopyY = 0.12 + trunkHeight + canopyRadius * 0.6;
+                for (let b = 0; b < 4; b++) {{
+                    const angle = (b / 4) * Math.PI * 2 + 0.4;
+                    const branch = new THREE.Mesh(
+                        new THREE.CylinderGeometry(trunkRadius * 0.3, trunkRadius * 0.5, canopyRadius * 0.9, 8),
+                        trunkMat
+                    );
+                    branch.position.set(
+                        Math.cos(angle) * canopyRadius * 0.2,
+                        0.12 + trunkHeight + canopyRadius * 0.3,
+                        Math.sin(angle) * canopyRadius * 0.2
+                    );
+                    branch.rotation.z = Math.cos(angle) * -0.6;
+                    branch.rotation.x = Math.sin(angle) * 0.6;
+                    group.add(branch);
+                }}
+
+                // Dense rounded canopy volume
+                const canopyMat = new THREE.MeshStandardMaterial({{
+                    color: new THREE.Color(leafColor),
+                    roughness: 0.8
+                }});
+                for (let c = 0; c < 5; c++) {{
+                    const angle = (c / 5) * Math.PI * 2;
+                    const blob = new THREE.Mesh(
+                        new THREE.SphereGeometry(canopyRadius * (0.45 + Math.random() * 0.15), 16, 12),
+                        canopyMat
+                    );
+                    blob.position.set(
+                        Math.cos(angle) * canopyRadius * 0.45,
+                        canopyY + (Math.random() - 0.5) * canopyRadius * 0.3,
+                        Math.sin(angle) * canopyRadius * 0.45
+                    );
+                    blob.castShadow = true;
+                    group.add(blob);
+                }}
+
+                // Lanceolate leaves on the canopy surface
+                for (let i = 0; i < leafCount; i++) {{
+                    const theta = Math.random() * Math.PI * 2;
+                    const phi = Math.random() * Math.PI * 0.6;
+                    const leaf = new THREE.Mesh(
+                        createLeafByShape('elongated', 0.06, 0.12, 0.1),
+                        new THREE.MeshStandardMaterial({{
+                            color: new THREE.Color(leafColor),
+                            side: THREE.DoubleSide,
+                            roughness: 0.5
+                        }})
+                    );
+                    leaf.position.set(
+                        Math.sin(phi) * Math.cos(theta) * canopyRadius * 0.95,
+                        canopyY + Math.cos(phi) * canopyRadius * 0.7,
+                        Math.sin(phi) * Math.sin(theta) * canopyRadius * 0.95
+                    );
+                    leaf.rotation.x = -phi;
+                    leaf.rotation.y = theta;
+                    group.add(leaf);
+                }}
+
+                // Fruits hanging below the canopy
+                for (let f = 0; f < fruitCount; f++) {{
+                    const angle = (f / Math.max(fruitCount, 1)) * Math.PI * 2 + Math.random() * 0.4;
+                    const fruitGeom = new THREE.SphereGeometry(fruitSize / 2, 16, 16);
+                    if (chars.fruit_shape === 'kidney') fruitGeom.scale(0.8, 1.25, 0.7);
+                    const fruit = new THREE.Mesh(fruitGeom, new THREE.MeshStandardMaterial({{
+                        color: new THREE.Color(fruitColor),
+                        roughness: 0.35
+                    }}));
+                    fruit.position.set(
+                        Math.cos(angle) * canopyRadius * 0.7,
+                        canopyY - canopyRadius * 0.45,
+                        Math.sin(angle) * canopyRadius * 0.7
+                    );
+                    fruit.castShadow = true;
+                    group.add(fruit);
+                }}
+
+                return group;
+            }}
+
+            // BANANA Builder (pseudostem with huge arching leaves and a bunch)
+            function buildBananaPlant(chars) {{
+                const group = new THREE.Group();
+                const leafSys = get(plantData, 'leaf_system', {{}});
+                const arch = get(plantData, 'plant_architecture', {{}});
+
+                const stemHeight = chars.trunk_height || 1.2;
+                const stemRadius = (chars.trunk_diameter || 0.15) / 2;
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#2E7D32');
+                const leafCount = growthSystem.getLeafCount(chars.leaf_count || 8);
+                const leafLength = chars.leaf_length || 0.8;
+                const leafWidth = chars.leaf_width || 0.2;
+
+                // Pseudostem made of overlapping leaf sheaths
+                const stem = new THREE.Mesh(
+                    new THREE.CylinderGeometry(stemRadius * 0.8, stemRadius, stemHeight, 16),
+                    new THREE.MeshStandardMaterial({{
+                        color: new THREE.Color(chars.trunk_color || '#7CB342'),
+                        roughness: 0.7
+                    }})
+                );
+                stem.position.y = 0.12 + stemHeight / 2;
+                stem.castShadow = true;
+                group.add(stem);
+
+                // Large paddle leaves arching out from the crown
+                const crownY = 0.12 + stemHeight;
+                for (let i = 0; i < leafCount; i++) {{
+                    const angle = (i / leafCount) * Math.PI * 2 + Math.random() * 0.3;
+                    const leaf = new THREE.Mesh(
+                        createLeafByShape('oval', leafWidth, leafLength, 0.15),
+                        new THREE.MeshStandardMaterial({{
+                            color: new THREE.Color(leafColor),
+                            side: THREE.DoubleSide,
+                            roughness: 0.5
+                        }})
+                    );
+                    leaf.position.set(Math.cos(angle) * stemRadius, crownY, Math.sin(angle) * stemRadius);
+                    leaf.rotation.y = -angle + Math.PI / 2;
+                    leaf.rotation.x = -0.9 + Math.random() * 0.4;
+                    leaf.castShadow = true;
+                    group.add(leaf);
+                }}
+
+                // Hanging bunch: curved stalk, hands of fingers and a purple bell
+                if (chars.has_bunch) {{
+                    const bunch = new THREE.Group();
+                    const fingerMat = new THREE.MeshStandardMaterial({{
+                        color: new THREE.Color(get(arch, 'fruit_color_hex', chars.bunch_color || '#FFEB3B')),
+                        roughness: 0.45
+                    }});
+                    const fingers = growthSystem.getFruitCount(chars.fruit_count || 12);
+                    const perHand = 4;
+                    for (let f = 0; f < fingers; f++) {{
+                        const hand = Math.floor(f / perHand);
+                        const angle = ((f % perHand) / perHand) * Math.PI * 1.2 - 0.6;
+                        const finger = new THREE.Mesh(new THREE.CylinderGeometry(0.015, 0.02, 0.12, 8), fingerMat);
+                        finger.position.set(Math.cos(angle) * 0.05, -hand * 0.07, Math.sin(angle) * 0.05);
+                        finger.rotation.z = -0.5;
+                        finger.rotation.y = angle;
+                        bunch.add(finger);
+                    }}
+                    const bell = new THREE.Mesh(
+                        new THREE.ConeGeometry(0.04, 0.12, 12),
+                        new THREE.MeshStandardMaterial({{ color: new THREE.Color('#6A1B4D'), roughness: 0.6 }})
+                    );
+                    bell.position.y = -Math.ceil(fingers / perHand) * 0.07 - 0.06;
+                    bell.rotation.x = Math.PI;
+                    bunch.add(bell);
+                    bunch.position.set(stemRadius + 0.08, crownY - 0.1, 0);
+                    group.add(bunch);
+                }}
+
+                return group;
+            }}
+
+            // PALM Builder (coconut: ringed trunk, pinnate fronds, nut cluster)
+            function buildPalmTree(chars) {{
+                const group = new THREE.Group();
+                const leafSys = get(plantData, 'leaf_system', {{}});
+
+                const trunkHeight = chars.trunk_height || 1.5;
+                const trunkRadius = (chars.trunk_diameter || 0.12) / 2;
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#228B22');
+                const frondCount = growthSystem.getLeafCount(chars.frond_count || 12);
+                const frondLength = chars.frond_length || 0.7;
+                const trunkMat = new THREE.MeshStandardMaterial({{
+                    color: new THREE.Color(chars.trunk_color || '#8B7355'),
+                    roughness: 0.95
+                }});
+
+                // Slightly leaning trunk built from ringed segments
+                const segments = 8;
+                const segHeight = trunkHeight / segments;
+                const lean = 0.04;
+                for (let s = 0; s < segments; s++) {{
+                    const seg = new THREE.Mesh(
+                        new THREE.CylinderGeometry(trunkRadius * 0.95, trunkRadius, segHeight, 12),
+                        trunkMat
+                    );
+                    seg.position.set(s * lean * segHeight * 4, 0.12 + segHeight * (s + 0.5), 0);
+                    seg.castShadow = true;
+                    group.add(seg);
+                    if (chars.trunk_rings) {{
+                        const ring = new THREE.Mesh(new THREE.TorusGeometry(trunkRadius, 0.006, 6, 16), trunkMat);
+                        ring.rotation.x = Math.PI / 2;
+                        ring.position.set(seg.position.x, 0.12 + segHeight * s, 0);
+                        group.add(ring);
+                    }}
+                }}
+                const crown = new THREE.Vector3(segments * lean * segHeight * 4, 0.12 + trunkHeight, 0);
+
+                // Fronds: arching rachis with leaflets on both sides
+                const rachisMat = new THREE.MeshStandardMaterial({{ color: new THREE.Color('#9E9D24'), roughness: 0.7 }});
+                for (let i = 0; i < frondCount; i++) {{
+                    const angle = (i / frondCount) * Math.PI * 2;
+                    const dir = new THREE.Vector3(Math.cos(angle), 0, Math.sin(angle));
+                    const curve = new THREE.CatmullRomCurve3([
+                        new THREE.Vector3(crown.x, crown.y, crown.z),
+                        new THREE.Vector3(crown.x + dir.x * frondLength * 0.4, crown.y + 0.15, crown.z + dir.z * frondLength * 0.4),
+                        new THREE.Vector3(crown.x + dir.x * frondLength * 0.8, crown.y + 0.05, crown.z + dir.z * frondLength * 0.8),
+                        new THREE.Vector3(crown.x + dir.x * frondLength, crown.y - 0.2, crown.z + dir.z * frondLength)
+                    ]);
+                    group.add(new THREE.Mesh(new THREE.TubeGeometry(curve, 12, 0.008, 6, false), rachisMat));
+
+                    for (let l = 1; l < 9; l++) {{
+                        const p = curve.getPoint(l / 9);
+                        for (let side = -1; side <= 1; side += 2) {{
+                            const leaflet = new THREE.Mesh(
+                                createGrassLeaf(0.02, frondLength * 0.3 * (1 - l / 12)),
+                                new THREE.MeshStandardMaterial({{
+                                    color: new THREE.Color(leafColor),
+                                    side: THREE.DoubleSide,
+                                    roughness: 0.55
+                                }})
+                            );
+                            leaflet.position.copy(p);
+                            leaflet.rotation.y = -angle + side * 0.9;
+                            leaflet.rotation.x = 1.1;
+                            group.add(leaflet);
+                        }}
+                    }}
+                }}
+
+                // Coconut cluster under the crown
+                if (chars.has_coconuts) {{
+                    const nutCount = growthSystem.getFruitCount(chars.coconut_count || 4);
+                    const nutMat = new THREE.MeshStandardMaterial({{
+                        color: new THREE.Color(chars.coconut_color || '#8B4513'),
+                        roughness: 0.6
+                    }});
+                    for (let n = 0; n < nutCount; n++) {{
+                        const angle = (n / Math.max(nutCount, 1)) * Math.PI * 2;
+                        const nut = new THREE.Mesh(new THREE.SphereGeometry(0.06, 14, 14), nutMat);
+                        nut.scale.set(1, 1.15, 1);
+                        nut.position.set(
+                            crown.x + Math.cos(angle) * trunkRadius * 1.3,
+                            crown.y - 0.08,
+                            crown.z + Math.sin(angle) * trunkRadius * 1.3
+                        );
+                        nut.castShadow = true;
+                        group.add(nut);
+                    }}
+                }}
+
+                return group;
+            }}
+
+            // PAPAYA Builder (single trunk, palmate crown, fruits on the trunk)
+            function buildPapayaTree(chars) {{
+                const group = new THREE.Group();
+                const leafSys = get(plantData, 'leaf_system', {{}});
+                const arch = get(plantData, 'plant_architecture', {{}});
+
+                const trunkHeight = chars.trunk_height || 1.2;
+                const trunkRadius = (chars.trunk_diameter || 0.1) / 2;
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#388E3C');
+                const leafCount = growthSystem.getLeafCount(chars.leaf_count || 12);
+                const leafSize = chars.leaf_size || 0.35;
+
+                const trunk = new THREE.Mesh(
+                    new THREE.CylinderGeometry(trunkRadius * 0.7, trunkRadius, trunkHeight, 12),
+                    new THREE.MeshStandardMaterial({{
+                        color: new THREE.Color(chars.trunk_color || '#9E9D24'),
+                        roughness: 0.85
+                    }})
+                );
+                trunk.position.y = 0.12 + trunkHeight / 2;
+                trunk.castShadow = true;
+                group.add(trunk);
+
+                // Long hollow petioles carrying deeply lobed leaves
+                const crownY = 0.12 + trunkHeight;
+                const petioleMat = new THREE.MeshStandardMaterial({{ color: new THREE.Color('#AFB42B'), roughness: 0.6 }});
+                for (let i = 0; i < leafCount; i++) {{
+                    const angle = (i / leafCount) * Math.PI * 2 + (i % 2) * 0.3;
+                    const rise = 0.1 + (i % 3) * 0.06;
+                    const petioleLength = leafSize * 1.1;
+                    const petiole = new THREE.Mesh(new THREE.CylinderGeometry(0.006, 0.008, petioleLength, 6), petioleMat);
+                    petiole.position.set(
+                        Math.cos(angle) * petioleLength * 0.4,
+                        crownY + rise * 0.5,
+                        Math.sin(angle) * petioleLength * 0.4
+                    );
+                    petiole.rotation.z = Math.cos(angle) * -1.0;
+                    petiole.rotation.x = Math.sin(angle) * 1.0;
+                    group.add(petiole);
+
+                    const leaf = new THREE.Mesh(
+                        createLeafByShape('lobed', leafSize * 0.5, leafSize, 0.3),
+                        new THREE.MeshStandardMaterial({{
+                            color: new THREE.Color(leafColor),
+                            side: THREE.DoubleSide,
+                            roughness: 0.5
+                        }})
+                    );
+                    leaf.position.set(
+                        Math.cos(angle) * petioleLength * 0.8,
+                        crownY + rise,
+                        Math.sin(angle) * petioleLength * 0.8
+                    );
+                    leaf.rotation.y = -angle + Math.PI / 2;
+                    leaf.rotation.x = -1.2;
+                    group.add(leaf);
+                }}
+
+                // Fruits clustered around the trunk just below the crown
+                const fruitCount = growthSystem.getFruitCount(chars.fruit_count || 6);
+                const fruitSize = chars.fruit_size || 0.12;
+                const fruitMat = new THREE.MeshStandardMaterial({{
+                    color: new THREE.Color(get(arch, 'fruit_color_hex', chars.fruit_color || '#FF9800')),
+                    roughness: 0.35
+                }});
+                for (let f = 0; f < fruitCount; f++) {{
+                    const angle = (f / Math.max(fruitCount, 1)) * Math.PI * 2;
+                    const fruit = new THREE.Mesh(new THREE.SphereGeometry(fruitSize / 2, 16, 16), fruitMat);
+                    fruit.scale.set(0.8, 1.4, 0.8);
+                    fruit.position.set(
+                        Math.cos(angle) * (trunkRadius + fruitSize * 0.35),
+                        crownY - 0.08 - (f % 2) * fruitSize * 0.9,
+                        Math.sin(angle) * (trunkRadius + fruitSize * 0.35)
+                    );
+                    fruit.castShadow = true;
+                    group.add(fruit);
+                }}
+
+                return group;
+            }}
+
+            // PINEAPPLE Builder (sword-leaf rosette with a central fruit and crown)
+            function buildPineapplePlant(chars) {{
+                const group = new THREE.Group();
+                const leafSys = get(plantData, 'leaf_system', {{}});
+                const arch = get(plantData, 'plant_architecture', {{}});
+
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#2E7D32');
+                const leafCount = growthSystem.getLeafCount(chars.leaf_count || 25);
+                const leafLength = chars.leaf_length || 0.4;
+                const fruitSize = chars.fruit_size || 0.15;
+
+                // Stiff sword leaves spiralling out of the base
+                for (let i = 0; i < leafCount; i++) {{
+                    const angle = i * 2.4;
+                    const ring = i / leafCount;
+                    const leaf = new THREE.Mesh(
+                        createGrassLeaf(0.035, leafLength * (0.7 + ring * 0.4)),
+                        new THREE.MeshStandardMaterial({{
+                            color: new THREE.Color(leafColor),
+                            side: THREE.DoubleSide,
+                            roughness: 0.45
+                        }})
+                    );
+                    leaf.position.set(Math.cos(angle) * 0.03, 0.14, Math.sin(angle) * 0.03);
+                    leaf.rotation.y = -angle + Math.PI / 2;
+                    leaf.rotation.x = -(1.2 - ring * 0.7);
+                    group.add(leaf);
+                }}
+
+                if (chars.has_fruit && growthSystem.getFruitCount(1) > 0) {{
+                    // Bumpy fruit on a short peduncle
+                    const fruitGeom = new THREE.SphereGeometry(fruitSize / 2, 20, 20);
+                    const positions = fruitGeom.attributes.position.array;
+                    for (let p = 0; p < positions.length; p += 3) {{
+                        const bump = 1 + Math.sin(positions[p] * 80) * Math.sin(positions[p + 1] * 80) * 0.04;
+                        positions[p] *= bump;
+                        positions[p + 2] *= bump;
+                    }}
+                    fruitGeom.computeVertexNormals();
+                    const fruit = new THREE.Mesh(fruitGeom, new THREE.MeshStandardMaterial({{
+                        color: new THREE.Color(get(arch, 'fruit_color_hex', chars.fruit_color || '#FFC107')),
+                        roughness: 0.8
+                    }}));
+                    fruit.scale.set(1, 1.4, 1);
+                    const fruitY = 0.14 + leafLength * 0.6;
+                    fruit.position.y = fruitY;
+                    fruit.castShadow = true;
+                    group.add(fruit);
+
+                    // Leafy crown on top of the fruit
+                    for (let c = 0; c < 10; c++) {{
+                        const angle = c * 2.4;
+                        const crownLeaf = new THREE.Mesh(
+                            createGrassLeaf(0.02, fruitSize * 0.8),
+                            new THREE.MeshStandardMaterial({{
+                                color: new THREE.Color(chars.crown_color || '#388E3C'),
+                                side: THREE.DoubleSide,
+                                roughness: 0.5
+                            }})
+                        );
+                        crownLeaf.position.set(0, fruitY + fruitSize * 0.65, 0);
+                        crownLeaf.rotation.y = angle;
+                        crownLeaf.rotation.x = -0.4;
+                        group.add(crownLeaf);
+                    }}
+                }}
+
+                return group;
+            }}
+
+            // COFFEE Builder (shrub with opposite branches, glossy leaves, berry clusters)
+            function buildCoffeePlant(chars) {{
+                const group = new THREE.Group();
+                const leafSys = get(plantData, 'leaf_system', {{}});
+
+                const trunkHeight = chars.trunk_height || 0.8;
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#1B5E20');
+                const branchCount = chars.branch_count || 6;
+                const leavesPerBranch = Math.max(1, Math.floor(growthSystem.getLeafCount(chars.leaf_count || 24) / branchCount));
+                const berriesPerBranch = Math.floor(growthSystem.getFruitCount(chars.berry_count || 15) / branchCount);
+                const woodMat = new THREE.MeshStandardMaterial({{
+                    color: new THREE.Color(chars.trunk_color || '#5D4037'),
+                    roughness: 0.9
+                }});
+                const berryMat = new THREE.MeshStandardMaterial({{
+                    color: new THREE.Color(chars.berry_color || '#B71C1C'),
+                    roughness: 0.3
+                }});
+
+                const trunk = new THREE.Mesh(
+                    new THREE.CylinderGeometry(0.012, (chars.trunk_diameter || 0.03) / 2, trunkHeight, 8),
+                    woodMat
+                );
+                trunk.position.y = 0.12 + trunkHeight / 2;
+                group.add(trunk);
+
+                // Opposite branch pairs, longest at the bottom (conical shrub)
+                for (let b = 0; b < branchCount; b++) {{
+                    const tier = Math.floor(b / 2);
+                    const branchY = 0.25 + tier * (trunkHeight * 0.8) / Math.ceil(branchCount / 2);
+                    const angle = (b % 2) * Math.PI + tier * (Math.PI / 2);
+                    const length = 0.35 - tier * 0.05;
+                    const dir = new THREE.Vector3(Math.cos(angle), 0, Math.sin(angle));
+
+                    const branch = new THREE.Mesh(new THREE.CylinderGeometry(0.005, 0.008, length, 6), woodMat);
+                    branch.position.set(dir.x * length / 2, branchY, dir.z * length / 2);
+                    branch.rotation.z = -dir.x * (Math.PI / 2 - 0.2);
+                    branch.rotation.x = dir.z * (Math.PI / 2 - 0.2);
+                    group.add(branch);
+
+                    for (let l = 0; l < leavesPerBranch; l++) {{
+                        const t = (l + 1) / (leavesPerBranch + 1);
+                        const side = l % 2 === 0 ? 1 : -1;
+                        const leaf = new THREE.Mesh(
+                            createLeafByShape('oval', 0.035, 0.09, 0.2),
+                            new THREE.MeshStandardMaterial({{
+                                color: new THREE.Color(leafColor),
+                                side: THREE.DoubleSide,
+                                roughness: 0.25
+                            }})
+                        );
+                        leaf.position.set(dir.x * length * t, branchY - 0.01, dir.z * length * t);
+                        leaf.rotation.y = -angle + side * Math.PI / 2;
+                        leaf.rotation.x = 0.5;
+                        group.add(leaf);
+
+                        // Berry clusters sit at the leaf nodes
+                        if (l < berriesPerBranch) {{
+                            for (let k = 0; k < 3; k++) {{
+                                const berry = new THREE.Mesh(new THREE.SphereGeometry(chars.berry_size || 0.015, 8, 8), berryMat);
+                                berry.position.set(
+                                    dir.x * length * t + (k - 1) * 0.015,
+                                    branchY - 0.02,
+                                    dir.z * length * t
+                                );
+                                group.add(berry);
+                            }}
+                        }}
+                    }}
+                }}
+
+                return group;
+            }}
+
+            // CACAO Builder (jorquette canopy, large leaves, pods on the trunk)
+            function buildCacaoTree(chars) {{
+                const group = new THREE.Group();
+                const leafSys = get(plantData, 'leaf_system', {{}});
+
+                const trunkHeight = chars.trunk_height || 0.9;
+                const trunkRadius = (chars.trunk_diameter || 0.06) / 2;
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#2E7D32');
+                const leafCount = growthSystem.getLeafCount(chars.leaf_count || 20);
+                const podCount = growthSystem.getFruitCount(chars.pod_count || 4);
+                const podSize = chars.pod_size || 0.12;
+                const woodMat = new THREE.MeshStandardMaterial({{
+                    color: new THREE.Color(chars.trunk_color || '#4E342E'),
+                    roughness: 0.95
+                }});
+
+                const trunk = new THREE.Mesh(
+                    new THREE.CylinderGeometry(trunkRadius * 0.8, trunkRadius, trunkHeight, 10),
+                    woodMat
+                );
+                trunk.position.y = 0.12 + trunkHeight / 2;
+                group.add(trunk);
+
+                // Jorquette: a whorl of fan branches at the top of the trunk
+                const forkY = 0.12 + trunkHeight;
+                const fanCount = 5;
+                for (let b = 0; b < fanCount; b++) {{
+                    const angle = (b / fanCount) * Math.PI * 2;
+                    const dir = new THREE.Vector3(Math.cos(angle), 0, Math.sin(angle));
+                    const branch = new THREE.Mesh(new THREE.CylinderGeometry(0.008, 0.014, 0.4, 6), woodMat);
+                    branch.position.set(dir.x * 0.15, forkY + 0.1, dir.z * 0.15);
+                    branch.rotation.z = -dir.x * 1.0;
+                    branch.rotation.x = dir.z * 1.0;
+                    group.add(branch);
+
+                    // Large drooping leaves along each fan branch
+                    const perBranch = Math.max(1, Math.floor(leafCount / fanCount));
+                    for (let l = 0; l < perBranch; l++) {{
+                        const t = 0.3 + (l / perBranch) * 0.7;
+                        const leaf = new THREE.Mesh(
+                            createLeafByShape('elongated', 0.08, 0.16, 0.1),
+                            new THREE.MeshStandardMaterial({{
+                                color: new THREE.Color(leafColor),
+                                side: THREE.DoubleSide,
+                                roughness: 0.5
+                            }})
+                        );
+                        leaf.position.set(dir.x * 0.35 * t, forkY + 0.2 * t, dir.z * 0.35 * t);
+                        leaf.rotation.y = -angle + (l % 2 ? 0.6 : -0.6);
+                        leaf.rotation.x = 0.9;
+                        group.add(leaf);
+                    }}
+                }}
+
+                // Cauliflorous ribbed pods growing straight from the trunk
+                const podMat = new THREE.MeshStandardMaterial({{
+                    color: new THREE.Color(chars.pod_color || '#FF6F00'),
+                    roughness: 0.6
+                }});
+                for (let p = 0; p < podCount; p++) {{
+                    const angle = (p / Math.max(podCount, 1)) * Math.PI * 2;
+                    const podGeom = new THREE.SphereGeometry(podSize / 2, 16, 16);
+                    const positions = podGeom.attributes.position.array;
+                    for (let v = 0; v < positions.length; v += 3) {{
+                        const rib = 1 + Math.cos(Math.atan2(positions[v + 2], positions[v]) * 10) * 0.05;
+                        positions[v] *= rib;
+                        positions[v + 2] *= rib;
+                    }}
+                    podGeom.computeVertexNormals();
+                    const pod = new THREE.Mesh(podGeom, podMat);
+                    pod.scale.set(0.6, 1.3, 0.6);
+                    pod.position.set(
+                        Math.cos(angle) * (trunkRadius + podSize * 0.3),
+                        0.3 + (p / Math.max(podCount, 1)) * trunkHeight * 0.6,
+                        Math.sin(angle) * (trunkRadius + podSize * 0.3)
+                    );
+                    pod.castShadow = true;
+                    group.add(pod);
+                }}
+
+                return group;
+            }}
+
+            // CASSAVA Builder (knobby stems, palmate leaves, tuberous roots)
+            function buildCassavaPlant(chars) {{
+                const group = new THREE.Group();
+                const leafSys = get(plantData, 'leaf_system', {{}});
+
+                const stemHeight = chars.stem_height || 1.0;
+                const stemCount = chars.stem_count || 3;
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#388E3C');
+                const leavesPerStem = Math.max(1, Math.floor(growthSystem.getLeafCount(chars.leaf_count || 18) / stemCount));
+                const lobes = chars.lobes_per_leaf || 7;
+                const stemMat = new THREE.MeshStandardMaterial({{
+                    color: new THREE.Color(chars.stem_color || '#795548'),
+                    roughness: 0.9
+                }});
+
+                for (let s = 0; s < stemCount; s++) {{
+                    const angle = (s / stemCount) * Math.PI * 2;
+                    const lean = 0.12;
+                    const stem = new THREE.Mesh(
+                        new THREE.CylinderGeometry((chars.stem_diameter || 0.03) / 3, (chars.stem_diameter || 0.03) / 2, stemHeight, 8),
+                        stemMat
+                    );
+                    stem.position.set(Math.cos(angle) * 0.05, 0.12 + stemHeight / 2, Math.sin(angle) * 0.05);
+                    stem.rotation.z = -Math.cos(angle) * lean;
+                    stem.rotation.x = Math.sin(angle) * lean;
+                    group.add(stem);
+
+                    // Palmate leaves: narrow lobes radiating from a petiole tip
+                    for (let l = 0; l < leavesPerStem; l++) {{
+                        const leafAngle = angle + l * 1.3;
+                        const y = 0.12 + stemHeight * (0.55 + 0.45 * (l / leavesPerStem));
+                        const hub = new THREE.Vector3(
+                            Math.cos(angle) * (0.05 + y * lean) + Math.cos(leafAngle) * 0.08,
+                            y,
+                            Math.sin(angle) * (0.05 + y * lean) + Math.sin(leafAngle) * 0.08
+                        );
+                        for (let k = 0; k < lobes; k++) {{
+                            const lobeAngle = leafAngle + ((k / (lobes - 1)) - 0.5) * Math.PI * 1.1;
+                            const lobe = new THREE.Mesh(
+                                createLeafByShape('elongated', 0.025, 0.09, 0.1),
+                                new THREE.MeshStandardMaterial({{
+                                    color: new THREE.Color(leafColor),
+                                    side: THREE.DoubleSide,
+                                    roughness: 0.5
+                                }})
+                            );
+                            lobe.position.copy(hub);
+                            lobe.rotation.y = -lobeAngle + Math.PI / 2;
+                            lobe.rotation.x = -1.1;
+                            group.add(lobe);
+                        }}
+                    }}
+                }}
+
+                // Tuberous roots radiating just at the soil surface
+                if (chars.root_visible) {{
+                    const rootMat = new THREE.MeshStandardMaterial({{
+                        color: new THREE.Color(chars.root_color || '#D7CCC8'),
+                        roughness: 0.8
+                    }});
+                    for (let r = 0; r < 5; r++) {{
+                        const angle = (r / 5) * Math.PI * 2 + 0.3;
+                        const root = new THREE.Mesh(new THREE.CylinderGeometry(0.03, 0.01, 0.25, 10), rootMat);
+                        root.position.set(Math.cos(angle) * 0.12, 0.1, Math.sin(angle) * 0.12);
+                        root.rotation.z = Math.cos(angle) * 1.3;
+                        root.rotation.x = -Math.sin(angle) * 1.3;
+                        group.add(root);
+                    }}
+                }}
+
+                return group;
+            }}
+
+            // TARO Builder (corm with elephant-ear leaves on tall petioles)
+            function buildTaroPlant(chars) {{
+                const group = new THREE.Group();
+                const leafSys = get(plantData, 'leaf_system', {{}});
+
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#1B5E20');
+                const leafCount = growthSystem.getLeafCount(chars.leaf_count || 6);
+                const leafSize = chars.leaf_size || 0.35;
+                const petioleLength = chars.petiole_length || 0.4;
+
+                if (chars.corm_visible) {{
+                    const corm = new THREE.Mesh(
+                        new THREE.SphereGeometry(0.07, 16, 16),
+                        new THREE.MeshStandardMaterial({{
+                            color: new THREE.Color(chars.corm_color || '#8D6E63'),
+                            roughness: 0.9
+                        }})
+                    );
+                    corm.scale.set(1, 1.2, 1);
+                    corm.position.y = 0.14;
+                    group.add(corm);
+                }}
+
+                const petioleMat = new THREE.MeshStandardMaterial({{
+                    color: new THREE.Color(chars.petiole_color || '#7CB342'),
+                    roughness: 0.5
+                }});
+                for (let i = 0; i < leafCount; i++) {{
+                    const angle = (i / leafCount) * Math.PI * 2;
+                    const length = petioleLength * (0.8 + (i % 3) * 0.15);
+                    const tilt = 0.35;
+                    const petiole = new THREE.Mesh(new THREE.CylinderGeometry(0.008, 0.014, length, 8), petioleMat);
+                    petiole.position.set(
+                        Math.cos(angle) * Math.sin(tilt) * length / 2,
+                        0.18 + Math.cos(tilt) * length / 2,
+                        Math.sin(angle) * Math.sin(tilt) * length / 2
+                    );
+                    petiole.rotation.z = -Math.cos(angle) * tilt;
+                    petiole.rotation.x = Math.sin(angle) * tilt;
+                    group.add(petiole);
+
+                    // Peltate heart-shaped blade hanging from the petiole tip
+                    const leaf = new THREE.Mesh(
+                        createLeafByShape('heart', leafSize * 0.6, leafSize, 0.1),
+                        new THREE.MeshStandardMaterial({{
+                            color: new THREE.Color(leafColor),
+                            side: THREE.DoubleSide,
+                            roughness: 0.35
+                        }})
+                    );
+                    leaf.position.set(
+                        Math.cos(angle) * Math.sin(tilt) * length,
+                        0.18 + Math.cos(tilt) * length,
+                        Math.sin(angle) * Math.sin(tilt) * length
+                    );
+                    leaf.rotation.y = -angle + Math.PI / 2;
+                    leaf.rotation.x = 0.6;
+                    leaf.castShadow = true;
+                    group.add(leaf);
+                }}
+
+                return group;
+            }}
+
+            // PEANUT Builder (low spreading legume with 4-leaflet leaves and pegs)
+            function buildPeanutPlant(chars) {{
+                const group = new THREE.Group();
+                const leafSys = get(plantData, 'leaf_system', {{}});
+
+                const stemHeight = chars.stem_height || 0.35;
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#4CAF50');
+                const leafletCount = chars.leaflet_count || 4;
+                const stemMat = new THREE.MeshStandardMaterial({{
+                    color: new THREE.Color(chars.stem_color || '#689F38'),
+                    roughness: 0.7
+                }});
+                const flowerMat = new THREE.MeshStandardMaterial({{
+                    color: new THREE.Color(chars.flower_color || '#FFEB3B'),
+                    roughness: 0.4
+                }});
+
+                const stemCount = 6;
+                const leavesPerStem = Math.max(1, Math.floor(growthSystem.getLeafCount(18) / stemCount));
+                for (let s = 0; s < stemCount; s++) {{
+                    const angle = (s / stemCount) * Math.PI * 2;
+                    const dir = new THREE.Vector3(Math.cos(angle), 0, Math.sin(angle));
+                    const curve = new THREE.CatmullRomCurve3([
+                        new THREE.Vector3(0, 0.13, 0),
+                        new THREE.Vector3(dir.x * 0.12, 0.13 + stemHeight * 0.6, dir.z * 0.12),
+                        new THREE.Vector3(dir.x * 0.28, 0.13 + stemHeight * 0.5, dir.z * 0.28)
+                    ]);
+                    group.add(new THREE.Mesh(new THREE.TubeGeometry(curve, 10, 0.007, 6, false), stemMat));
+
+                    for (let l = 0; l < leavesPerStem; l++) {{
+                        const p = curve.getPoint((l + 1) / (leavesPerStem + 1));
+                        // Pinnate leaf with paired leaflets
+                        for (let k = 0; k < leafletCount; k++) {{
+                            const side = k % 2 === 0 ? 1 : -1;
+                            const leaflet = new THREE.Mesh(
+                                createLeafByShape('oval', 0.022, 0.045, 0.1),
+                                new THREE.MeshStandardMaterial({{
+                                    color: new THREE.Color(leafColor),
+                                    side: THREE.DoubleSide,
+                                    roughness: 0.5
+                                }})
+                            );
+                            leaflet.position.set(p.x, p.y + 0.01 + Math.floor(k / 2) * 0.02, p.z);
+                            leaflet.rotation.y = -angle + side * Math.PI / 2;
+                            leaflet.rotation.x = -1.0;
+                            group.add(leaflet);
+                        }}
+                    }}
+
+                    // Yellow flower and a peg diving into the soil
+                    const flower = new THREE.Mesh(new THREE.SphereGeometry(0.012, 8, 8), flowerMat);
+                    flower.position.set(dir.x * 0.08, 0.15, dir.z * 0.08);
+                    group.add(flower);
+                    if (chars.pods_underground) {{
+                        const peg = new THREE.Mesh(new THREE.CylinderGeometry(0.003, 0.003, 0.06, 4), stemMat);
+                        peg.position.set(dir.x * 0.1, 0.11, dir.z * 0.1);
+                        group.add(peg);
+                    }}
+                }}
+
+                return group;
+            }}
+
+            // BEAN VINE Builder (climbing vine on a stake with hanging pods)
+            function buildBeanVine(chars) {{
+                const group = new THREE.Group();
+                const leafSys = get(plantData, 'leaf_system', {{}});
+                const arch = get(plantData, 'plant_architecture', {{}});
+
+                const vineHeight = (chars.vine_length || 0.8) * 1.3;
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#43A047');
+                const beanColor = get(arch, 'fruit_color_hex', chars.bean_color || '#8BC34A');
+                const beanLength = chars.bean_length || 0.25;
+
+                // Bamboo stake
+                const stake = new THREE.Mesh(
+                    new THREE.CylinderGeometry(0.01, 0.012, vineHeight + 0.1, 8),
+                    new THREE.MeshStandardMaterial({{ color: new THREE.Color('#C8A165'), roughness: 0.9 }})
+                );
+                stake.position.y = 0.12 + (vineHeight + 0.1) / 2;
+                group.add(stake);
+
+                // Vine twining up the stake
+                const points = [];
+                const turns = 4;
+                for (let i = 0; i <= 40; i++) {{
+                    const t = i / 40;
+                    const a = t * turns * Math.PI * 2;
+                    points.push(new THREE.Vector3(Math.cos(a) * 0.03, 0.12 + t * vineHeight, Math.sin(a) * 0.03));
+                }}
+                const vine = new THREE.CatmullRomCurve3(points);
+                group.add(new THREE.Mesh(
+                    new THREE.TubeGeometry(vine, 80, 0.005, 6, false),
+                    new THREE.MeshStandardMaterial({{ color: new THREE.Color(chars.vine_color || '#558B2F'), roughness: 0.6 }})
+                ));
+
+                // Trifoliate leaves along the vine
+                const leafNodes = growthSystem.getLeafCount(8);
+                for (let n = 0; n < leafNodes; n++) {{
+                    const p = vine.getPoint((n + 1) / (leafNodes + 1));
+                    const nodeAngle = n * 2.1;
+                    for (let k = 0; k < 3; k++) {{
+                        const leaflet = new THREE.Mesh(
+                            createLeafByShape('oval', 0.04, 0.08, 0.1),
+                            new THREE.MeshStandardMaterial({{
+                                color: new THREE.Color(leafColor),
+                                side: THREE.DoubleSide,
+                                roughness: 0.5
+                            }})
+                        );
+                        leaflet.position.set(p.x + Math.cos(nodeAngle) * 0.04, p.y, p.z + Math.sin(nodeAngle) * 0.04);
+                        leaflet.rotation.y = -nodeAngle + (k - 1) * 0.9 + Math.PI / 2;
+                        leaflet.rotation.x = -0.8;
+                        group.add(leaflet);
+                    }}
+                }}
+
+                // Long slender pods hanging from the upper nodes
+                const beanCount = growthSystem.getFruitCount(chars.bean_count || 5);
+                const beanMat = new THREE.MeshStandardMaterial({{ color: new THREE.Color(beanColor), roughness: 0.45 }});
+                for (let b = 0; b < beanCount; b++) {{
+                    const p = vine.getPoint(0.4 + (b / Math.max(beanCount, 1)) * 0.5);
+                    const angle = b * 1.7;
+                    const bean = new THREE.Mesh(new THREE.CylinderGeometry(0.006, 0.008, beanLength, 6), beanMat);
+                    bean.position.set(p.x + Math.cos(angle) * 0.06, p.y - beanLength / 2, p.z + Math.sin(angle) * 0.06);
+                    bean.rotation.z = (Math.random() - 0.5) * 0.2;
+                    group.add(bean);
+                }}
+
+                return group;
+            }}
+
+            // GOURD VINE Builder (trellised vine with hanging gourds: patola, upo, ampalaya)
+            function buildGourdVine(chars) {{
+                const group = new THREE.Group();
+                const leafSys = get(plantData, 'leaf_system', {{}});
+                const arch = get(plantData, 'plant_architecture', {{}});
+
+                const vineLength = chars.vine_length || 1.0;
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#66BB6A');
+                const fruitColor = get(arch, 'fruit_color_hex', chars.fruit_color || '#8BC34A');
+                const fruitLength = chars.fruit_length || 0.3;
+                const trellisY = 0.12 + Math.min(vineLength, 1.0) * 1.1;
+                const woodMat = new THREE.MeshStandardMaterial({{ color: new THREE.Color('#A1887F'), roughness: 0.9 }});
+                const vineMat = new THREE.MeshStandardMaterial({{ color: new THREE.Color(chars.vine_color || '#558B2F'), roughness: 0.6 }});
+
+                // Simple trellis: two posts and a crossbar
+                for (let side = -1; side <= 1; side += 2) {{
+                    const post = new THREE.Mesh(new THREE.CylinderGeometry(0.012, 0.012, trellisY, 6), woodMat);
+                    post.position.set(side * 0.4, trellisY / 2, 0);
+                    group.add(post);
+                }}
+                const bar = new THREE.Mesh(new THREE.CylinderGeometry(0.01, 0.01, 0.85, 6), woodMat);
+                bar.rotation.z = Math.PI / 2;
+                bar.position.y = trellisY;
+                group.add(bar);
+
+                // Vine climbing a post then running along the bar
+                const vine = new THREE.CatmullRomCurve3([
+                    new THREE.Vector3(-0.05, 0.12, 0),
+                    new THREE.Vector3(-0.3, trellisY * 0.5, 0.02),
+                    new THREE.Vector3(-0.38, trellisY, 0.02),
+                    new THREE.Vector3(0, trellisY + 0.02, 0.03),
+                    new THREE.Vector3(0.38, trellisY, 0.02)
+                ]);
+                group.add(new THREE.Mesh(new THREE.TubeGeometry(vine, 40, 0.007, 6, false), vineMat));
+
+                // Lobed leaves along the vine
+                const leafCount = growthSystem.getLeafCount(14);
+                const leafShape = chars.leaf_type === 'rounded' ? 'heart' : 'lobed';
+                for (let i = 0; i < leafCount; i++) {{
+                    const p = vine.getPoint((i + 1) / (leafCount + 1));
+                    const leaf = new THREE.Mesh(
+                        createLeafByShape(leafShape, 0.06, 0.1, 0.2),
+                        new THREE.MeshStandardMaterial({{
+                            color: new THREE.Color(leafColor),
+                            side: THREE.DoubleSide,
+                            roughness: 0.5
+                        }})
+                    );
+                    leaf.position.set(p.x, p.y + 0.02, p.z + (i % 2 ? 0.05 : -0.05));
+                    leaf.rotation.x = -1.2 + Math.random() * 0.4;
+                    leaf.rotation.y = i * 1.3;
+                    group.add(leaf);
+                }}
+
+                // Gourds hanging from the crossbar, shaped per variety
+                const fruitCount = growthSystem.getFruitCount(chars.fruit_count || 3);
+                const fruitMat = new THREE.MeshStandardMaterial({{ color: new THREE.Color(fruitColor), roughness: 0.5 }});
+                for (let f = 0; f < fruitCount; f++) {{
+                    const x = -0.3 + (f + 0.5) * (0.6 / Math.max(fruitCount, 1));
+                    const fruit = new THREE.Group();
+                    if (chars.fruit_shape === 'bottle') {{
+                        const body = new THREE.Mesh(new THREE.SphereGeometry(fruitLength * 0.25, 16, 16), fruitMat);
+                        body.position.y = -fruitLength * 0.7;
+                        const neck = new THREE.Mesh(new THREE.SphereGeometry(fruitLength * 0.14, 16, 16), fruitMat);
+                        neck.position.y = -fruitLength * 0.3;
+                        fruit.add(body, neck);
+                    }}
+                    else if (chars.fruit_shape === 'warty_spindle') {{
+                        const geom = new THREE.SphereGeometry(fruitLength * 0.18, 16, 16);
+                        const positions = geom.attributes.position.array;
+                        for (let v = 0; v < positions.length; v += 3) {{
+                            const wart = 1 + (Math.random() - 0.5) * 0.15;
+                            positions[v] *= wart;
+                            positions[v + 2] *= wart;
+                        }}
+                        geom.computeVertexNormals();
+                        const body = new THREE.Mesh(geom, fruitMat);
+                        body.scale.set(1, 2.8, 1);
+                        body.position.y = -fruitLength * 0.5;
+                        fruit.add(body);
+                    }}
+                    else {{
+                        // Cylindrical (patola, cucumber)
+                        const body = new THREE.Mesh(
+                            new THREE.CylinderGeometry(fruitLength * 0.12, fruitLength * 0.1, fruitLength, 12),
+                            fruitMat
+                        );
+                        body.position.y = -fruitLength / 2;
+                        fruit.add(body);
+                    }}
+                    fruit.position.set(x, trellisY - 0.02, 0.03);
+                    fruit.children.forEach(part => {{ part.castShadow = true; }});
+                    group.add(fruit);
+                }}
+
+                return group;
+            }}
+
+            // SQUASH VINE Builder (ground-sprawling vine, umbrella leaves, big fruits)
+            function buildSquashVine(chars) {{
+                const group = new THREE.Group();
+                const leafSys = get(plantData, 'leaf_system', {{}});
+                const arch = get(plantData, 'plant_architecture', {{}});
+
+                const vineLength = chars.vine_length || 1.5;
+                const leafColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#43A047');
+                const leafSize = chars.leaf_size || 0.25;
+                const fruitSize = chars.fruit_size || 0.2;
+                const vineMat = new THREE.MeshStandardMaterial({{ color: new THREE.Color(chars.vine_color || '#558B2F'), roughness: 0.6 }});
+                const petioleMat = new THREE.MeshStandardMaterial({{ color: new THREE.Color('#7CB342'), roughness: 0.6 }});
+
+                const runners = 3;
+                const leavesPerRunner = Math.max(1, Math.floor(growthSystem.getLeafCount(12) / runners));
+                const runnerCurves = [];
+                for (let r = 0; r < runners; r++) {{
+                    const angle = (r / runners) * Math.PI * 2 + 0.5;
+                    const length = vineLength * 0.5;
+                    const curve = new THREE.CatmullRomCurve3([
+                        new THREE.Vector3(0, 0.14, 0),
+                        new THREE.Vector3(Math.cos(angle) * length * 0.4, 0.13, Math.sin(angle) * length * 0.4 + 0.05),
+                        new THREE.Vector3(Math.cos(angle + 0.3) * length, 0.13, Math.sin(angle + 0.3) * length)
+                    ]);
+                    runnerCurves.push(curve);
+                    group.add(new THREE.Mesh(new THREE.TubeGeometry(curve, 20, 0.01, 6, false), vineMat));
+
+                    // Large lobed leaves held up on petioles like umbrellas
+                    for (let l = 0; l < leavesPerRunner; l++) {{
+                        const p = curve.getPoint((l + 1) / (leavesPerRunner + 1));
+                        const petioleHeight = 0.15 + Math.random() * 0.1;
+                        const petiole = new THREE.Mesh(new THREE.CylinderGeometry(0.006, 0.008, petioleHeight, 6), petioleMat);
+                        petiole.position.set(p.x, p.y + petioleHeight / 2, p.z);
+                        group.add(petiole);
+
+                        const leaf = new THREE.Mesh(
+                            createLeafByShape('lobed', leafSize * 0.5, leafSize, 0.3),
+                            new THREE.MeshStandardMaterial({{
+                                color: new THREE.Color(leafColor),
+                                side: THREE.DoubleSide,
+                                roughness: 0.6
+                            }})
+                        );
+                        leaf.position.set(p.x, p.y + petioleHeight, p.z);
+                        leaf.rotation.x = -1.3;
+                        leaf.rotation.y = Math.random() * Math.PI * 2;
+                        leaf.castShadow = true;
+                        group.add(leaf);
+                    }}
+                }}
+
+                // Ribbed fruits resting on the ground along the runners
+                const fruitCount = growthSystem.getFruitCount(chars.fruit_count || 2);
+                const fruitMat = new THREE.MeshStandardMaterial({{
+                    color: new THREE.Color(get(arch, 'fruit_color_hex', chars.fruit_color || '#FF9800')),
+                    roughness: 0.55
+                }});
+                for (let f = 0; f < fruitCount; f++) {{
+                    const p = runnerCurves[f % runners].getPoint(0.6);
+                    const geom = new THREE.SphereGeometry(fruitSize / 2, 24, 16);
+                    const positions = geom.attributes.position.array;
+                    for (let v = 0; v < positions.length; v += 3) {{
+                        const rib = 1 + Math.cos(Math.atan2(positions[v + 2], positions[v]) * 10) * 0.06;
+                        positions[v] *= rib;
+                        positions[v + 2] *= rib;
+                    }}
+                    geom.computeVertexNormals();
+                    const fruit = new THREE.Mesh(geom, fruitMat);
+                    fruit.scale.set(1, chars.fruit_shape === 'round' ? 0.75 : 1.2, 1);
+                    fruit.position.set(p.x, 0.12 + fruitSize * 0.35, p.z);
+                    fruit.castShadow = true;
+                    group.add(fruit);
+                }}
+
+                return group;
+            }}
+
             // Create grass-style long leaf
             function createGrassLeaf(width, length) {{
                 const shape = new THREE.Shape();
@@ -1158,13 +2349,13 @@ def render_3d_simulation(
             }}
             
             // GENERIC LEAFY PLANT Builder (lettuce, herbs, etc.)
-            function buildLeafyPlant() {{
+            function buildLeafyPlant(chars) {{
                 const group = new THREE.Group();
                 const leafSys = get(plantData, 'leaf_system', {{}});
                 
-                const leafCount = get(leafSys, 'total_count', 12);
-                const leafShape = get(leafSys, 'shape', 'oval');
-                const primaryColor = get(leafSys, 'primary_color_hex', '#4CAF50');
+                const leafCount = get(leafSys, 'total_count', chars.leaf_count || 12);
+                const leafShape = get(leafSys, 'shape', chars.leaf_type || 'oval');
+                const primaryColor = get(leafSys, 'primary_color_hex', chars.leaf_color || '#4CAF50');
                 const curl = get(leafSys, 'curl_amount', 0.3);
                 const waviness = get(leafSys, 'waviness', 0.3);
                 const orientation = get(leafSys, 'orientation', 'outward');
@@ -1397,82 +2588,21 @@ def render_3d_simulation(
             scene.add(ground);
             
             // ===== BUILD THE SCENE =====
-            function buildScene() {{
-                const headType = get(plantData, 'plant_architecture.head_type', 'none');
-                const fruitType = get(plantData, 'plant_architecture.fruit_type', 'none');
-                const overallForm = get(plantData, 'plant_architecture.overall_form', '');
-                const plantFamily = get(plantData, 'identified_plant.plant_family', '');
-                const plantName = get(plantData, 'identified_plant.common_name', '').toLowerCase();
-                
-                // Add container
-                const container = buildContainer();
-                if (container) plantGroup.add(container);
-                
-                // Build plant based on type - SMART DETECTION
-                let plant;
-                
-                // 1. GRASSES & GRAINS (rice, corn, wheat, bamboo)
-                if (plantFamily === 'Poaceae' || plantFamily === 'Gramineae' ||
-                    plantName.includes('rice') || plantName.includes('palay') ||
-                    plantName.includes('corn') || plantName.includes('maize') ||
-                    plantName.includes('wheat') || plantName.includes('bamboo') ||
-                    plantName.includes('grass') || plantName.includes('sugarcane')) {{
-                    plant = buildGrassPlant();
-                }}
-                // 2. FRUITING PLANTS (tomato, pepper, eggplant)
-                else if (fruitType !== 'none' || 
-                    plantName.includes('tomato') || plantName.includes('kamatis') ||
-                    plantName.includes('pepper') || plantName.includes('sili') ||
-                    plantName.includes('chili') ||
-                    plantName.includes('eggplant') || plantName.includes('talong') ||
-                    plantFamily === 'Solanaceae') {{
-                    plant = buildFruitingPlant();
-                }}
-                // 3. VINE PLANTS (kangkong, sweet potato, squash vine)
-                else if (overallForm === 'vining' || overallForm === 'trailing' ||
-                    plantName.includes('kangkong') || plantName.includes('water spinach') ||
-                    plantName.includes('camote') || plantName.includes('sweet potato') ||
-                    plantName.includes('squash') || plantName.includes('kalabasa') ||
-                    plantName.includes('cucumber') || plantName.includes('pipino') ||
-                    plantName.includes('ampalaya') || plantName.includes('bitter gourd') ||
-                    plantFamily === 'Convolvulaceae' || plantFamily === 'Cucurbitaceae') {{
-                    plant = buildVinePlant();
-                }}
-                // 4. ROOT VEGETABLES (carrot, radish, onion)
-                else if (plantName.includes('carrot') || plantName.includes('karot') ||
-                    plantName.includes('radish') || plantName.includes('labanos') ||
-                    plantName.includes('onion') || plantName.includes('sibuyas') ||
-                    plantName.includes('garlic') || plantName.includes('bawang') ||
-                    plantName.includes('turnip') || plantName.includes('singkamas') ||
-                    plantName.includes('ginger') || plantName.includes('luya') ||
-                    plantFamily === 'Alliaceae') {{
-                    plant = buildRootVegetable();
-                }}
-                // 5. HERBS (basil, mint, cilantro, oregano)
-                else if (plantName.includes('basil') || plantName.includes('balanoy') ||
-                    plantName.includes('mint') || plantName.includes('yerba buena') ||
-                    plantName.includes('cilantro') || plantName.includes('wansoy') ||
-                    plantName.includes('oregano') || plantName.includes('parsley') ||
-                    plantName.includes('rosemary') || plantName.includes('thyme') ||
-                    plantFamily === 'Lamiaceae') {{
-                    plant = buildHerbPlant();
-                }}
-                // 6. BRASSICAS (cauliflower, broccoli, cabbage)
-                else if (headType === 'cauliflower' || headType === 'broccoli' || headType === 'cabbage' ||
-                    plantName.includes('cauliflower') ||
-                    plantName.includes('broccoli') ||
-                    plantName.includes('cabbage') || plantName.includes('repolyo') ||
-                    plantName.includes('pechay') || plantName.includes('bok choy') ||
-                    plantName.includes('mustard') || plantName.includes('mustasa') ||
-                    plantFamily === 'Brassicaceae') {{
-                    plant = buildBrassicaPlant(headType);
-                }} 
-                // 7. DEFAULT: Generic leafy plant (lettuce, spinach, etc.)
-                else {{
-                    plant = buildLeafyPlant();
-                }}
-                
-                plantGroup.add(plant);
+            // Builder names come from PLANT_LIBRARY / resolve_plant_profile
+            const plantBuilders = {{
+                buildGrainPlant, buildFruitingPlant, buildVinePlant, buildRootVegetable,
+                buildHerbPlant, buildBrassicaPlant, buildLeafyPlant,
+                buildFruitTree, buildBananaPlant, buildPalmTree, buildPapayaTree,
+                buildPineapplePlant, buildCoffeePlant, buildCacaoTree, buildCassavaPlant,
+                buildTaroPlant, buildPeanutPlant, buildBeanVine, buildGourdVine, buildSquashVine
+            }};
+            
+            // Build the plant with growth and disease effects applied
+            function buildPlant() {{
+                // Build plant from the resolved library profile
+                // (common name -> plant family -> scanned architecture -> leafy default)
+                const builder = plantBuilders[plantProfile.builder] || buildLeafyPlant;
+                const plant = builder(plantProfile.characteristics || {{}});
                 
                 // ===== APPLY GROWTH SIMULATION =====
                 if (growthSystem.enabled) {{
@@ -1494,15 +2624,7 @@ def render_3d_simulation(
                 }}
                 
                 // ===== APPLY DISEASE VISUALIZATION =====
-                const hasDisease = diseaseSystem.detectDisease();
-                
-                if (hasDisease) {{
-                    // Show disease UI elements
-                    healthStatus.textContent = '🦠 ' + (diseaseSystem.diseaseName || 'Disease Detected');
-                    healthStatus.className = 'diseased pulse-warning';
-                    diseaseControls.classList.add('visible');
-                    diseaseLegend.classList.add('visible');
-                    
+                if (!diseaseSystem.isHealthy) {{
                     // Apply disease effects to leaves
                     const applyDiseaseToGroup = (group) => {{
                         group.children.forEach((child, index) => {{
@@ -1539,6 +2661,89 @@ def render_3d_simulation(
                     }};
                     
                     applyDiseaseToGroup(plant);
+                }}
+                
+                return plant;
+            }}
+            
+            let currentPlant = null;
+            
+            // Swap in a freshly built plant (same seed -> same layout)
+            function rebuildPlant() {{
+                if (currentPlant) {{
+                    plantGroup.remove(currentPlant);
+                    currentPlant.traverse(obj => {{
+                        if (obj.geometry) obj.geometry.dispose();
+                        if (obj.material) obj.material.dispose();
+                    }});
+                }}
+                diseaseSystem.affectedLeaves = [];
+                diseaseSystem.diseaseSpots = [];
+                
+                currentPlant = withSeededRandom(PLANT_SEED, buildPlant);
+                plantGroup.add(currentPlant);
+            }}
+            
+            // ===== GROWTH TIMELINE (runs in the browser, no Python rerun) =====
+            const TIMELINE_STEP_MS = 80;
+            let timelineTimer = null;
+            
+            function showGrowthAt(pct) {{
+                growthSystem.setPercentage(pct);
+                timelineValue.textContent = Math.round(pct) + '%';
+                updatePlantLabel();
+                rebuildPlant();
+            }}
+            
+            function stopTimeline() {{
+                clearInterval(timelineTimer);
+                timelineTimer = null;
+                timelinePlay.textContent = '▶';
+            }}
+            
+            function playTimeline() {{
+                let pct = parseFloat(timelineSlider.value);
+                if (pct >= 100) pct = 0;
+                timelinePlay.textContent = '⏸';
+                timelineTimer = setInterval(() => {{
+                    pct = Math.min(100, pct + 1);
+                    timelineSlider.value = pct;
+                    showGrowthAt(pct);
+                    if (pct >= 100) stopTimeline();
+                }}, TIMELINE_STEP_MS);
+            }}
+            
+            function setupGrowthTimeline() {{
+                if (!growthSystem.curve) return;
+                growthTimeline.classList.add('visible');
+                timelineSlider.value = growthSystem.percentage;
+                timelineValue.textContent = growthSystem.percentage + '%';
+                
+                timelineSlider.addEventListener('input', (e) => {{
+                    stopTimeline();
+                    showGrowthAt(parseFloat(e.target.value));
+                }});
+                timelinePlay.addEventListener('click', () => {{
+                    if (timelineTimer) stopTimeline();
+                    else playTimeline();
+                }});
+            }}
+            
+            function buildScene() {{
+                // Add container
+                const container = buildContainer();
+                if (container) plantGroup.add(container);
+                
+                const hasDisease = diseaseSystem.detectDisease();
+                rebuildPlant();
+                setupGrowthTimeline();
+                
+                if (hasDisease) {{
+                    // Show disease UI elements
+                    healthStatus.textContent = '🦠 ' + (diseaseSystem.diseaseName || 'Disease Detected');
+                    healthStatus.className = 'diseased pulse-warning';
+                    diseaseControls.classList.add('visible');
+                    diseaseLegend.classList.add('visible');
                     
                     // Setup slider event
                     progressionSlider.addEventListener('input', (e) => {{
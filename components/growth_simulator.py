@@ -7,122 +7,11 @@ Integrates with the existing digital_twin.py without modifying it.
 import streamlit as st
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
+import hashlib
 import json
 
-# ============================================================================
-# GROWTH STAGES CONFIGURATION
-# ============================================================================
-
-GROWTH_STAGES = {
-    "seed": {
-        "name": "Seed/Germination",
-        "icon": "🌰",
-        "scale": 0.05,
-        "leaf_factor": 0.0,
-        "fruit_factor": 0.0,
-        "height_factor": 0.05,
-        "color_shift": 0.0,
-        "days_range": (0, 7),
-        "description": "Seed germinating underground"
-    },
-    "seedling": {
-        "name": "Seedling",
-        "icon": "🌱",
-        "scale": 0.2,
-        "leaf_factor": 0.15,
-        "fruit_factor": 0.0,
-        "height_factor": 0.15,
-        "color_shift": 0.1,  # Lighter green
-        "days_range": (7, 21),
-        "description": "First true leaves emerging"
-    },
-    "vegetative": {
-        "name": "Vegetative Growth",
-        "icon": "🌿",
-        "scale": 0.5,
-        "leaf_factor": 0.6,
-        "fruit_factor": 0.0,
-        "height_factor": 0.5,
-        "color_shift": 0.0,
-        "days_range": (21, 45),
-        "description": "Rapid leaf and stem development"
-    },
-    "flowering": {
-        "name": "Flowering",
-        "icon": "🌸",
-        "scale": 0.75,
-        "leaf_factor": 0.85,
-        "fruit_factor": 0.1,
-        "height_factor": 0.8,
-        "color_shift": 0.0,
-        "days_range": (45, 60),
-        "description": "Producing flowers for reproduction"
-    },
-    "fruiting": {
-        "name": "Fruiting",
-        "icon": "🍅",
-        "scale": 0.9,
-        "leaf_factor": 0.9,
-        "fruit_factor": 0.7,
-        "height_factor": 0.95,
-        "color_shift": 0.0,
-        "days_range": (60, 80),
-        "description": "Fruits developing and growing"
-    },
-    "mature": {
-        "name": "Mature/Harvest Ready",
-        "icon": "🌾",
-        "scale": 1.0,
-        "leaf_factor": 1.0,
-        "fruit_factor": 1.0,
-        "height_factor": 1.0,
-        "color_shift": 0.0,
-        "days_range": (80, 100),
-        "description": "Ready for harvest"
-    },
-    "senescence": {
-        "name": "Post-Harvest/Decline",
-        "icon": "🍂",
-        "scale": 0.9,
-        "leaf_factor": 0.7,
-        "fruit_factor": 0.3,
-        "height_factor": 0.95,
-        "color_shift": -0.2,  # Yellowing
-        "days_range": (100, 120),
-        "description": "Natural decline after harvest window"
-    }
-}
-
-# ============================================================================
-# PLANT-SPECIFIC GROWTH DATA
-# ============================================================================
-
-PLANT_GROWTH_DATA = {
-    # Vegetables
-    "tomato": {"days_to_harvest": 70, "stages": ["seed", "seedling", "vegetative", "flowering", "fruiting", "mature"]},
-    "pepper": {"days_to_harvest": 75, "stages": ["seed", "seedling", "vegetative", "flowering", "fruiting", "mature"]},
-    "eggplant": {"days_to_harvest": 80, "stages": ["seed", "seedling", "vegetative", "flowering", "fruiting", "mature"]},
-    "lettuce": {"days_to_harvest": 45, "stages": ["seed", "seedling", "vegetative", "mature"]},
-    "cabbage": {"days_to_harvest": 70, "stages": ["seed", "seedling", "vegetative", "mature"]},
-    "cauliflower": {"days_to_harvest": 80, "stages": ["seed", "seedling", "vegetative", "mature"]},
-    "broccoli": {"days_to_harvest": 65, "stages": ["seed", "seedling", "vegetative", "mature"]},
-    "carrot": {"days_to_harvest": 75, "stages": ["seed", "seedling", "vegetative", "mature"]},
-    "onion": {"days_to_harvest": 100, "stages": ["seed", "seedling", "vegetative", "mature"]},
-    "cucumber": {"days_to_harvest": 55, "stages": ["seed", "seedling", "vegetative", "flowering", "fruiting", "mature"]},
-    "squash": {"days_to_harvest": 50, "stages": ["seed", "seedling", "vegetative", "flowering", "fruiting", "mature"]},
-    
-    # Philippine crops
-    "rice": {"days_to_harvest": 120, "stages": ["seed", "seedling", "vegetative", "flowering", "fruiting", "mature"]},
-    "corn": {"days_to_harvest": 90, "stages": ["seed", "seedling", "vegetative", "flowering", "fruiting", "mature"]},
-    "kangkong": {"days_to_harvest": 30, "stages": ["seed", "seedling", "vegetative", "mature"]},
-    "pechay": {"days_to_harvest": 30, "stages": ["seed", "seedling", "vegetative", "mature"]},
-    "sitaw": {"days_to_harvest": 55, "stages": ["seed", "seedling", "vegetative", "flowering", "fruiting", "mature"]},
-    "ampalaya": {"days_to_harvest": 60, "stages": ["seed", "seedling", "vegetative", "flowering", "fruiting", "mature"]},
-    "talong": {"days_to_harvest": 80, "stages": ["seed", "seedling", "vegetative", "flowering", "fruiting", "mature"]},
-    
-    # Default for unknown plants
-    "default": {"days_to_harvest": 60, "stages": ["seed", "seedling", "vegetative", "flowering", "mature"]}
-}
+from components.crop_model import GROWTH_STAGES, PLANT_GROWTH_DATA, get_crop_model
+from components.structure_overlay import StructureOverlay
 
 # ============================================================================
 # WHAT-IF SCENARIO EFFECTS
@@ -219,19 +108,32 @@ SCENARIO_EFFECTS = {
 }
 
 
+# Simulated structures kept in memory (per growth %, scenario combination)
+SIMULATION_CACHE_SIZE = 256
+
 # ============================================================================
 # GROWTH SIMULATOR CLASS
 # ============================================================================
 
+def structure_fingerprint(plant_structure: dict) -> str:
+    """Stable content hash of a plant structure (key order independent)."""
+    payload = json.dumps(plant_structure or {}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
 class GrowthSimulator:
     """
     Manages growth simulation state and calculations.
+    Simulation results are StructureOverlay views over the original
+    structure, which is shared and never mutated.
     """
     
     def __init__(self, plant_structure: dict):
-        self.original_structure = plant_structure.copy() if plant_structure else {}
+        self.original_structure = plant_structure if plant_structure else {}
+        self.fingerprint = structure_fingerprint(self.original_structure)
         self.plant_name = self._extract_plant_name()
-        self.growth_data = self._get_growth_data()
+        self.crop = get_crop_model(self.plant_name)
+        self.growth_data = PLANT_GROWTH_DATA[self.crop.key]
         
         # Simulation state
         self.current_stage = "mature"
@@ -242,37 +144,28 @@ class GrowthSimulator:
             "nutrients": "optimal"
         }
         
+    def matches(self, plant_structure: dict) -> bool:
+        """Check whether this simulator was built for plant_structure."""
+        if plant_structure is self.original_structure:
+            return True
+        if structure_fingerprint(plant_structure) != self.fingerprint:
+            return False
+        # Same content, new object: keep it so the next check is an identity hit
+        self.original_structure = plant_structure
+        return True
+    
     def _extract_plant_name(self) -> str:
         """Extract plant name from structure."""
         name = self.original_structure.get("identified_plant", {}).get("common_name", "Plant")
         return name.lower().split("(")[0].strip()
     
-    def _get_growth_data(self) -> dict:
-        """Get growth data for this plant type."""
-        # Try to match plant name
-        for key in PLANT_GROWTH_DATA:
-            if key in self.plant_name or self.plant_name in key:
-                return PLANT_GROWTH_DATA[key]
-        return PLANT_GROWTH_DATA["default"]
-    
     def get_stage_from_percentage(self, percentage: int) -> str:
         """Convert percentage (0-100) to growth stage."""
-        stages = self.growth_data["stages"]
-        num_stages = len(stages)
-        
-        if percentage <= 0:
-            return stages[0]
-        if percentage >= 100:
-            return stages[-1]
-        
-        stage_index = int((percentage / 100) * (num_stages - 1))
-        return stages[min(stage_index, num_stages - 1)]
+        return self.crop.stage_at(percentage)
     
     def calculate_days_to_harvest(self, current_percentage: int) -> int:
         """Calculate days remaining to harvest."""
-        total_days = self.growth_data["days_to_harvest"]
-        current_days = (current_percentage / 100) * total_days
-        return max(0, int(total_days - current_days))
+        return self.crop.days_remaining(current_percentage)
     
     def get_harvest_date(self, current_percentage: int) -> str:
         """Get predicted harvest date."""
@@ -280,45 +173,57 @@ class GrowthSimulator:
         harvest_date = datetime.now() + timedelta(days=days_remaining)
         return harvest_date.strftime("%B %d, %Y")
     
-    def apply_growth_modifiers(self, structure: dict, percentage: int) -> dict:
-        """Apply growth stage modifications to plant structure."""
-        modified = json.loads(json.dumps(structure))  # Deep copy
+    def apply_growth_modifiers(self, structure: dict, percentage: int) -> StructureOverlay:
+        """
+        Apply growth stage modifications to plant structure.
+        Size factors are interpolated between stages, so they change
+        smoothly with the percentage instead of jumping at stage borders.
+        """
+        delta = {}
         
         stage_name = self.get_stage_from_percentage(percentage)
         stage = GROWTH_STAGES.get(stage_name, GROWTH_STAGES["mature"])
+        factors = self.crop.factors_at(percentage)
         
-        # Apply scale factors
-        if "plant_architecture" in modified:
-            arch = modified["plant_architecture"]
+        # Apply scale factors (only the touched fields go into the delta)
+        arch = structure.get("plant_architecture")
+        if arch:
+            arch_delta = {}
             if "height_cm" in arch:
-                arch["height_cm"] = int(arch["height_cm"] * stage["height_factor"])
+                arch_delta["height_cm"] = int(arch["height_cm"] * factors["height_factor"])
             if "fruit_count" in arch:
-                arch["fruit_count"] = int(arch.get("fruit_count", 0) * stage["fruit_factor"])
+                arch_delta["fruit_count"] = int(arch.get("fruit_count", 0) * factors["fruit_factor"])
+            if arch_delta:
+                delta["plant_architecture"] = arch_delta
         
-        if "leaf_system" in modified:
-            leaves = modified["leaf_system"]
+        leaves = structure.get("leaf_system")
+        if leaves:
+            leaf_delta = {}
             if "total_count" in leaves:
-                leaves["total_count"] = max(2, int(leaves["total_count"] * stage["leaf_factor"]))
+                leaf_delta["total_count"] = max(2, int(leaves["total_count"] * factors["leaf_factor"]))
             if "size_cm" in leaves:
-                leaves["size_cm"] = int(leaves.get("size_cm", 20) * stage["scale"])
+                leaf_delta["size_cm"] = int(leaves.get("size_cm", 20) * factors["scale"])
+            if leaf_delta:
+                delta["leaf_system"] = leaf_delta
         
-        # Store growth metadata for 3D renderer
-        modified["growth_simulation"] = {
+        # Store growth metadata for 3D renderer; the curve lets the renderer
+        # replay other percentages locally without a Python rerun
+        delta["growth_simulation"] = {
             "stage": stage_name,
             "stage_display": stage["name"],
-            "scale": stage["scale"],
+            "scale": factors["scale"],
             "percentage": percentage,
-            "leaf_factor": stage["leaf_factor"],
-            "fruit_factor": stage["fruit_factor"],
-            "color_shift": stage["color_shift"]
+            "leaf_factor": factors["leaf_factor"],
+            "fruit_factor": factors["fruit_factor"],
+            "height_factor": factors["height_factor"],
+            "color_shift": factors["color_shift"],
+            "curve": self.crop.curve
         }
         
-        return modified
+        return StructureOverlay(structure, delta)
     
-    def apply_scenario_effects(self, structure: dict) -> dict:
-        """Apply what-if scenario effects to plant structure."""
-        modified = json.loads(json.dumps(structure))  # Deep copy
-        
+    def apply_scenario_effects(self, structure: dict) -> StructureOverlay:
+        """Apply what-if scenario effects to plant structure."""        
         # Combine effects from all scenarios
         total_growth_modifier = 1.0
         total_health_impact = 0.0
@@ -347,7 +252,7 @@ class GrowthSimulator:
                 active_effects.append(f"{effect['icon']} {effect['name']}")
         
         # Store scenario effects for 3D renderer
-        modified["scenario_effects"] = {
+        scenario_effects = {
             "growth_modifier": total_growth_modifier,
             "health_impact": total_health_impact,
             "color_shift": combined_color,
@@ -358,13 +263,30 @@ class GrowthSimulator:
             "scenarios": self.scenarios.copy()
         }
         
-        return modified
+        return StructureOverlay(structure, {"scenario_effects": scenario_effects})
     
-    def get_modified_structure(self, percentage: int) -> dict:
+    def get_modified_structure(self, percentage: int) -> StructureOverlay:
         """Get fully modified plant structure with growth and scenarios applied."""
         structure = self.apply_growth_modifiers(self.original_structure, percentage)
         structure = self.apply_scenario_effects(structure)
         return structure
+    
+    def get_cached_structure(self, percentage: int) -> StructureOverlay:
+        """Like get_modified_structure, memoized on (fingerprint, %, scenarios)."""
+        scenario_key = tuple(sorted(self.scenarios.items()))
+        return _simulate_cached(self.fingerprint, percentage, scenario_key, self)
+
+
+@st.cache_data(max_entries=SIMULATION_CACHE_SIZE, show_spinner=False)
+def _simulate_cached(fingerprint: str, percentage: int, scenarios: tuple,
+                     _simulator: GrowthSimulator) -> StructureOverlay:
+    """
+    Shared simulation memo. The simulator argument is not hashed (leading
+    underscore); fingerprint + scenarios identify the result. cache_data
+    hands every caller its own copy, so a caller that edits a section it
+    read (e.g. growth_simulation) cannot change other sessions' results.
+    """
+    return _simulator.get_modified_structure(percentage)
 
 
 # ============================================================================
@@ -381,14 +303,9 @@ def render_growth_controls(plant_structure: dict, key_prefix: str = "") -> dict:
         key_prefix: Unique prefix for widget keys to avoid duplicates across tabs
     """
     
-    # Initialize simulator in session state
-    if "growth_simulator" not in st.session_state:
-        st.session_state.growth_simulator = GrowthSimulator(plant_structure)
-    
-    simulator = st.session_state.growth_simulator
-    
-    # Update original structure if changed
-    if plant_structure != simulator.original_structure:
+    # Initialize simulator in session state (rebuilt only when the structure changes)
+    simulator = st.session_state.get("growth_simulator")
+    if simulator is None or not simulator.matches(plant_structure):
         simulator = GrowthSimulator(plant_structure)
         st.session_state.growth_simulator = simulator
     
@@ -477,7 +394,7 @@ def render_growth_controls(plant_structure: dict, key_prefix: str = "") -> dict:
             simulator.scenarios["nutrients"] = nutrient_level
         
         # Show active effects
-        modified_structure = simulator.get_modified_structure(growth_pct)
+        modified_structure = simulator.get_cached_structure(growth_pct)
         effects = modified_structure.get("scenario_effects", {}).get("active_effects", [])
         
         if effects:
@@ -504,36 +421,34 @@ def render_growth_controls(plant_structure: dict, key_prefix: str = "") -> dict:
                     delta=f"{int(health_impact * 100)}%"
                 )
     
+        # Harvest window under uncertain conditions
+        if growth_pct < 100:
+            window = _forecast_window(
+                simulator.crop.key, growth_pct, tuple(sorted(simulator.scenarios.items()))
+            )
+            st.caption(
+                f"🎲 **Likely harvest window:** {window['p10_date']} – {window['p90_date']} "
+                f"(most likely {window['p50_date']})"
+            )
+    
     return modified_structure
 
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def _forecast_window(crop_key: str, percentage: int, scenarios: tuple) -> dict:
+    """Monte Carlo P10/P50/P90 harvest dates for one plant (seeded, so stable across reruns)."""
+    from components.harvest_forecast import forecast_harvest
+
+    forecast = forecast_harvest(
+        [{"name": crop_key, "growth_pct": percentage, "scenarios": dict(scenarios)}],
+        seed=0
+    )
+    return forecast.to_records()[0]
+
+
 def get_growth_stage_timeline(plant_name: str) -> list:
     """Get timeline of growth stages for a plant."""
-    # Find plant data
-    plant_data = PLANT_GROWTH_DATA.get("default")
-    for key in PLANT_GROWTH_DATA:
-        if key in plant_name.lower():
-            plant_data = PLANT_GROWTH_DATA[key]
-            break
-    
-    total_days = plant_data["days_to_harvest"]
-    stages = plant_data["stages"]
-    
-    timeline = []
-    days_per_stage = total_days / len(stages)
-    
-    for i, stage in enumerate(stages):
-        stage_info = GROWTH_STAGES[stage]
-        timeline.append({
-            "stage": stage,
-            "name": stage_info["name"],
-            "icon": stage_info["icon"],
-            "start_day": int(i * days_per_stage),
-            "end_day": int((i + 1) * days_per_stage),
-            "description": stage_info["description"]
-        })
-    
-    return timeline
+    return get_crop_model(plant_name).timeline()
 
 
 def render_growth_timeline(plant_name: str):
@@ -0,0 +1,278 @@
+"""
+Harvest Forecast - Monte Carlo Harvest Dates
+Samples growing-condition trajectories and per-crop timing variance to give
+a harvest-date distribution (P10/P50/P90) per plant instead of one date.
+Vectorized over plants x samples with NumPy, using the same crop and
+scenario tables as the batch simulator.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from components.batch_simulator import (
+    CROP_DAYS, CROP_KEYS, SCENARIO_LEVELS, SCENARIO_TYPES, _scenario_table
+)
+from components.crop_model import CROP_MODELS, get_crop_model
+
+# ============================================================================
+# FORECAST SETTINGS
+# ============================================================================
+
+DEFAULT_SAMPLES = 1000
+STEP_DAYS = 7  # Conditions are re-drawn once per simulated week
+
+# Weekly chance of moving between condition levels (rows: from, cols: to,
+# both ordered low/optimal/high). Conditions tend to persist, and
+# out-of-range conditions drift back towards optimal.
+LEVEL_TRANSITIONS = np.array([
+    [0.60, 0.35, 0.05],
+    [0.10, 0.80, 0.10],
+    [0.05, 0.35, 0.60],
+])
+_TRANSITION_CDF = np.cumsum(LEVEL_TRANSITIONS, axis=1)
+_STAY_LOW = _TRANSITION_CDF[:, 0].astype(np.float32)  # draw below -> low
+_BELOW_HIGH = _TRANSITION_CDF[:, 1].astype(np.float32)  # draw above -> high
+
+# growth_modifier per (scenario type, level), shape (3, 3)
+_GROWTH_MODIFIER = _scenario_table("growth_modifier", 1.0)
+_MIN_GROWTH_MODIFIER = _GROWTH_MODIFIER.min(axis=1).prod()
+
+# Combined growth rate for every water/sunlight/nutrient level triple, shape (3, 3, 3)
+_RATE_BY_LEVELS = np.einsum("i,j,k->ijk", *_GROWTH_MODIFIER)
+
+CROP_DAYS_CV = np.array([CROP_MODELS[key].days_cv for key in CROP_KEYS])
+_CROP_POSITION = {key: i for i, key in enumerate(CROP_KEYS)}
+_LEVEL_INDEX = {level: i for i, level in enumerate(SCENARIO_LEVELS)}
+
+QUANTILES = (10, 50, 90)
+
+
+# ============================================================================
+# SAMPLING
+# ============================================================================
+
+def sample_harvest_days(crop_index: np.ndarray, growth_pct: np.ndarray,
+                        start_levels: np.ndarray, n_samples: int = DEFAULT_SAMPLES,
+                        rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Sample days until harvest for every plant.
+
+    Each sample draws the crop's remaining growing days from a lognormal
+    with the crop's days_cv (mean = the deterministic estimate), then
+    advances week by week, growing at the product of the current
+    water/sunlight/nutrient growth modifiers while each condition moves
+    along LEVEL_TRANSITIONS.
+
+    Args:
+        crop_index: Position in CROP_KEYS per plant, shape (plants,)
+        growth_pct: Current growth percentage per plant (0-100)
+        start_levels: Current level index per plant and scenario type,
+                      shape (plants, 3), ordered as SCENARIO_TYPES
+        n_samples: Trajectories per plant
+        rng: NumPy random generator (a fresh one if omitted)
+
+    Returns:
+        Days until harvest, shape (plants, samples)
+    """
+    rng = rng or np.random.default_rng()
+    crop_index = np.asarray(crop_index, dtype=np.intp)
+    pct = np.clip(np.asarray(growth_pct, dtype=np.float64), 0, 100)
+    n_plants = len(crop_index)
+
+    # Remaining growing days at optimal conditions, shape (plants, samples)
+    sigma = np.sqrt(np.log1p(CROP_DAYS_CV[crop_index] ** 2))[:, None]
+    spread = rng.lognormal(-sigma ** 2 / 2, sigma, size=(n_plants, n_samples))
+    remaining = (CROP_DAYS[crop_index] * (1 - pct / 100))[:, None] * spread
+
+    levels = np.broadcast_to(
+        np.asarray(start_levels, dtype=np.int8)[:, None, :],
+        (n_plants, n_samples, len(SCENARIO_TYPES))
+    ).copy()
+
+    harvest = np.where(remaining <= 0, 0.0, np.nan)
+    progress = np.zeros_like(remaining)
+    max_steps = int(np.ceil(remaining.max(initial=0) / (STEP_DAYS * _MIN_GROWTH_MODIFIER))) + 1
+
+    for step in range(max_steps):
+        pending = np.isnan(harvest)
+        if not pending.any():
+            break
+
+        rate = _RATE_BY_LEVELS[levels[..., 0], levels[..., 1], levels[..., 2]]
+        gained = STEP_DAYS * rate
+        finished = pending & (progress + gained >= remaining)
+
+        # Interpolate the crossing day inside this week
+        harvest[finished] = (
+            step * STEP_DAYS
+            + (remaining[finished] - progress[finished]) / rate[finished]
+        )
+        progress += gained
+
+        draws = rng.random(levels.shape, dtype=np.float32)
+        levels = (draws > _STAY_LOW[levels]).view(np.int8) + (draws > _BELOW_HIGH[levels]).view(np.int8)
+
+    # Any sample still growing (only possible by rounding) ends at the cap
+    return np.where(np.isnan(harvest), max_steps * STEP_DAYS, harvest)
+
+
+# ============================================================================
+# FORECAST RESULTS
+# ============================================================================
+
+@dataclass
+class HarvestForecast:
+    """Harvest-day quantiles per plant, counted from start_date."""
+    labels: List[str]
+    crops: List[str]
+    growth_pct: np.ndarray
+    p10_days: np.ndarray
+    p50_days: np.ndarray
+    p90_days: np.ndarray
+    start_date: date
+
+    def date_for(self, days: float) -> date:
+        """Calendar date a number of days after start_date."""
+        return self.start_date + timedelta(days=int(round(days)))
+
+    def to_records(self) -> List[dict]:
+        """One dict per plant with P10/P50/P90 days and dates."""
+        records = []
+        for i, label in enumerate(self.labels):
+            records.append({
+                "plant": label,
+                "crop": self.crops[i],
+                "growth_pct": int(round(self.growth_pct[i])),
+                "p10_days": int(round(self.p10_days[i])),
+                "p50_days": int(round(self.p50_days[i])),
+                "p90_days": int(round(self.p90_days[i])),
+                "p10_date": self.date_for(self.p10_days[i]).strftime("%B %d, %Y"),
+                "p50_date": self.date_for(self.p50_days[i]).strftime("%B %d, %Y"),
+                "p90_date": self.date_for(self.p90_days[i]).strftime("%B %d, %Y"),
+            })
+        return records
+
+
+def forecast_harvest(plants: Sequence[Mapping], n_samples: int = DEFAULT_SAMPLES,
+                     seed: Optional[int] = None,
+                     start_date: Optional[date] = None) -> HarvestForecast:
+    """
+    Forecast harvest-date quantiles for many plants at once.
+
+    Args:
+        plants: Dicts with "name" (plant name or alias), "growth_pct" and
+                optional "scenarios" ({"water": "low", ...}, default optimal)
+                and "label"
+        n_samples: Monte Carlo trajectories per plant
+        seed: Seed for reproducible forecasts (e.g. stable across reruns)
+        start_date: Day the forecast counts from (default today)
+
+    Returns:
+        HarvestForecast with P10/P50/P90 days per plant
+    """
+    crop_index, growth_pct, start_levels, labels, crops = [], [], [], [], []
+    for plant in plants:
+        crop = get_crop_model(plant.get("name") or "")
+        scenarios = plant.get("scenarios") or {}
+
+        crops.append(crop.key)
+        labels.append(plant.get("label") or plant.get("name") or "Plant")
+        crop_index.append(_CROP_POSITION[crop.key])
+        growth_pct.append(plant.get("growth_pct") or 0)
+        start_levels.append([
+            _LEVEL_INDEX.get(scenarios.get(kind, "optimal"), _LEVEL_INDEX["optimal"])
+            for kind in SCENARIO_TYPES
+        ])
+
+    growth_pct = np.array(growth_pct, dtype=np.float64)
+    if crop_index:
+        days = sample_harvest_days(
+            np.array(crop_index), growth_pct, np.array(start_levels),
+            n_samples=n_samples, rng=np.random.default_rng(seed)
+        )
+        p10, p50, p90 = np.percentile(days, QUANTILES, axis=1)
+    else:
+        p10 = p50 = p90 = np.zeros(0)
+
+    return HarvestForecast(
+        labels=labels,
+        crops=crops,
+        growth_pct=growth_pct,
+        p10_days=p10,
+        p50_days=p50,
+        p90_days=p90,
+        start_date=start_date or date.today()
+    )
+
+
+# ============================================================================
+# TRACKED PLANTS
+# ============================================================================
+
+def _days_since(timestamp: Optional[str], today: date) -> int:
+    """Whole days between a Supabase timestamp and today (0 if unparseable)."""
+    if not timestamp:
+        return 0
+    try:
+        scanned = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00")).date()
+    except ValueError:
+        return 0
+    return max(0, (today - scanned).days)
+
+
+def estimate_growth_pct(plant_name: str, growth_stage: Optional[str],
+                        days_since_scan: int = 0) -> float:
+    """
+    Estimate current growth % from the stage seen at the last scan,
+    advanced by the days elapsed since then.
+    """
+    crop = get_crop_model(plant_name)
+    pct = crop.percentage_for_stage((growth_stage or "").lower())
+    return min(100.0, pct + days_since_scan / crop.days_to_harvest * 100)
+
+
+def tracked_plant_inputs(tracked_plants: Sequence[Mapping],
+                         today: Optional[date] = None) -> List[Dict]:
+    """
+    Turn plants_registry rows (latest scan per tracking_id) into
+    forecast_harvest inputs.
+    """
+    today = today or date.today()
+    inputs = []
+    for row in tracked_plants:
+        analysis = row.get("analysis_json") or {}
+        identified = (analysis.get("plant_structure") or {}).get("identified_plant") or {}
+        name = identified.get("common_name") or analysis.get("plant_name") or row.get("plant_name") or ""
+
+        inputs.append({
+            "label": row.get("plant_name") or name or "Plant",
+            "name": name,
+            "growth_pct": estimate_growth_pct(
+                name, identified.get("growth_stage"), _days_since(row.get("created_at"), today)
+            ),
+        })
+    return inputs
+
+
+def forecast_tracked_plants(tracked_plants: Sequence[Mapping],
+                            n_samples: int = DEFAULT_SAMPLES,
+                            seed: Optional[int] = 0,
+                            today: Optional[date] = None) -> List[dict]:
+    """
+    Harvest outlook for every tracked plant, as to_records() rows.
+
+    Args:
+        tracked_plants: Rows from get_unique_tracked_plants()
+        n_samples: Monte Carlo trajectories per plant
+        seed: Seed so the outlook does not jitter between page loads
+        today: Forecast start (default today)
+    """
+    today = today or date.today()
+    forecast = forecast_harvest(
+        tracked_plant_inputs(tracked_plants, today),
+        n_samples=n_samples, seed=seed, start_date=today
+    )
+    return forecast.to_records()
@@ -0,0 +1,187 @@
+"""
+Name Index - Fast Plant/Disease Name Resolution
+Builds an exact-match hash plus an Aho-Corasick matcher over library aliases,
+so free-text names from Gemini resolve to a library key in one pass.
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Iterable, Optional
+
+# ============================================================================
+# NORMALIZATION
+# ============================================================================
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Letters allowed after a pattern that ends mid-word ("tomato" -> "tomatoes")
+PLURAL_SUFFIXES = ("", "s", "es")
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a name for matching.
+    Lowercases and collapses punctuation/underscores into single spaces,
+    so "Powdery_Mildew", "powdery-mildew" and "Powdery Mildew" are equal.
+    """
+    return _NON_ALNUM.sub(" ", (name or "").lower()).strip()
+
+
+# ============================================================================
+# ALIAS INDEX
+# ============================================================================
+
+class AliasIndex:
+    """
+    Resolves free-text names to library keys.
+
+    Patterns are added in priority order (first added wins). A lookup tries,
+    in order:
+      1. Exact normalized match against any pattern.
+      2. The highest-priority pattern found inside the name (Aho-Corasick;
+         matches must be whole words, plurals allowed: "tomatoes" ->
+         "tomato", but "peppermint" does not match "pepper"; patterns
+         added with prefix=True match any word they start, "wilting" ->
+         "wilt"), or the highest-priority pattern that contains the name
+         at a word start ("bean" -> "string beans"), whichever has higher
+         priority.
+
+    Build once with add(), then call lookup(). Adding after the first
+    lookup rebuilds the automaton lazily.
+    """
+
+    def __init__(self, min_reverse_length: int = 3, stop_words: Iterable[str] = ()):
+        self.min_reverse_length = min_reverse_length
+        self.stop_words = {normalize_name(word) for word in stop_words}
+        self._priority = 0
+        self._exact = {}
+        self._reverse = {}
+        self._patterns = []  # (pattern, priority, value, prefix)
+        self._goto = None
+        self._fail = None
+        self._out = None
+        self._cached_lookup = lru_cache(maxsize=2048)(
+            lambda name: self._lookup(normalize_name(name))
+        )
+
+    def add(self, value: str, patterns: Iterable[str], reverse: bool = True, prefix: bool = False) -> None:
+        """
+        Register patterns that resolve to value.
+
+        Args:
+            value: What lookup() returns when one of the patterns matches
+            patterns: Names/aliases, highest priority first
+            reverse: Also match names that are contained in these patterns
+            prefix: Also match words that merely start with these patterns
+                    (keywords: "wilt" -> "wilting", "rust" -> "rusty")
+        """
+        for raw in patterns:
+            pattern = normalize_name(raw)
+            if not pattern:
+                continue
+            priority = self._priority
+            self._priority += 1
+
+            self._exact.setdefault(pattern, value)
+            self._patterns.append((pattern, priority, value, prefix))
+
+            if reverse:
+                self._add_reverse(pattern, priority, value)
+
+        # Invalidate the automaton and cached results
+        self._goto = None
+        self._cached_lookup.cache_clear()
+
+    def _add_reverse(self, pattern: str, priority: int, value: str) -> None:
+        """Index every substring of pattern that starts at a word start."""
+        for start in range(len(pattern)):
+            if start > 0 and pattern[start - 1] != " ":
+                continue
+            for end in range(start + self.min_reverse_length, len(pattern) + 1):
+                fragment = pattern[start:end]
+                if fragment.endswith(" ") or fragment in self.stop_words:
+                    continue
+                if fragment not in self._reverse or self._reverse[fragment][0] > priority:
+                    self._reverse[fragment] = (priority, value)
+
+    def _build(self) -> None:
+        """Build the Aho-Corasick goto/fail/output tables."""
+        goto = [{}]
+        out = [[]]
+
+        for pattern, priority, value, prefix in self._patterns:
+            node = 0
+            for char in pattern:
+                nxt = goto[node].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][char] = nxt
+                    goto.append({})
+                    out.append([])
+                node = nxt
+            out[node].append((len(pattern), priority, value, prefix))
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+                out[child] = out[child] + out[fail[child]]
+
+        self._goto, self._fail, self._out = goto, fail, out
+
+    def _lookup(self, name: str) -> Optional[str]:
+        """Uncached lookup on an already-normalized name."""
+        if not name:
+            return None
+
+        exact = self._exact.get(name)
+        if exact is not None:
+            return exact
+
+        if self._goto is None:
+            self._build()
+        goto, fail, out = self._goto, self._fail, self._out
+
+        best_priority, best_value = None, None
+        node = 0
+        for index, char in enumerate(name):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, priority, value, prefix in out[node]:
+                start = index - length + 1
+                if start > 0 and name[start - 1] != " ":
+                    continue
+                if not prefix and name[index + 1:].split(" ", 1)[0] not in PLURAL_SUFFIXES:
+                    continue
+                if best_priority is None or priority < best_priority:
+                    best_priority, best_value = priority, value
+
+        if name not in self.stop_words:
+            hit = self._reverse.get(name)
+            if hit and (best_priority is None or hit[0] < best_priority):
+                best_value = hit[1]
+
+        return best_value
+
+    def lookup(self, name: str) -> Optional[str]:
+        """
+        Resolve a free-text name.
+
+        Args:
+            name: Plant or disease name as written by a user or Gemini
+
+        Returns:
+            The registered value for the best match, or None
+        """
+        return self._cached_lookup(name or "")
+
+    def __len__(self) -> int:
+        return len(self._patterns)
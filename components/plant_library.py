@@ -4,6 +4,11 @@ This file contains all plant type configurations for the 3D Digital Twin.
 Easy to add new plants by adding entries to the PLANT_LIBRARY dictionary.
 """
 
+from typing import Optional
+
+from components.crop_model import get_stage_config
+from components.name_index import AliasIndex
+
 # ============================================================================
 # PLANT LIBRARY - Organized by Category
 # ============================================================================
@@ -340,9 +345,307 @@ PLANT_LIBRARY = {
             "leaf_count": 12,
             "leaf_shape": "wavy"
         }
+    },
+    "cauliflower": {
+        "aliases": ["koliplor", "brassica oleracea var. botrytis"],
+        "category": "brassica",
+        "builder": "buildBrassicaPlant",
+        "characteristics": {
+            "head_type": "cauliflower",
+            "head_color": "#F5F5DC",
+            "leaf_color": "#2E7D32",
+            "leaf_count": 12
+        }
+    },
+    "broccoli": {
+        "aliases": ["brokoli", "brassica oleracea var. italica"],
+        "category": "brassica",
+        "builder": "buildBrassicaPlant",
+        "characteristics": {
+            "head_type": "broccoli",
+            "head_color": "#33691E",
+            "leaf_color": "#388E3C",
+            "leaf_count": 10
+        }
+    },
+    "cabbage": {
+        "aliases": ["repolyo", "brassica oleracea var. capitata"],
+        "category": "brassica",
+        "builder": "buildBrassicaPlant",
+        "characteristics": {
+            "head_type": "cabbage",
+            "head_color": "#A5D6A7",
+            "leaf_color": "#66BB6A",
+            "leaf_count": 12
+        }
+    },
+    "lettuce": {
+        "aliases": ["litsugas", "lactuca sativa"],
+        "category": "leafy",
+        "builder": "buildLeafyPlant",
+        "characteristics": {
+            "leaf_type": "ruffled",
+            "leaf_color": "#7CB342",
+            "leaf_count": 14
+        }
+    },
+    
+    # === FRUITING VEGETABLES ===
+    "tomato": {
+        "aliases": ["kamatis", "cherry tomato", "solanum lycopersicum"],
+        "category": "fruiting_vegetable",
+        "builder": "buildFruitingPlant",
+        "characteristics": {
+            "fruit_type": "tomato",
+            "fruit_color": "#FF6347",
+            "fruit_count": 6,
+            "stem_color": "#2E8B57"
+        }
+    },
+    "pepper": {
+        "aliases": ["sili", "chili", "siling labuyo", "bell pepper", "capsicum"],
+        "category": "fruiting_vegetable",
+        "builder": "buildFruitingPlant",
+        "characteristics": {
+            "fruit_type": "pepper",
+            "fruit_color": "#D32F2F",
+            "fruit_count": 8,
+            "stem_color": "#388E3C"
+        }
+    },
+    "eggplant": {
+        "aliases": ["talong", "aubergine", "solanum melongena"],
+        "category": "fruiting_vegetable",
+        "builder": "buildFruitingPlant",
+        "characteristics": {
+            "fruit_type": "eggplant",
+            "fruit_color": "#4A148C",
+            "fruit_count": 4,
+            "stem_color": "#5D4037"
+        }
+    },
+    "cucumber": {
+        "aliases": ["pipino", "cucumis sativus"],
+        "category": "vine",
+        "builder": "buildGourdVine",
+        "characteristics": {
+            "vine_length": 0.9,
+            "vine_color": "#558B2F",
+            "leaf_type": "lobed",
+            "leaf_color": "#43A047",
+            "fruit_shape": "cylindrical",
+            "fruit_color": "#33691E",
+            "fruit_length": 0.2,
+            "fruit_count": 4
+        }
+    },
+    "camote": {
+        "aliases": ["kamote", "sweet potato", "ipomoea batatas"],
+        "category": "vine",
+        "builder": "buildVinePlant",
+        "characteristics": {
+            "vine_length": 0.7,
+            "vine_color": "#6D4C41",
+            "leaf_type": "heart",
+            "leaf_color": "#43A047"
+        }
+    },
+    
+    # === GRASSES ===
+    "wheat": {
+        "aliases": ["trigo", "triticum"],
+        "category": "grain",
+        "builder": "buildGrainPlant",
+        "characteristics": {
+            "stem_type": "culm",
+            "stem_count": 10,
+            "stem_height": 0.9,
+            "stem_color": "#C0CA33",
+            "leaf_type": "grass_blade",
+            "leaf_color": "#9E9D24",
+            "has_grain_head": True,
+            "grain_type": "spike",
+            "grain_color": "#D4A017",
+            "grain_count": 8,
+            "growth_habit": "tillering"
+        }
+    },
+    "sugarcane": {
+        "aliases": ["tubo", "saccharum officinarum"],
+        "category": "grain",
+        "builder": "buildGrainPlant",
+        "characteristics": {
+            "stem_type": "cane",
+            "stem_count": 5,
+            "stem_height": 1.8,
+            "stem_color": "#8D6E63",
+            "stem_diameter": 0.035,
+            "leaf_type": "grass_blade",
+            "leaf_color": "#558B2F",
+            "has_grain_head": False,
+            "growth_habit": "clumping"
+        }
+    },
+    "bamboo": {
+        "aliases": ["kawayan", "bambusa"],
+        "category": "grain",
+        "builder": "buildGrainPlant",
+        "characteristics": {
+            "stem_type": "culm",
+            "stem_count": 5,
+            "stem_height": 2.0,
+            "stem_color": "#7CB342",
+            "stem_diameter": 0.04,
+            "leaf_type": "grass_blade",
+            "leaf_color": "#558B2F",
+            "has_grain_head": False,
+            "growth_habit": "clumping"
+        }
+    },
+    
+    # === ROOT VEGETABLES ===
+    "carrot": {
+        "aliases": ["karot", "daucus carota"],
+        "category": "root_vegetable",
+        "builder": "buildRootVegetable",
+        "characteristics": {
+            "root_shape": "taproot",
+            "root_color": "#FF6600",
+            "leaf_type": "feathery",
+            "leaf_color": "#388E3C",
+            "leaf_count": 8
+        }
+    },
+    "radish": {
+        "aliases": ["labanos", "raphanus sativus"],
+        "category": "root_vegetable",
+        "builder": "buildRootVegetable",
+        "characteristics": {
+            "root_shape": "round",
+            "root_color": "#F5F5F5",
+            "leaf_type": "elongated",
+            "leaf_color": "#43A047",
+            "leaf_count": 8
+        }
+    },
+    "onion": {
+        "aliases": ["sibuyas", "allium cepa"],
+        "category": "root_vegetable",
+        "builder": "buildRootVegetable",
+        "characteristics": {
+            "root_shape": "bulb",
+            "root_color": "#C62828",
+            "leaf_type": "tubular",
+            "leaf_color": "#558B2F",
+            "leaf_count": 5
+        }
+    },
+    "garlic": {
+        "aliases": ["bawang", "allium sativum"],
+        "category": "root_vegetable",
+        "builder": "buildRootVegetable",
+        "characteristics": {
+            "root_shape": "bulb",
+            "root_color": "#F5F5F5",
+            "leaf_type": "tubular",
+            "leaf_color": "#689F38",
+            "leaf_count": 5
+        }
+    },
+    "turnip": {
+        "aliases": ["singkamas", "brassica rapa subsp. rapa"],
+        "category": "root_vegetable",
+        "builder": "buildRootVegetable",
+        "characteristics": {
+            "root_shape": "round",
+            "root_color": "#EDE7F6",
+            "leaf_type": "elongated",
+            "leaf_color": "#43A047",
+            "leaf_count": 8
+        }
+    },
+    "ginger": {
+        "aliases": ["luya", "zingiber officinale"],
+        "category": "root_vegetable",
+        "builder": "buildRootVegetable",
+        "characteristics": {
+            "root_shape": "rhizome",
+            "root_color": "#D7B377",
+            "leaf_type": "elongated",
+            "leaf_color": "#388E3C",
+            "leaf_count": 8
+        }
+    },
+    
+    # === HERBS ===
+    "basil": {
+        "aliases": ["balanoy", "ocimum basilicum"],
+        "category": "herb",
+        "builder": "buildHerbPlant",
+        "characteristics": {"leaf_type": "oval", "leaf_color": "#43A047"}
+    },
+    "mint": {
+        "aliases": ["yerba buena", "mentha"],
+        "category": "herb",
+        "builder": "buildHerbPlant",
+        "characteristics": {"leaf_type": "oval", "leaf_color": "#4CAF50"}
+    },
+    "cilantro": {
+        "aliases": ["wansoy", "coriander", "coriandrum sativum"],
+        "category": "herb",
+        "builder": "buildHerbPlant",
+        "characteristics": {"leaf_type": "lobed", "leaf_color": "#558B2F"}
+    },
+    "oregano": {
+        "aliases": ["origanum vulgare"],
+        "category": "herb",
+        "builder": "buildHerbPlant",
+        "characteristics": {"leaf_type": "oval", "leaf_color": "#689F38"}
+    },
+    "parsley": {
+        "aliases": ["petroselinum crispum"],
+        "category": "herb",
+        "builder": "buildHerbPlant",
+        "characteristics": {"leaf_type": "lobed", "leaf_color": "#388E3C"}
+    },
+    "rosemary": {
+        "aliases": ["salvia rosmarinus"],
+        "category": "herb",
+        "builder": "buildHerbPlant",
+        "characteristics": {"leaf_type": "elongated", "leaf_color": "#546E7A"}
+    },
+    "thyme": {
+        "aliases": ["thymus vulgaris"],
+        "category": "herb",
+        "builder": "buildHerbPlant",
+        "characteristics": {"leaf_type": "oval", "leaf_color": "#6B8E23"}
     }
 }
 
+# ============================================================================
+# BUILDER FALLBACKS - For plants not in the library
+# ============================================================================
+
+DEFAULT_BUILDER = "buildLeafyPlant"
+
+# Botanical family -> builder, used when the common name is not in the library
+FAMILY_BUILDERS = {
+    "poaceae": "buildGrainPlant",
+    "gramineae": "buildGrainPlant",
+    "solanaceae": "buildFruitingPlant",
+    "convolvulaceae": "buildVinePlant",
+    "cucurbitaceae": "buildVinePlant",
+    "alliaceae": "buildRootVegetable",
+    "lamiaceae": "buildHerbPlant",
+    "brassicaceae": "buildBrassicaPlant"
+}
+
+BRASSICA_HEAD_TYPES = {"cauliflower", "broccoli", "cabbage"}
+VINING_FORMS = {"vining", "trailing"}
+
+# Names too generic to match inside an alias (e.g. "plant" in "rice plant")
+GENERIC_PLANT_WORDS = {"plant", "crop", "tree", "vine", "herb", "leaf", "unknown"}
+
 # ============================================================================
 # DISEASE PATTERNS - For Disease Visualization
 # ============================================================================
@@ -410,76 +713,67 @@ DISEASE_PATTERNS = {
 }
 
 # ============================================================================
-# GROWTH STAGES - For Growth Simulation
+# NAME INDEXES - Built once at import
 # ============================================================================
 
-GROWTH_STAGES = {
-    "seed": {
-        "scale": 0.0,
-        "visibility": {"stem": False, "leaves": False, "fruit": False},
-        "description": "Germinating seed"
-    },
-    "seedling": {
-        "scale": 0.15,
-        "visibility": {"stem": True, "leaves": True, "fruit": False},
-        "leaf_count_factor": 0.2,
-        "description": "Young seedling with first leaves"
-    },
-    "vegetative": {
-        "scale": 0.5,
-        "visibility": {"stem": True, "leaves": True, "fruit": False},
-        "leaf_count_factor": 0.6,
-        "description": "Active leaf and stem growth"
-    },
-    "flowering": {
-        "scale": 0.75,
-        "visibility": {"stem": True, "leaves": True, "flowers": True, "fruit": False},
-        "leaf_count_factor": 0.9,
-        "description": "Producing flowers"
-    },
-    "fruiting": {
-        "scale": 0.9,
-        "visibility": {"stem": True, "leaves": True, "flowers": False, "fruit": True},
-        "fruit_count_factor": 0.5,
-        "description": "Fruits developing"
-    },
-    "mature": {
-        "scale": 1.0,
-        "visibility": {"stem": True, "leaves": True, "fruit": True},
-        "fruit_count_factor": 1.0,
-        "description": "Ready for harvest"
-    },
-    "senescence": {
-        "scale": 0.95,
-        "visibility": {"stem": True, "leaves": True, "fruit": True},
-        "color_shift": "#8D6E63",
-        "description": "Post-harvest decline"
-    }
-}
+# Disease terms checked after the DISEASE_PATTERNS keys themselves, in order
+DISEASE_KEYWORDS = [
+    ("leaf_spot", ["spot", "anthracnose"]),
+    ("blight", ["blight", "burn"]),
+    ("powdery_mildew", ["mildew", "powder"]),
+    ("rust", ["rust"]),
+    ("mosaic_virus", ["virus", "mosaic"]),
+    ("wilt", ["wilt", "droop"]),
+    ("rot", ["rot", "decay"]),
+    ("yellowing", ["yellow", "chlorosis", "deficiency"])
+]
+
+
+def _build_plant_index() -> AliasIndex:
+    """Index library keys and aliases; library order sets match priority."""
+    index = AliasIndex(stop_words=GENERIC_PLANT_WORDS)
+    for key, config in PLANT_LIBRARY.items():
+        index.add(key, [key] + config.get("aliases", []))
+    return index
+
+
+def _build_disease_index() -> AliasIndex:
+    """
+    Index disease pattern keys, then the keyword cascade. Both match words
+    they start ("Wilting", "Rusty spots", "Blighted leaves"), like the
+    substring checks this replaced.
+    """
+    index = AliasIndex()
+    for key in DISEASE_PATTERNS:
+        index.add(key, [key], prefix=True)
+    for key, terms in DISEASE_KEYWORDS:
+        index.add(key, terms, reverse=False, prefix=True)
+    return index
+
+
+_PLANT_INDEX = _build_plant_index()
+_DISEASE_INDEX = _build_disease_index()
+
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+def get_plant_key(plant_name: str) -> Optional[str]:
+    """
+    Get the PLANT_LIBRARY key for a plant name or alias.
+    Returns the matching key or None.
+    """
+    return _PLANT_INDEX.lookup(plant_name)
+
+
 def get_plant_config(plant_name: str) -> dict:
     """
     Get plant configuration by name or alias.
     Returns the matching plant config or None.
     """
-    plant_name_lower = plant_name.lower().strip()
-    
-    # Direct match
-    if plant_name_lower in PLANT_LIBRARY:
-        return PLANT_LIBRARY[plant_name_lower]
-    
-    # Search aliases
-    for key, config in PLANT_LIBRARY.items():
-        aliases = config.get("aliases", [])
-        for alias in aliases:
-            if alias.lower() in plant_name_lower or plant_name_lower in alias.lower():
-                return config
-    
-    return None
+    key = get_plant_key(plant_name)
+    return PLANT_LIBRARY[key] if key else None
 
 
 def get_builder_for_plant(plant_name: str) -> str:
@@ -489,46 +783,76 @@ def get_builder_for_plant(plant_name: str) -> str:
     """
     config = get_plant_config(plant_name)
     if config:
-        return config.get("builder", "buildLeafyPlant")
-    return "buildLeafyPlant"
+        return config.get("builder", DEFAULT_BUILDER)
+    return DEFAULT_BUILDER
 
 
-def get_disease_pattern(disease_name: str) -> dict:
+def _builder_from_architecture(architecture: dict) -> Optional[str]:
+    """Pick a builder from Gemini's architecture hints, if they are specific enough."""
+    if architecture.get("fruit_type", "none") not in ("none", "", None):
+        return "buildFruitingPlant"
+    if architecture.get("overall_form") in VINING_FORMS:
+        return "buildVinePlant"
+    if architecture.get("head_type") in BRASSICA_HEAD_TYPES:
+        return "buildBrassicaPlant"
+    return None
+
+
+def resolve_plant_profile(plant_structure: dict) -> dict:
     """
-    Get disease visualization pattern by name.
-    Matches partial names for flexibility.
+    Resolve which 3D builder renders a plant, and with which characteristics.
+    Looks up the common name in PLANT_LIBRARY first, then falls back to the
+    plant family and Gemini's architecture hints.
+    
+    Returns:
+        Dictionary with "key", "builder", "category" and "characteristics",
+        ready to be passed to the 3D renderer as-is.
     """
-    disease_lower = disease_name.lower()
+    identified = plant_structure.get("identified_plant") or {}
+    common_name = identified.get("common_name") or ""
     
-    for key, pattern in DISEASE_PATTERNS.items():
-        if key in disease_lower or disease_lower in key:
-            return pattern
+    key = get_plant_key(common_name)
+    if key:
+        config = PLANT_LIBRARY[key]
+        return {
+            "key": key,
+            "builder": config.get("builder", DEFAULT_BUILDER),
+            "category": config.get("category", "other"),
+            "characteristics": config.get("characteristics", {})
+        }
     
-    # Map common disease terms to patterns
-    if any(term in disease_lower for term in ["spot", "anthracnose"]):
-        return DISEASE_PATTERNS["leaf_spot"]
-    if any(term in disease_lower for term in ["blight", "burn"]):
-        return DISEASE_PATTERNS["blight"]
-    if any(term in disease_lower for term in ["mildew", "powder"]):
-        return DISEASE_PATTERNS["powdery_mildew"]
-    if any(term in disease_lower for term in ["rust"]):
-        return DISEASE_PATTERNS["rust"]
-    if any(term in disease_lower for term in ["virus", "mosaic"]):
-        return DISEASE_PATTERNS["mosaic_virus"]
-    if any(term in disease_lower for term in ["wilt", "droop"]):
-        return DISEASE_PATTERNS["wilt"]
-    if any(term in disease_lower for term in ["rot", "decay"]):
-        return DISEASE_PATTERNS["rot"]
-    if any(term in disease_lower for term in ["yellow", "chlorosis", "deficiency"]):
-        return DISEASE_PATTERNS["yellowing"]
+    family = (identified.get("plant_family") or "").strip().lower()
+    builder = FAMILY_BUILDERS.get(family) or \
+        _builder_from_architecture(plant_structure.get("plant_architecture") or {}) or \
+        DEFAULT_BUILDER
     
-    # Default pattern
-    return DISEASE_PATTERNS["leaf_spot"]
+    return {
+        "key": None,
+        "builder": builder,
+        "category": "other",
+        "characteristics": {}
+    }
+
+
+def get_disease_key(disease_name: str) -> str:
+    """
+    Get the DISEASE_PATTERNS key for a disease name.
+    Matches partial names for flexibility; defaults to "leaf_spot".
+    """
+    return _DISEASE_INDEX.lookup(disease_name) or "leaf_spot"
+
+
+def get_disease_pattern(disease_name: str) -> dict:
+    """
+    Get disease visualization pattern by name.
+    Matches partial names for flexibility.
+    """
+    return DISEASE_PATTERNS[get_disease_key(disease_name)]
 
 
 def get_growth_stage(stage_name: str) -> dict:
-    """Get growth stage configuration."""
-    return GROWTH_STAGES.get(stage_name.lower(), GROWTH_STAGES["mature"])
+    """Get growth stage configuration (shared with the growth simulator)."""
+    return get_stage_config(stage_name)
 
 
 def list_all_plants() -> list:
@@ -1,7 +1,24 @@
 import streamlit as st
-import pandas as pd
+from typing import TYPE_CHECKING
 from services.db_service import fetch_all_plants 
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+REGISTRY_COLUMNS = ["image_url", "plant_name", "category", "health_status", "farm_name", "confidence", "created_at"]
+
+
+def build_registry_dataframe(raw_data: list) -> "pd.DataFrame":
+    """Registry rows as the table shown on the dashboard (confidence in %)."""
+    import pandas as pd
+
+    df = pd.DataFrame(raw_data)
+
+    if "confidence" in df.columns:
+        df["confidence"] = df["confidence"] * 100
+    return df[REGISTRY_COLUMNS]
+
+
 def render_registry_table():
     st.divider()
     st.markdown("### 📋 Smart Field Registry")
@@ -11,11 +28,7 @@ def render_registry_table():
         st.info("No scans yet. Go analyze some plants!")
         return
 
-    df = pd.DataFrame(raw_data)
-
-    if "confidence" in df.columns:
-        df["confidence"] = df["confidence"] * 100
-    display_df = df[["image_url", "plant_name", "category", "health_status", "farm_name", "confidence", "created_at"]]
+    display_df = build_registry_dataframe(raw_data)
 
     st.dataframe(
         display_df,
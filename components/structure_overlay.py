@@ -0,0 +1,88 @@
+"""
+Structure Overlay for the Digital Twin
+A read-only view of a Gemini plant structure plus a small delta of changed
+fields, so growth/scenario simulation never copies the full structure.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+
+
+class StructureOverlay(Mapping):
+    """
+    Immutable plant structure = shared base + one-level-deep delta.
+
+    Delta entries whose value is a dict and whose base value is also a dict
+    are merged field-by-field (e.g. {"leaf_system": {"total_count": 4}}
+    only changes total_count); any other delta entry replaces the base
+    value. The base is shared, never copied or mutated.
+
+    Usage:
+        overlay = StructureOverlay(structure).patch({"leaf_system": {"total_count": 4}})
+        overlay["leaf_system"]["total_count"]  # 4
+        overlay.base is structure             # True
+    """
+
+    __slots__ = ("_base", "_delta")
+
+    def __init__(self, base: Mapping, delta: Dict[str, Any] = None):
+        # Overlays stack by folding into a single base + delta
+        if isinstance(base, StructureOverlay):
+            merged = dict(base._delta)
+            for key, value in (delta or {}).items():
+                merged[key] = _merge_section(merged.get(key), value)
+            base, delta = base._base, merged
+        self._base = base if base is not None else {}
+        self._delta = dict(delta or {})
+
+    @property
+    def base(self) -> Mapping:
+        """The original structure (shared, treat as read-only)."""
+        return self._base
+
+    @property
+    def delta(self) -> Dict[str, Any]:
+        """The changed fields, keyed by top-level section."""
+        return self._delta
+
+    def patch(self, delta: Dict[str, Any]) -> "StructureOverlay":
+        """Return a new overlay with delta layered on top of this one."""
+        return StructureOverlay(self, delta)
+
+    def to_dict(self) -> dict:
+        """Materialize a plain dict (only the patched sections are copied)."""
+        return {key: self[key] for key in self}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._delta:
+            return _merge_section(self._base.get(key), self._delta[key])
+        return self._base[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._base
+        for key in self._delta:
+            if key not in self._base:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self._base) + sum(1 for key in self._delta if key not in self._base)
+
+    def __repr__(self) -> str:
+        return f"StructureOverlay(delta={self._delta!r})"
+
+
+def _merge_section(base_value: Any, delta_value: Any) -> Any:
+    """Merge a delta section over a base section one level deep."""
+    if isinstance(base_value, Mapping) and isinstance(delta_value, Mapping):
+        return {**base_value, **delta_value}
+    return delta_value
+
+
+def split_structure(structure: Mapping) -> tuple:
+    """
+    Split a structure into (base, delta) for the renderer.
+    Plain dicts come back with an empty delta.
+    """
+    if isinstance(structure, StructureOverlay):
+        return structure.base, structure.delta
+    return structure, {}
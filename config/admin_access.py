@@ -0,0 +1,57 @@
+"""
+Admin Access - Operator Check for the Admin Page
+The Admin page shows per-key usage and can rebuild or reset process-wide
+state, so it is only offered to operators:
+
+    ADMIN_MODE = true            every session is an operator (local dev)
+    ADMIN_PASSWORD = "..."       sessions unlock it with the password
+
+With neither secret set, nobody gets the Admin page.
+"""
+
+import hmac
+import os
+from typing import Optional
+
+import streamlit as st
+
+
+def _secret(name: str) -> Optional[str]:
+    try:
+        if name in st.secrets:
+            return str(st.secrets[name])
+    except Exception:
+        pass
+    return os.environ.get(name) or None
+
+
+def admin_mode() -> bool:
+    """True if ADMIN_MODE makes every session an operator."""
+    return (_secret("ADMIN_MODE") or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def is_operator() -> bool:
+    """True if this session may open the Admin page and use its actions."""
+    return admin_mode() or st.session_state.get("admin_authenticated", False)
+
+
+def render_operator_login():
+    """Sidebar password form (only when ADMIN_PASSWORD is configured)."""
+    password = _secret("ADMIN_PASSWORD")
+    if not password or admin_mode():
+        return
+
+    if st.session_state.get("admin_authenticated"):
+        if st.button("🔒 Leave operator mode", key="admin_logout_btn"):
+            st.session_state.admin_authenticated = False
+            st.rerun()
+        return
+
+    with st.expander("🔐 Operator", expanded=False):
+        attempt = st.text_input("Admin password", type="password", key="admin_password_input")
+        if st.button("Unlock Admin", key="admin_login_btn"):
+            if hmac.compare_digest(attempt.encode(), password.encode()):
+                st.session_state.admin_authenticated = True
+                st.rerun()
+            else:
+                st.error("Wrong password")
@@ -1,6 +1,9 @@
 import streamlit as st
 import uuid
+from config.admin_access import is_operator, render_operator_login
 from core.api_key_manager import render_api_usage_sidebar
+from core.resources import start_resource_warm_up
+from core.tracing import span, start_metrics_exporter
 
 # Here we define the app_config function to set the Streamlit page configuration
 
@@ -13,12 +16,22 @@ def app_config():
     scan_page = st.Page("pages/scan.py", title="📸 Scan Plant")
     view_twin = st.Page("pages/view_digital_twin.py", title="🌿 Digital Twin")
     registry_page = st.Page("pages/registry.py", title="📋 Registry")
-    pg = st.navigation({
+    pages = {
     "Main": [home_page],
     "Tools": [scan_page, view_twin, registry_page]
-    })
-    # Run the navigation
-    pg.run()
+    }
+    # Operators only: the Admin page shows key usage and resets shared state
+    if is_operator():
+        pages["Admin"] = [st.Page("pages/admin.py", title="📈 Admin")]
+    pg = st.navigation(pages)
+    # Prometheus /metrics endpoint (only if METRICS_PORT is configured)
+    start_metrics_exporter()
+    # Build the shared Gemini / Supabase clients in the background, once per process
+    start_resource_warm_up()
+
+    # Run the navigation; each rerun is one trace with the page as its root span
+    with span(f"page.{pg.url_path or 'home'}"):
+        pg.run()
     
     if "user_id" not in st.session_state:
         generated_id = str(uuid.uuid4())[:8]
@@ -29,4 +42,5 @@ def app_config():
         
         # API Usage Monitor
         st.divider()
-        render_api_usage_sidebar()
\ No newline at end of file
+        render_api_usage_sidebar()
+        render_operator_login()
@@ -1,35 +1,60 @@
-import google.generativeai as genai
 import streamlit as st
-from google import genai as genai_client
-from google.genai import types
-from PIL import Image
+import asyncio
 import json
 import base64
+from functools import partial
 from io import BytesIO
-from typing import Optional
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
-# Import API Key Manager
-from core.api_key_manager import APIKeyManager, track_api_call, init_api_manager
+from core.gemini_client import get_gemini_client
+from core.history_management import SUMMARY_MAX_WORDS, ConversationMemory
+from core.multi_angle import analyze_multi_angle_map_reduce, analyze_multi_angle_map_reduce_async
+from core.scan_metrics import extract_health, row_health
+from core.schemas import CropAnalysis, MultiAngleAnalysis, PlantStructure, ScanResult, field_names
+from core.structured_output import (
+    agenerate_structured, generate_structured, json_generation_config, parse_partial_json,
+    repair_structured
+)
+from core.tracing import record_error, traced
 
-# 'gemini-3-pro-preview' is best for deep diagnosis (Visual Reasoning)
-# 'gemini-3-flash-preview' is best for fast voice/chat
+if TYPE_CHECKING:
+    from PIL import Image
 
-# Initialize API Key Manager (handles multiple keys, rotation, rate limiting)
-api_manager = init_api_manager()
+# Shared Gemini access comes from get_gemini_client(): one pooled client per
+# API key, thread-safe key selection and usage tracking (multiple keys,
+# rotation, rate limiting). It is created on the first request, not at import.
 
-# Gemini model with tool functions
-model = genai.GenerativeModel(
-    "gemini-3-flash-preview",
-)
+
+def _open_image(image_file) -> "Image.Image":
+    """PIL image from an uploaded file object."""
+    from PIL import Image
+
+    image_file.seek(0)
+    return Image.open(image_file)
+
+
+def _open_images(image_files: list) -> List["Image.Image"]:
+    return [_open_image(img_file) for img_file in image_files]
 
 
-def _get_model():
-    """Get model with refreshed API key (for rotation support)."""
-    api_manager.configure_genai()
-    return genai.GenerativeModel("gemini-3-flash-preview")
+SCAN_PROMPT = """
+You are an expert Agronomist (Project A.N.I.). 
+Analyze this plant image.
+
+Return ONLY a JSON object with this exact structure (no markdown):
+{
+    "plant_name": "Common Name (Scientific Name)",
+    "health_status": "Healthy" or "Name of Disease",
+    "action_plan": "One short sentence on what to do.",
+    "confidence": 0.95,
+    "category": "Crop" or "Weed" or "Ornamental"
+}
+"""
 
 
 # This function for image analysis
+@traced("agent.ask_gemini")
 def ask_gemini(image_file):
     """
     Accepts an uploaded file object, converts it to an image,
@@ -38,69 +63,200 @@ def ask_gemini(image_file):
     try:
         if not image_file:
             return "Error: No image provided."
-        image_file.seek(0)
-        image = Image.open(image_file)
-        prompt = """
-        You are an expert Agronomist (Project A.N.I.). 
-        Analyze this plant image.
-        
-        Return ONLY a JSON object with this exact structure (no markdown):
-        {
-            "plant_name": "Common Name (Scientific Name)",
-            "health_status": "Healthy" or "Name of Disease",
-            "action_plan": "One short sentence on what to do.",
-            "confidence": 0.95,
-            "category": "Crop" or "Weed" or "Ornamental"
-        }
-        """
-        current_model = _get_model()
-        response = current_model.generate_content([prompt, image])
-        
-        # Track successful request
-        tokens_used = len(response.text) // 4 if response.text else 0
-        api_manager.record_request(tokens_used=tokens_used, success=True)
-        
-        return response.text
+        image = _open_image(image_file)
+        result, _ = generate_structured(get_gemini_client().generate, SCAN_PROMPT, [image], ScanResult)
+        return json.dumps(result)
         
     except Exception as e:
-        # Track failed request
-        api_manager.record_request(success=False, error_msg=str(e))
+        record_error(e)
         return f"Error connecting to Gemini: {e}"
 
+
+@traced("agent.ask_gemini_async")
+async def ask_gemini_async(image_file) -> str:
+    """Async version of ask_gemini."""
+    try:
+        if not image_file:
+            return "Error: No image provided."
+        image = _open_image(image_file)
+        result, _ = await agenerate_structured(get_gemini_client().agenerate, SCAN_PROMPT, [image], ScanResult)
+        return json.dumps(result)
+
+    except Exception as e:
+        record_error(e)
+        return f"Error connecting to Gemini: {e}"
+
+
+class ScanFailed(RuntimeError):
+    """A streamed scan produced no usable analysis (request failed or every field defaulted)."""
+
+
+@traced("agent.ask_gemini_stream")
+def ask_gemini_stream(image_file) -> Iterator[Tuple[dict, Optional[Dict[str, str]]]]:
+    """
+    Streaming version of ask_gemini for progressive scan results.
+
+    Yields:
+        (fields, None) for the scan fields completed so far (plant_name
+        and health_status arrive first), then (result, problems) for the
+        validated result, with missing or invalid fields repaired like
+        ask_gemini and problems listing the fields that fell back to
+        defaults anyway
+
+    Raises:
+        ScanFailed: The request failed, or no field could be read
+    """
+    try:
+        image = _open_image(image_file)
+
+        text = ""
+        shown = {}
+        for chunk in get_gemini_client().stream([SCAN_PROMPT, image], json_generation_config(ScanResult)):
+            text += chunk
+            fields = parse_partial_json(text)
+            if fields != shown:
+                shown = fields
+                yield fields, None
+
+        result, problems = repair_structured(get_gemini_client().generate, SCAN_PROMPT, [image], ScanResult, text)
+
+    except Exception as e:
+        record_error(e)
+        raise ScanFailed(f"Error connecting to Gemini: {e}") from e
+
+    if set(problems) >= set(field_names(ScanResult)):
+        raise ScanFailed("Could not analyze the photo: " + ", ".join(f"{k} ({v})" for k, v in problems.items()))
+    yield result, problems
+
+
+ANI_SYSTEM_INSTRUCTION = """
+You are A.N.I. (Agricultural Network Intelligence), a friendly and expert farming assistant for the Philippines.
+- Answer questions about farming, crops, and pests.
+- Keep answers concise and helpful.
+- If asked about non-farming topics, politely guide them back to agriculture.
+- You can help users navigate the app:
+    * "Scan" -> Takes a photo to diagnose plants.
+    * "Registry" -> View saved plant data.
+    * "Digital Twin" -> Simulate crop conditions.
+"""
+
+
+SUMMARY_PROMPT = """
+Update the running summary of a farming-assistant chat.
+Keep the farmer's crops, locations, problems, advice already given and open questions.
+Write at most {max_words} words, plain text.
+
+Current summary:
+{summary}
+
+New messages:
+{transcript}
+"""
+
+
+@traced("agent.summarize_conversation")
+def summarize_conversation(summary: str, messages: list) -> str:
+    """
+    Fold older chat messages into the rolling summary (used by
+    ConversationMemory.compact). Falls back to clipped excerpts if the
+    request fails, so compaction never blocks the chat.
+    """
+    transcript = "\n".join(
+        f"{'Farmer' if m['role'] == 'user' else 'ANI'}: {m['content']}" for m in messages
+    )
+    try:
+        prompt = SUMMARY_PROMPT.format(
+            max_words=SUMMARY_MAX_WORDS, summary=summary or "(none)", transcript=transcript
+        )
+        return get_gemini_client().generate([prompt]).strip()
+
+    except Exception:
+        excerpts = " ".join(m["content"][:100] for m in messages if m["role"] == "user")
+        return f"{summary} {excerpts}".strip()[-SUMMARY_MAX_WORDS * 8:]
+
+
+def _chat_contents(user_question: str, memory: Optional[ConversationMemory]) -> list:
+    """History under the token budget, then the new question."""
+    history = memory.to_contents() if memory is not None else []
+    return history + [{"role": "user", "parts": [{"text": user_question}]}]
+
+
+def _remember_turn(memory: Optional[ConversationMemory], user_question: str, answer: str):
+    """Record a finished turn; older turns are folded into the summary."""
+    if memory is None:
+        return
+    memory.add("user", user_question)
+    memory.add("model", answer)
+    if memory.needs_compaction():
+        memory.compact(summarize_conversation)
+
+
 # Main ANI agent function
-def ani_agent(user_question: str) -> str:
+@traced("agent.ani_agent")
+def ani_agent(user_question: str, memory: Optional[ConversationMemory] = None) -> str:
     """
     Main agent function for text-based chat with ANI.
     Expects Text -> Returns Text.
     """
+    return "".join(ani_agent_stream(user_question, memory))
+
+
+@traced("agent.ani_agent_stream")
+def ani_agent_stream(user_question: str, memory: Optional[ConversationMemory] = None) -> Iterator[str]:
+    """
+    Streaming version of ani_agent: yields the answer as it is generated,
+    for st.write_stream.
+
+    Args:
+        user_question: The farmer's message
+        memory: Conversation memory to send as context and to record the
+                turn in (older turns are summarized after the answer)
+    """
     try:
-        system_instruction = """
-        You are A.N.I. (Agricultural Network Intelligence), a friendly and expert farming assistant for the Philippines.
-        - Answer questions about farming, crops, and pests.
-        - Keep answers concise and helpful.
-        - If asked about non-farming topics, politely guide them back to agriculture.
-        - You can help users navigate the app:
-            * "Scan" -> Takes a photo to diagnose plants.
-            * "Registry" -> View saved plant data.
-            * "Digital Twin" -> Simulate crop conditions.
-        """
-        full_prompt = f"{system_instruction}\n\nUser: {user_question}\nANI:"
-        
-        current_model = _get_model()
-        response = current_model.generate_content(full_prompt)
-        
-        # Track successful request
-        tokens_used = len(response.text) // 4 if response.text else 0
-        api_manager.record_request(tokens_used=tokens_used, success=True)
-        
-        return response.text
-        
+        # System prompt goes in system_instruction, history under the token budget
+        answer = ""
+        for text in get_gemini_client().stream(_chat_contents(user_question, memory), system_instruction=ANI_SYSTEM_INSTRUCTION):
+            answer += text
+            yield text
+        _remember_turn(memory, user_question, answer)
+
     except Exception as e:
-        # Track failed request
-        api_manager.record_request(success=False, error_msg=str(e))
+        record_error(e)
+        yield f"Sorry, I couldn't connect to the server. ({e})"
+
+
+@traced("agent.ani_agent_async")
+async def ani_agent_async(user_question: str, memory: Optional[ConversationMemory] = None) -> str:
+    """Async version of ani_agent."""
+    try:
+        answer = await get_gemini_client().agenerate(
+            _chat_contents(user_question, memory), system_instruction=ANI_SYSTEM_INSTRUCTION
+        )
+        await asyncio.to_thread(_remember_turn, memory, user_question, answer)
+        return answer
+
+    except Exception as e:
+        record_error(e)
         return f"Sorry, I couldn't connect to the server. ({e})"
 
 
+@traced("agent.ani_agent_stream_async")
+async def ani_agent_stream_async(user_question: str,
+                                 memory: Optional[ConversationMemory] = None) -> AsyncIterator[str]:
+    """Async version of ani_agent_stream."""
+    try:
+        answer = ""
+        async for text in get_gemini_client().astream(_chat_contents(user_question, memory), system_instruction=ANI_SYSTEM_INSTRUCTION):
+            answer += text
+            yield text
+        await asyncio.to_thread(_remember_turn, memory, user_question, answer)
+
+    except Exception as e:
+        record_error(e)
+        yield f"Sorry, I couldn't connect to the server. ({e})"
+
+
+@traced("agent.generate_texture_from_upload")
 def generate_texture_from_upload(image_file) -> Optional[str]:
     """
     Convert uploaded crop image directly to a Base64 texture for 3D rendering.
@@ -116,6 +272,8 @@ def generate_texture_from_upload(image_file) -> Optional[str]:
         if not image_file:
             return None
         
+        from PIL import Image
+
         # Read the uploaded image directly and convert to base64
         image_file.seek(0)
         image = Image.open(image_file)
@@ -135,10 +293,131 @@ def generate_texture_from_upload(image_file) -> Optional[str]:
         return data_uri
             
     except Exception as e:
+        record_error(e)
         st.error(f"Texture generation error: {e}")
         return None
 
 
+PLANT_STRUCTURE_PROMPT = """
+You are a 3D botanical modeler with expert knowledge of plant anatomy.
+
+CRITICAL TASK: Analyze this plant image to create a COMPLETE 3D model.
+
+STEP 1 - IDENTIFY THE PLANT:
+Use your extensive botanical knowledge to identify exactly what plant this is.
+Consider: leaf shape, growth pattern, stem structure, any flowers/fruits/heads visible.
+
+STEP 2 - THINK IN 3D:
+Even though you only see one angle, use your knowledge of this plant species to:
+- Infer what the back/hidden parts look like
+- Understand the full 3D structure from root to top
+- Know how leaves are arranged around the stem (phyllotaxy)
+- Understand the plant's typical form and silhouette
+
+STEP 3 - DESCRIBE FOR 3D MODELING:
+
+Return ONLY a JSON object with this exact structure (no markdown):
+{
+    "identified_plant": {
+        "common_name": "Cauliflower",
+        "scientific_name": "Brassica oleracea var. botrytis",
+        "plant_family": "Brassicaceae",
+        "growth_stage": "vegetative" or "flowering" or "fruiting" or "mature"
+    },
+
+    "plant_architecture": {
+        "overall_form": "rosette" or "bushy" or "upright" or "vining" or "columnar" or "spreading" or "grass" or "trailing",
+        "symmetry": "radial" or "bilateral" or "asymmetric",
+        "height_cm": 40,
+        "width_cm": 50,
+        "has_central_head": true,
+        "head_type": "none" or "cauliflower" or "cabbage" or "broccoli" or "lettuce",
+        "head_color_hex": "#F5F5DC",
+        "head_size_ratio": 0.3,
+        "fruit_type": "none" or "tomato" or "cherry_tomato" or "pepper" or "chili" or "eggplant" or "cucumber" or "squash" or "bean",
+        "fruit_color_hex": "#FF6347",
+        "fruit_count": 5,
+        "fruit_size": 0.08,
+        "fruit_stage": "none" or "flowering" or "green" or "ripening" or "ripe",
+        "root_type": "none" or "taproot" or "bulb" or "tuber" or "rhizome",
+        "root_color_hex": "#FF6600",
+        "root_visible": false
+    },
+
+    "leaf_system": {
+        "arrangement": "rosette" or "alternate" or "opposite" or "whorled" or "basal",
+        "total_count": 12,
+        "leaf_layers": 3,
+        "shape": "oval" or "elongated" or "heart" or "lobed" or "wavy" or "ruffled" or "spatulate",
+        "size_cm": 25,
+        "width_cm": 15,
+        "thickness": "thin" or "medium" or "thick" or "succulent",
+        "texture": "smooth" or "waxy" or "hairy" or "ribbed" or "veined",
+        "edge_type": "smooth" or "wavy" or "serrated" or "lobed" or "ruffled",
+        "curl_amount": 0.4,
+        "waviness": 0.6,
+        "stiffness": "flexible" or "semi-rigid" or "rigid",
+        "primary_color_hex": "#228B22",
+        "secondary_color_hex": "#90EE90",
+        "vein_color_hex": "#FFFFFF",
+        "vein_prominence": "subtle" or "visible" or "prominent",
+        "orientation": "upward" or "outward" or "drooping" or "cupping"
+    },
+
+    "stem_system": {
+        "visible": true,
+        "type": "single" or "branching" or "rosette_base" or "none_visible",
+        "thickness_cm": 3,
+        "height_cm": 5,
+        "color_hex": "#90EE90"
+    },
+
+    "container": {
+        "type": "pot" or "planter" or "ground" or "raised_bed" or "none",
+        "visible": true,
+        "shape": "round" or "square" or "rectangular" or "natural",
+        "material": "terracotta" or "plastic" or "ceramic" or "wood" or "soil",
+        "color_hex": "#8B4513",
+        "has_rim": true
+    },
+
+    "soil_ground": {
+        "visible": true,
+        "type": "potting_soil" or "garden_soil" or "mulch" or "none",
+        "color_hex": "#3D2B1F"
+    },
+
+    "environmental_context": {
+        "setting": "indoor" or "outdoor" or "greenhouse",
+        "lighting": "bright" or "moderate" or "low",
+        "background_plants": false
+    },
+
+    "health_assessment": {
+        "health_status": "Healthy" or "Name of Disease/Problem",
+        "disease_name": "" or "Specific disease name if detected",
+        "severity": 0.0 to 1.0 (0=healthy, 1=severe),
+        "affected_percentage": 0 to 100,
+        "affected_areas": ["leaf tips", "lower leaves", "stem base", "fruits", "whole plant"],
+        "issues": ["List of observed problems like yellowing, spots, wilting, pest damage"],
+        "disease_pattern": "spots" or "patches" or "coating" or "wilting" or "discoloration" or "none",
+        "disease_color_hex": "#8B4513" or color of disease symptoms
+    },
+
+    "3d_generation_notes": "Describe specific instructions for making this 3D model accurate. E.g., 'Large wavy outer leaves cupping inward around a central white cauliflower head. Leaves have prominent white midribs and bluish-green color. Leaves emerge from a thick central stem hidden by the head.'"
+}
+
+IMPORTANT: 
+- Extract ACTUAL colors from the image as hex codes
+- Count ACTUAL visible leaves and estimate total including hidden ones
+- Use your botanical knowledge to fill in what you can't see
+- The 3d_generation_notes should be detailed enough for a 3D artist to recreate this plant
+- CAREFULLY assess plant health: look for spots, discoloration, wilting, pest damage, yellowing
+- If plant shows ANY signs of disease/damage, set health_status to the problem name and severity > 0
+"""
+
+
+@traced("agent.analyze_plant_structure")
 def analyze_plant_structure(image_file) -> Optional[dict]:
     """
     Use Gemini's advanced vision + botanical knowledge to create a complete 3D mental model.
@@ -154,140 +433,37 @@ def analyze_plant_structure(image_file) -> Optional[dict]:
         if not image_file:
             return None
             
-        image_file.seek(0)
-        image = Image.open(image_file)
-        
-        prompt = """
-        You are a 3D botanical modeler with expert knowledge of plant anatomy.
-        
-        CRITICAL TASK: Analyze this plant image to create a COMPLETE 3D model.
-        
-        STEP 1 - IDENTIFY THE PLANT:
-        Use your extensive botanical knowledge to identify exactly what plant this is.
-        Consider: leaf shape, growth pattern, stem structure, any flowers/fruits/heads visible.
-        
-        STEP 2 - THINK IN 3D:
-        Even though you only see one angle, use your knowledge of this plant species to:
-        - Infer what the back/hidden parts look like
-        - Understand the full 3D structure from root to top
-        - Know how leaves are arranged around the stem (phyllotaxy)
-        - Understand the plant's typical form and silhouette
-        
-        STEP 3 - DESCRIBE FOR 3D MODELING:
-        
-        Return ONLY a JSON object with this exact structure (no markdown):
-        {
-            "identified_plant": {
-                "common_name": "Cauliflower",
-                "scientific_name": "Brassica oleracea var. botrytis",
-                "plant_family": "Brassicaceae",
-                "growth_stage": "vegetative" or "flowering" or "fruiting" or "mature"
-            },
-            
-            "plant_architecture": {
-                "overall_form": "rosette" or "bushy" or "upright" or "vining" or "columnar" or "spreading" or "grass" or "trailing",
-                "symmetry": "radial" or "bilateral" or "asymmetric",
-                "height_cm": 40,
-                "width_cm": 50,
-                "has_central_head": true,
-                "head_type": "none" or "cauliflower" or "cabbage" or "broccoli" or "lettuce",
-                "head_color_hex": "#F5F5DC",
-                "head_size_ratio": 0.3,
-                "fruit_type": "none" or "tomato" or "cherry_tomato" or "pepper" or "chili" or "eggplant" or "cucumber" or "squash" or "bean",
-                "fruit_color_hex": "#FF6347",
-                "fruit_count": 5,
-                "fruit_size": 0.08,
-                "fruit_stage": "none" or "flowering" or "green" or "ripening" or "ripe",
-                "root_type": "none" or "taproot" or "bulb" or "tuber" or "rhizome",
-                "root_color_hex": "#FF6600",
-                "root_visible": false
-            },
-            
-            "leaf_system": {
-                "arrangement": "rosette" or "alternate" or "opposite" or "whorled" or "basal",
-                "total_count": 12,
-                "leaf_layers": 3,
-                "shape": "oval" or "elongated" or "heart" or "lobed" or "wavy" or "ruffled" or "spatulate",
-                "size_cm": 25,
-                "width_cm": 15,
-                "thickness": "thin" or "medium" or "thick" or "succulent",
-                "texture": "smooth" or "waxy" or "hairy" or "ribbed" or "veined",
-                "edge_type": "smooth" or "wavy" or "serrated" or "lobed" or "ruffled",
-                "curl_amount": 0.4,
-                "waviness": 0.6,
-                "stiffness": "flexible" or "semi-rigid" or "rigid",
-                "primary_color_hex": "#228B22",
-                "secondary_color_hex": "#90EE90",
-                "vein_color_hex": "#FFFFFF",
-                "vein_prominence": "subtle" or "visible" or "prominent",
-                "orientation": "upward" or "outward" or "drooping" or "cupping"
-            },
-            
-            "stem_system": {
-                "visible": true,
-                "type": "single" or "branching" or "rosette_base" or "none_visible",
-                "thickness_cm": 3,
-                "height_cm": 5,
-                "color_hex": "#90EE90"
-            },
-            
-            "container": {
-                "type": "pot" or "planter" or "ground" or "raised_bed" or "none",
-                "visible": true,
-                "shape": "round" or "square" or "rectangular" or "natural",
-                "material": "terracotta" or "plastic" or "ceramic" or "wood" or "soil",
-                "color_hex": "#8B4513",
-                "has_rim": true
-            },
-            
-            "soil_ground": {
-                "visible": true,
-                "type": "potting_soil" or "garden_soil" or "mulch" or "none",
-                "color_hex": "#3D2B1F"
-            },
-            
-            "environmental_context": {
-                "setting": "indoor" or "outdoor" or "greenhouse",
-                "lighting": "bright" or "moderate" or "low",
-                "background_plants": false
-            },
-            
-            "health_assessment": {
-                "health_status": "Healthy" or "Name of Disease/Problem",
-                "disease_name": "" or "Specific disease name if detected",
-                "severity": 0.0 to 1.0 (0=healthy, 1=severe),
-                "affected_percentage": 0 to 100,
-                "affected_areas": ["leaf tips", "lower leaves", "stem base", "fruits", "whole plant"],
-                "issues": ["List of observed problems like yellowing, spots, wilting, pest damage"],
-                "disease_pattern": "spots" or "patches" or "coating" or "wilting" or "discoloration" or "none",
-                "disease_color_hex": "#8B4513" or color of disease symptoms
-            },
-            
-            "3d_generation_notes": "Describe specific instructions for making this 3D model accurate. E.g., 'Large wavy outer leaves cupping inward around a central white cauliflower head. Leaves have prominent white midribs and bluish-green color. Leaves emerge from a thick central stem hidden by the head.'"
-        }
-        
-        IMPORTANT: 
-        - Extract ACTUAL colors from the image as hex codes
-        - Count ACTUAL visible leaves and estimate total including hidden ones
-        - Use your botanical knowledge to fill in what you can't see
-        - The 3d_generation_notes should be detailed enough for a 3D artist to recreate this plant
-        - CAREFULLY assess plant health: look for spots, discoloration, wilting, pest damage, yellowing
-        - If plant shows ANY signs of disease/damage, set health_status to the problem name and severity > 0
-        """
-        
-        current_model = _get_model()
-        response = current_model.generate_content([prompt, image])
-        clean_json = response.text.replace("```json", "").replace("```", "").strip()
-        
-        # Track successful request
-        tokens_used = len(response.text) // 4 if response.text else 0
-        api_manager.record_request(tokens_used=tokens_used, success=True)
+        image = _open_image(image_file)
         
-        return json.loads(clean_json)
+        # Static prompt is served from the context cache when available
+        generate = partial(get_gemini_client().generate, cached_prompt=("plant_structure", PLANT_STRUCTURE_PROMPT))
+        result, problems = generate_structured(generate, PLANT_STRUCTURE_PROMPT, [image], PlantStructure)
+        if problems:
+            print(f"Plant structure analysis: using defaults for {', '.join(problems)}")
+        return result
         
     except Exception as e:
-        # Track failed request
-        api_manager.record_request(success=False, error_msg=str(e))
+        record_error(e)
+        st.error(f"Plant structure analysis error: {e}")
+        return get_default_plant_structure()
+
+
+@traced("agent.analyze_plant_structure_async")
+async def analyze_plant_structure_async(image_file) -> Optional[dict]:
+    """Async version of analyze_plant_structure."""
+    try:
+        if not image_file:
+            return None
+        image = _open_image(image_file)
+
+        agenerate = partial(get_gemini_client().agenerate, cached_prompt=("plant_structure", PLANT_STRUCTURE_PROMPT))
+        result, problems = await agenerate_structured(agenerate, PLANT_STRUCTURE_PROMPT, [image], PlantStructure)
+        if problems:
+            print(f"Plant structure analysis: using defaults for {', '.join(problems)}")
+        return result
+
+    except Exception as e:
+        record_error(e)
         st.error(f"Plant structure analysis error: {e}")
         return get_default_plant_structure()
 
@@ -369,6 +545,31 @@ def get_default_plant_structure() -> dict:
     }
 
 
+def is_default_plant_structure(structure: Optional[dict]) -> bool:
+    """True if a plant structure is the placeholder returned when analysis failed."""
+    return structure == get_default_plant_structure()
+
+
+CROP_ANALYSIS_PROMPT = """
+You are an expert Agronomist analyzing a crop for digital twin simulation.
+
+Return ONLY a JSON object with this exact structure (no markdown):
+{
+    "plant_name": "Common Name (Scientific Name)",
+    "health_status": "Healthy" or "Disease Name",
+    "health_percentage": 85,
+    "disease_severity": "None" or "Mild" or "Moderate" or "Severe",
+    "affected_area_percent": 15,
+    "primary_color": "#2E7D32",
+    "secondary_color": "#81C784",
+    "disease_color": "#8B4513",
+    "texture_description": "Brief description of surface texture",
+    "recommended_action": "One sentence recommendation"
+}
+"""
+
+
+@traced("agent.analyze_crop_for_simulation")
 def analyze_crop_for_simulation(image_file) -> Optional[dict]:
     """
     Analyze uploaded crop image and return structured data for simulation.
@@ -383,51 +584,132 @@ def analyze_crop_for_simulation(image_file) -> Optional[dict]:
         if not image_file:
             return None
             
-        image_file.seek(0)
-        image = Image.open(image_file)
+        image = _open_image(image_file)
         
-        prompt = """
-        You are an expert Agronomist analyzing a crop for digital twin simulation.
-        
-        Return ONLY a JSON object with this exact structure (no markdown):
-        {
-            "plant_name": "Common Name (Scientific Name)",
-            "health_status": "Healthy" or "Disease Name",
-            "health_percentage": 85,
-            "disease_severity": "None" or "Mild" or "Moderate" or "Severe",
-            "affected_area_percent": 15,
-            "primary_color": "#2E7D32",
-            "secondary_color": "#81C784",
-            "disease_color": "#8B4513",
-            "texture_description": "Brief description of surface texture",
-            "recommended_action": "One sentence recommendation"
-        }
-        """
-        
-        current_model = _get_model()
-        response = current_model.generate_content([prompt, image])
-        clean_json = response.text.replace("```json", "").replace("```", "").strip()
-        
-        # Track successful request
-        tokens_used = len(response.text) // 4 if response.text else 0
-        api_manager.record_request(tokens_used=tokens_used, success=True)
-        
-        return json.loads(clean_json)
+        result, problems = generate_structured(get_gemini_client().generate, CROP_ANALYSIS_PROMPT, [image], CropAnalysis)
+        if problems:
+            print(f"Crop analysis: using defaults for {', '.join(problems)}")
+        return result
         
     except Exception as e:
-        # Track failed request
-        api_manager.record_request(success=False, error_msg=str(e))
+        record_error(e)
+        st.error(f"Analysis error: {e}")
+        return None
+
+
+@traced("agent.analyze_crop_for_simulation_async")
+async def analyze_crop_for_simulation_async(image_file) -> Optional[dict]:
+    """Async version of analyze_crop_for_simulation."""
+    try:
+        if not image_file:
+            return None
+        image = _open_image(image_file)
+
+        result, problems = await agenerate_structured(get_gemini_client().agenerate, CROP_ANALYSIS_PROMPT, [image], CropAnalysis)
+        if problems:
+            print(f"Crop analysis: using defaults for {', '.join(problems)}")
+        return result
+
+    except Exception as e:
+        record_error(e)
         st.error(f"Analysis error: {e}")
         return None
 
 
-def analyze_multi_angle_images(image_files: list) -> Optional[dict]:
+MULTI_ANGLE_PROMPT = """
+You are an expert 3D botanical modeler analyzing several images of THE SAME PLANT from different angles.
+
+CRITICAL TASK: Combine information from ALL angles to create an accurate 3D model.
+
+For each image, note:
+- What parts of the plant are visible (front, back, top, sides, underside of leaves)
+- Any diseases, damage, or discoloration visible from that angle
+- Details about structure (stems, branches, leaf arrangement)
+
+Then MERGE all observations into a single comprehensive analysis.
+
+Return ONLY a JSON object with this exact structure (no markdown):
+{
+    "identified_plant": {
+        "common_name": "Plant Name",
+        "scientific_name": "Scientific name",
+        "plant_family": "Family name",
+        "growth_stage": "vegetative" or "flowering" or "fruiting" or "mature",
+        "confidence": 0.95
+    },
+
+    "multi_angle_observations": {
+        "angles_analyzed": 3,
+        "front_view_notes": "What was observed from front angle",
+        "back_view_notes": "What was observed from back angle (if available)",
+        "top_view_notes": "What was observed from top angle (if available)",
+        "side_view_notes": "What was observed from side angles",
+        "underside_notes": "Leaf underside observations (if visible)"
+    },
+
+    "plant_architecture": {
+        "overall_form": "rosette" or "bushy" or "upright" or "vining" or "columnar" or "spreading",
+        "symmetry": "radial" or "bilateral" or "asymmetric",
+        "height_cm": 40,
+        "width_cm": 50,
+        "has_central_head": false,
+        "head_type": "none" or "cauliflower" or "cabbage" or "broccoli" or "lettuce",
+        "fruit_type": "none" or "tomato" or "pepper" or "eggplant" or "cucumber",
+        "fruit_count": 0,
+        "fruit_color_hex": "#FF0000"
+    },
+
+    "leaf_system": {
+        "arrangement": "rosette" or "alternate" or "opposite" or "whorled",
+        "total_count": 12,
+        "shape": "oval" or "elongated" or "heart" or "lobed" or "wavy",
+        "primary_color_hex": "#228B22",
+        "secondary_color_hex": "#90EE90",
+        "underside_color_hex": "#98FB98",
+        "waviness": 0.3,
+        "orientation": "upward" or "outward" or "drooping" or "cupping"
+    },
+
+    "health_analysis": {
+        "overall_health_percentage": 85,
+        "health_status": "Healthy" or "Disease Name",
+        "disease_severity": "None" or "Mild" or "Moderate" or "Severe",
+        "affected_leaves_count": 0,
+        "affected_area_percent": 5,
+        "disease_locations": ["top leaves", "underside of lower leaves"],
+        "symptoms_observed": ["yellowing", "spots", "wilting"],
+        "diseases_detected": []
+    },
+
+    "container": {
+        "type": "pot" or "ground" or "raised_bed" or "field",
+        "shape": "round" or "square" or "natural",
+        "material": "terracotta" or "plastic" or "soil",
+        "color_hex": "#8B4513"
+    },
+
+    "environmental_context": {
+        "setting": "indoor" or "outdoor" or "greenhouse" or "field",
+        "lighting": "bright" or "moderate" or "low"
+    },
+
+    "3d_generation_notes": "Detailed notes combining all angle observations for accurate 3D modeling. Include hidden parts that were revealed by multi-angle views.",
+
+    "recommended_action": "One sentence recommendation based on complete analysis"
+}
+"""
+
+
+@traced("agent.analyze_multi_angle_images")
+def analyze_multi_angle_images(image_files: list, map_reduce: bool = False) -> Optional[dict]:
     """
     Analyze multiple images from different angles for more accurate 3D modeling.
     Combines insights from all angles to create a comprehensive plant profile.
     
     Args:
         image_files: List of uploaded image file objects (3-5 images recommended)
+        map_reduce: Analyze each angle in parallel and merge locally
+                    (faster, tolerates failed angles; see core/multi_angle.py)
         
     Returns:
         Dictionary with merged plant analysis and structure data
@@ -435,119 +717,56 @@ def analyze_multi_angle_images(image_files: list) -> Optional[dict]:
     try:
         if not image_files or len(image_files) == 0:
             return None
+
+        if map_reduce:
+            return analyze_multi_angle_map_reduce(get_gemini_client(), image_files)
         
         # Load all images
-        images = []
-        for img_file in image_files:
-            img_file.seek(0)
-            images.append(Image.open(img_file))
-        
-        # Build the prompt with all images
-        prompt = f"""
-        You are an expert 3D botanical modeler analyzing {len(images)} images of THE SAME PLANT from different angles.
-        
-        CRITICAL TASK: Combine information from ALL angles to create an accurate 3D model.
-        
-        For each image, note:
-        - What parts of the plant are visible (front, back, top, sides, underside of leaves)
-        - Any diseases, damage, or discoloration visible from that angle
-        - Details about structure (stems, branches, leaf arrangement)
-        
-        Then MERGE all observations into a single comprehensive analysis.
+        images = _open_images(image_files)
         
-        Return ONLY a JSON object with this exact structure (no markdown):
-        {{
-            "identified_plant": {{
-                "common_name": "Plant Name",
-                "scientific_name": "Scientific name",
-                "plant_family": "Family name",
-                "growth_stage": "vegetative" or "flowering" or "fruiting" or "mature",
-                "confidence": 0.95
-            }},
-            
-            "multi_angle_observations": {{
-                "angles_analyzed": {len(images)},
-                "front_view_notes": "What was observed from front angle",
-                "back_view_notes": "What was observed from back angle (if available)",
-                "top_view_notes": "What was observed from top angle (if available)",
-                "side_view_notes": "What was observed from side angles",
-                "underside_notes": "Leaf underside observations (if visible)"
-            }},
-            
-            "plant_architecture": {{
-                "overall_form": "rosette" or "bushy" or "upright" or "vining" or "columnar" or "spreading",
-                "symmetry": "radial" or "bilateral" or "asymmetric",
-                "height_cm": 40,
-                "width_cm": 50,
-                "has_central_head": false,
-                "head_type": "none" or "cauliflower" or "cabbage" or "broccoli" or "lettuce",
-                "fruit_type": "none" or "tomato" or "pepper" or "eggplant" or "cucumber",
-                "fruit_count": 0,
-                "fruit_color_hex": "#FF0000"
-            }},
-            
-            "leaf_system": {{
-                "arrangement": "rosette" or "alternate" or "opposite" or "whorled",
-                "total_count": 12,
-                "shape": "oval" or "elongated" or "heart" or "lobed" or "wavy",
-                "primary_color_hex": "#228B22",
-                "secondary_color_hex": "#90EE90",
-                "underside_color_hex": "#98FB98",
-                "waviness": 0.3,
-                "orientation": "upward" or "outward" or "drooping" or "cupping"
-            }},
-            
-            "health_analysis": {{
-                "overall_health_percentage": 85,
-                "health_status": "Healthy" or "Disease Name",
-                "disease_severity": "None" or "Mild" or "Moderate" or "Severe",
-                "affected_leaves_count": 0,
-                "affected_area_percent": 5,
-                "disease_locations": ["top leaves", "underside of lower leaves"],
-                "symptoms_observed": ["yellowing", "spots", "wilting"],
-                "diseases_detected": []
-            }},
-            
-            "container": {{
-                "type": "pot" or "ground" or "raised_bed" or "field",
-                "shape": "round" or "square" or "natural",
-                "material": "terracotta" or "plastic" or "soil",
-                "color_hex": "#8B4513"
-            }},
-            
-            "environmental_context": {{
-                "setting": "indoor" or "outdoor" or "greenhouse" or "field",
-                "lighting": "bright" or "moderate" or "low"
-            }},
-            
-            "3d_generation_notes": "Detailed notes combining all angle observations for accurate 3D modeling. Include hidden parts that were revealed by multi-angle views.",
-            
-            "recommended_action": "One sentence recommendation based on complete analysis"
-        }}
-        """
-        
-        # Send all images with the prompt
-        content = [prompt] + images
-        current_model = _get_model()
-        response = current_model.generate_content(content)
-        clean_json = response.text.replace("```json", "").replace("```", "").strip()
-        
-        # Track successful request
-        tokens_used = len(response.text) // 4 if response.text else 0
-        api_manager.record_request(tokens_used=tokens_used, success=True)
-        
-        return json.loads(clean_json)
+        # Static prompt (cached), then the per-request count and all images
+        generate = partial(get_gemini_client().generate, cached_prompt=("multi_angle", MULTI_ANGLE_PROMPT))
+        media = [f"There are {len(images)} images of this plant.", *images]
+        result, problems = generate_structured(generate, MULTI_ANGLE_PROMPT, media, MultiAngleAnalysis)
+        if problems:
+            print(f"Multi-angle analysis: using defaults for {', '.join(problems)}")
+        return result
         
     except Exception as e:
-        # Track failed request
-        api_manager.record_request(success=False, error_msg=str(e))
+        record_error(e)
         st.error(f"Multi-angle analysis error: {e}")
         return None
 
 
+@traced("agent.analyze_multi_angle_images_async")
+async def analyze_multi_angle_images_async(image_files: list, map_reduce: bool = False) -> Optional[dict]:
+    """Async version of analyze_multi_angle_images."""
+    try:
+        if not image_files:
+            return None
+        if map_reduce:
+            return await analyze_multi_angle_map_reduce_async(get_gemini_client(), image_files)
+        images = _open_images(image_files)
+
+        agenerate = partial(get_gemini_client().agenerate, cached_prompt=("multi_angle", MULTI_ANGLE_PROMPT))
+        media = [f"There are {len(images)} images of this plant.", *images]
+        result, problems = await agenerate_structured(agenerate, MULTI_ANGLE_PROMPT, media, MultiAngleAnalysis)
+        if problems:
+            print(f"Multi-angle analysis: using defaults for {', '.join(problems)}")
+        return result
+
+    except Exception as e:
+        record_error(e)
+        st.error(f"Multi-angle analysis error: {e}")
+        return None
+
+
+@traced("agent.compare_plant_health_over_time")
 def compare_plant_health_over_time(current_analysis: dict, history: list) -> dict:
     """
     Compare current plant health with historical data to detect progression.
+    The trend is a robust (Theil-Sen) fit over every scan, not just the
+    first and last one, so a single odd scan doesn't flip the result.
     
     Args:
         current_analysis: Current scan analysis dictionary
@@ -566,39 +785,39 @@ def compare_plant_health_over_time(current_analysis: dict, history: list) -> dic
             }
         
         # Get health percentages over time
-        current_health = current_analysis.get("health_percentage", 0) or \
-                        current_analysis.get("health_analysis", {}).get("overall_health_percentage", 0)
+        current_health = round(extract_health(current_analysis))
         
         health_timeline = []
         for h in history:
-            hp = h.get("analysis_json", {}).get("health_percentage", 0) or \
-                h.get("analysis_json", {}).get("health_analysis", {}).get("overall_health_percentage", 0)
             health_timeline.append({
                 "date": h.get("created_at", "Unknown"),
-                "health": hp,
+                "health": round(row_health(h)),
                 "status": h.get("health_status", "Unknown")
             })
         
         # Calculate trend
         if len(health_timeline) >= 2:
+            from core.health_trends import analyze_health_trend  # numpy; only needed for tracked plants
+
+            scans = [{"created_at": datetime.now(timezone.utc), "analysis_json": current_analysis}] + list(history)
+            trend_fit = analyze_health_trend(scans)
+            
             first_health = health_timeline[-1]["health"]  # Oldest
             last_health = health_timeline[0]["health"]    # Most recent before current
             
             health_change = current_health - first_health
             recent_change = current_health - last_health
+            fitted_change = round(trend_fit.fitted_change)
+            rate = trend_fit.slope_per_day
             
-            if health_change > 10:
-                trend = "improving"
-                trend_emoji = "📈"
-                message = f"Plant health improved by {health_change}% since first scan!"
-            elif health_change < -10:
-                trend = "declining"
-                trend_emoji = "📉"
-                message = f"Plant health declined by {abs(health_change)}% since first scan. Action needed."
+            trend = trend_fit.trend
+            trend_emoji = trend_fit.trend_emoji
+            if trend == "improving":
+                message = f"Plant health improved by {fitted_change}% since first scan ({rate:+.1f}%/day)!"
+            elif trend == "declining":
+                message = f"Plant health declined by {abs(fitted_change)}% since first scan ({rate:+.1f}%/day). Action needed."
             else:
-                trend = "stable"
-                trend_emoji = "➡️"
-                message = f"Plant health is stable (±{abs(health_change)}% change)."
+                message = f"Plant health is stable (±{abs(fitted_change)}% change)."
             
             # Generate recommendation based on trend
             if trend == "declining":
@@ -608,6 +827,9 @@ def compare_plant_health_over_time(current_analysis: dict, history: list) -> dic
             else:
                 recommendation = "Plant is stable. Maintain current care and continue monitoring."
             
+            if trend_fit.anomaly_days:
+                recommendation += f" {len(trend_fit.anomaly_days)} scan(s) look unusual compared to the trend - consider rescanning in similar lighting."
+            
             return {
                 "has_history": True,
                 "scan_count": len(history) + 1,
@@ -615,6 +837,10 @@ def compare_plant_health_over_time(current_analysis: dict, history: list) -> dic
                 "trend_emoji": trend_emoji,
                 "health_change_total": health_change,
                 "health_change_recent": recent_change,
+                "health_change_fitted": fitted_change,
+                "rate_per_day": round(rate, 2),
+                "volatility": round(trend_fit.volatility, 1),
+                "anomaly_count": len(trend_fit.anomaly_days),
                 "current_health": current_health,
                 "first_health": first_health,
                 "message": message,
@@ -632,6 +858,7 @@ def compare_plant_health_over_time(current_analysis: dict, history: list) -> dic
             }
             
     except Exception as e:
+        record_error(e)
         return {
             "has_history": False,
             "trend": "error",
@@ -8,7 +8,6 @@ Provides:
 """
 
 import streamlit as st
-import google.generativeai as genai
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Tuple
 import time
@@ -16,6 +15,8 @@ import threading
 from dataclasses import dataclass, field
 from collections import deque
 
+from core.metrics import record_metric
+
 
 # ============================================================================
 # CONFIGURATION
@@ -118,13 +119,24 @@ class APIKeyManager:
         self.key_stats: Dict[str, APIKeyStats] = {}
         self.current_key_index: int = 0
         self.alerts: List[Dict] = []
+        self.load_error: Optional[str] = None  # Why no keys were loaded (shown on the admin page)
+        self._key_lock = threading.RLock()  # Guards key selection and stats across sessions
         self._initialized = True
         
         # Load keys from secrets
         self._load_keys()
     
+    @classmethod
+    def reset_instance(cls):
+        """Forget the singleton; the next APIKeyManager() reloads keys from secrets."""
+        with cls._lock:
+            cls._instance = None
+    
     def _load_keys(self):
-        """Load API keys from Streamlit secrets."""
+        """
+        Load API keys from Streamlit secrets. May run on a background thread
+        (resource warm-up), so problems go to load_error, not the UI.
+        """
         try:
             # Support multiple keys: GEMINI_API_KEY, GEMINI_API_KEY_2, etc.
             if "GEMINI_API_KEY" in st.secrets:
@@ -142,13 +154,37 @@ class APIKeyManager:
                 self.key_stats[key] = APIKeyStats(key_id=key_id)
             
             if not self.keys:
-                st.error("❌ No GEMINI_API_KEY found in secrets!")
+                self.load_error = "No GEMINI_API_KEY found in secrets"
                 
         except Exception as e:
-            st.error(f"❌ Error loading API keys: {e}")
+            self.load_error = f"Error loading API keys: {e}"
+        
+        if self.load_error:
+            print(f"API keys: {self.load_error}")
     
     def get_current_key(self) -> Optional[str]:
         """Get the current active API key."""
+        with self._key_lock:
+            return self._select_key()
+    
+    def select_key(self) -> Optional[str]:
+        """
+        Pick the key for one request (rotating if needed). Thread-safe;
+        pass the key back to record_request so usage is charged to it even
+        if another session rotates meanwhile.
+        """
+        return self.get_current_key()
+    
+    def available_keys(self) -> List[str]:
+        """Keys that are not rate limited (e.g. to spread parallel requests)."""
+        with self._key_lock:
+            return [
+                key for key in self.keys
+                if not (self.key_stats.get(key) and self.key_stats[key].is_rate_limited
+                        and not self.key_stats[key].check_rate_limit_expired())
+            ]
+    
+    def _select_key(self) -> Optional[str]:
         if not self.keys:
             return None
         
@@ -171,6 +207,10 @@ class APIKeyManager:
     
     def _rotate_key(self, reason: str = "manual") -> bool:
         """Rotate to the next available API key."""
+        with self._key_lock:
+            return self._rotate_key_locked(reason)
+    
+    def _rotate_key_locked(self, reason: str) -> bool:
         if len(self.keys) <= 1:
             return False
         
@@ -194,9 +234,15 @@ class APIKeyManager:
         self._add_alert("error", "⚠️ All API keys are rate limited!")
         return False
     
-    def record_request(self, tokens_used: int = 0, success: bool = True, error_msg: str = None):
-        """Record an API request."""
-        current_key = self.keys[self.current_key_index] if self.keys else None
+    def record_request(self, tokens_used: int = 0, success: bool = True, error_msg: str = None,
+                       api_key: Optional[str] = None):
+        """Record an API request (on api_key, default the active key)."""
+        with self._key_lock:
+            self._record_request(tokens_used, success, error_msg, api_key)
+    
+    def _record_request(self, tokens_used: int, success: bool, error_msg: Optional[str],
+                        api_key: Optional[str]):
+        current_key = api_key or (self.keys[self.current_key_index] if self.keys else None)
         if not current_key:
             return
         
@@ -204,6 +250,11 @@ class APIKeyManager:
         if not stats:
             return
         
+        # Time series for the admin page
+        record_metric("gemini.requests", key=stats.key_id)
+        record_metric("gemini.tokens", tokens_used if success else 0, key=stats.key_id)
+        record_metric("gemini.error", 0.0 if success else 1.0, key=stats.key_id)
+        
         if success:
             stats.add_request(tokens_used)
             self._check_thresholds(stats)
@@ -291,6 +342,9 @@ class APIKeyManager:
     
     def configure_genai(self) -> bool:
         """Configure google.generativeai with the current key."""
+        # Legacy SDK, only needed by track_api_call users; imported on demand
+        import google.generativeai as genai
+
         key = self.get_current_key()
         if key:
             genai.configure(api_key=key)
@@ -365,7 +419,7 @@ def render_api_usage_dashboard():
     st.markdown("### 📊 API Key Usage Dashboard")
     
     if not stats["keys"]:
-        st.error("No API keys configured!")
+        st.error(f"No API keys configured! {manager.load_error or ''}".strip())
         return
     
     # Overview metrics
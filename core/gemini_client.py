@@ -0,0 +1,385 @@
+"""
+Gemini Client - Pooled google.genai Clients per API Key
+One google.genai Client per API key, shared by every session and reused
+across requests (each client keeps its HTTP connection pool). Every
+request leases a key from the APIKeyManager instead of reconfiguring the
+SDK globally, so concurrent sessions never clobber each other's key.
+
+Blocking, streaming and asyncio variants share key selection, context
+caching of static prompts and usage tracking. A google.genai client's
+async transport stays bound to the first event loop that used it, so all
+async requests run on one event loop thread owned by the GeminiClient,
+whichever loop (or asyncio.run call) awaits them.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Coroutine, Dict, Iterator, Optional, Tuple
+
+import streamlit as st
+
+from core.api_key_manager import APIKeyManager
+from core.metrics import record_metric
+from core.prompt_cache import CACHED_PROMPT_REFERENCE, PromptCacheManager
+from core.resources import get_resource
+from core.tracing import traced
+
+if TYPE_CHECKING:
+    # google.genai takes about a second to import; it is loaded on the first request
+    from google import genai
+    from google.genai import types
+
+# 'gemini-3-pro-preview' is best for deep diagnosis (Visual Reasoning)
+# 'gemini-3-flash-preview' is best for fast voice/chat
+GEMINI_MODEL = "gemini-3-flash-preview"
+
+# (name, text) of a static prompt that may be served from the context cache
+CachedPromptSpec = Tuple[str, str]
+
+
+def gemini_base_url() -> Optional[str]:
+    """
+    GEMINI_BASE_URL from secrets or the environment, e.g. the local
+    stand-in (python -m standins.gemini_server); None for the real API.
+    """
+    try:
+        if "GEMINI_BASE_URL" in st.secrets:
+            return st.secrets["GEMINI_BASE_URL"]
+    except Exception:
+        pass
+    return os.environ.get("GEMINI_BASE_URL") or None
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop):
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_forever()
+    finally:
+        loop.close()
+
+
+async def _drain_and_stop(loop: asyncio.AbstractEventLoop):
+    pending = [task for task in asyncio.all_tasks(loop) if task is not asyncio.current_task()]
+    await asyncio.gather(*pending, return_exceptions=True)
+    loop.stop()
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+# A deleted or expired cached content is reported as NOT_FOUND, PERMISSION_DENIED
+# ("CachedContent not found (or permission denied)") or INVALID_ARGUMENT ("... is expired")
+_STALE_CACHE_CODES = (400, 403, 404)
+
+
+def _is_stale_cache_error(error: Exception, cache_name: str) -> bool:
+    """True if a request failed because the cached content it used is gone."""
+    from google.genai import errors
+
+    if not isinstance(error, errors.APIError) or error.code not in _STALE_CACHE_CODES:
+        return False
+    message = str(error).lower()
+    about_cache = cache_name.lower() in message or "cachedcontent" in message.replace(" ", "")
+    return about_cache and ("not found" in message or "expired" in message)
+
+
+async def _in_context(context: contextvars.Context, coro: Coroutine) -> Any:
+    """Await a coroutine with the caller's context vars (e.g. the current trace span)."""
+    for var, value in context.items():
+        var.set(value)
+    return await coro
+
+
+def _tokens_used(response, text_length: int) -> int:
+    """Total tokens from usage metadata, else the 4 chars/token estimate."""
+    usage = getattr(response, "usage_metadata", None)
+    total = getattr(usage, "total_token_count", None)
+    return total if isinstance(total, int) else text_length // 4
+
+
+class GeminiClient:
+    """
+    Thread-safe Gemini access for the whole app (see get_gemini_client).
+    """
+
+    def __init__(self, api_manager: APIKeyManager, model_name: str = GEMINI_MODEL,
+                 base_url: Optional[str] = None):
+        self.api_manager = api_manager
+        self.model_name = model_name
+        self.base_url = base_url
+        self.prompt_cache = PromptCacheManager(model_name)
+        self._clients: Dict[str, "genai.Client"] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def client_for(self, api_key: str) -> "genai.Client":
+        """Pooled client for a key (created on first use)."""
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                from google import genai
+                from google.genai import types
+
+                http_options = types.HttpOptions(base_url=self.base_url) if self.base_url else None
+                client = self._clients[api_key] = genai.Client(api_key=api_key, http_options=http_options)
+            return client
+
+    # ========================================================================
+    # EVENT LOOP
+    # ========================================================================
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        """The client's own event loop, running on a daemon thread (started on first use)."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=_run_loop, args=(self._loop,), daemon=True, name="gemini-loop").start()
+            return self._loop
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine on the client's event loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(_in_context(contextvars.copy_context(), coro), self._event_loop())
+
+    def run(self, coro: Coroutine) -> Any:
+        """
+        Blocking: run a coroutine on the client's event loop and return its
+        result. Use instead of asyncio.run for anything that awaits this client.
+        """
+        if self._loop is not None and _running_loop() is self._loop:
+            coro.close()
+            raise RuntimeError("GeminiClient.run() called from the client's own event loop; await instead")
+        return self.submit(coro).result()
+
+    async def _on_loop(self, coro: Coroutine) -> Any:
+        """Await a coroutine on the client's event loop, whichever loop is awaiting."""
+        loop = self._event_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def close(self):
+        """
+        Stop the event loop once its in-flight requests finish and drop the
+        pooled clients; later use starts over with a new loop and clients.
+        """
+        with self._lock:
+            loop, self._loop = self._loop, None
+            self._clients = {}
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(lambda: loop.create_task(_drain_and_stop(loop)))
+
+    def warm_up(self):
+        """Create every key's pooled client ahead of the first request."""
+        for api_key in list(self.api_manager.keys):
+            self.client_for(api_key)
+
+    def _lease(self, api_key: Optional[str] = None) -> Tuple[str, "genai.Client"]:
+        """Key (the given one, else the manager's pick) and client for one request."""
+        started = time.perf_counter()
+        api_key = api_key or self.api_manager.select_key()
+        if not api_key:
+            raise RuntimeError("No Gemini API key configured")
+        client = self.client_for(api_key)
+        # Waiting on the key/client locks is where concurrent sessions queue
+        record_metric("gemini.lease_wait_s", time.perf_counter() - started)
+        return api_key, client
+
+    def _config(self, generation_config: Optional[dict], system_instruction: Optional[str],
+                cached_content: Optional[str] = None) -> "types.GenerateContentConfig":
+        from google.genai import types
+
+        return types.GenerateContentConfig(
+            **(generation_config or {}),
+            system_instruction=system_instruction,
+            cached_content=cached_content
+        )
+
+    def _use_cache(self, api_key: str, client: "genai.Client", contents: list,
+                   cached_prompt: Optional[CachedPromptSpec]) -> Tuple[list, Optional[str]]:
+        """Swap a leading static prompt for its cached content, if available."""
+        if cached_prompt and contents and contents[0] == cached_prompt[1]:
+            cache_name = self.prompt_cache.get_cache_name(*cached_prompt, api_key, client)
+            if cache_name:
+                return [CACHED_PROMPT_REFERENCE, *contents[1:]], cache_name
+        return contents, None
+
+    def _record(self, api_key: str, response=None, text_length: int = 0,
+                error: Optional[Exception] = None):
+        if error is not None:
+            self.api_manager.record_request(success=False, error_msg=str(error), api_key=api_key)
+        else:
+            self.api_manager.record_request(
+                tokens_used=_tokens_used(response, text_length), success=True, api_key=api_key
+            )
+
+    # ========================================================================
+    # BLOCKING
+    # ========================================================================
+
+    @traced("gemini.generate")
+    def generate(self, contents: list, generation_config: Optional[dict] = None,
+                 system_instruction: Optional[str] = None,
+                 cached_prompt: Optional[CachedPromptSpec] = None) -> str:
+        """
+        Run one request and return the response text.
+
+        Args:
+            contents: Prompt parts (text, PIL images, Content dicts)
+            generation_config: GenerateContentConfig fields (e.g. JSON mode)
+            system_instruction: System prompt
+            cached_prompt: (name, text) if contents[0] is a static prompt
+                           that may be served from the context cache
+        """
+        api_key, client = self._lease()
+        contents = list(contents)
+        try:
+            request, cache_name = self._use_cache(api_key, client, contents, cached_prompt)
+            try:
+                response = client.models.generate_content(
+                    model=self.model_name, contents=request,
+                    config=self._config(generation_config, system_instruction, cache_name)
+                )
+            except Exception as e:
+                if not cache_name or not _is_stale_cache_error(e, cache_name):
+                    raise
+                # Cache deleted or expired server-side: drop it and send inline
+                self.prompt_cache.invalidate(cached_prompt[0], api_key)
+                response = client.models.generate_content(
+                    model=self.model_name, contents=contents,
+                    config=self._config(generation_config, system_instruction)
+                )
+        except Exception as e:
+            self._record(api_key, error=e)
+            raise
+
+        text = response.text or ""
+        self._record(api_key, response, len(text))
+        return text
+
+    @traced("gemini.stream")
+    def stream(self, contents: list, generation_config: Optional[dict] = None,
+               system_instruction: Optional[str] = None) -> Iterator[str]:
+        """Stream response text; the request is tracked when the stream ends."""
+        api_key, client = self._lease()
+        last_chunk, text_length = None, 0
+        try:
+            for chunk in client.models.generate_content_stream(
+                model=self.model_name, contents=list(contents),
+                config=self._config(generation_config, system_instruction)
+            ):
+                last_chunk = chunk
+                if chunk.text:
+                    text_length += len(chunk.text)
+                    yield chunk.text
+        except Exception as e:
+            self._record(api_key, error=e)
+            raise
+        self._record(api_key, last_chunk, text_length)
+
+    # ========================================================================
+    # ASYNCIO
+    # ========================================================================
+
+    @traced("gemini.agenerate")
+    async def agenerate(self, contents: list, generation_config: Optional[dict] = None,
+                        system_instruction: Optional[str] = None,
+                        cached_prompt: Optional[CachedPromptSpec] = None,
+                        api_key: Optional[str] = None, model: Optional[str] = None) -> str:
+        """
+        Async version of generate (same arguments), plus:
+
+        Args:
+            api_key: Send with this key (to spread parallel calls over keys)
+            model: Use another model than the client's (e.g. a lighter one);
+                   cached prompts are only used with the client's model
+        """
+        return await self._on_loop(self._agenerate(
+            contents, generation_config, system_instruction, cached_prompt, api_key, model
+        ))
+
+    async def _agenerate(self, contents: list, generation_config: Optional[dict],
+                         system_instruction: Optional[str], cached_prompt: Optional[CachedPromptSpec],
+                         api_key: Optional[str], model: Optional[str]) -> str:
+        api_key, client = self._lease(api_key)
+        if model and model != self.model_name:
+            cached_prompt = None
+        model = model or self.model_name
+        contents = list(contents)
+        try:
+            # Cache creation/refresh is a blocking call; keep it off the event loop
+            request, cache_name = await asyncio.to_thread(
+                self._use_cache, api_key, client, contents, cached_prompt
+            )
+            try:
+                response = await client.aio.models.generate_content(
+                    model=model, contents=request,
+                    config=self._config(generation_config, system_instruction, cache_name)
+                )
+            except Exception as e:
+                if not cache_name or not _is_stale_cache_error(e, cache_name):
+                    raise
+                self.prompt_cache.invalidate(cached_prompt[0], api_key)
+                response = await client.aio.models.generate_content(
+                    model=model, contents=contents,
+                    config=self._config(generation_config, system_instruction)
+                )
+        except Exception as e:
+            self._record(api_key, error=e)
+            raise
+
+        text = response.text or ""
+        self._record(api_key, response, len(text))
+        return text
+
+    @traced("gemini.astream")
+    async def astream(self, contents: list, generation_config: Optional[dict] = None,
+                      system_instruction: Optional[str] = None) -> AsyncIterator[str]:
+        """Async version of stream."""
+        chunks = self._astream(contents, generation_config, system_instruction)
+
+        async def next_chunk():
+            return await chunks.__anext__()
+
+        async def close():
+            await chunks.aclose()
+
+        try:
+            while True:
+                try:
+                    chunk = await self._on_loop(next_chunk())
+                except StopAsyncIteration:
+                    break
+                yield chunk
+        finally:
+            await self._on_loop(close())
+
+    async def _astream(self, contents: list, generation_config: Optional[dict],
+                       system_instruction: Optional[str]) -> AsyncIterator[str]:
+        api_key, client = self._lease()
+        last_chunk, text_length = None, 0
+        try:
+            async for chunk in await client.aio.models.generate_content_stream(
+                model=self.model_name, contents=list(contents),
+                config=self._config(generation_config, system_instruction)
+            ):
+                last_chunk = chunk
+                if chunk.text:
+                    text_length += len(chunk.text)
+                    yield chunk.text
+        except Exception as e:
+            self._record(api_key, error=e)
+            raise
+        self._record(api_key, last_chunk, text_length)
+
+
+def get_gemini_client() -> GeminiClient:
+    """Shared GeminiClient (one per app process, used by every session)."""
+    return get_resource("gemini")
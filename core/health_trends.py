@@ -0,0 +1,250 @@
+"""
+Health Trends - Vectorized Trend Analytics for Tracked Plants
+Turns plants_registry scan rows into NumPy health series and fits a robust
+(Theil-Sen) trend per tracking_id, with rate of change, volatility and
+anomaly flags. All tracked plants are evaluated in one grouped pass.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from core.scan_metrics import known_row_health
+
+# ============================================================================
+# TREND SETTINGS
+# ============================================================================
+
+# Fitted change (health points over the tracked period) that counts as a trend
+TREND_CHANGE_THRESHOLD = 10.0
+
+# Modified z-score above which a scan is flagged as an anomaly
+ANOMALY_Z_THRESHOLD = 3.5
+
+# Floor for the residual MAD, so near-perfect fits don't flag tiny wobbles
+MIN_MAD_POINTS = 2.0
+
+_MAD_TO_SIGMA = 1.4826
+_SECONDS_PER_DAY = 86400.0
+
+
+# ============================================================================
+# SERIES EXTRACTION
+# ============================================================================
+
+def _timestamp_days(value) -> float:
+    """Supabase timestamp -> days since the epoch (NaN if unparseable)."""
+    if isinstance(value, datetime):
+        moment = value
+    else:
+        try:
+            moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return np.nan
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp() / _SECONDS_PER_DAY
+
+
+def health_series(rows: Sequence[dict], group_key: str = "tracking_id"):
+    """
+    Flatten scan rows into parallel arrays.
+
+    Args:
+        rows: plants_registry rows (created_at, tracking_id and either the
+              health_percentage column or analysis_json)
+        group_key: Column that identifies one plant
+
+    Returns:
+        (group_ids, groups, days, health): unique ids, each row's index
+        into group_ids, and float arrays of days since the epoch and
+        health %. Rows with no timestamp or unknown health are dropped
+        (counting them as 0% would look like a sudden decline).
+    """
+    ids, days, health = [], [], []
+    for row in rows:
+        day = _timestamp_days(row.get("created_at"))
+        row_value = known_row_health(row)
+        if np.isnan(day) or row_value is None:
+            continue
+        ids.append(row.get(group_key) or "")
+        days.append(day)
+        health.append(row_value)
+
+    group_ids, codes = np.unique(np.array(ids, dtype=str), return_inverse=True)
+    return (
+        [str(group_id) for group_id in group_ids],
+        codes.astype(np.intp),
+        np.array(days, dtype=np.float64),
+        np.array(health, dtype=np.float64),
+    )
+
+
+# ============================================================================
+# GROUPED STATISTICS
+# ============================================================================
+
+def _grouped_median(values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    """Median of values per group (NaN for empty groups)."""
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+
+    result = np.full(n_groups, np.nan)
+    present = counts > 0
+    low = starts[present] + (counts[present] - 1) // 2
+    high = starts[present] + counts[present] // 2
+    result[present] = (sorted_values[low] + sorted_values[high]) / 2
+    return result
+
+
+def _pairs_within_groups(groups: np.ndarray):
+    """
+    Index pairs (i, j), i < j, for every two rows in the same group.
+    groups must be sorted.
+    """
+    n = len(groups)
+    group_end = np.searchsorted(groups, groups, side="right")
+    partners = group_end - np.arange(n) - 1
+    first = np.repeat(np.arange(n), partners)
+    offset = np.arange(partners.sum()) - np.repeat(np.cumsum(partners) - partners, partners)
+    return first, first + 1 + offset
+
+
+def theil_sen(groups: np.ndarray, x: np.ndarray, y: np.ndarray, n_groups: int):
+    """
+    Theil-Sen fit per group: slope is the median of pairwise slopes,
+    intercept the median of y - slope * x. Pairs with equal x are ignored.
+
+    Returns:
+        (slope, intercept) arrays of shape (n_groups,); slope is 0 for
+        groups with fewer than two distinct x values.
+    """
+    order = np.lexsort((x, groups))
+    groups, x, y = groups[order], x[order], y[order]
+
+    i, j = _pairs_within_groups(groups)
+    dx = x[j] - x[i]
+    usable = dx > 0
+    slopes = _grouped_median((y[j] - y[i])[usable] / dx[usable], groups[i][usable], n_groups)
+    slopes = np.nan_to_num(slopes, nan=0.0)
+
+    intercepts = _grouped_median(y - slopes[groups] * x, groups, n_groups)
+    return slopes, intercepts
+
+
+# ============================================================================
+# TREND RESULTS
+# ============================================================================
+
+@dataclass
+class HealthTrend:
+    """Trend summary for one tracked plant."""
+    tracking_id: str
+    scan_count: int
+    first_health: float
+    current_health: float
+    span_days: float
+    slope_per_day: float
+    fitted_change: float
+    volatility: float
+    trend: str
+    anomaly_days: List[float] = field(default_factory=list)
+
+    @property
+    def total_change(self) -> float:
+        """Raw change between the first and the latest scan."""
+        return self.current_health - self.first_health
+
+    @property
+    def trend_emoji(self) -> str:
+        return {"improving": "📈", "declining": "📉"}.get(self.trend, "➡️")
+
+
+def _classify(fitted_change: float) -> str:
+    """Trend label from the fitted change over the tracked period."""
+    if fitted_change > TREND_CHANGE_THRESHOLD:
+        return "improving"
+    if fitted_change < -TREND_CHANGE_THRESHOLD:
+        return "declining"
+    return "stable"
+
+
+def analyze_health_trends(rows: Sequence[dict], group_key: str = "tracking_id") -> Dict[str, HealthTrend]:
+    """
+    Fit a health trend for every plant in one pass.
+
+    Args:
+        rows: Scan rows for any number of tracked plants
+        group_key: Column that identifies one plant
+
+    Returns:
+        Dict of tracking_id -> HealthTrend
+    """
+    group_ids, groups, days, health = health_series(rows, group_key)
+    n_groups = len(group_ids)
+    if n_groups == 0:
+        return {}
+
+    counts = np.bincount(groups, minlength=n_groups)
+    first_day = np.full(n_groups, np.inf)
+    last_day = np.full(n_groups, -np.inf)
+    np.minimum.at(first_day, groups, days)
+    np.maximum.at(last_day, groups, days)
+    span = last_day - first_day
+
+    # Work in days since each plant's first scan
+    elapsed = days - first_day[groups]
+    slopes, intercepts = theil_sen(groups, elapsed, health, n_groups)
+    # Change along the fitted line, kept inside the valid 0-100% range
+    fitted_change = np.clip(intercepts + slopes * span, 0, 100) - np.clip(intercepts, 0, 100)
+
+    residuals = health - (intercepts[groups] + slopes[groups] * elapsed)
+    volatility = np.sqrt(np.bincount(groups, residuals ** 2, minlength=n_groups) / counts)
+
+    # Modified z-score of residuals (robust to the outliers it looks for)
+    center = _grouped_median(residuals, groups, n_groups)
+    deviation = np.abs(residuals - center[groups])
+    mad = np.maximum(_grouped_median(deviation, groups, n_groups), MIN_MAD_POINTS)
+    anomalous = (deviation / (_MAD_TO_SIGMA * mad[groups]) > ANOMALY_Z_THRESHOLD) & (counts[groups] >= 3)
+
+    # Health at the first and latest scan of each plant
+    order = np.lexsort((days, groups))
+    ends = np.cumsum(counts) - 1
+    first_health = health[order][ends - counts + 1]
+    current_health = health[order][ends]
+
+    anomaly_days = {}
+    for row in np.flatnonzero(anomalous):
+        anomaly_days.setdefault(groups[row], []).append(float(elapsed[row]))
+
+    trends = {}
+    for g, tracking_id in enumerate(group_ids):
+        trends[tracking_id] = HealthTrend(
+            tracking_id=tracking_id,
+            scan_count=int(counts[g]),
+            first_health=float(first_health[g]),
+            current_health=float(current_health[g]),
+            span_days=float(span[g]),
+            slope_per_day=float(slopes[g]),
+            fitted_change=float(fitted_change[g]),
+            volatility=float(volatility[g]),
+            trend=_classify(fitted_change[g]),
+            anomaly_days=sorted(anomaly_days.get(g, []))
+        )
+    return trends
+
+
+def analyze_health_trend(rows: Sequence[dict]) -> Optional[HealthTrend]:
+    """Trend for the scans of a single plant (None if no dated scans)."""
+    trends = analyze_health_trends(rows, group_key="__single__")
+    return next(iter(trends.values()), None)
+
+
+def find_declining_plants(rows: Sequence[dict]) -> List[HealthTrend]:
+    """Declining plants across all tracking IDs, fastest decline first."""
+    declining = [t for t in analyze_health_trends(rows).values() if t.trend == "declining"]
+    return sorted(declining, key=lambda t: t.slope_per_day)
@@ -1,4 +1,116 @@
+"""
+Conversation Memory for A.N.I. Chat
+Keeps the chat history per session under a token budget: recent turns are
+sent verbatim, older turns are folded into a rolling summary, and the
+stored history is capped so a long session does not grow without bound.
+"""
+
 import streamlit as st
+from dataclasses import dataclass, field
+from typing import Callable, List
+
+# ============================================================================
+# MEMORY SETTINGS
+# ============================================================================
+
+HISTORY_TOKEN_BUDGET = 1500   # Tokens of history (summary + recent turns) per request
+SUMMARY_MAX_WORDS = 120       # Requested length of the rolling summary
+MAX_STORED_MESSAGES = 60      # Messages kept per session (for display and context)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (same 4 chars/token estimate as the API usage tracker)."""
+    return len(text or "") // 4 + 1
+
+
+@dataclass
+class ConversationMemory:
+    """
+    Chat history with a rolling summary.
+
+    messages[:summarized] are already folded into summary; the newest
+    messages that fit in the budget are sent verbatim. Only summarized
+    messages are evicted: compaction also folds in the messages over
+    max_messages, so none are dropped unseen.
+    """
+    messages: List[dict] = field(default_factory=list)
+    summary: str = ""
+    summarized: int = 0
+    token_budget: int = HISTORY_TOKEN_BUDGET
+    max_messages: int = MAX_STORED_MESSAGES
+
+    def add(self, role: str, content: str):
+        """Store a message ("user" or "model")."""
+        self.messages.append({"role": role, "content": content, "tokens": estimate_tokens(content)})
+        self._evict()
+
+    def _evict(self):
+        """Drop the oldest messages over max_messages that are already summarized."""
+        overflow = min(len(self.messages) - self.max_messages, self.summarized)
+        if overflow > 0:
+            del self.messages[:overflow]
+            self.summarized -= overflow
+
+    def _window_start(self) -> int:
+        """Index of the oldest message that still fits in the budget."""
+        remaining = self.token_budget - estimate_tokens(self.summary)
+        start = len(self.messages)
+        while start > self.summarized and self.messages[start - 1]["tokens"] <= remaining:
+            start -= 1
+            remaining -= self.messages[start]["tokens"]
+
+        # Gemini expects the history to open with a user turn
+        while start < len(self.messages) and self.messages[start]["role"] != "user":
+            start += 1
+        return start
+
+    def recent_messages(self) -> List[dict]:
+        """Messages sent verbatim with the next request."""
+        return self.messages[self._window_start():]
+
+    def _compact_end(self) -> int:
+        """Messages before this index belong in the summary (out of the window or over max_messages)."""
+        return max(self._window_start(), len(self.messages) - self.max_messages)
+
+    def needs_compaction(self) -> bool:
+        """True if messages fell out of the window, or are due for eviction, without being summarized."""
+        return self._compact_end() > self.summarized
+
+    def compact(self, summarize: Callable[[str, List[dict]], str]):
+        """
+        Fold messages that no longer fit, or are over max_messages, into
+        the rolling summary, then evict what is over max_messages.
+
+        Args:
+            summarize: Callable(previous_summary, messages) -> new summary
+        """
+        end = self._compact_end()
+        if end <= self.summarized:
+            return
+        self.summary = summarize(self.summary, self.messages[self.summarized:end])
+        self.summarized = end
+        self._evict()
+
+    def to_contents(self) -> List[dict]:
+        """History as Gemini contents (summary first, then recent turns)."""
+        contents = []
+        if self.summary:
+            contents.append({"role": "user", "parts": [{"text": f"Summary of our conversation so far: {self.summary}"}]})
+            contents.append({"role": "model", "parts": [{"text": "Noted, I'll keep that in mind."}]})
+        for message in self.recent_messages():
+            contents.append({"role": message["role"], "parts": [{"text": message["content"]}]})
+        return contents
+
+
+# ============================================================================
+# SESSION HELPERS
+# ============================================================================
+
+def get_conversation_memory() -> ConversationMemory:
+    """This session's conversation memory (created on first use)."""
+    initialize_session_state()
+    return st.session_state.conversation_memory
+
 
 def initialize_session_state():
     """
@@ -6,22 +118,27 @@ def initialize_session_state():
     """
     if "messages" not in st.session_state:
         st.session_state.messages = []
+    if "conversation_memory" not in st.session_state:
+        # Share the list so existing st.session_state.messages readers stay valid
+        st.session_state.conversation_memory = ConversationMemory(messages=st.session_state.messages)
 
 def get_chat_history():
     """
     Returns the clean list of messages for the AI to read.
     """
-    # only send the text content to the AI, not the UI objects
-    return [m["content"] for m in st.session_state.messages]
+    # only the summary and the turns that fit in the token budget
+    memory = get_conversation_memory()
+    history = [m["content"] for m in memory.recent_messages()]
+    return ([memory.summary] if memory.summary else []) + history
 
 def add_user_message(content):
     """
     Saves what YOU typed.
     """
-    st.session_state.messages.append({"role": "user", "content": content})
+    get_conversation_memory().add("user", content)
 
 def add_ai_message(content):
     """
     Saves what the AI replied.
     """
-    st.session_state.messages.append({"role": "model", "content": content})
\ No newline at end of file
+    get_conversation_memory().add("model", content)
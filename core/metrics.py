@@ -0,0 +1,137 @@
+"""
+Metrics - In-Process Time Series Ring Buffer
+Low-overhead counters for the admin page's live charts. Every
+record_metric call adds one value to a fixed-size time slot (count, sum
+and max per label set), and slots older than the window are overwritten,
+so memory stays constant however long the server runs:
+
+    record_metric("gemini.tokens", 812, key="…a1b2")
+    times, columns = metric_series("gemini.tokens", "sum", per_minute=True)
+
+Recorded by the app:
+    gemini.requests / gemini.tokens / gemini.error   per key (error is 0/1)
+    gemini.lease_wait_s                              time to get a key per request
+    cache.hit                                        per cache (0/1)
+    stage.latency_s / stage.error                    per traced stage (0/1)
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# ============================================================================
+# SETTINGS
+# ============================================================================
+
+RESOLUTION_S = 10           # Width of one time slot
+WINDOW_SLOTS = 360          # Slots kept (10s x 360 = the last hour)
+
+STATS = ("count", "sum", "mean", "max")
+
+
+# ============================================================================
+# RING BUFFER
+# ============================================================================
+
+class _Slot:
+    __slots__ = ("epoch", "values")
+
+    def __init__(self):
+        self.epoch = -1
+        # (name, labels) -> [count, sum, max]
+        self.values: Dict[Tuple[str, tuple], list] = {}
+
+
+class MetricsRing:
+    """Thread-safe ring of time slots (see the module docstring)."""
+
+    def __init__(self, resolution_s: float = RESOLUTION_S, slots: int = WINDOW_SLOTS):
+        self.resolution_s = resolution_s
+        self.slots = [_Slot() for _ in range(slots)]
+        self._lock = threading.Lock()
+
+    def record(self, name: str, value: float = 1.0, labels: tuple = (), now: Optional[float] = None):
+        epoch = int((time.time() if now is None else now) // self.resolution_s)
+        slot = self.slots[epoch % len(self.slots)]
+        with self._lock:
+            if slot.epoch != epoch:
+                slot.epoch = epoch
+                slot.values = {}
+            entry = slot.values.get((name, labels))
+            if entry is None:
+                slot.values[(name, labels)] = [1, value, value]
+            else:
+                entry[0] += 1
+                entry[1] += value
+                if value > entry[2]:
+                    entry[2] = value
+
+    def series(self, name: str, stat: str = "sum", window_s: Optional[float] = None,
+               per_minute: bool = False, now: Optional[float] = None
+               ) -> Tuple[List[datetime], Dict[str, List[Optional[float]]]]:
+        """
+        One column per label set over the window, oldest slot first.
+
+        Args:
+            name: Metric name
+            stat: "count", "sum", "mean" or "max" of the values in a slot
+            window_s: Seconds to return (default: the whole ring)
+            per_minute: Scale count/sum to a per-minute rate (e.g. RPM, TPM)
+
+        Returns:
+            (slot start times, {label: values}); empty slots are 0 for
+            count/sum and None for mean/max
+        """
+        if stat not in STATS:
+            raise ValueError(f"stat must be one of {STATS}")
+        last = int((time.time() if now is None else now) // self.resolution_s)
+        count = min(len(self.slots), int((window_s or len(self.slots) * self.resolution_s) // self.resolution_s) or 1)
+        epochs = range(last - count + 1, last + 1)
+        scale = 60 / self.resolution_s if per_minute and stat in ("count", "sum") else 1.0
+        empty = 0.0 if stat in ("count", "sum") else None
+
+        columns: Dict[str, List[Optional[float]]] = {}
+        with self._lock:
+            for i, epoch in enumerate(epochs):
+                slot = self.slots[epoch % len(self.slots)]
+                if slot.epoch != epoch:
+                    continue
+                for (metric, labels), (n, total, peak) in slot.values.items():
+                    if metric != name:
+                        continue
+                    column = columns.setdefault(_column(labels), [empty] * count)
+                    value = {"count": n, "sum": total, "mean": total / n, "max": peak}[stat]
+                    column[i] = value * scale
+
+        times = [datetime.fromtimestamp(epoch * self.resolution_s) for epoch in epochs]
+        return times, columns
+
+    def clear(self):
+        with self._lock:
+            for slot in self.slots:
+                slot.epoch = -1
+                slot.values = {}
+
+
+def _column(labels: tuple) -> str:
+    return ", ".join(str(value) for _, value in labels) or "all"
+
+
+_ring = MetricsRing()
+
+
+def record_metric(name: str, value: float = 1.0, **labels):
+    """Add one value to the current time slot of a metric."""
+    _ring.record(name, value, tuple(sorted(labels.items())))
+
+
+def metric_series(name: str, stat: str = "sum", window_s: Optional[float] = None,
+                  per_minute: bool = False) -> Tuple[List[datetime], Dict[str, List[Optional[float]]]]:
+    """Time series of a metric (see MetricsRing.series)."""
+    return _ring.series(name, stat, window_s, per_minute)
+
+
+def reset_metrics():
+    """Drop all recorded values."""
+    _ring.clear()
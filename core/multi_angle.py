@@ -0,0 +1,497 @@
+"""
+Multi-Angle Analysis - Map-Reduce Mode
+Analyzes each photo of a multi-angle set on its own, in parallel and
+spread over the API keys (map), then merges the per-angle results locally
+and deterministically (reduce): leaf counts and sizes by median, colors by
+per-channel median, categories by vote, and the health picture from the
+most severe angle plus the union of where disease was seen.
+
+A small text-only model is asked to reconcile the plant identity and
+health only when the angles disagree. Failed or timed-out angles are
+dropped, and per-image results are cached by image content so a photo
+that is re-uploaded is not analyzed again.
+"""
+
+import asyncio
+import hashlib
+import json
+import statistics
+import threading
+from collections import Counter, OrderedDict
+from io import BytesIO
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import streamlit as st
+
+from core.gemini_client import GeminiClient
+from core.metrics import record_metric
+from core.schemas import AngleAnalysis, MultiAngleAnalysis
+from core.structured_output import (
+    agenerate_structured, json_generation_config, parse_json_lenient, validate_fields
+)
+
+if TYPE_CHECKING:
+    from google.genai import types
+
+# ============================================================================
+# MAP-REDUCE SETTINGS
+# ============================================================================
+
+MAX_IMAGE_SIDE = 1024           # Photos are downscaled to this before the map step
+ANGLE_TIMEOUT_S = 60            # A slower angle is dropped from the merge
+ANGLE_CACHE_SIZE = 128          # Per-image results kept in memory
+RECONCILE_MODEL = "gemini-2.5-flash-lite"
+
+# The angles disagree (and are reconciled) beyond these
+HEALTH_SPREAD_LIMIT = 25        # Points of overall_health_percentage
+SEVERITY_GAP_LIMIT = 2          # Steps on the severity scale below
+
+SEVERITY_LEVELS = ["None", "Mild", "Moderate", "Severe"]
+VIEWS = ["front", "back", "top", "side", "underside"]
+
+# Bump when ANGLE_PROMPT changes so cached per-image results are not reused
+ANGLE_PROMPT_VERSION = 1
+
+ANGLE_PROMPT = """
+You are an expert 3D botanical modeler. This is ONE photo from a set of photos of the same plant taken from different angles; the other angles are analyzed separately and merged afterwards.
+
+Describe only what is visible in THIS photo.
+
+Return ONLY a JSON object with this exact structure (no markdown):
+{
+    "view": "front" or "back" or "top" or "side" or "underside",
+    "view_notes": "What this angle shows (visible parts, damage, structure)",
+
+    "identified_plant": {
+        "common_name": "Plant Name",
+        "scientific_name": "Scientific name",
+        "plant_family": "Family name",
+        "growth_stage": "vegetative" or "flowering" or "fruiting" or "mature",
+        "confidence": 0.95
+    },
+
+    "plant_architecture": {
+        "overall_form": "rosette" or "bushy" or "upright" or "vining" or "columnar" or "spreading",
+        "symmetry": "radial" or "bilateral" or "asymmetric",
+        "height_cm": 40,
+        "width_cm": 50,
+        "has_central_head": false,
+        "head_type": "none" or "cauliflower" or "cabbage" or "broccoli" or "lettuce",
+        "fruit_type": "none" or "tomato" or "pepper" or "eggplant" or "cucumber",
+        "fruit_count": 0,
+        "fruit_color_hex": "#FF0000"
+    },
+
+    "leaf_system": {
+        "arrangement": "rosette" or "alternate" or "opposite" or "whorled",
+        "total_count": 12,
+        "shape": "oval" or "elongated" or "heart" or "lobed" or "wavy",
+        "primary_color_hex": "#228B22",
+        "secondary_color_hex": "#90EE90",
+        "underside_color_hex": "#98FB98",
+        "waviness": 0.3,
+        "orientation": "upward" or "outward" or "drooping" or "cupping"
+    },
+
+    "health_analysis": {
+        "overall_health_percentage": 85,
+        "health_status": "Healthy" or "Disease Name",
+        "disease_severity": "None" or "Mild" or "Moderate" or "Severe",
+        "affected_leaves_count": 0,
+        "affected_area_percent": 5,
+        "disease_locations": ["top leaves", "underside of lower leaves"],
+        "symptoms_observed": ["yellowing", "spots", "wilting"],
+        "diseases_detected": []
+    },
+
+    "container": {
+        "type": "pot" or "ground" or "raised_bed" or "field",
+        "shape": "round" or "square" or "natural",
+        "material": "terracotta" or "plastic" or "soil",
+        "color_hex": "#8B4513"
+    },
+
+    "environmental_context": {
+        "setting": "indoor" or "outdoor" or "greenhouse" or "field",
+        "lighting": "bright" or "moderate" or "low"
+    },
+
+    "3d_generation_notes": "Details from this angle that matter for 3D modeling",
+
+    "recommended_action": "One sentence recommendation based on this angle"
+}
+"""
+
+RECONCILE_PROMPT = """
+You are an expert Agronomist. The same plant was photographed from several angles and each photo was analyzed separately. The analyses disagree:
+
+{angles}
+
+Decide which identification and health assessment is most plausible for the plant as a whole. Damage seen from any angle counts, even if other angles look healthy.
+
+Return ONLY a JSON object with the keys "identified_plant", "health_analysis" and "recommended_action", using the same fields as the analyses above (no markdown).
+"""
+
+# Per-image results are only cached when these sections came back valid
+CACHED_ANGLE_FIELDS = {"identified_plant", "health_analysis"}
+
+# Keys of MultiAngleAnalysis the reconciliation call may overwrite
+RECONCILED_FIELDS = ["identified_plant", "health_analysis", "recommended_action"]
+
+
+# ============================================================================
+# PER-IMAGE CACHE
+# ============================================================================
+
+class AngleResultCache:
+    """Thread-safe LRU of per-image analyses keyed by image content."""
+
+    def __init__(self, max_size: int = ANGLE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+        record_metric("cache.hit", 0.0 if result is None else 1.0, cache="angle")
+        return result
+
+    def put(self, key: str, result: dict):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+@st.cache_resource
+def get_angle_cache() -> AngleResultCache:
+    """Shared per-image result cache (one per app process)."""
+    return AngleResultCache()
+
+
+def _load_angle_image(image_file) -> Tuple[str, "types.Part"]:
+    """
+    Cache key and downscaled photo for an uploaded file, already encoded as
+    the PNG part the SDK would build from a PIL image. CPU-bound (decode,
+    resize, encode), so the map step runs it off the event loop.
+    """
+    image_file.seek(0)
+    data = image_file.read()
+    key = f"v{ANGLE_PROMPT_VERSION}:{hashlib.sha256(data).hexdigest()}"
+
+    from google.genai import types
+    from PIL import Image
+
+    image = Image.open(BytesIO(data))
+    image.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+    encoded = BytesIO()
+    image.save(encoded, "PNG")
+    return key, types.Part.from_bytes(data=encoded.getvalue(), mime_type="image/png")
+
+
+# ============================================================================
+# MAP: ONE CALL PER ANGLE
+# ============================================================================
+
+async def _analyze_angle(gemini: GeminiClient, image: "types.Part",
+                         api_key: Optional[str]) -> Tuple[dict, Dict[str, str]]:
+    """AngleAnalysis dict for one photo (no repair call, to bound latency)."""
+    async def agenerate(contents: list, generation_config: dict) -> str:
+        return await gemini.agenerate(contents, generation_config, api_key=api_key,
+                                      cached_prompt=("angle", ANGLE_PROMPT))
+
+    return await asyncio.wait_for(
+        agenerate_structured(agenerate, ANGLE_PROMPT, [image], AngleAnalysis, max_repairs=0),
+        timeout=ANGLE_TIMEOUT_S
+    )
+
+
+async def analyze_angles(gemini: GeminiClient, image_files: list) -> List[dict]:
+    """
+    Per-angle analyses, run concurrently with the keys assigned round-robin.
+
+    Args:
+        gemini: Shared GeminiClient
+        image_files: Uploaded image file objects
+
+    Returns:
+        One AngleAnalysis dict per photo that could be analyzed, in upload
+        order. Sections that failed validation are left out so they do not
+        pull the merge towards the defaults.
+    """
+    cache = get_angle_cache()
+    # Decoding and resizing would block every other request on the client's loop
+    loaded = await asyncio.gather(*(asyncio.to_thread(_load_angle_image, f) for f in image_files))
+    keys = gemini.api_manager.available_keys() or [None]
+
+    results: List[Optional[dict]] = [cache.get(key) for key, _ in loaded]
+    pending = [i for i, result in enumerate(results) if result is None]
+    outcomes = await asyncio.gather(
+        *(_analyze_angle(gemini, loaded[i][1], keys[n % len(keys)]) for n, i in enumerate(pending)),
+        return_exceptions=True
+    )
+
+    for i, outcome in zip(pending, outcomes):
+        if isinstance(outcome, BaseException):
+            print(f"Multi-angle: angle {i + 1} failed ({type(outcome).__name__}: {outcome})")
+            continue
+        result, problems = outcome
+        if problems:
+            print(f"Multi-angle: angle {i + 1} missing {', '.join(problems)}")
+            result = {k: v for k, v in result.items() if k not in problems}
+        if not CACHED_ANGLE_FIELDS & problems.keys():
+            cache.put(loaded[i][0], result)
+        results[i] = result
+
+    return [result for result in results if result is not None]
+
+
+# ============================================================================
+# REDUCE: DETERMINISTIC LOCAL MERGE
+# ============================================================================
+
+def _severity_rank(label: Optional[str]) -> int:
+    label = (label or "None").strip().capitalize()
+    return SEVERITY_LEVELS.index(label) if label in SEVERITY_LEVELS else 0
+
+
+def _hex_to_rgb(value: str) -> Optional[Tuple[int, int, int]]:
+    value = value.strip().lstrip("#")
+    if len(value) != 6:
+        return None
+    try:
+        return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+    except ValueError:
+        return None
+
+
+def _merge_colors(values: List[str]) -> Optional[str]:
+    """Per-channel median of hex colors (robust to one odd angle)."""
+    rgbs = [rgb for rgb in map(_hex_to_rgb, values) if rgb]
+    if not rgbs:
+        return None
+    return "#" + "".join(f"{int(statistics.median(channel)):02X}" for channel in zip(*rgbs))
+
+
+def _vote(values: list):
+    """Most common value; ties go to the earliest angle."""
+    counts = Counter(values)
+    best = max(counts.values())
+    return next(v for v in values if counts[v] == best)
+
+
+def _union(lists: List[list]) -> list:
+    """Items of every list, first-seen order, case-insensitive duplicates dropped."""
+    seen, merged = set(), []
+    for items in lists:
+        for item in items or []:
+            key = str(item).strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                merged.append(item)
+    return merged
+
+
+def _merge_values(name: str, values: list):
+    """Merge one field across angles by type."""
+    values = [v for v in values if v is not None and v != ""]
+    if not values:
+        return None
+    if all(isinstance(v, list) for v in values):
+        return _union(values)
+    if all(isinstance(v, bool) for v in values):
+        return _vote(values)
+    if all(isinstance(v, (int, float)) for v in values):
+        median = statistics.median(values)
+        return round(median) if all(isinstance(v, int) for v in values) else median
+    if name.endswith("_hex"):
+        return _merge_colors([str(v) for v in values])
+    return _vote([str(v) for v in values])
+
+
+def _merge_section(sections: List[dict]) -> dict:
+    """Field-by-field merge of one section (e.g. leaf_system)."""
+    names = []
+    for section in sections:
+        names.extend(name for name in section if name not in names)
+    merged = {name: _merge_values(name, [s.get(name) for s in sections]) for name in names}
+    return {name: value for name, value in merged.items() if value is not None}
+
+
+def _present(values) -> List[float]:
+    """Numeric values only (a field an angle did not return is not a 0)."""
+    return [v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool)]
+
+
+def _mean(values) -> Optional[float]:
+    present = _present(values)
+    return round(statistics.mean(present), 1) if present else None
+
+
+def _merge_identity(angles: List[dict]) -> dict:
+    """Confidence-weighted vote on the plant; confidence is the agreeing share."""
+    plants = [a["identified_plant"] for a in angles if a.get("identified_plant")]
+    if not plants:
+        return {}
+
+    weights: Dict[str, float] = {}
+    for plant in plants:
+        name = plant.get("common_name", "").strip().lower()
+        weights[name] = weights.get(name, 0.0) + (plant.get("confidence") or 0.5)
+    winner = max(weights, key=lambda name: (weights[name], -list(weights).index(name)))
+
+    agreeing = [p for p in plants if p.get("common_name", "").strip().lower() == winner]
+    merged = _merge_section(agreeing)
+    merged["confidence"] = round(weights[winner] / len(plants), 2)
+    return merged
+
+
+def _merge_health(angles: List[dict]) -> dict:
+    """
+    Health as seen from all angles: the worst severity and status win,
+    damage counts take the maximum and locations/symptoms are combined.
+    """
+    health = [a["health_analysis"] for a in angles if a.get("health_analysis")]
+    if not health:
+        return {}
+
+    worst = max(health, key=lambda h: (_severity_rank(h.get("disease_severity")),
+                                       -(h.get("overall_health_percentage") or 0)))
+    affected_leaves = _present(h.get("affected_leaves_count") for h in health)
+    merged = {
+        "overall_health_percentage": _mean(h.get("overall_health_percentage") for h in health),
+        "health_status": worst.get("health_status", "Unknown"),
+        "disease_severity": worst.get("disease_severity", "None"),
+        "affected_leaves_count": max(affected_leaves) if affected_leaves else None,
+        "affected_area_percent": _mean(h.get("affected_area_percent") for h in health),
+        "disease_locations": _union([h.get("disease_locations") for h in health]),
+        "symptoms_observed": _union([h.get("symptoms_observed") for h in health]),
+        "diseases_detected": _union([h.get("diseases_detected") for h in health]),
+    }
+    # Fields no angle returned are left to the schema defaults
+    return {name: value for name, value in merged.items() if value is not None}
+
+
+def _merge_observations(angles: List[dict]) -> dict:
+    """multi_angle_observations with one notes field per view."""
+    notes: Dict[str, List[str]] = {}
+    for angle in angles:
+        view = angle.get("view", "").strip().lower()
+        view = view if view in VIEWS else "side"
+        if angle.get("view_notes"):
+            notes.setdefault(view, []).append(angle["view_notes"])
+
+    observations = {"angles_analyzed": len(angles)}
+    for view, texts in notes.items():
+        key = "underside_notes" if view == "underside" else f"{view}_view_notes"
+        observations[key] = " ".join(texts)
+    return observations
+
+
+def merge_angle_results(angles: List[dict]) -> dict:
+    """
+    Combine per-angle analyses into one MultiAngleAnalysis-shaped dict.
+
+    Args:
+        angles: AngleAnalysis dicts (at least one)
+
+    Returns:
+        Merged result with the same keys as the single-call analysis
+    """
+    merged = {
+        "identified_plant": _merge_identity(angles),
+        "multi_angle_observations": _merge_observations(angles),
+        "health_analysis": _merge_health(angles),
+    }
+    for key in ("plant_architecture", "leaf_system", "container", "environmental_context"):
+        merged[key] = _merge_section([a[key] for a in angles if a.get(key)])
+
+    merged["3d_generation_notes"] = " ".join(
+        f"[{a.get('view', 'view')}] {a['3d_generation_notes']}" for a in angles if a.get("3d_generation_notes")
+    )
+    worst = max(angles, key=lambda a: _severity_rank(a.get("health_analysis", {}).get("disease_severity")))
+    merged["recommended_action"] = worst.get("recommended_action", "")
+    return merged
+
+
+def angles_disagree(angles: List[dict]) -> bool:
+    """True if the angles name different plants or differ a lot on health."""
+    names = {a.get("identified_plant", {}).get("common_name", "").strip().lower() for a in angles}
+    names.discard("")
+    health = [a["health_analysis"] for a in angles if a.get("health_analysis")]
+    percentages = _present(h.get("overall_health_percentage") for h in health)
+    ranks = [_severity_rank(h.get("disease_severity")) for h in health]
+
+    return (
+        len(names) > 1
+        or (bool(percentages) and max(percentages) - min(percentages) > HEALTH_SPREAD_LIMIT)
+        or (bool(ranks) and max(ranks) - min(ranks) >= SEVERITY_GAP_LIMIT)
+    )
+
+
+async def reconcile(gemini: GeminiClient, angles: List[dict], merged: dict) -> dict:
+    """
+    Ask the small text-only model to settle identity and health.
+
+    Returns merged with the reconciled sections applied, or unchanged if
+    the call fails.
+    """
+    summary = [
+        {"view": a.get("view"), **{k: a[k] for k in RECONCILED_FIELDS if k in a}}
+        for a in angles
+    ]
+    prompt = RECONCILE_PROMPT.format(angles=json.dumps(summary, indent=2))
+    try:
+        text = await gemini.agenerate(
+            [prompt], json_generation_config(MultiAngleAnalysis, RECONCILED_FIELDS), model=RECONCILE_MODEL
+        )
+    except Exception as e:
+        print(f"Multi-angle: reconciliation failed, keeping local merge ({e})")
+        return merged
+
+    patch = parse_json_lenient(text) or {}
+    patch, problems = validate_fields({k: v for k, v in patch.items() if k in RECONCILED_FIELDS}, MultiAngleAnalysis)
+    for key in RECONCILED_FIELDS:
+        if key in patch and key not in problems:
+            value = patch[key]
+            merged[key] = {**merged.get(key, {}), **value} if isinstance(value, dict) else value
+    return merged
+
+
+# ============================================================================
+# ENTRY POINTS
+# ============================================================================
+
+async def analyze_multi_angle_map_reduce_async(gemini: GeminiClient, image_files: list) -> dict:
+    """
+    Map-reduce multi-angle analysis.
+
+    Args:
+        gemini: Shared GeminiClient
+        image_files: Uploaded image file objects
+
+    Returns:
+        Dictionary in the same shape as analyze_multi_angle_images
+
+    Raises:
+        RuntimeError: If no angle could be analyzed
+    """
+    angles = await analyze_angles(gemini, image_files)
+    if not angles:
+        raise RuntimeError("None of the angles could be analyzed")
+
+    merged = merge_angle_results(angles)
+    if len(angles) > 1 and angles_disagree(angles):
+        merged = await reconcile(gemini, angles, merged)
+
+    return MultiAngleAnalysis.model_validate(merged).model_dump(by_alias=True, exclude_none=True)
+
+
+def analyze_multi_angle_map_reduce(gemini: GeminiClient, image_files: list) -> dict:
+    """Blocking version of analyze_multi_angle_map_reduce_async."""
+    # On the client's own event loop: its async transport cannot move between loops
+    return gemini.run(analyze_multi_angle_map_reduce_async(gemini, image_files))
@@ -0,0 +1,163 @@
+"""
+Prompt Cache - Gemini Context Caching for Static Prompts
+Registers large, unchanging prompt prefixes (e.g. the plant-structure
+schema) as cached contents, once per API key, so each request only sends
+the images and the dynamic part of the prompt.
+
+Cached contents belong to the key that created them, expire after a TTL
+and are refreshed shortly before they do. Prompts too small to cache, or
+caches that cannot be created, fall back to sending the prompt inline.
+"""
+
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from core.metrics import record_metric
+
+if TYPE_CHECKING:
+    from google import genai
+
+# ============================================================================
+# CACHE SETTINGS
+# ============================================================================
+
+CACHE_TTL = timedelta(hours=1)
+REFRESH_MARGIN = timedelta(minutes=5)   # Extend caches this close to expiry
+RETRY_AFTER = timedelta(minutes=15)     # Wait before retrying a failed cache
+
+# Gemini rejects cached contents below a minimum size (estimated 4 chars/token)
+MIN_CACHE_TOKENS = 1024
+
+# Short text sent instead of a cached prompt
+CACHED_PROMPT_REFERENCE = "Follow the instructions above for the attached image(s)."
+
+
+@dataclass
+class CachedPrompt:
+    """One cached prompt on one API key."""
+    name: str                # Cached content resource name
+    client: "genai.Client"   # Client of the key that owns the cache
+    expires_at: datetime
+
+    def needs_refresh(self, now: datetime) -> bool:
+        return now >= self.expires_at - REFRESH_MARGIN
+
+
+class PromptCacheManager:
+    """
+    Cached contents per (prompt, API key) with TTL refresh.
+    Thread-safe; owned by the shared GeminiClient.
+    """
+
+    def __init__(self, model_name: str, ttl: timedelta = CACHE_TTL):
+        self.model_name = model_name
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, str], CachedPrompt] = {}
+        self._unavailable: Dict[Tuple[str, str], datetime] = {}
+        self._slot_locks: Dict[Tuple[str, str], threading.Lock] = {}   # Held while creating or refreshing
+        self._lock = threading.Lock()                                   # Guards the dicts only
+
+    def _ttl(self) -> str:
+        return f"{int(self.ttl.total_seconds())}s"
+
+    def _create(self, client: "genai.Client", prompt: str, name: str) -> CachedPrompt:
+        from google.genai import types
+
+        cache = client.caches.create(
+            model=self.model_name,
+            config=types.CreateCachedContentConfig(
+                display_name=f"ani-{name}",
+                contents=[types.Content(role="user", parts=[types.Part(text=prompt)])],
+                ttl=self._ttl()
+            )
+        )
+        return CachedPrompt(name=cache.name, client=client, expires_at=datetime.now() + self.ttl)
+
+    def _refresh(self, entry: CachedPrompt, prompt: str, name: str) -> CachedPrompt:
+        """Extend the TTL, or re-create the cache if it already expired."""
+        from google.genai import types
+
+        try:
+            entry.client.caches.update(
+                name=entry.name, config=types.UpdateCachedContentConfig(ttl=self._ttl())
+            )
+            entry.expires_at = datetime.now() + self.ttl
+            return entry
+        except Exception:
+            return self._create(entry.client, prompt, name)
+
+    def get_cache_name(self, name: str, prompt: str, api_key: Optional[str],
+                       client: "genai.Client") -> Optional[str]:
+        """
+        Cached content for a prompt on the given key.
+
+        Args:
+            name: Stable prompt identifier
+            prompt: Static prompt text to cache
+            api_key: Key the request is sent with
+            client: Client for that key
+
+        Returns:
+            Cached content name for GenerateContentConfig.cached_content, or
+            None if the prompt should be sent inline (too small, no key, or
+            caching failed)
+        """
+        if not api_key or len(prompt) // 4 < MIN_CACHE_TOKENS:
+            return None
+
+        slot = (name, api_key)
+        now = datetime.now()
+        with self._lock:
+            if self._unavailable.get(slot, now) > now:
+                return None
+            entry = self._entries.get(slot)
+            if entry is not None and not entry.needs_refresh(now):
+                record_metric("cache.hit", 1.0, cache="prompt")
+                return entry.name
+            slot_lock = self._slot_locks.setdefault(slot, threading.Lock())
+
+        # One create/refresh per slot; other prompts and keys are not blocked
+        with slot_lock:
+            with self._lock:
+                if self._unavailable.get(slot, now) > now:
+                    return None
+                entry = self._entries.get(slot)
+            record_metric("cache.hit", 0.0 if entry is None else 1.0, cache="prompt")
+            if entry is not None and not entry.needs_refresh(datetime.now()):
+                return entry.name       # Another request just created or refreshed it
+
+            try:
+                if entry is None:
+                    entry = self._create(client, prompt, name)
+                else:
+                    entry = self._refresh(entry, prompt, name)
+            except Exception as e:
+                print(f"Prompt cache unavailable for {name}: {e}")
+                with self._lock:
+                    self._entries.pop(slot, None)
+                    self._unavailable[slot] = now + RETRY_AFTER
+                return None
+
+            with self._lock:
+                self._entries[slot] = entry
+                self._unavailable.pop(slot, None)
+            return entry.name
+
+    def invalidate(self, name: str, api_key: str):
+        """Drop a cache that the API rejected (e.g. deleted or expired early)."""
+        with self._lock:
+            self._entries.pop((name, api_key), None)
+
+    def clear(self):
+        """Delete every cached prompt (e.g. when prompts change)."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            self._unavailable.clear()
+        for entry in entries:
+            try:
+                entry.client.caches.delete(name=entry.name)
+            except Exception:
+                pass
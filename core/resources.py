@@ -0,0 +1,271 @@
+"""
+Resources - Process-Wide Shared Clients
+One instance of each expensive, thread-safe object per server process,
+shared by every session and rerun:
+
+    api_keys    APIKeyManager (Gemini keys loaded from secrets)
+    gemini      GeminiClient (pooled google.genai client per key)
+    supabase    Supabase client
+
+Each resource is built on first use, or ahead of the first request by
+start_resource_warm_up(). A cheap health check runs on access at most
+every CHECK_INTERVAL_S; a resource that fails it, or that is invalidated,
+is rebuilt on the next access. A build that fails is retried after
+RETRY_AFTER_S instead of on every rerun.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import streamlit as st
+
+from core.metrics import record_metric
+from core.tracing import span
+
+# ============================================================================
+# SETTINGS
+# ============================================================================
+
+CHECK_INTERVAL_S = 30       # Health checks run at most this often per resource
+RETRY_AFTER_S = 15          # Wait before rebuilding a resource whose build failed
+
+
+class ResourceUnavailable(RuntimeError):
+    """A resource's last build failed and is not retried yet."""
+
+
+@dataclass
+class ResourceSpec:
+    name: str
+    factory: Callable[[], Any]
+    health_check: Optional[Callable[[Any], bool]] = None    # False or raising = rebuild
+    warm_up: Optional[Callable[[Any], None]] = None         # Extra start-up work (imports, pools)
+    dispose: Optional[Callable[[Any], None]] = None         # Release a discarded instance
+
+
+_MISSING = object()
+
+
+@dataclass
+class _Entry:
+    spec: ResourceSpec
+    instance: Any = _MISSING
+    created_at: Optional[float] = None      # Wall clock, for display
+    checked_at: float = 0.0                 # Monotonic time of the last health check
+    builds: int = 0
+    failures: int = 0
+    last_error: Optional[str] = None
+    retry_at: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+class ResourceRegistry:
+    """Thread-safe, lazily built singletons (see the module docstring)."""
+
+    def __init__(self, check_interval_s: float = CHECK_INTERVAL_S, retry_after_s: float = RETRY_AFTER_S):
+        self.check_interval_s = check_interval_s
+        self.retry_after_s = retry_after_s
+        self._entries: Dict[str, _Entry] = {}
+
+    def register(self, spec: ResourceSpec):
+        self._entries[spec.name] = _Entry(spec)
+
+    def get(self, name: str) -> Any:
+        """
+        The shared instance of a resource, built or rebuilt if needed.
+
+        Raises:
+            KeyError: Unknown resource
+            ResourceUnavailable: The last build failed less than RETRY_AFTER_S ago
+            Exception: Whatever the factory raised when building now
+        """
+        entry = self._entries[name]
+
+        # Fast path: no lock while the instance is fresh
+        instance = entry.instance
+        if instance is not _MISSING and time.monotonic() - entry.checked_at < self.check_interval_s:
+            return instance
+
+        with entry.lock:
+            now = time.monotonic()
+            if entry.instance is not _MISSING and now - entry.checked_at >= self.check_interval_s:
+                if self._healthy(entry):
+                    entry.checked_at = now
+                else:
+                    self._discard(entry, "health check failed")
+
+            if entry.instance is _MISSING:
+                if now < entry.retry_at:
+                    raise ResourceUnavailable(f"{name} unavailable: {entry.last_error}")
+                self._build(entry)
+            return entry.instance
+
+    def invalidate(self, name: str, reason: str = "invalidated"):
+        """Drop a resource (e.g. a broken connection); it is rebuilt on next access."""
+        entry = self._entries[name]
+        with entry.lock:
+            entry.retry_at = 0.0
+            if entry.instance is not _MISSING:
+                self._discard(entry, reason)
+
+    def warm_up(self, names: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+        """
+        Build resources (and run their warm-up step) ahead of first use.
+
+        Returns:
+            {name: error message, or None if the resource is ready}
+        """
+        results = {}
+        for name in names or list(self._entries):
+            # Runs on a background thread: problems are recorded, never shown
+            entry = self._entries[name]
+            try:
+                instance = self.get(name)
+                if not self._healthy(entry):
+                    results[name] = entry.last_error or "health check failed"
+                    continue
+                if entry.spec.warm_up:
+                    with span("resource.warm_up", resource=name):
+                        entry.spec.warm_up(instance)
+                results[name] = None
+            except Exception as e:
+                results[name] = str(e)
+                if entry.instance is not _MISSING:
+                    entry.last_error = f"warm-up: {e}"
+                print(f"Resource {name} warm-up failed: {e}")
+        return results
+
+    def status(self) -> List[dict]:
+        """One row per resource for the admin page."""
+        rows = []
+        for name, entry in self._entries.items():
+            ready = entry.instance is not _MISSING
+            rows.append({
+                "resource": name,
+                "state": "ready" if ready else ("failed" if entry.last_error else "not built"),
+                "builds": entry.builds,
+                "failures": entry.failures,
+                "created_at": entry.created_at if ready else None,
+                "last_error": entry.last_error,
+            })
+        return rows
+
+    def _healthy(self, entry: _Entry) -> bool:
+        check = entry.spec.health_check
+        if check is None:
+            return True
+        try:
+            return bool(check(entry.instance))
+        except Exception as e:
+            entry.last_error = f"health check: {e}"
+            return False
+
+    def _build(self, entry: _Entry):
+        name = entry.spec.name
+        started = time.perf_counter()
+        try:
+            with span("resource.build", resource=name):
+                instance = entry.spec.factory()
+        except Exception as e:
+            entry.failures += 1
+            entry.last_error = str(e)
+            entry.retry_at = time.monotonic() + self.retry_after_s
+            record_metric("resource.build_error", resource=name)
+            print(f"Resource {name} could not be built: {e}")
+            raise
+
+        entry.instance = instance
+        entry.created_at = time.time()
+        entry.checked_at = time.monotonic()
+        entry.builds += 1
+        entry.last_error = None
+        entry.retry_at = 0.0
+        record_metric("resource.build_s", time.perf_counter() - started, resource=name)
+
+    def _discard(self, entry: _Entry, reason: str):
+        old, entry.instance = entry.instance, _MISSING
+        entry.last_error = entry.last_error or reason
+        if entry.spec.dispose:
+            try:
+                entry.spec.dispose(old)
+            except Exception as e:
+                print(f"Resource {entry.spec.name} was not disposed cleanly: {e}")
+
+
+# ============================================================================
+# APP RESOURCES
+# ============================================================================
+
+def _create_api_keys():
+    from core.api_key_manager import APIKeyManager
+    return APIKeyManager()
+
+
+def _api_keys_healthy(manager) -> bool:
+    if not manager.keys:
+        # Keys missing (e.g. secrets added after start-up): reload them
+        raise RuntimeError(manager.load_error or "No Gemini API keys loaded")
+    return True
+
+
+def _dispose_api_keys(manager):
+    # The manager is a class-level singleton; drop it so secrets are read again
+    manager.reset_instance()
+
+
+def _create_gemini():
+    from core.gemini_client import GeminiClient, gemini_base_url
+    return GeminiClient(get_resource("api_keys"), base_url=gemini_base_url())
+
+
+def _create_supabase():
+    from supabase import create_client
+    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
+
+
+_registry = ResourceRegistry()
+_registry.register(ResourceSpec(
+    "api_keys", _create_api_keys,
+    health_check=_api_keys_healthy,
+    dispose=_dispose_api_keys,
+))
+_registry.register(ResourceSpec(
+    "gemini", _create_gemini,
+    # Follow the key manager when it is rebuilt
+    health_check=lambda client: client.api_manager is get_resource("api_keys"),
+    warm_up=lambda client: client.warm_up(),
+    dispose=lambda client: client.close(),
+))
+_registry.register(ResourceSpec("supabase", _create_supabase))
+
+
+def get_resource(name: str) -> Any:
+    """Shared instance of an app resource (see ResourceRegistry.get)."""
+    return _registry.get(name)
+
+
+def invalidate_resource(name: str, reason: str = "invalidated"):
+    """Rebuild an app resource on its next access."""
+    _registry.invalidate(name, reason)
+
+
+def resource_status() -> List[dict]:
+    """Build state of every app resource."""
+    return _registry.status()
+
+
+@st.cache_resource
+def start_resource_warm_up() -> threading.Thread:
+    """
+    Build every app resource once per process on a background thread, so
+    the first scan does not wait for SDK imports and client set-up.
+    """
+    thread = threading.Thread(target=_registry.warm_up, daemon=True, name="resource-warm-up")
+    thread.start()
+    return thread
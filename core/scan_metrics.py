@@ -0,0 +1,124 @@
+"""
+Scan Metrics - Flat, Typed Metrics per Scan
+Gemini analyses put health, severity and confidence under different keys
+depending on which prompt produced them. This module normalizes them once,
+at write time, into the plants_registry metric columns so reads can select
+small numeric columns instead of parsing analysis_json.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+# Bump when extraction rules change; the backfill re-processes older rows
+SCAN_METRICS_VERSION = 1
+
+# analyze_crop_for_simulation reports severity as a label
+SEVERITY_LABELS = {"none": 0.0, "mild": 0.33, "moderate": 0.66, "severe": 1.0}
+
+
+# ============================================================================
+# VALUE COERCION
+# ============================================================================
+
+def _to_float(value: Any) -> Optional[float]:
+    """Number from ints, floats or strings like "85%" (None if not numeric)."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip().rstrip("%"))
+    except ValueError:
+        return None
+
+
+def _first(*values: Any) -> Optional[float]:
+    """First value that coerces to a non-zero number, else the first numeric one."""
+    numbers = [n for n in (_to_float(v) for v in values) if n is not None]
+    return next((n for n in numbers if n != 0), numbers[0] if numbers else None)
+
+
+def _section(data: Any, key: str) -> dict:
+    """Nested dict or {} (tolerates null sections)."""
+    value = data.get(key) if isinstance(data, dict) else None
+    return value if isinstance(value, dict) else {}
+
+
+# ============================================================================
+# METRICS RECORD
+# ============================================================================
+
+@dataclass
+class ScanMetrics:
+    """Metrics stored in dedicated plants_registry columns."""
+    health_percentage: Optional[float] = None  # 0-100
+    disease_severity: Optional[float] = None   # 0 (healthy) - 1 (severe)
+    affected_percentage: Optional[float] = None  # 0-100
+    confidence: Optional[float] = None          # 0-1
+
+    def to_columns(self) -> dict:
+        """Column values for an insert/update."""
+        return {
+            "health_percentage": self.health_percentage,
+            "disease_severity": self.disease_severity,
+            "affected_percentage": self.affected_percentage,
+            "confidence": self.confidence,
+            "metrics_version": SCAN_METRICS_VERSION
+        }
+
+
+def extract_scan_metrics(analysis: Optional[dict]) -> ScanMetrics:
+    """
+    Normalize a scan analysis (crop analysis, optionally with a
+    plant_structure, or a multi-angle analysis) into ScanMetrics.
+    """
+    analysis = analysis if isinstance(analysis, dict) else {}
+    structure = _section(analysis, "plant_structure")
+    health_analysis = _section(analysis, "health_analysis")
+    assessment = _section(analysis, "health_assessment") or _section(structure, "health_assessment")
+
+    severity = _first(assessment.get("severity"), health_analysis.get("severity"))
+    if severity is None:
+        label = str(analysis.get("disease_severity") or health_analysis.get("disease_severity") or "")
+        severity = SEVERITY_LABELS.get(label.strip().lower())
+
+    return ScanMetrics(
+        health_percentage=_first(
+            analysis.get("health_percentage"),
+            health_analysis.get("overall_health_percentage")
+        ),
+        disease_severity=severity,
+        affected_percentage=_first(
+            analysis.get("affected_area_percent"),
+            health_analysis.get("affected_area_percent"),
+            assessment.get("affected_percentage")
+        ),
+        confidence=_first(
+            analysis.get("confidence"),
+            _section(analysis, "identified_plant").get("confidence"),
+            _section(structure, "identified_plant").get("confidence")
+        )
+    )
+
+
+def extract_health(analysis: Optional[dict]) -> float:
+    """Health percentage from a scan analysis (0 if missing)."""
+    return extract_scan_metrics(analysis).health_percentage or 0.0
+
+
+def known_row_health(row: dict) -> Optional[float]:
+    """
+    Health percentage of a plants_registry row: the materialized column
+    when present, otherwise parsed from analysis_json (pre-backfill rows).
+    None if neither has it.
+    """
+    health = _to_float(row.get("health_percentage"))
+    if health is not None:
+        return health
+    return extract_scan_metrics(row.get("analysis_json")).health_percentage
+
+
+def row_health(row: dict) -> float:
+    """Health percentage of a plants_registry row (0 if unknown)."""
+    health = known_row_health(row)
+    return 0.0 if health is None else health
@@ -0,0 +1,251 @@
+"""
+Response Schemas for Gemini JSON Outputs
+Pydantic models for every JSON prompt in core/agent.py. They validate the
+parsed responses and are converted to Gemini's response-schema format, so
+the model is constrained to the same shape the app reads.
+
+Every field has a default: a partial response still validates, and the
+structured-output layer decides which missing/invalid fields to repair.
+"""
+
+from typing import List, Optional, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class GeminiModel(BaseModel):
+    """Base for response models: keeps unknown keys, accepts aliases or names."""
+    model_config = ConfigDict(extra="allow", populate_by_name=True)
+
+
+# ============================================================================
+# QUICK SCAN (ask_gemini)
+# ============================================================================
+
+class ScanResult(GeminiModel):
+    plant_name: str = "Unknown"
+    health_status: str = "Unknown"
+    action_plan: str = ""
+    confidence: float = 0.0
+    category: str = "Crop"
+
+
+# ============================================================================
+# CROP ANALYSIS (analyze_crop_for_simulation)
+# ============================================================================
+
+class CropAnalysis(GeminiModel):
+    plant_name: str = "Unknown"
+    health_status: str = "Unknown"
+    health_percentage: float = 0
+    disease_severity: str = "None"
+    affected_area_percent: float = 0
+    primary_color: str = "#2E7D32"
+    secondary_color: str = "#81C784"
+    disease_color: str = "#8B4513"
+    texture_description: str = ""
+    recommended_action: str = ""
+
+
+# ============================================================================
+# PLANT STRUCTURE (analyze_plant_structure)
+# ============================================================================
+
+class IdentifiedPlant(GeminiModel):
+    common_name: str = "Unknown Plant"
+    scientific_name: Optional[str] = None
+    plant_family: Optional[str] = None
+    growth_stage: Optional[str] = None
+    confidence: Optional[float] = None
+
+
+class PlantArchitecture(GeminiModel):
+    overall_form: Optional[str] = None
+    symmetry: Optional[str] = None
+    height_cm: Optional[float] = None
+    width_cm: Optional[float] = None
+    has_central_head: Optional[bool] = None
+    head_type: Optional[str] = None
+    head_color_hex: Optional[str] = None
+    head_size_ratio: Optional[float] = None
+    fruit_type: Optional[str] = None
+    fruit_color_hex: Optional[str] = None
+    fruit_count: Optional[int] = None
+    fruit_size: Optional[float] = None
+    fruit_stage: Optional[str] = None
+    root_type: Optional[str] = None
+    root_color_hex: Optional[str] = None
+    root_visible: Optional[bool] = None
+
+
+class LeafSystem(GeminiModel):
+    arrangement: Optional[str] = None
+    total_count: Optional[int] = None
+    leaf_layers: Optional[int] = None
+    shape: Optional[str] = None
+    size_cm: Optional[float] = None
+    width_cm: Optional[float] = None
+    thickness: Optional[str] = None
+    texture: Optional[str] = None
+    edge_type: Optional[str] = None
+    curl_amount: Optional[float] = None
+    waviness: Optional[float] = None
+    stiffness: Optional[str] = None
+    primary_color_hex: Optional[str] = None
+    secondary_color_hex: Optional[str] = None
+    underside_color_hex: Optional[str] = None
+    vein_color_hex: Optional[str] = None
+    vein_prominence: Optional[str] = None
+    orientation: Optional[str] = None
+
+
+class StemSystem(GeminiModel):
+    visible: Optional[bool] = None
+    type: Optional[str] = None
+    thickness_cm: Optional[float] = None
+    height_cm: Optional[float] = None
+    color_hex: Optional[str] = None
+
+
+class Container(GeminiModel):
+    type: Optional[str] = None
+    visible: Optional[bool] = None
+    shape: Optional[str] = None
+    material: Optional[str] = None
+    color_hex: Optional[str] = None
+    has_rim: Optional[bool] = None
+
+
+class SoilGround(GeminiModel):
+    visible: Optional[bool] = None
+    type: Optional[str] = None
+    color_hex: Optional[str] = None
+
+
+class EnvironmentalContext(GeminiModel):
+    setting: Optional[str] = None
+    lighting: Optional[str] = None
+    background_plants: Optional[bool] = None
+
+
+class HealthAssessment(GeminiModel):
+    health_status: str = "Healthy"
+    disease_name: str = ""
+    severity: float = 0.0
+    affected_percentage: float = 0
+    affected_areas: List[str] = Field(default_factory=list)
+    issues: List[str] = Field(default_factory=list)
+    disease_pattern: str = "none"
+    disease_color_hex: str = ""
+
+
+class PlantStructure(GeminiModel):
+    identified_plant: IdentifiedPlant = Field(default_factory=IdentifiedPlant)
+    plant_architecture: PlantArchitecture = Field(default_factory=PlantArchitecture)
+    leaf_system: LeafSystem = Field(default_factory=LeafSystem)
+    stem_system: StemSystem = Field(default_factory=StemSystem)
+    container: Container = Field(default_factory=Container)
+    soil_ground: SoilGround = Field(default_factory=SoilGround)
+    environmental_context: EnvironmentalContext = Field(default_factory=EnvironmentalContext)
+    health_assessment: HealthAssessment = Field(default_factory=HealthAssessment)
+    generation_notes: str = Field("", alias="3d_generation_notes")
+
+
+# ============================================================================
+# MULTI-ANGLE ANALYSIS (analyze_multi_angle_images)
+# ============================================================================
+
+class MultiAngleObservations(GeminiModel):
+    angles_analyzed: Optional[int] = None
+    front_view_notes: Optional[str] = None
+    back_view_notes: Optional[str] = None
+    top_view_notes: Optional[str] = None
+    side_view_notes: Optional[str] = None
+    underside_notes: Optional[str] = None
+
+
+class HealthAnalysis(GeminiModel):
+    overall_health_percentage: float = 0
+    health_status: str = "Unknown"
+    disease_severity: str = "None"
+    affected_leaves_count: int = 0
+    affected_area_percent: float = 0
+    disease_locations: List[str] = Field(default_factory=list)
+    symptoms_observed: List[str] = Field(default_factory=list)
+    diseases_detected: List[str] = Field(default_factory=list)
+
+
+class MultiAngleAnalysis(GeminiModel):
+    identified_plant: IdentifiedPlant = Field(default_factory=IdentifiedPlant)
+    multi_angle_observations: MultiAngleObservations = Field(default_factory=MultiAngleObservations)
+    plant_architecture: PlantArchitecture = Field(default_factory=PlantArchitecture)
+    leaf_system: LeafSystem = Field(default_factory=LeafSystem)
+    health_analysis: HealthAnalysis = Field(default_factory=HealthAnalysis)
+    container: Container = Field(default_factory=Container)
+    environmental_context: EnvironmentalContext = Field(default_factory=EnvironmentalContext)
+    generation_notes: str = Field("", alias="3d_generation_notes")
+    recommended_action: str = ""
+
+
+class AngleAnalysis(GeminiModel):
+    """One photo of a multi-angle set, analyzed on its own (map step)."""
+    view: str = "front"
+    view_notes: str = ""
+    identified_plant: IdentifiedPlant = Field(default_factory=IdentifiedPlant)
+    plant_architecture: PlantArchitecture = Field(default_factory=PlantArchitecture)
+    leaf_system: LeafSystem = Field(default_factory=LeafSystem)
+    health_analysis: HealthAnalysis = Field(default_factory=HealthAnalysis)
+    container: Container = Field(default_factory=Container)
+    environmental_context: EnvironmentalContext = Field(default_factory=EnvironmentalContext)
+    generation_notes: str = Field("", alias="3d_generation_notes")
+    recommended_action: str = ""
+
+
+# ============================================================================
+# GEMINI RESPONSE SCHEMA
+# ============================================================================
+
+_SCALAR_TYPES = {str: "STRING", int: "INTEGER", float: "NUMBER", bool: "BOOLEAN"}
+
+
+def _schema_for_annotation(annotation) -> dict:
+    """OpenAPI-subset schema (the format Gemini accepts) for a field type."""
+    origin = get_origin(annotation)
+    if origin is Union:
+        inner = [arg for arg in get_args(annotation) if arg is not type(None)]
+        schema = _schema_for_annotation(inner[0])
+        schema["nullable"] = True
+        return schema
+    if origin in (list, List):
+        return {"type": "ARRAY", "items": _schema_for_annotation(get_args(annotation)[0])}
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return response_schema(annotation)
+    return {"type": _SCALAR_TYPES.get(annotation, "STRING")}
+
+
+def field_names(model: Type[BaseModel]) -> List[str]:
+    """Top-level JSON keys of a model (aliases where set)."""
+    return [info.alias or name for name, info in model.model_fields.items()]
+
+
+def response_schema(model: Type[BaseModel], fields: Optional[List[str]] = None) -> dict:
+    """
+    Gemini response schema for a model.
+
+    Args:
+        model: Response model class
+        fields: Only include these top-level keys (used for repair calls)
+
+    Returns:
+        Schema dict for generation_config["response_schema"]. Non-Optional
+        fields are required; Optional ones may be omitted (sections are
+        shared between prompts that ask for different details).
+    """
+    properties, required = {}, []
+    for name, info in model.model_fields.items():
+        key = info.alias or name
+        if fields is None or key in fields:
+            properties[key] = _schema_for_annotation(info.annotation)
+            if not properties[key].get("nullable"):
+                required.append(key)
+    return {"type": "OBJECT", "properties": properties, "required": required}
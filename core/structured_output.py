@@ -0,0 +1,315 @@
+"""
+Structured Output - Parsing and Repair for Gemini JSON Responses
+Requests JSON with a response schema, parses it leniently (markdown fences,
+trailing text, truncated output), validates it field by field against the
+pydantic models in core.schemas, and re-asks Gemini only for the fields
+that are missing or invalid instead of discarding the whole response.
+"""
+
+import copy
+import json
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from core.schemas import field_names, response_schema
+from core.tracing import span
+
+# Repair calls per analysis (each asks only for the failing fields)
+MAX_REPAIR_ATTEMPTS = 1
+
+# Previous answer is quoted back in the repair prompt, capped to this length
+REPAIR_CONTEXT_CHARS = 4000
+
+# Comma cut points tried when closing a truncated response
+MAX_TRUNCATION_CUTS = 64
+
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_CLOSERS = {"{": "}", "[": "]"}
+
+REPAIR_PROMPT = """
+Your previous JSON answer to the request below had missing or invalid fields:
+{problems}
+
+Previous answer (for reference, may be cut off):
+{previous}
+
+Return ONLY a JSON object with exactly these keys: {keys}.
+Use the same meaning and format the original request describes for them.
+
+Original request:
+{original}
+"""
+
+
+# ============================================================================
+# LENIENT PARSING
+# ============================================================================
+
+def strip_fences(text: Optional[str]) -> str:
+    """Remove markdown code fences around a JSON answer."""
+    return _FENCE.sub("", text or "").strip()
+
+
+def _close_truncated(text: str) -> List[str]:
+    """
+    Candidate completions of a cut-off JSON object: the full text with its
+    open string and brackets closed, then the text cut back to each earlier
+    comma (dropping the incomplete member) and closed.
+    """
+    stack, cuts = [], []
+    in_string = escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "}]" and stack:
+            stack.pop()
+        elif char == ",":
+            cuts.append((i, "".join(reversed(stack))))
+
+    full = text + ('"' if in_string else "")
+    full = full.rstrip().rstrip(",:")
+    candidates = [full + "".join(reversed(stack))]
+    for position, closers in reversed(cuts[-MAX_TRUNCATION_CUTS:]):
+        candidates.append(text[:position] + closers)
+    return candidates
+
+
+def parse_json_lenient(text: Optional[str]) -> Optional[dict]:
+    """
+    Parse the first JSON object in a model answer.
+
+    Handles markdown fences, text around the object, trailing commas and
+    truncated output (max tokens): the longest prefix that can be closed
+    into valid JSON is kept.
+
+    Returns:
+        Parsed dict, or None if no object could be recovered
+    """
+    cleaned = strip_fences(text)
+    start = cleaned.find("{")
+    if start < 0:
+        return None
+    cleaned = cleaned[start:]
+
+    try:
+        data, _ = json.JSONDecoder().raw_decode(cleaned)
+        return data if isinstance(data, dict) else None
+    except json.JSONDecodeError:
+        pass
+
+    without_commas = _TRAILING_COMMA.sub(r"\1", cleaned)
+    for candidate in [without_commas] + _close_truncated(without_commas):
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def parse_partial_json(text: Optional[str]) -> dict:
+    """
+    Members of a JSON object that are already complete in a streamed
+    prefix (a value still being generated is left out, not cut short).
+    """
+    cleaned = strip_fences(text)
+    start = cleaned.find("{")
+    if start < 0:
+        return {}
+    cleaned = cleaned[start:]
+
+    try:
+        data, _ = json.JSONDecoder().raw_decode(cleaned)
+        return data if isinstance(data, dict) else {}
+    except json.JSONDecodeError:
+        pass
+
+    # Skip the first candidate (it closes the unfinished value)
+    for candidate in _close_truncated(cleaned)[1:]:
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return {}
+
+
+# ============================================================================
+# FIELD VALIDATION
+# ============================================================================
+
+def _drop_error_path(data: dict, loc: Sequence) -> bool:
+    """
+    Delete the innermost dict key on an error location, so the model
+    default applies there and valid sibling fields are kept.
+    """
+    parent, key, node = None, None, data
+    for part in loc:
+        if isinstance(node, dict) and part in node:
+            parent, key, node = node, part, node[part]
+        elif isinstance(node, list) and isinstance(part, int) and part < len(node):
+            node = node[part]
+        else:
+            break
+    if parent is None:
+        return False
+    del parent[key]
+    return True
+
+
+def validate_fields(data: Any, schema: Type[BaseModel]) -> Tuple[dict, Dict[str, str]]:
+    """
+    Validate parsed JSON without discarding the valid parts.
+
+    Args:
+        data: Parsed response (anything; non-dicts count as empty)
+        schema: Response model from core.schemas
+
+    Returns:
+        (clean_data, problems): data with invalid values removed, and
+        top-level key -> reason for every missing or invalid field
+    """
+    clean = copy.deepcopy(data) if isinstance(data, dict) else {}
+    problems = {key: "missing" for key in field_names(schema) if clean.get(key) is None}
+
+    while True:
+        try:
+            schema.model_validate(clean)
+            return clean, problems
+        except ValidationError as e:
+            removed = False
+            for error in e.errors():
+                loc = error.get("loc") or ()
+                if loc:
+                    problems.setdefault(str(loc[0]), f"{'.'.join(map(str, loc))}: {error.get('msg')}")
+                removed = _drop_error_path(clean, loc) or removed
+            if not removed:
+                return {}, {key: "invalid" for key in field_names(schema)}
+
+
+def _merge(base: dict, patch: dict) -> dict:
+    """Fill base with patch values (nested sections merged, patch wins)."""
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        elif value is not None:
+            base[key] = value
+    return base
+
+
+# ============================================================================
+# GENERATION WITH REPAIR
+# ============================================================================
+
+def json_generation_config(schema: Type[BaseModel], fields: Optional[List[str]] = None) -> dict:
+    """generation_config for Gemini's JSON mode constrained to a model."""
+    return {
+        "response_mime_type": "application/json",
+        "response_schema": response_schema(schema, fields)
+    }
+
+
+def _repair_prompt(prompt: str, text: Optional[str], problems: Dict[str, str]) -> str:
+    """Follow-up prompt asking only for the failing fields."""
+    return REPAIR_PROMPT.format(
+        problems="\n".join(f"- {key}: {reason}" for key, reason in problems.items()),
+        previous=strip_fences(text)[:REPAIR_CONTEXT_CHARS],
+        keys=", ".join(problems),
+        original=prompt
+    )
+
+
+def _apply_patch(data: dict, patch_text: Optional[str], keys: List[str],
+                 schema: Type[BaseModel]) -> Tuple[dict, Dict[str, str]]:
+    """Merge the repaired fields into data and re-validate."""
+    patch = parse_json_lenient(patch_text) or {}
+    return validate_fields(_merge(data, {k: v for k, v in patch.items() if k in keys}), schema)
+
+
+def _finish(data: dict, schema: Type[BaseModel]) -> dict:
+    """Validated result as a plain dict (aliases as keys, unset optionals omitted)."""
+    return schema.model_validate(data).model_dump(by_alias=True, exclude_none=True)
+
+
+def repair_structured(generate: Callable[[list, dict], str], prompt: str, media: Sequence,
+                      schema: Type[BaseModel], text: Optional[str],
+                      max_repairs: int = MAX_REPAIR_ATTEMPTS) -> Tuple[dict, Dict[str, str]]:
+    """
+    Validate a response already received and repair what is missing.
+
+    Args:
+        generate: Callable(contents, generation_config) -> response text
+        prompt: Prompt that produced text
+        media: Images sent with the prompt (re-sent on repair calls)
+        schema: Response model from core.schemas
+        text: Raw response text (complete or streamed)
+        max_repairs: Follow-up calls for fields that are still missing/invalid
+
+    Returns:
+        (result, problems): the validated result as a plain dict (aliases
+        as keys, unset optional fields omitted) and any fields that fell
+        back to defaults after the repair attempts
+    """
+    with span("parse.json", schema=schema.__name__):
+        data, problems = validate_fields(parse_json_lenient(text), schema)
+
+    for _ in range(max_repairs):
+        if not problems:
+            break
+        keys = list(problems)
+        patch_text = generate([_repair_prompt(prompt, text, problems), *media], json_generation_config(schema, keys))
+        data, problems = _apply_patch(data, patch_text, keys, schema)
+
+    return _finish(data, schema), problems
+
+
+def generate_structured(generate: Callable[[list, dict], str], prompt: str, media: Sequence,
+                        schema: Type[BaseModel],
+                        max_repairs: int = MAX_REPAIR_ATTEMPTS) -> Tuple[dict, Dict[str, str]]:
+    """
+    Run a JSON prompt and return a validated result.
+
+    Same arguments and return value as repair_structured, which is applied
+    to the first response.
+    """
+    text = generate([prompt, *media], json_generation_config(schema))
+    return repair_structured(generate, prompt, media, schema, text, max_repairs)
+
+
+async def arepair_structured(agenerate: Callable[[list, dict], Awaitable[str]], prompt: str,
+                             media: Sequence, schema: Type[BaseModel], text: Optional[str],
+                             max_repairs: int = MAX_REPAIR_ATTEMPTS) -> Tuple[dict, Dict[str, str]]:
+    """Async version of repair_structured (agenerate is awaited)."""
+    with span("parse.json", schema=schema.__name__):
+        data, problems = validate_fields(parse_json_lenient(text), schema)
+
+    for _ in range(max_repairs):
+        if not problems:
+            break
+        keys = list(problems)
+        patch_text = await agenerate([_repair_prompt(prompt, text, problems), *media], json_generation_config(schema, keys))
+        data, problems = _apply_patch(data, patch_text, keys, schema)
+
+    return _finish(data, schema), problems
+
+
+async def agenerate_structured(agenerate: Callable[[list, dict], Awaitable[str]], prompt: str,
+                               media: Sequence, schema: Type[BaseModel],
+                               max_repairs: int = MAX_REPAIR_ATTEMPTS) -> Tuple[dict, Dict[str, str]]:
+    """Async version of generate_structured."""
+    text = await agenerate([prompt, *media], json_generation_config(schema))
+    return await arepair_structured(agenerate, prompt, media, schema, text, max_repairs)
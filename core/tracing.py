@@ -0,0 +1,452 @@
+"""
+Tracing - Per-Stage Spans and Latency Histograms
+Lightweight in-process tracing for the scan and digital-twin pipelines.
+Spans nest through contextvars and carry W3C trace-context ids (32-hex
+trace id, 16-hex span id, `traceparent` header), so they line up with
+OpenTelemetry traces, but nothing needs a collector:
+
+    @traced("db.fetch_all_plants")
+    def fetch_all_plants(): ...
+
+    with span("parse.json", schema="ScanResult"):
+        ...
+
+Finished spans go to a ring buffer of recent spans and to a latency
+histogram per stage, exported in Prometheus text format
+(prometheus_text(), or GET /metrics from start_metrics_server) and shown
+on the admin page.
+"""
+
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import streamlit as st
+
+from core.metrics import record_metric
+
+# ============================================================================
+# SETTINGS
+# ============================================================================
+
+# Upper bounds (seconds) of the histogram buckets, Prometheus style
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RECENT_SPANS = 2000             # Finished spans kept for the trace view
+METRIC_NAME = "ani_stage_duration_seconds"
+
+
+# ============================================================================
+# SPANS
+# ============================================================================
+
+@dataclass
+class Span:
+    """One timed stage; ids follow the W3C trace-context format."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start_time: float = 0.0         # Unix seconds
+    duration_s: float = 0.0
+    status: str = "ok"              # "ok" or "error"
+    error: Optional[str] = None
+    _started: float = 0.0           # perf_counter at start
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header for this span (to propagate the trace)."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_otlp(self) -> dict:
+        """The span in OTLP/JSON form, for sending to a collector if one exists."""
+        start_ns = int(self.start_time * 1e9)
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(start_ns + int(self.duration_s * 1e9)),
+            "attributes": [{"key": k, "value": {"stringValue": str(v)}} for k, v in self.attributes.items()],
+            "status": {"code": 2 if self.status == "error" else 1, "message": self.error or ""},
+        }
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("ani_current_span", default=None)
+
+
+def _new_id(hex_chars: int) -> str:
+    value = os.urandom(hex_chars // 2).hex()
+    # All-zero ids are invalid in W3C trace context
+    return value if value.strip("0") else _new_id(hex_chars)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(trace_id, parent span id) from a traceparent header, or None if invalid."""
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2]
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def current_traceparent() -> Optional[str]:
+    active = _current.get()
+    return active.traceparent if active else None
+
+
+def record_error(error: Exception):
+    """Mark the current span failed for an error that is handled, not raised."""
+    active = _current.get()
+    if active is not None:
+        active.status = "error"
+        active.error = f"{type(error).__name__}: {error}"
+
+
+def _start(name: str, attributes: dict, traceparent: Optional[str] = None) -> Span:
+    parent = _current.get()
+    remote = parse_traceparent(traceparent)
+    if remote:
+        trace_id, parent_id = remote
+    elif parent:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        trace_id, parent_id = _new_id(32), None
+    return Span(name, trace_id, _new_id(16), parent_id, dict(attributes),
+                start_time=time.time(), _started=time.perf_counter())
+
+
+def _finish(active: Span, error: Optional[BaseException] = None):
+    active.duration_s = time.perf_counter() - active._started
+    # st.rerun / st.stop unwind through spans as BaseExceptions; only real errors count
+    if isinstance(error, Exception):
+        active.status = "error"
+        active.error = f"{type(error).__name__}: {error}"
+    _recorder.record(active)
+
+
+@contextmanager
+def span(name: str, traceparent: Optional[str] = None, **attributes) -> Iterator[Span]:
+    """
+    Time a block as a span (a child of the current span, if any).
+
+    Args:
+        name: Stage name, e.g. "db.save_plant_to_db"
+        traceparent: Continue a trace started elsewhere (W3C header)
+        **attributes: Extra details shown with the span
+    """
+    active = _start(name, attributes, traceparent)
+    token = _current.set(active)
+    try:
+        yield active
+    except BaseException as e:
+        _finish(active, e)
+        raise
+    else:
+        _finish(active)
+    finally:
+        _current.reset(token)
+
+
+def traced(name: Optional[str] = None, **attributes):
+    """
+    Decorator: run every call of a function (sync, async, generator or
+    async generator) in a span. Generators are timed from the first item
+    until they are exhausted or closed.
+
+    Args:
+        name: Stage name (default: module.function)
+    """
+    def decorate(func):
+        stage = name or f"{func.__module__}.{func.__qualname__}"
+
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def async_gen_wrapper(*args, **kwargs):
+                active = _start(stage, attributes)
+                agen = func(*args, **kwargs)
+                error = None
+                try:
+                    while True:
+                        token = _current.set(active)
+                        try:
+                            item = await agen.__anext__()
+                        except StopAsyncIteration:
+                            break
+                        finally:
+                            _current.reset(token)
+                        yield item
+                except BaseException as e:
+                    error = e
+                    raise
+                finally:
+                    await agen.aclose()
+                    _finish(active, error)
+            return async_gen_wrapper
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def gen_wrapper(*args, **kwargs):
+                active = _start(stage, attributes)
+                gen = func(*args, **kwargs)
+                error = None
+                try:
+                    while True:
+                        # Current only while the generator body runs, not the caller's loop
+                        token = _current.set(active)
+                        try:
+                            item = next(gen)
+                        except StopIteration:
+                            break
+                        finally:
+                            _current.reset(token)
+                        yield item
+                except BaseException as e:
+                    error = e
+                    raise
+                finally:
+                    gen.close()
+                    _finish(active, error)
+            return gen_wrapper
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+# ============================================================================
+# HISTOGRAMS
+# ============================================================================
+
+class Histogram:
+    """Cumulative-bucket latency histogram (thread-safe)."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)     # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, error: bool = False):
+        index = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+            self.max = max(self.max, seconds)
+            if error:
+                self.errors += 1
+
+    def cumulative(self) -> List[int]:
+        with self._lock:
+            counts = list(self.counts)
+        total, running = [], 0
+        for n in counts:
+            running += n
+            total.append(running)
+        return total
+
+    def quantile(self, q: float) -> float:
+        """Estimated quantile, interpolated within the bucket (like histogram_quantile)."""
+        cumulative = self.cumulative()
+        if not cumulative[-1]:
+            return 0.0
+        rank = q * cumulative[-1]
+        for i, running in enumerate(cumulative):
+            if running >= rank:
+                if i == len(self.buckets):
+                    return self.max
+                lower = self.buckets[i - 1] if i else 0.0
+                below = cumulative[i - 1] if i else 0
+                in_bucket = running - below
+                fraction = (rank - below) / in_bucket if in_bucket else 1.0
+                return min(self.max, lower + (self.buckets[i] - lower) * fraction)
+        return self.max
+
+    def summary(self) -> dict:
+        with self._lock:
+            count, total, errors, slowest = self.count, self.sum, self.errors, self.max
+        return {
+            "count": count,
+            "errors": errors,
+            "mean": total / count if count else 0.0,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": slowest,
+        }
+
+
+class _Recorder:
+    """Process-wide store of finished spans and per-stage histograms."""
+
+    def __init__(self):
+        self.spans: deque = deque(maxlen=RECENT_SPANS)
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str) -> Histogram:
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, Histogram())
+        return histogram
+
+    def record(self, finished: Span):
+        failed = finished.status == "error"
+        self.spans.append(finished)
+        self.histogram(finished.name).observe(finished.duration_s, failed)
+        record_metric("stage.latency_s", finished.duration_s, stage=finished.name)
+        record_metric("stage.error", 1.0 if failed else 0.0, stage=finished.name)
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.histograms = {}
+
+
+_recorder = _Recorder()
+
+
+def stage_histograms() -> Dict[str, Histogram]:
+    """Latency histogram per stage name."""
+    return dict(_recorder.histograms)
+
+
+def recent_spans(limit: Optional[int] = None) -> List[Span]:
+    """Finished spans, oldest first."""
+    spans = list(_recorder.spans)
+    return spans[-limit:] if limit else spans
+
+
+def recent_traces(limit: int = 20) -> List[List[Span]]:
+    """
+    The most recent traces, newest first.
+
+    Returns:
+        One list per trace, its spans ordered by start time
+    """
+    traces: Dict[str, List[Span]] = {}
+    for finished in reversed(_recorder.spans):
+        if finished.trace_id not in traces:
+            if len(traces) >= limit:
+                continue
+            traces[finished.trace_id] = []
+        traces[finished.trace_id].append(finished)
+    return [sorted(spans, key=lambda s: s.start_time) for spans in traces.values()]
+
+
+def reset_tracing():
+    """Drop all recorded spans and histograms."""
+    _recorder.reset()
+
+
+# ============================================================================
+# PROMETHEUS EXPORT
+# ============================================================================
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text() -> str:
+    """All stage histograms in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {METRIC_NAME} Time spent per pipeline stage.",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+    errors = []
+    for stage, histogram in sorted(stage_histograms().items()):
+        label = f'stage="{_label(stage)}"'
+        for bound, running in zip(list(histogram.buckets) + ["+Inf"], histogram.cumulative()):
+            lines.append(f'{METRIC_NAME}_bucket{{{label},le="{bound}"}} {running}')
+        lines.append(f"{METRIC_NAME}_sum{{{label}}} {histogram.sum:.6f}")
+        lines.append(f"{METRIC_NAME}_count{{{label}}} {histogram.count}")
+        errors.append(f"ani_stage_errors_total{{{label}}} {histogram.errors}")
+    lines += ["# HELP ani_stage_errors_total Failed calls per pipeline stage.",
+              "# TYPE ani_stage_errors_total counter", *errors]
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve prometheus_text() at GET /metrics on a background thread.
+
+    Returns:
+        The server (server.shutdown() stops it)
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-server").start()
+    return server
+
+
+@st.cache_resource
+def start_metrics_exporter() -> Optional[ThreadingHTTPServer]:
+    """
+    Start the /metrics server once per process when METRICS_PORT is set
+    in secrets or the environment (None when unset or the port is taken).
+    """
+    port = os.environ.get("METRICS_PORT")
+    try:
+        if "METRICS_PORT" in st.secrets:
+            port = st.secrets["METRICS_PORT"]
+    except Exception:
+        pass
+    if not port:
+        return None
+
+    try:
+        return start_metrics_server(int(port))
+    except (OSError, ValueError) as e:
+        print(f"Metrics server not started on port {port}: {e}")
+        return None
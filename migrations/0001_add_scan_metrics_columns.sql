@@ -0,0 +1,19 @@
+-- Flat per-scan metrics, extracted from analysis_json at write time
+-- (core/scan_metrics.py). "confidence" already exists on plants_registry.
+-- Existing rows are filled by: python -m services.backfill_scan_metrics
+
+ALTER TABLE plants_registry
+    ADD COLUMN IF NOT EXISTS health_percentage real,
+    ADD COLUMN IF NOT EXISTS disease_severity real,
+    ADD COLUMN IF NOT EXISTS affected_percentage real,
+    ADD COLUMN IF NOT EXISTS metrics_version smallint;
+
+-- Trend queries read one plant's (or one device's) scans in time order
+CREATE INDEX IF NOT EXISTS plants_registry_tracking_created_idx
+    ON plants_registry (tracking_id, created_at DESC)
+    WHERE tracking_id IS NOT NULL;
+
+-- Lets the backfill find unprocessed rows without a full scan
+CREATE INDEX IF NOT EXISTS plants_registry_metrics_pending_idx
+    ON plants_registry (id)
+    WHERE metrics_version IS NULL;
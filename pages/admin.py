@@ -0,0 +1,243 @@
+import streamlit as st
+import pandas as pd
+from config.admin_access import is_operator
+from core.api_key_manager import render_api_usage_dashboard
+from core.metrics import metric_series, reset_metrics
+from core.resources import invalidate_resource, resource_status
+from core.tracing import prometheus_text, recent_traces, reset_tracing, stage_histograms
+
+WINDOWS = {"Last 15 minutes": 15 * 60, "Last hour": 60 * 60}
+REFRESH_SECONDS = 10
+
+
+def _series_frame(name: str, stat: str, window_s: int, per_minute: bool = False,
+                  scale: float = 1.0, prefixes: tuple = ()) -> pd.DataFrame:
+    """A metric from the ring buffer as a chartable frame (one column per label)."""
+    times, columns = metric_series(name, stat, window_s, per_minute)
+    if prefixes:
+        columns = {label: values for label, values in columns.items() if label.startswith(prefixes)}
+    frame = pd.DataFrame(columns, index=pd.DatetimeIndex(times, name="time"), dtype=float)
+    return frame * scale
+
+
+def _chart(title: str, frame: pd.DataFrame, caption: str = ""):
+    st.markdown(f"**{title}**")
+    if frame.empty or frame.isna().all().all():
+        st.caption("No data in this window yet.")
+    else:
+        st.line_chart(frame, height=220)
+    if caption:
+        st.caption(caption)
+
+
+def render_live_metrics(window_s: int):
+    """Time-series charts from the in-process metrics ring buffer."""
+    col1, col2 = st.columns(2)
+    with col1:
+        _chart("📤 Requests per minute by key",
+               _series_frame("gemini.requests", "count", window_s, per_minute=True),
+               "Compare with the RPM limit in the API Keys tab.")
+    with col2:
+        _chart("🔤 Tokens per minute by key",
+               _series_frame("gemini.tokens", "sum", window_s, per_minute=True))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        _chart("❌ Gemini error rate by key",
+               _series_frame("gemini.error", "mean", window_s, scale=100),
+               "Percent of requests that failed (rate limits included).")
+    with col2:
+        _chart("⏳ Key lease wait",
+               _series_frame("gemini.lease_wait_s", "max", window_s, scale=1000),
+               "Slowest wait (ms) for an API key per interval; grows when sessions queue on the key manager.")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        _chart("🎯 Cache hit ratio",
+               _series_frame("cache.hit", "mean", window_s, scale=100),
+               "Percent of lookups answered from the prompt / angle caches.")
+    with col2:
+        _chart("🗄️ DB query latency",
+               _series_frame("stage.latency_s", "mean", window_s, scale=1000, prefixes=("db.", "storage.")),
+               "Mean ms per query or upload.")
+
+    _chart("🚨 Error rate by stage",
+           _series_frame("stage.error", "mean", window_s, scale=100),
+           "Percent of failed calls per traced stage.")
+
+
+def render_stage_latencies():
+    """Latency per pipeline stage (estimated from the histogram buckets)."""
+    st.markdown("### ⏱️ Stage Latencies")
+    histograms = stage_histograms()
+
+    if not histograms:
+        st.info("No traced calls yet. Scan a plant or open the Digital Twin to collect timings.")
+        return
+
+    rows = []
+    for stage, histogram in sorted(histograms.items()):
+        summary = histogram.summary()
+        rows.append({
+            "stage": stage,
+            "calls": summary["count"],
+            "errors": summary["errors"],
+            "mean_ms": summary["mean"] * 1000,
+            "p50_ms": summary["p50"] * 1000,
+            "p95_ms": summary["p95"] * 1000,
+            "p99_ms": summary["p99"] * 1000,
+            "max_ms": summary["max"] * 1000,
+        })
+
+    st.dataframe(
+        pd.DataFrame(rows),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "stage": st.column_config.TextColumn("Stage", width="medium"),
+            "calls": st.column_config.NumberColumn("Calls"),
+            "errors": st.column_config.NumberColumn("Errors"),
+            "mean_ms": st.column_config.NumberColumn("Mean", format="%.0f ms"),
+            "p50_ms": st.column_config.NumberColumn("p50", format="%.0f ms"),
+            "p95_ms": st.column_config.NumberColumn("p95", format="%.0f ms"),
+            "p99_ms": st.column_config.NumberColumn("p99", format="%.0f ms"),
+            "max_ms": st.column_config.NumberColumn("Max", format="%.0f ms"),
+        }
+    )
+
+
+def render_recent_traces():
+    """Waterfall of one recent trace (one page run or background job)."""
+    st.markdown("### 🧵 Recent Traces")
+    traces = recent_traces(limit=25)
+
+    if not traces:
+        st.info("No traces recorded yet.")
+        return
+
+    def describe(trace):
+        root = trace[0]
+        total = max(s.start_time + s.duration_s for s in trace) - root.start_time
+        return f"{pd.Timestamp(root.start_time, unit='s'):%H:%M:%S} · {root.name} · {total * 1000:.0f} ms · {len(trace)} spans"
+
+    trace = st.selectbox("Trace", traces, format_func=describe, key="admin_trace_select")
+
+    parents = {s.span_id: s.parent_id for s in trace}
+    def depth(s):
+        level, parent = 0, s.parent_id
+        while parent in parents:
+            level, parent = level + 1, parents[parent]
+        return level
+
+    start = trace[0].start_time
+    waterfall = pd.DataFrame([{
+        "span": "  " * depth(s) + s.name,
+        "offset_ms": (s.start_time - start) * 1000,
+        "duration_ms": s.duration_s * 1000,
+        "status": "❌ " + (s.error or "") if s.status == "error" else "✅",
+        "span_id": s.span_id,
+    } for s in trace])
+
+    st.caption(f"trace_id `{trace[0].trace_id}`")
+    st.dataframe(
+        waterfall,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "span": st.column_config.TextColumn("Span", width="large"),
+            "offset_ms": st.column_config.NumberColumn("Start", format="+%.0f ms"),
+            "duration_ms": st.column_config.ProgressColumn(
+                "Duration",
+                format="%.0f ms",
+                min_value=0,
+                max_value=max(waterfall["duration_ms"].max(), 1),
+            ),
+            "status": st.column_config.TextColumn("Status", width="medium"),
+            "span_id": st.column_config.TextColumn("Span ID", width="small"),
+        }
+    )
+
+
+def render_resources():
+    """Shared clients of this server process and their build state."""
+    st.markdown("### 🧩 Shared Resources")
+    rows = resource_status()
+    frame = pd.DataFrame(rows)
+    frame["created_at"] = pd.to_datetime(frame["created_at"], unit="s")
+
+    st.dataframe(
+        frame,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "resource": st.column_config.TextColumn("Resource", width="small"),
+            "state": st.column_config.TextColumn("State", width="small"),
+            "builds": st.column_config.NumberColumn("Builds"),
+            "failures": st.column_config.NumberColumn("Failed Builds"),
+            "created_at": st.column_config.DatetimeColumn("Built At", format="h:mm:ss a"),
+            "last_error": st.column_config.TextColumn("Last Error", width="large"),
+        }
+    )
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        name = st.selectbox("Resource", [row["resource"] for row in rows], key="admin_resource_select")
+    with col2:
+        st.write("")
+        if st.button("♻️ Rebuild", use_container_width=True):
+            invalidate_resource(name, "rebuilt from the admin page")
+            st.rerun()
+    st.caption("A rebuilt resource is created again on its next use, by any session.")
+
+
+def admin_view():
+    st.markdown("""
+    <div style='text-align: center;'>
+        <h2 style='margin-bottom: 0; margin-top: 70px;'>📈 Admin</h2>
+        <p style='color: gray; font-size: 16px; margin-top: -15px;'>Pipeline performance for this server</p>
+    </div>
+    """, unsafe_allow_html=True)
+    st.write("---")
+
+    tab1, tab2, tab3, tab4 = st.tabs(["📈 Live Metrics", "⏱️ Stages & Traces", "🔑 API Keys", "🧩 Resources"])
+
+    with tab1:
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            window = st.selectbox("Window", list(WINDOWS), key="admin_metrics_window")
+        with col2:
+            live = st.toggle(f"🔄 Refresh every {REFRESH_SECONDS}s", value=True, key="admin_metrics_live")
+
+        @st.fragment(run_every=REFRESH_SECONDS if live else None)
+        def live_metrics():
+            render_live_metrics(WINDOWS[window])
+
+        live_metrics()
+
+    with tab2:
+        render_stage_latencies()
+        st.divider()
+        render_recent_traces()
+        st.divider()
+
+        with st.expander("📤 Prometheus metrics"):
+            metrics = prometheus_text()
+            st.download_button("⬇️ Download metrics.txt", metrics, file_name="metrics.txt", mime="text/plain")
+            st.code(metrics, language="text")
+
+        if st.button("🧹 Reset Timings", use_container_width=True):
+            reset_tracing()
+            reset_metrics()
+            st.rerun()
+
+    with tab3:
+        render_api_usage_dashboard()
+
+    with tab4:
+        render_resources()
+
+# Also checked here: the page must not run for a session that is not an operator
+if is_operator():
+    admin_view()
+else:
+    st.error("🔒 The Admin page is for operators only.")
@@ -1,9 +1,9 @@
 import streamlit as st
-from streamlit_float import *
 import streamlit.components.v1 as components # <--- 1. IMPORT THIS
 from components.camera.picture.take_picture import take_picture_view
 import datetime
 from components.registry_table import render_registry_table
+from components.ani_chat import render_ani_chat
 
 def dashboard_view():
     st.markdown("""
@@ -48,6 +48,7 @@ def dashboard_view():
         )
 
     render_registry_table()
+    render_ani_chat()
     
     st.write("---")
 
@@ -5,17 +5,22 @@ from core.agent import (
     analyze_crop_for_simulation, 
     analyze_plant_structure,
     analyze_multi_angle_images,
+    is_default_plant_structure,
     compare_plant_health_over_time
 )
 from components.digital_twin import render_3d_simulation
 from components.growth_simulator import integrate_growth_simulation, render_growth_timeline
+from components.harvest_forecast import forecast_tracked_plants
+from core.health_trends import find_declining_plants
 from services.db_service import (
     fetch_plant_history,
+    fetch_tracked_scan_metrics,
     get_unique_tracked_plants,
     save_tracked_plant_scan,
     generate_tracking_id,
     upload_image_to_supabase
 )
+from services.vision_service import find_recent_scan, image_fingerprint, remember_scan
 
 def view_digital_twin():
     """
@@ -135,8 +140,14 @@ def render_multi_angle_mode():
                     st.image(img, caption=f"Angle {idx + 1}", use_container_width=True)
             
             if len(uploaded_files) >= 2:
+                map_reduce = st.toggle(
+                    "⚡ Fast mode: analyze angles in parallel",
+                    key="multi_angle_map_reduce",
+                    help="Each photo is analyzed separately and the results are merged. "
+                         "Faster, and a failed photo does not fail the whole analysis."
+                )
                 if st.button("🧬 Analyze All Angles", type="primary", use_container_width=True, key="multi_clone_btn"):
-                    run_multi_angle_analysis(uploaded_files[:5])
+                    run_multi_angle_analysis(uploaded_files[:5], map_reduce=map_reduce)
         else:
             st.info("👆 Upload 3-5 images from different angles")
         
@@ -161,6 +172,8 @@ def render_multi_angle_mode():
                     st.markdown(f"**Back:** {obs.get('back_view_notes')}")
                 if obs.get("top_view_notes"):
                     st.markdown(f"**Top:** {obs.get('top_view_notes')}")
+                if obs.get("side_view_notes"):
+                    st.markdown(f"**Side:** {obs.get('side_view_notes')}")
                 if obs.get("underside_notes"):
                     st.markdown(f"**Underside:** {obs.get('underside_notes')}")
 
@@ -258,6 +271,58 @@ def render_tracking_mode():
         # Show progression analysis
         if st.session_state.progression_data:
             render_progression_analysis()
+        
+        if tracked_plants:
+            render_harvest_outlook(tracked_plants)
+            render_declining_plants_report(device_id, tracked_plants)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_harvest_outlook(tracked_plants: list) -> list:
+    """Harvest forecast for the tracked-plant set, reused across reruns."""
+    return forecast_tracked_plants(tracked_plants)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _cached_declining_plants(device_id: Optional[str]) -> list:
+    """Declining tracked plants for a device, fitted over every scan in one pass."""
+    return find_declining_plants(fetch_tracked_scan_metrics(device_id))
+
+
+def render_declining_plants_report(device_id: Optional[str], tracked_plants: list):
+    """Farm-wide list of tracked plants whose health is trending down."""
+    names = {p.get("tracking_id"): p.get("plant_name", "Unknown") for p in tracked_plants}
+    declining = _cached_declining_plants(device_id)
+    
+    with st.expander(f"📉 Declining Plants ({len(declining)})", expanded=bool(declining)):
+        if not declining:
+            st.success("No tracked plant is trending down. 🌿")
+            return
+        
+        for t in declining:
+            st.markdown(
+                f"🔴 **{names.get(t.tracking_id, t.tracking_id)}** - "
+                f"{t.slope_per_day:+.1f}%/day over {t.span_days:.0f} days "
+                f"({t.first_health:.0f}% → {t.current_health:.0f}%, {t.scan_count} scans)"
+            )
+
+
+def render_harvest_outlook(tracked_plants: list):
+    """Display P10/P50/P90 harvest dates for every tracked plant."""
+    with st.expander("🗓️ Harvest Outlook", expanded=False):
+        st.caption("Estimated from each plant's last scanned growth stage, "
+                   "with changing water, sunlight and nutrient conditions.")
+        
+        outlook = _cached_harvest_outlook(tracked_plants)
+        for entry in sorted(outlook, key=lambda e: e["p50_days"]):
+            if entry["p90_days"] == 0:
+                st.markdown(f"✅ **{entry['plant']}** - ready for harvest")
+            else:
+                st.markdown(
+                    f"🌾 **{entry['plant']}** ({entry['growth_pct']}% grown) - "
+                    f"most likely **{entry['p50_date']}**, "
+                    f"between {entry['p10_date']} and {entry['p90_date']}"
+                )
 
 
 def render_progression_analysis():
@@ -291,6 +356,13 @@ def render_progression_analysis():
         change = prog.get("health_change_total", 0)
         st.metric("Change", f"{change:+}%", delta=change)
     
+    if "rate_per_day" in prog:
+        st.caption(
+            f"Trend: {prog['rate_per_day']:+.2f}%/day • "
+            f"Volatility: ±{prog.get('volatility', 0)}% • "
+            f"Unusual scans: {prog.get('anomaly_count', 0)}"
+        )
+    
     # Timeline
     timeline = prog.get("health_timeline", [])
     if timeline:
@@ -349,13 +421,13 @@ def run_single_image_analysis(uploaded_file):
             st.error("Could not analyze the image. Please try a clearer photo.")
 
 
-def run_multi_angle_analysis(uploaded_files):
+def run_multi_angle_analysis(uploaded_files, map_reduce: bool = False):
     """Run analysis on multiple images from different angles."""
     with st.status(f"🔬 Analyzing {len(uploaded_files)} angles...", expanded=True) as status:
         st.write(f"📐 Processing {len(uploaded_files)} images from different angles...")
         
         # Run multi-angle analysis
-        combined_analysis = analyze_multi_angle_images(uploaded_files)
+        combined_analysis = analyze_multi_angle_images(uploaded_files, map_reduce=map_reduce)
         
         if combined_analysis:
             st.write(f"✅ Identified: {combined_analysis.get('identified_plant', {}).get('common_name', 'Unknown')}")
@@ -408,6 +480,10 @@ def start_new_plant_tracking(uploaded_file, nickname, device_id):
             
             # Combine analysis data
             combined_data = {**analysis, "plant_structure": plant_structure}
+            # A failed structure analysis falls back to a placeholder; don't reuse that
+            if plant_structure and not is_default_plant_structure(plant_structure):
+                remember_scan(tracking_id, image_fingerprint(uploaded_file),
+                              {"analysis": analysis, "plant_structure": plant_structure})
             
             # Save to database with tracking ID
             st.write("💾 Saving to database...")
@@ -446,10 +522,18 @@ def add_tracking_scan(uploaded_file, tracking_id, plant_name, device_id):
         st.write("📚 Fetching scan history...")
         history = fetch_plant_history(tracking_id)
         
-        # Analyze current image
-        st.write("🔬 Analyzing current state...")
-        analysis = analyze_crop_for_simulation(uploaded_file)
-        plant_structure = analyze_plant_structure(uploaded_file)
+        # Analyze current image (a near-identical recent photo of this plant is reused)
+        fingerprint, duplicate = find_recent_scan(uploaded_file, tracking_id)
+        if duplicate:
+            st.write(f"♻️ Same as the scan added {duplicate.age_s:.0f}s ago, reusing its analysis")
+            analysis = duplicate.analysis["analysis"]
+            plant_structure = duplicate.analysis["plant_structure"]
+        else:
+            st.write("🔬 Analyzing current state...")
+            analysis = analyze_crop_for_simulation(uploaded_file)
+            plant_structure = analyze_plant_structure(uploaded_file)
+            if analysis and plant_structure and not is_default_plant_structure(plant_structure):
+                remember_scan(tracking_id, fingerprint, {"analysis": analysis, "plant_structure": plant_structure})
         
         if analysis:
             # Upload image
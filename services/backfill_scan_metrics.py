@@ -0,0 +1,21 @@
+"""
+Backfill Scan Metrics
+One-off job that fills the plants_registry metric columns for scans saved
+before migrations/0001_add_scan_metrics_columns.sql:
+
+    python -m services.backfill_scan_metrics [batch_size]
+"""
+
+import sys
+
+from services.db_service import backfill_scan_metrics
+
+
+def main():
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    updated = backfill_scan_metrics(batch_size)
+    print(f"Backfilled metrics for {updated} scans")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Batch Ingestion
+Headless bulk scanning of field photos from a folder or a ZIP archive:
+
+    python -m services.batch_ingest PATH [--farm NAME] [--concurrency N]
+                                         [--workers N] [--batch-size N]
+                                         [--checkpoint FILE] [--device-id ID]
+
+Images are decoded, rotated upright and downscaled in a process pool,
+analyzed with the scan prompt through the shared GeminiClient (which picks
+and rotates API keys) with at most --concurrency requests in flight,
+uploaded to Storage in parallel and inserted into plants_registry in bulk.
+
+Finished images are recorded in a checkpoint file after each bulk insert,
+so an interrupted run can be started again with the same command and only
+the remaining (or failed) images are processed. A throughput and latency
+report is printed at the end.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from PIL import Image, ImageOps
+
+from core.agent import SCAN_PROMPT
+from core.gemini_client import get_gemini_client
+from core.schemas import ScanResult
+from core.structured_output import agenerate_structured
+from services.db_service import (
+    build_scan_row, get_supabase_client, save_plants_bulk, upload_image_bytes
+)
+
+# ============================================================================
+# INGESTION SETTINGS
+# ============================================================================
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+MAX_IMAGE_SIDE = 1600           # Larger photos are downscaled before analysis/upload
+JPEG_QUALITY = 85
+
+DEFAULT_CONCURRENCY = 8         # Gemini requests in flight
+DEFAULT_UPLOADS = 8             # Storage uploads in flight
+DEFAULT_BATCH_SIZE = 50         # Rows per bulk insert (and per checkpoint save)
+ANALYSIS_RETRIES = 2            # Extra attempts per image (the key may rotate in between)
+RETRY_DELAY_S = 2.0
+
+
+@dataclass
+class IngestItem:
+    """One photo: a file in a folder, or a member of a ZIP archive."""
+    name: str                       # Checkpoint id (path relative to the source)
+    path: str                       # File, or the ZIP archive
+    member: Optional[str] = None    # Name inside the ZIP
+
+
+@dataclass
+class IngestReport:
+    """Counts and per-stage latencies (seconds) of one run."""
+    total: int = 0
+    skipped: int = 0
+    succeeded: int = 0
+    failed: Dict[str, str] = field(default_factory=dict)
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: {
+        "preprocess": [], "analysis": [], "upload": [], "insert": [], "end_to_end": []
+    })
+    started: float = field(default_factory=time.perf_counter)
+    elapsed: float = 0.0
+
+    def format(self) -> str:
+        processed = self.succeeded + len(self.failed)
+        lines = [
+            "",
+            "=" * 60,
+            "BATCH INGESTION REPORT",
+            "=" * 60,
+            f"Images found:      {self.total}",
+            f"Already ingested:  {self.skipped}",
+            f"Succeeded:         {self.succeeded}",
+            f"Failed:            {len(self.failed)}",
+            f"Wall time:         {self.elapsed:.1f}s",
+            f"Throughput:        {processed / self.elapsed * 60 if self.elapsed else 0:.1f} images/min",
+            "",
+            f"{'Stage':<12} {'n':>5} {'p50':>8} {'p95':>8} {'max':>8}",
+        ]
+        for stage, values in self.latencies.items():
+            if values:
+                lines.append(
+                    f"{stage:<12} {len(values):>5} {_percentile(values, 50):>7.2f}s "
+                    f"{_percentile(values, 95):>7.2f}s {max(values):>7.2f}s"
+                )
+        for name, error in list(self.failed.items())[:20]:
+            lines.append(f"  FAILED {name}: {error}")
+        if len(self.failed) > 20:
+            lines.append(f"  ... and {len(self.failed) - 20} more (see the checkpoint file)")
+        return "\n".join(lines)
+
+
+def _percentile(values: List[float], pct: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+# ============================================================================
+# CHECKPOINT
+# ============================================================================
+
+class Checkpoint:
+    """Names of ingested images (and the last error of failed ones) in a JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Set[str] = set()
+        self.failed: Dict[str, str] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.done = set(data.get("done", []))
+            self.failed = data.get("failed", {})
+
+    def mark_done(self, names: List[str]):
+        self.done.update(names)
+        for name in names:
+            self.failed.pop(name, None)
+
+    def mark_failed(self, name: str, error: str):
+        self.failed[name] = error
+
+    def save(self):
+        """Write atomically so an interrupted run never leaves a corrupt file."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"done": sorted(self.done), "failed": self.failed}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+# ============================================================================
+# DISCOVERY AND PREPROCESSING
+# ============================================================================
+
+def discover_images(source: str) -> List[IngestItem]:
+    """Every image in a folder (recursively) or a ZIP archive, sorted by name."""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            members = [
+                m for m in archive.namelist()
+                if Path(m).suffix.lower() in IMAGE_EXTENSIONS and not Path(m).name.startswith(".")
+            ]
+        return [IngestItem(name=m, path=source, member=m) for m in sorted(members)]
+
+    root = Path(source)
+    if not root.is_dir():
+        raise ValueError(f"{source} is neither a folder nor a ZIP archive")
+    files = sorted(p for p in root.rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS and p.is_file())
+    return [IngestItem(name=p.relative_to(root).as_posix(), path=str(p)) for p in files]
+
+
+def preprocess_image(path: str, member: Optional[str] = None) -> bytes:
+    """
+    Decode, rotate by EXIF, downscale and re-encode one photo as JPEG.
+    Runs in a worker process.
+    """
+    if member is None:
+        with open(path, "rb") as f:
+            data = f.read()
+    else:
+        with zipfile.ZipFile(path) as archive:
+            data = archive.read(member)
+
+    image = ImageOps.exif_transpose(Image.open(BytesIO(data))).convert("RGB")
+    image.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+    out = BytesIO()
+    image.save(out, format="JPEG", quality=JPEG_QUALITY)
+    return out.getvalue()
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+async def _analyze(image_bytes: bytes) -> dict:
+    """Scan result for one image, retried so a rate-limited key can rotate."""
+    image = Image.open(BytesIO(image_bytes))
+    for attempt in range(ANALYSIS_RETRIES + 1):
+        try:
+            result, _ = await agenerate_structured(get_gemini_client().agenerate, SCAN_PROMPT, [image], ScanResult)
+            return result
+        except Exception:
+            if attempt == ANALYSIS_RETRIES:
+                raise
+            await asyncio.sleep(RETRY_DELAY_S * (attempt + 1))
+
+
+class BatchIngestor:
+    """Runs the preprocess -> analyze + upload -> bulk insert pipeline."""
+
+    def __init__(self, farm_name: str, checkpoint: Checkpoint, concurrency: int = DEFAULT_CONCURRENCY,
+                 uploads: int = DEFAULT_UPLOADS, batch_size: int = DEFAULT_BATCH_SIZE,
+                 workers: Optional[int] = None, device_id: Optional[str] = None):
+        self.farm_name = farm_name
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.uploads = uploads
+        self.batch_size = batch_size
+        self.workers = workers
+        self.device_id = device_id
+        self.report = IngestReport()
+        self._pending: List[Tuple[str, dict, float]] = []   # (name, row, item start)
+
+    async def _flush(self):
+        """Bulk-insert the finished rows, then checkpoint them."""
+        async with self._insert_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(save_plants_bulk, [row for _, row, _ in batch])
+            except Exception as e:
+                for name, _, _ in batch:
+                    self._fail(name, f"insert: {e}")
+            else:
+                finished = time.perf_counter()
+                self.report.latencies["insert"].append(finished - started)
+                self.report.latencies["end_to_end"].extend(finished - t0 for _, _, t0 in batch)
+                self.report.succeeded += len(batch)
+                self.checkpoint.mark_done([name for name, _, _ in batch])
+            self.checkpoint.save()
+            print(f"Ingested {self.report.succeeded}/{self.report.total - self.report.skipped} "
+                  f"({len(self.report.failed)} failed)")
+
+    def _fail(self, name: str, error: str):
+        self.report.failed[name] = error
+        self.checkpoint.mark_failed(name, error)
+
+    async def _process(self, item: IngestItem, pool: ProcessPoolExecutor, supabase):
+        async with self._in_flight:
+            started = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            try:
+                image_bytes = await loop.run_in_executor(pool, preprocess_image, item.path, item.member)
+            except Exception as e:
+                self._fail(item.name, f"preprocess: {e}")
+                return
+            self.report.latencies["preprocess"].append(time.perf_counter() - started)
+
+            async def analyze():
+                async with self._analysis_slots:
+                    t0 = time.perf_counter()
+                    result = await _analyze(image_bytes)
+                    self.report.latencies["analysis"].append(time.perf_counter() - t0)
+                    return result
+
+            async def upload():
+                async with self._upload_slots:
+                    t0 = time.perf_counter()
+                    url = await asyncio.to_thread(upload_image_bytes, supabase, image_bytes, "jpg", "image/jpeg")
+                    self.report.latencies["upload"].append(time.perf_counter() - t0)
+                    return url
+
+            result, url = await asyncio.gather(analyze(), upload(), return_exceptions=True)
+            if isinstance(result, BaseException) or isinstance(url, BaseException):
+                stage, error = ("analysis", result) if isinstance(result, BaseException) else ("upload", url)
+                self._fail(item.name, f"{stage}: {error}")
+                return
+
+            row = build_scan_row(result.get("plant_name", "Unknown"), url, result,
+                                 farm_name=self.farm_name, device_id=self.device_id)
+            self._pending.append((item.name, row, started))
+
+        if len(self._pending) >= self.batch_size:
+            await self._flush()
+
+    async def run(self, items: List[IngestItem]) -> IngestReport:
+        """Ingest every item not already in the checkpoint."""
+        self.report.total = len(items)
+        todo = [item for item in items if item.name not in self.checkpoint.done]
+        self.report.skipped = len(items) - len(todo)
+
+        supabase = get_supabase_client()
+        if not supabase:
+            raise RuntimeError("Supabase is not configured")
+
+        self._analysis_slots = asyncio.Semaphore(self.concurrency)
+        self._upload_slots = asyncio.Semaphore(self.uploads)
+        # Bounds how many decoded images wait in memory ahead of the API
+        self._in_flight = asyncio.Semaphore(self.concurrency * 2)
+        self._insert_lock = asyncio.Lock()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            await asyncio.gather(*(self._process(item, pool, supabase) for item in todo))
+        await self._flush()
+        self.checkpoint.save()
+
+        self.report.elapsed = time.perf_counter() - self.report.started
+        return self.report
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-scan a folder or ZIP of plant photos into the registry.")
+    parser.add_argument("path", help="Folder (searched recursively) or ZIP archive of photos")
+    parser.add_argument("--farm", default="Main Field", help="farm_name for every scan")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Gemini requests in flight")
+    parser.add_argument("--uploads", type=int, default=DEFAULT_UPLOADS, help="Storage uploads in flight")
+    parser.add_argument("--workers", type=int, default=None, help="Preprocessing processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per bulk insert")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default: PATH.ingest.json)")
+    parser.add_argument("--device-id", default=None, help="device_id for every scan")
+    args = parser.parse_args(argv)
+
+    source = args.path.rstrip("/\\")
+    checkpoint = Checkpoint(args.checkpoint or f"{source}.ingest.json")
+    items = discover_images(source)
+    print(f"Found {len(items)} images in {source} ({len(checkpoint.done)} already ingested)")
+
+    ingestor = BatchIngestor(
+        args.farm, checkpoint, concurrency=args.concurrency, uploads=args.uploads,
+        batch_size=args.batch_size, workers=args.workers, device_id=args.device_id
+    )
+    try:
+        report = asyncio.run(ingestor.run(items))
+    except KeyboardInterrupt:
+        checkpoint.save()
+        print(f"Interrupted; progress saved to {checkpoint.path}")
+        return 130
+
+    print(report.format())
+    print(f"Checkpoint: {checkpoint.path}")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
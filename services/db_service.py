@@ -1,18 +1,20 @@
 import streamlit as st
 import uuid
 from datetime import datetime
-from supabase import create_client, Client
 
-@st.cache_resource
+from core.resources import get_resource
+from core.scan_metrics import SCAN_METRICS_VERSION, extract_scan_metrics
+from core.tracing import record_error, traced
+
 def get_supabase_client():
+    # Shared by every session; a failed connection is retried after a short wait
     try:
-        url = st.secrets["SUPABASE_URL"]
-        key = st.secrets["SUPABASE_KEY"]
-        return create_client(url, key)
+        return get_resource("supabase")
     except Exception as e:
         st.error(f"Supabase Connection Error: {e}")
         return None
 
+@traced("db.fetch_all_plants")
 def fetch_all_plants():
     """Gets the raw data from the database."""
     supabase = get_supabase_client()
@@ -22,10 +24,12 @@ def fetch_all_plants():
         response = supabase.table("plants_registry").select("*").order("created_at", desc=True).execute()
         return response.data
     except Exception as e:
+        record_error(e)
         print(f"DB Error: {e}")
         return []
 
 
+@traced("db.fetch_tracked_plants")
 def fetch_tracked_plants(device_id: str = None):
     """
     Gets all tracked plants for the current device/user.
@@ -47,10 +51,12 @@ def fetch_tracked_plants(device_id: str = None):
         
         return response.data
     except Exception as e:
+        record_error(e)
         print(f"DB Error fetching tracked plants: {e}")
         return []
 
 
+@traced("db.fetch_plant_history")
 def fetch_plant_history(tracking_id: str):
     """
     Gets all scan history for a specific tracked plant.
@@ -72,10 +78,45 @@ def fetch_plant_history(tracking_id: str):
             .execute()
         return response.data
     except Exception as e:
+        record_error(e)
         print(f"DB Error fetching plant history: {e}")
         return []
 
 
+@traced("db.fetch_tracked_scan_metrics")
+def fetch_tracked_scan_metrics(device_id: str = None):
+    """
+    Gets the metric columns of every tracked scan, for trend analytics
+    across all tracked plants. analysis_json is only fetched for rows
+    saved before the metric columns existed (metrics_version is null).
+    
+    Returns:
+        List of rows with tracking_id, created_at, health_percentage,
+        disease_severity and confidence (plus analysis_json for
+        pre-backfill rows), newest first
+    """
+    supabase = get_supabase_client()
+    if not supabase: return []
+    
+    columns = "tracking_id, created_at, health_percentage, disease_severity, confidence"
+    
+    def tracked_scans(select: str):
+        query = supabase.table("plants_registry").select(select)
+        if device_id:
+            query = query.eq("device_id", device_id)
+        return query.not_.is_("tracking_id", "null")
+    
+    try:
+        rows = tracked_scans(columns).not_.is_("metrics_version", "null").execute().data
+        legacy = tracked_scans(f"{columns}, analysis_json").is_("metrics_version", "null").execute().data
+        return sorted(rows + legacy, key=lambda row: row.get("created_at") or "", reverse=True)
+    except Exception as e:
+        record_error(e)
+        print(f"DB Error fetching scan metrics: {e}")
+        return []
+
+
+@traced("db.get_unique_tracked_plants")
 def get_unique_tracked_plants(device_id: str = None):
     """
     Gets unique tracked plants (one entry per tracking_id with latest data).
@@ -104,36 +145,50 @@ def get_unique_tracked_plants(device_id: str = None):
         
         return list(plants_by_id.values())
     except Exception as e:
+        record_error(e)
         print(f"DB Error: {e}")
         return []
 
 # --- THIS IS THE NEW FUNCTION YOU WERE MISSING ---
+@traced("storage.upload_image")
 def upload_image_to_supabase(image_file):
     """Uploads the raw image file to Supabase Storage and returns the public URL."""
     supabase = get_supabase_client()
     if not supabase: return None
 
     try:
-        # 1. Generate a unique filename (e.g., "scans/abc-123.jpg")
         file_ext = image_file.name.split(".")[-1]
-        file_path = f"scans/{uuid.uuid4()}.{file_ext}"
-        
-        # 2. Upload the bytes to the 'plant-photos' bucket
-        # MAKE SURE YOU CREATED THIS BUCKET IN SUPABASE!
-        supabase.storage.from_("plant-photos").upload(
-            file_path, 
-            image_file.getvalue(), 
-            {"content-type": image_file.type}
-        )
-        
-        # 3. Get the Public Link so we can save it to the DB
-        public_url = supabase.storage.from_("plant-photos").get_public_url(file_path)
-        return public_url
+        return upload_image_bytes(supabase, image_file.getvalue(), file_ext, image_file.type)
         
     except Exception as e:
+        record_error(e)
         st.error(f"Upload Failed: {e}")
         return None
 
+
+@traced("storage.put_object")
+def upload_image_bytes(supabase, image_bytes: bytes, file_ext: str, content_type: str) -> str:
+    """
+    Uploads raw image bytes to Supabase Storage (raises on failure).
+    
+    Returns:
+        Public URL of the stored image
+    """
+    # 1. Generate a unique filename (e.g., "scans/abc-123.jpg")
+    file_path = f"scans/{uuid.uuid4()}.{file_ext}"
+    
+    # 2. Upload the bytes to the 'plant-photos' bucket
+    # MAKE SURE YOU CREATED THIS BUCKET IN SUPABASE!
+    supabase.storage.from_("plant-photos").upload(
+        file_path, 
+        image_bytes, 
+        {"content-type": content_type}
+    )
+    
+    # 3. Get the Public Link so we can save it to the DB
+    return supabase.storage.from_("plant-photos").get_public_url(file_path)
+
+@traced("db.save_plant_to_db")
 def save_plant_to_db(plant_name, image_url, json_data, farm_name="Main Field", tracking_id=None, device_id=None):
     """
     Saves a new scan to the database.
@@ -149,14 +204,24 @@ def save_plant_to_db(plant_name, image_url, json_data, farm_name="Main Field", t
     supabase = get_supabase_client()
     if not supabase: return None
     
+    data = build_scan_row(plant_name, image_url, json_data, farm_name, tracking_id, device_id)
+    return supabase.table("plants_registry").insert(data).execute()
+
+
+def build_scan_row(plant_name, image_url, json_data, farm_name="Main Field", tracking_id=None, device_id=None,
+                   default_category="Uncategorized"):
+    """
+    plants_registry row for one scan (same arguments as save_plant_to_db;
+    default_category is used when the analysis has no category).
+    """
     data = {
         "plant_name": plant_name,
         "image_url": image_url,
-        "category": json_data.get("category", "Uncategorized"),
+        "category": json_data.get("category", default_category),
         "health_status": json_data.get("health_status", "Unknown"),
-        "confidence": json_data.get("confidence", 0.0),
         "farm_name": farm_name,
-        "analysis_json": json_data
+        "analysis_json": json_data,
+        **extract_scan_metrics(json_data).to_columns()
     }
     
     # Add tracking fields if provided
@@ -165,9 +230,23 @@ def save_plant_to_db(plant_name, image_url, json_data, farm_name="Main Field", t
     if device_id:
         data["device_id"] = device_id
     
-    return supabase.table("plants_registry").insert(data).execute()
+    return data
 
 
+@traced("db.save_plants_bulk")
+def save_plants_bulk(rows: list):
+    """
+    Inserts many scans in one request (rows from build_scan_row).
+    Raises on failure so batch jobs can retry the whole batch.
+    """
+    supabase = get_supabase_client()
+    if not supabase:
+        raise RuntimeError("Supabase is not configured")
+    
+    return supabase.table("plants_registry").insert(rows).execute()
+
+
+@traced("db.save_tracked_plant_scan")
 def save_tracked_plant_scan(plant_name, image_url, json_data, tracking_id, plant_nickname=None, device_id=None):
     """
     Save a scan for a tracked plant (progressive monitoring).
@@ -183,24 +262,56 @@ def save_tracked_plant_scan(plant_name, image_url, json_data, tracking_id, plant
     supabase = get_supabase_client()
     if not supabase: return None
     
-    # Extract health data from different possible structures
-    health_pct = json_data.get("health_percentage", 0) or \
-                 json_data.get("health_analysis", {}).get("overall_health_percentage", 0)
+    data = build_scan_row(
+        plant_nickname or plant_name, image_url, json_data, farm_name="Tracked Plant",
+        tracking_id=tracking_id, device_id=device_id, default_category="Crop"
+    )
+    return supabase.table("plants_registry").insert(data).execute()
+
+
+@traced("db.backfill_scan_metrics")
+def backfill_scan_metrics(batch_size: int = 200) -> int:
+    """
+    Fill the metric columns for rows saved before they existed (or with an
+    older SCAN_METRICS_VERSION) by extracting them from analysis_json.
     
-    data = {
-        "plant_name": plant_nickname or plant_name,
-        "image_url": image_url,
-        "category": json_data.get("category", "Crop"),
-        "health_status": json_data.get("health_status", "Unknown"),
-        "confidence": json_data.get("confidence", 0.0) or \
-                     json_data.get("identified_plant", {}).get("confidence", 0.0),
-        "farm_name": "Tracked Plant",
-        "analysis_json": json_data,
-        "tracking_id": tracking_id,
-        "device_id": device_id
-    }
+    Args:
+        batch_size: Rows fetched per round trip
+        
+    Returns:
+        Number of rows updated
+    """
+    supabase = get_supabase_client()
+    if not supabase: return 0
     
-    return supabase.table("plants_registry").insert(data).execute()
+    updated = 0
+    last_id = None
+    try:
+        while True:
+            # Page on id, so rows an update could not change (RLS, triggers,
+            # missing columns) are not fetched again forever
+            query = supabase.table("plants_registry") \
+                .select("id, analysis_json") \
+                .or_(f"metrics_version.is.null,metrics_version.lt.{SCAN_METRICS_VERSION}")
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            response = query.order("id").limit(batch_size).execute()
+            
+            if not response.data:
+                break
+            
+            for row in response.data:
+                # A metric the analysis doesn't have keeps the row's current value
+                metrics = extract_scan_metrics(row.get("analysis_json")).to_columns()
+                columns = {name: value for name, value in metrics.items() if value is not None}
+                result = supabase.table("plants_registry").update(columns).eq("id", row["id"]).execute()
+                updated += len(result.data or [])
+            last_id = response.data[-1]["id"]
+    except Exception as e:
+        record_error(e)
+        print(f"DB Error backfilling scan metrics: {e}")
+    
+    return updated
 
 
 def generate_tracking_id():
@@ -208,6 +319,7 @@ def generate_tracking_id():
     return f"track_{uuid.uuid4().hex[:12]}"
 
 
+@traced("db.delete_tracked_plant")
 def delete_tracked_plant(tracking_id: str):
     """
     Delete all scans associated with a tracked plant.
@@ -222,5 +334,6 @@ def delete_tracked_plant(tracking_id: str):
             .execute()
         return True
     except Exception as e:
+        record_error(e)
         print(f"Error deleting tracked plant: {e}")
         return False
\ No newline at end of file
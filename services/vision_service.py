@@ -3,9 +3,235 @@ from dotenv import load_dotenv
 from core.agent import ask_gemini
 from core.history_management import (initialize_session_state, add_user_message, add_ai_message, get_chat_history)
 
-from PIL import Image
+import copy
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.metrics import record_metric
 
 
 def process():
     # Function to process image or video input And analyze it  
     take_picture()
+
+
+# ============================================================================
+# NEAR-DUPLICATE SCANS
+# ============================================================================
+# Farmers often take several almost identical photos in a row. Each photo
+# gets a perceptual fingerprint (pHash + dHash, 128 bits); a scan whose
+# fingerprint is within DUPLICATE_DISTANCE bits of a recent scan from the
+# same device or tracked plant reuses that scan's analysis instead of
+# spending another Gemini request.
+
+HASH_SIZE = 8                   # 8x8 bits per hash
+PHASH_SAMPLE = 32               # pHash takes the DCT of a 32x32 thumbnail
+DUPLICATE_DISTANCE = 16         # Max differing bits (of 128) to count as the same photo
+RECENT_SCAN_S = 15 * 60         # Older scans are never reused
+MAX_SCANS_PER_SCOPE = 64
+MAX_SCOPES = 1024
+
+
+def _dct_matrix(n: int):
+    import numpy as np
+
+    k, x = np.meshgrid(np.arange(n), np.arange(n), indexing="ij")
+    return np.cos(np.pi * (2 * x + 1) * k / (2 * n))
+
+
+_DCT = None
+
+
+def _bits_to_int(bits) -> int:
+    import numpy as np
+
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def dhash(gray) -> int:
+    """64-bit difference hash: is each pixel brighter than its right neighbour."""
+    import numpy as np
+    from PIL import Image
+
+    pixels = np.asarray(gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR), dtype=np.int16)
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def phash(gray) -> int:
+    """64-bit perceptual hash: low DCT frequencies above their median."""
+    global _DCT
+    import numpy as np
+    from PIL import Image
+
+    if _DCT is None:
+        _DCT = _dct_matrix(PHASH_SAMPLE)
+    pixels = np.asarray(gray.resize((PHASH_SAMPLE, PHASH_SAMPLE), Image.Resampling.BILINEAR), dtype=np.float64)
+    low = (_DCT @ pixels @ _DCT.T)[:HASH_SIZE, :HASH_SIZE]
+    return _bits_to_int(low > np.median(low))
+
+
+def image_fingerprint(image_file) -> Optional[int]:
+    """
+    128-bit perceptual fingerprint (pHash, then dHash) of an uploaded image.
+
+    Returns:
+        The fingerprint, or None if the file is not a readable image
+    """
+    from PIL import Image, ImageOps
+
+    try:
+        image_file.seek(0)
+        image = Image.open(image_file)
+        # Let the JPEG decoder downscale while decoding; a hash needs no detail
+        image.draft("L", (PHASH_SAMPLE * 4, PHASH_SAMPLE * 4))
+        gray = ImageOps.exif_transpose(image).convert("L")
+        return (phash(gray) << 64) | dhash(gray)
+    except Exception as e:
+        print(f"Could not fingerprint image: {e}")
+        return None
+    finally:
+        image_file.seek(0)
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits."""
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """Burkhard-Keller tree of fingerprints for Hamming-radius search."""
+
+    def __init__(self):
+        # Node: [fingerprint, value, {distance: child node}]
+        self._root: Optional[list] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, fingerprint: int, value: Any):
+        self._size += 1
+        if self._root is None:
+            self._root = [fingerprint, value, {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(fingerprint, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [fingerprint, value, {}]
+                return
+            node = child
+
+    def search(self, fingerprint: int, max_distance: int) -> List[Tuple[int, Any]]:
+        """(distance, value) of every entry within max_distance, nearest first."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(fingerprint, node[0])
+            if distance <= max_distance:
+                found.append((distance, node[1]))
+            # Triangle inequality: only these subtrees can hold matches
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return sorted(found, key=lambda match: match[0])
+
+
+@dataclass
+class RecentScan:
+    fingerprint: int
+    analysis: dict
+    scanned_at: float
+
+
+@dataclass
+class DuplicateMatch:
+    analysis: dict
+    distance: int
+    age_s: float
+
+
+class RecentScanIndex:
+    """
+    Thread-safe recent scans per scope (a device or tracking_id), each
+    scope a BKTree rebuilt as scans expire; scopes are evicted LRU.
+    """
+
+    def __init__(self, max_distance: int = DUPLICATE_DISTANCE, max_age_s: float = RECENT_SCAN_S,
+                 max_per_scope: int = MAX_SCANS_PER_SCOPE, max_scopes: int = MAX_SCOPES):
+        self.max_distance = max_distance
+        self.max_age_s = max_age_s
+        self.max_per_scope = max_per_scope
+        self.max_scopes = max_scopes
+        self._scopes: "OrderedDict[str, Tuple[BKTree, List[RecentScan]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def find(self, scope: str, fingerprint: int, now: Optional[float] = None) -> Optional[DuplicateMatch]:
+        """Nearest recent scan within max_distance, if any."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._scopes.get(scope)
+            if entry is None:
+                return None
+            self._scopes.move_to_end(scope)
+            for distance, scan in entry[0].search(fingerprint, self.max_distance):
+                if now - scan.scanned_at <= self.max_age_s:
+                    return DuplicateMatch(copy.deepcopy(scan.analysis), distance, now - scan.scanned_at)
+        return None
+
+    def add(self, scope: str, fingerprint: int, analysis: dict, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            _, scans = self._scopes.pop(scope, (None, []))
+            scans = [s for s in scans if now - s.scanned_at <= self.max_age_s]
+            scans = (scans + [RecentScan(fingerprint, copy.deepcopy(analysis), now)])[-self.max_per_scope:]
+
+            tree = BKTree()
+            for scan in scans:
+                tree.add(scan.fingerprint, scan)
+            self._scopes[scope] = (tree, scans)
+            while len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._scopes.clear()
+
+
+@st.cache_resource
+def get_recent_scan_index() -> RecentScanIndex:
+    """Shared recent-scan index (one per app process)."""
+    return RecentScanIndex()
+
+
+def find_recent_scan(image_file, scope: Optional[str]) -> Tuple[Optional[int], Optional[DuplicateMatch]]:
+    """
+    Look for a near-identical recent scan before analyzing a photo.
+
+    Args:
+        image_file: Uploaded image file object
+        scope: Device or tracking_id the scan belongs to (None: no lookup)
+
+    Returns:
+        (fingerprint to pass to remember_scan, match or None)
+    """
+    if not scope:
+        return None, None
+    fingerprint = image_fingerprint(image_file)
+    if fingerprint is None:
+        return None, None
+
+    match = get_recent_scan_index().find(scope, fingerprint)
+    record_metric("cache.hit", 0.0 if match is None else 1.0, cache="scan")
+    return fingerprint, match
+
+
+def remember_scan(scope: Optional[str], fingerprint: Optional[int], analysis: Dict):
+    """Make a completed analysis reusable for near-identical photos."""
+    if scope and fingerprint is not None and analysis:
+        get_recent_scan_index().add(scope, fingerprint, analysis)
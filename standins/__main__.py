@@ -0,0 +1,52 @@
+"""
+Run both stand-ins for offline development:
+
+    python -m standins [--gemini-port 8787] [--supabase-port 54321]
+                       [--latency-ms 800] [--rate-limit-rate 0.05] [--seed-rows 0]
+
+then set in .streamlit/secrets.toml:
+
+    GEMINI_API_KEY = "standin"
+    GEMINI_BASE_URL = "http://127.0.0.1:8787"
+    SUPABASE_URL = "http://127.0.0.1:54321"
+    SUPABASE_KEY = "<the key printed at startup>"
+"""
+
+import argparse
+import time
+
+from standins.gemini_server import DEFAULT_PORT as GEMINI_PORT
+from standins.gemini_server import GeminiStandinConfig, start_gemini_standin
+from standins.supabase_server import DEFAULT_PORT as SUPABASE_PORT
+from standins.supabase_server import STANDIN_KEY, start_supabase_standin
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini and Supabase stand-ins.")
+    parser.add_argument("--gemini-port", type=int, default=GEMINI_PORT)
+    parser.add_argument("--supabase-port", type=int, default=SUPABASE_PORT)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Gemini response latency")
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of a Gemini 429")
+    parser.add_argument("--seed-rows", type=int, default=0, help="plants_registry rows to create")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    gemini, _ = start_gemini_standin(args.gemini_port, GeminiStandinConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        rate_limit_rate=args.rate_limit_rate, seed=args.seed
+    ))
+    supabase, _ = start_supabase_standin(args.supabase_port, seed_rows=args.seed_rows)
+    print(f"GEMINI_BASE_URL = \"http://127.0.0.1:{gemini.server_port}\"")
+    print(f"SUPABASE_URL = \"http://127.0.0.1:{supabase.server_port}\"")
+    print(f"SUPABASE_KEY = \"{STANDIN_KEY}\"")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        gemini.shutdown()
+        supabase.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Stand-in Environment
+Starts both stand-ins and points this process's st.secrets at them, for
+scripts that exercise the app code outside `streamlit run` (benchmarks,
+load tests):
+
+    with standin_environment(seed_rows=10_000) as env:
+        ...  # core.agent / services.db_service now talk to the stand-ins
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import ThreadingHTTPServer
+from typing import Dict, Iterator, Optional
+
+import streamlit as st
+
+from standins.gemini_server import GeminiStandin, GeminiStandinConfig, start_gemini_standin
+from standins.supabase_server import STANDIN_KEY, SupabaseStandin, start_supabase_standin
+
+
+@dataclass
+class StandinEnvironment:
+    gemini_server: ThreadingHTTPServer
+    gemini: GeminiStandin
+    supabase_server: ThreadingHTTPServer
+    supabase: SupabaseStandin
+    secrets: Dict[str, str]
+
+    @property
+    def gemini_url(self) -> str:
+        return f"http://127.0.0.1:{self.gemini_server.server_port}"
+
+    @property
+    def supabase_url(self) -> str:
+        return f"http://127.0.0.1:{self.supabase_server.server_port}"
+
+
+def standin_secrets(gemini_url: str, supabase_url: str, keys: int = 2) -> Dict[str, str]:
+    """secrets.toml entries that select the stand-ins."""
+    secrets = {"GEMINI_API_KEY": "standin-key-1", "GEMINI_BASE_URL": gemini_url,
+               "SUPABASE_URL": supabase_url, "SUPABASE_KEY": STANDIN_KEY}
+    for i in range(2, keys + 1):
+        secrets[f"GEMINI_API_KEY_{i}"] = f"standin-key-{i}"
+    return secrets
+
+
+@contextmanager
+def standin_environment(gemini_config: Optional[GeminiStandinConfig] = None, seed_rows: int = 0,
+                        supabase_latency_ms: float = 0, keys: int = 2) -> Iterator[StandinEnvironment]:
+    """
+    Run the stand-ins and serve their settings as st.secrets.
+
+    Args:
+        gemini_config: Gemini latency / rate-limit behaviour
+        seed_rows: plants_registry rows to create
+        supabase_latency_ms: Delay added to every Supabase request
+        keys: Number of fake Gemini API keys
+    """
+    gemini_server, gemini = start_gemini_standin(config=gemini_config)
+    supabase_server, supabase = start_supabase_standin(seed_rows=seed_rows, latency_ms=supabase_latency_ms)
+    secrets = standin_secrets(f"http://127.0.0.1:{gemini_server.server_port}",
+                              f"http://127.0.0.1:{supabase_server.server_port}", keys)
+
+    # Served from memory: no secrets.toml is read or watched while active
+    st.secrets._reset()
+    st.secrets._secrets = secrets
+    try:
+        yield StandinEnvironment(gemini_server, gemini, supabase_server, supabase, secrets)
+    finally:
+        st.secrets._reset()
+        gemini_server.shutdown()
+        supabase_server.shutdown()
@@ -0,0 +1,203 @@
+"""
+Canned Responses for the Gemini Stand-in
+One builder per prompt type in core/agent.py and core/multi_angle.py. The
+plant is picked from PLANTS by a hash of the request, so the same image
+always gets the same answer and different images get different ones.
+"""
+
+import hashlib
+from typing import Callable, Dict, List, Optional
+
+PLANTS = [
+    {
+        "common_name": "Tomato", "scientific_name": "Solanum lycopersicum", "family": "Solanaceae",
+        "category": "Crop", "health_status": "Early Blight", "health": 72, "severity": "Mild",
+        "form": "bushy", "leaves": 24, "color": "#2E7D32", "secondary": "#81C784", "disease_color": "#6D4C41",
+        "fruit_type": "tomato", "fruit_color": "#E53935", "fruit_count": 6,
+        "symptoms": ["brown concentric spots", "yellowing lower leaves"], "locations": ["lower leaves"],
+        "action": "Remove infected lower leaves and apply a copper-based fungicide.",
+    },
+    {
+        "common_name": "Rice", "scientific_name": "Oryza sativa", "family": "Poaceae",
+        "category": "Crop", "health_status": "Healthy", "health": 94, "severity": "None",
+        "form": "upright", "leaves": 18, "color": "#558B2F", "secondary": "#9CCC65", "disease_color": "",
+        "fruit_type": "none", "fruit_color": "", "fruit_count": 0,
+        "symptoms": [], "locations": [],
+        "action": "Keep the paddy flooded 3-5 cm and monitor for stem borers.",
+    },
+    {
+        "common_name": "Lettuce", "scientific_name": "Lactuca sativa", "family": "Asteraceae",
+        "category": "Crop", "health_status": "Downy Mildew", "health": 55, "severity": "Moderate",
+        "form": "rosette", "leaves": 14, "color": "#7CB342", "secondary": "#C5E1A5", "disease_color": "#FDD835",
+        "fruit_type": "none", "fruit_color": "", "fruit_count": 0,
+        "symptoms": ["yellow angular patches", "white growth on leaf undersides"],
+        "locations": ["outer leaves", "underside of leaves"],
+        "action": "Improve air flow, water at the base and remove infected outer leaves.",
+    },
+    {
+        "common_name": "Chili Pepper", "scientific_name": "Capsicum frutescens", "family": "Solanaceae",
+        "category": "Crop", "health_status": "Leaf Curl", "health": 35, "severity": "Severe",
+        "form": "bushy", "leaves": 30, "color": "#388E3C", "secondary": "#A5D6A7", "disease_color": "#CDDC39",
+        "fruit_type": "chili", "fruit_color": "#C62828", "fruit_count": 9,
+        "symptoms": ["upward leaf curling", "stunted growth", "whiteflies"], "locations": ["top leaves", "new growth"],
+        "action": "Control whiteflies with neem oil and remove badly curled plants.",
+    },
+]
+
+
+def pick_plant(seed: bytes) -> dict:
+    """Deterministic plant for a request."""
+    return PLANTS[int(hashlib.sha256(seed).hexdigest(), 16) % len(PLANTS)]
+
+
+def _identity(p: dict) -> dict:
+    return {
+        "common_name": p["common_name"], "scientific_name": p["scientific_name"],
+        "plant_family": p["family"], "growth_stage": "vegetative", "confidence": 0.9,
+    }
+
+
+def _architecture(p: dict) -> dict:
+    return {
+        "overall_form": p["form"], "symmetry": "radial", "height_cm": 45, "width_cm": 40,
+        "has_central_head": False, "head_type": "none",
+        "fruit_type": p["fruit_type"], "fruit_color_hex": p["fruit_color"] or "#FFFFFF",
+        "fruit_count": p["fruit_count"],
+    }
+
+
+def _leaves(p: dict) -> dict:
+    return {
+        "arrangement": "rosette" if p["form"] == "rosette" else "alternate", "total_count": p["leaves"],
+        "leaf_layers": 3, "shape": "oval", "size_cm": 12, "width_cm": 7, "waviness": 0.3,
+        "primary_color_hex": p["color"], "secondary_color_hex": p["secondary"],
+        "underside_color_hex": p["secondary"], "orientation": "outward",
+    }
+
+
+def _health_analysis(p: dict) -> dict:
+    diseased = p["severity"] != "None"
+    return {
+        "overall_health_percentage": p["health"], "health_status": p["health_status"],
+        "disease_severity": p["severity"], "affected_leaves_count": p["leaves"] // 4 if diseased else 0,
+        "affected_area_percent": 100 - p["health"], "disease_locations": p["locations"],
+        "symptoms_observed": p["symptoms"], "diseases_detected": [p["health_status"]] if diseased else [],
+    }
+
+
+def _context() -> dict:
+    return {
+        "container": {"type": "ground", "shape": "natural", "material": "soil", "color_hex": "#5D4037"},
+        "environmental_context": {"setting": "outdoor", "lighting": "bright"},
+    }
+
+
+def scan(p: dict) -> dict:
+    return {
+        "plant_name": f"{p['common_name']} ({p['scientific_name']})", "health_status": p["health_status"],
+        "action_plan": p["action"], "confidence": 0.9, "category": p["category"],
+    }
+
+
+def crop(p: dict) -> dict:
+    return {
+        "plant_name": f"{p['common_name']} ({p['scientific_name']})", "health_status": p["health_status"],
+        "health_percentage": p["health"], "disease_severity": p["severity"],
+        "affected_area_percent": 100 - p["health"], "primary_color": p["color"],
+        "secondary_color": p["secondary"], "disease_color": p["disease_color"] or "#8B4513",
+        "texture_description": "Matte leaves with visible veins", "recommended_action": p["action"],
+    }
+
+
+def plant_structure(p: dict) -> dict:
+    severity = {"None": 0.0, "Mild": 0.3, "Moderate": 0.55, "Severe": 0.8}[p["severity"]]
+    return {
+        "identified_plant": _identity(p),
+        "plant_architecture": _architecture(p),
+        "leaf_system": _leaves(p),
+        "stem_system": {"visible": True, "type": "branching", "thickness_cm": 1.5, "height_cm": 20, "color_hex": "#689F38"},
+        "soil_ground": {"visible": True, "type": "garden_soil", "color_hex": "#4E342E"},
+        "health_assessment": {
+            "health_status": p["health_status"], "disease_name": "" if severity == 0 else p["health_status"],
+            "severity": severity, "affected_percentage": 100 - p["health"], "affected_areas": p["locations"],
+            "issues": p["symptoms"], "disease_pattern": "none" if severity == 0 else "spots",
+            "disease_color_hex": p["disease_color"],
+        },
+        "3d_generation_notes": f"{p['form'].capitalize()} {p['common_name'].lower()} with {p['leaves']} oval leaves.",
+        **_context(),
+    }
+
+
+def multi_angle(p: dict) -> dict:
+    return {
+        "identified_plant": _identity(p),
+        "multi_angle_observations": {
+            "angles_analyzed": 3, "front_view_notes": "Full canopy visible.",
+            "top_view_notes": "Leaf arrangement visible from above.",
+            "underside_notes": "Leaf undersides visible on lower leaves.",
+        },
+        "plant_architecture": _architecture(p),
+        "leaf_system": _leaves(p),
+        "health_analysis": _health_analysis(p),
+        "3d_generation_notes": f"{p['form'].capitalize()} {p['common_name'].lower()} seen from several angles.",
+        "recommended_action": p["action"],
+        **_context(),
+    }
+
+
+def angle(p: dict) -> dict:
+    return {
+        "view": "front", "view_notes": "Full canopy visible.",
+        "identified_plant": _identity(p),
+        "plant_architecture": _architecture(p),
+        "leaf_system": _leaves(p),
+        "health_analysis": _health_analysis(p),
+        "3d_generation_notes": f"{p['form'].capitalize()} {p['common_name'].lower()}.",
+        "recommended_action": p["action"],
+        **_context(),
+    }
+
+
+def reconcile(p: dict) -> dict:
+    return {"identified_plant": _identity(p), "health_analysis": _health_analysis(p), "recommended_action": p["action"]}
+
+
+def chat(p: dict) -> str:
+    return (f"For {p['common_name'].lower()}, check the leaves every few days and water early in the morning. "
+            "This is a reply from the local Gemini stand-in.")
+
+
+def summary(p: dict) -> str:
+    return f"The farmer is asking about {p['common_name'].lower()} care."
+
+
+# (marker found in the prompt text, builder); checked in order
+PROMPT_TYPES: List[tuple] = [
+    ("The analyses disagree", reconcile),
+    ("running summary", summary),
+    ('"view_notes"', angle),
+    ('"multi_angle_observations"', multi_angle),
+    ('"stem_system"', plant_structure),
+    ('"texture_description"', crop),
+    ('"action_plan"', scan),
+]
+
+
+def builder_for(prompt_text: str) -> Optional[Callable[[dict], object]]:
+    """Canned response builder for a prompt, or None (free-text chat)."""
+    for marker, build in PROMPT_TYPES:
+        if marker in prompt_text:
+            return build
+    return None
+
+
+def fill_schema(schema: Optional[Dict]) -> object:
+    """Minimal value matching a response schema (for prompts without a fixture)."""
+    if not schema:
+        return {}
+    kind = str(schema.get("type", "OBJECT")).upper()
+    if kind == "OBJECT":
+        return {key: fill_schema(sub) for key, sub in (schema.get("properties") or {}).items()}
+    if kind == "ARRAY":
+        return []
+    return {"STRING": "", "INTEGER": 0, "NUMBER": 0.0, "BOOLEAN": False}.get(kind, "")
@@ -0,0 +1,298 @@
+"""
+Gemini Stand-in Server
+A local HTTP server that speaks the parts of the Gemini REST API the app
+uses (generateContent, streamGenerateContent and cachedContents), with
+canned answers per prompt type from standins/fixtures.py:
+
+    python -m standins.gemini_server [--port 8787] [--latency-ms 800]
+                                     [--jitter-ms 200] [--rate-limit-rate 0.05]
+                                     [--rate-limit-every N] [--seed 0]
+
+Point the app at it with GEMINI_BASE_URL = "http://127.0.0.1:8787" in
+.streamlit/secrets.toml (or the environment); any API key is accepted.
+Latency and 429 (quota) errors are injected from a seeded RNG, so runs are
+repeatable. GET /stats returns request counts and the in-flight depth.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from standins import fixtures
+
+DEFAULT_PORT = 8787
+
+_GENERATE_PATH = re.compile(r"^/v1(?:beta|alpha)?/models/([^/:]+):(generateContent|streamGenerateContent)$")
+_CACHE_PATH = re.compile(r"^/v1(?:beta|alpha)?/(cachedContents(?:/[^/]+)?)$")
+
+
+@dataclass
+class GeminiStandinConfig:
+    """Behaviour of the stand-in (all delays in milliseconds)."""
+    latency_ms: float = 0
+    jitter_ms: float = 0
+    rate_limit_rate: float = 0.0        # Probability of a 429 per generate request
+    rate_limit_every: int = 0           # Also 429 every Nth generate request (0 = off)
+    stream_chunks: int = 4
+    seed: int = 0
+
+
+@dataclass
+class GeminiStandinStats:
+    requests: int = 0
+    rate_limited: int = 0
+    cache_requests: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+
+class GeminiStandin:
+    """Request handling and state shared by the server threads."""
+
+    def __init__(self, config: GeminiStandinConfig):
+        self.config = config
+        self.stats = GeminiStandinStats()
+        self.caches: Dict[str, dict] = {}
+        self._rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Injection
+    # ------------------------------------------------------------------
+
+    def _admit(self) -> Tuple[float, bool]:
+        """(delay seconds, rate limited) for the next generate request."""
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.in_flight += 1
+            self.stats.max_in_flight = max(self.stats.max_in_flight, self.stats.in_flight)
+            delay = max(0.0, self.config.latency_ms + self._rng.uniform(-1, 1) * self.config.jitter_ms) / 1000
+            limited = (
+                self._rng.random() < self.config.rate_limit_rate
+                or (self.config.rate_limit_every > 0 and self.stats.requests % self.config.rate_limit_every == 0)
+            )
+            if limited:
+                self.stats.rate_limited += 1
+            return delay, limited
+
+    def _release(self):
+        with self._lock:
+            self.stats.in_flight -= 1
+
+    # ------------------------------------------------------------------
+    # Responses
+    # ------------------------------------------------------------------
+
+    def _prompt_text(self, body: dict) -> Tuple[str, bytes]:
+        """All request text (including a referenced cache) and a seed for the fixtures."""
+        contents = list(body.get("contents") or [])
+        cached = self.caches.get(body.get("cachedContent") or "")
+        if cached:
+            contents = cached.get("contents", []) + contents
+
+        texts, seed = [], b""
+        for content in contents:
+            for part in content.get("parts", []):
+                if "text" in part:
+                    texts.append(part["text"])
+                inline = part.get("inlineData") or part.get("inline_data")
+                if inline:
+                    seed += inline.get("data", "")[:4096].encode()
+        text = "\n".join(texts)
+        return text, seed or text.encode()
+
+    def answer(self, body: dict) -> str:
+        """Response text for a generate request."""
+        text, seed = self._prompt_text(body)
+        plant = fixtures.pick_plant(seed)
+        build = fixtures.builder_for(text)
+        config = body.get("generationConfig") or {}
+        schema = config.get("responseSchema")
+
+        data = build(plant) if build else None
+        if not isinstance(data, dict):
+            if config.get("responseMimeType") == "application/json":
+                return json.dumps(fixtures.fill_schema(schema))
+            return data if data is not None else fixtures.chat(plant)
+
+        if schema and schema.get("properties"):
+            # Repair calls ask for a subset of the keys
+            data = {k: v for k, v in data.items() if k in schema["properties"]}
+        return json.dumps(data)
+
+    @staticmethod
+    def response(text: str, finish: Optional[str] = "STOP") -> dict:
+        candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+        if finish:
+            candidate["finishReason"] = finish
+        tokens = len(text) // 4 + 1
+        return {
+            "candidates": [candidate],
+            "usageMetadata": {"promptTokenCount": 258, "candidatesTokenCount": tokens, "totalTokenCount": 258 + tokens},
+            "modelVersion": "standin",
+        }
+
+    def create_cache(self, body: dict) -> dict:
+        ttl = float(str(body.get("ttl", "3600s")).rstrip("s") or 3600)
+        name = f"cachedContents/{uuid.uuid4().hex[:12]}"
+        entry = {
+            "name": name, "model": body.get("model", ""), "displayName": body.get("displayName", ""),
+            "contents": body.get("contents", []),
+            "expireTime": (datetime.now(timezone.utc) + timedelta(seconds=ttl)).isoformat(),
+        }
+        with self._lock:
+            self.caches[name] = entry
+            self.stats.cache_requests += 1
+        return {k: v for k, v in entry.items() if k != "contents"}
+
+
+def _make_handler(standin: GeminiStandin):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _json(self, status: int, payload: dict):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def _rate_limited(self):
+            self._json(429, {"error": {
+                "code": 429, "status": "RESOURCE_EXHAUSTED",
+                "message": "Resource has been exhausted (e.g. check quota). [stand-in rate limit]",
+            }})
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == "/stats":
+                with standin._lock:
+                    return self._json(200, asdict(standin.stats))
+            match = _CACHE_PATH.match(path)
+            if match and match.group(1) in standin.caches:
+                return self._json(200, standin.caches[match.group(1)])
+            self._json(404, {"error": {"code": 404, "message": f"Not found: {path}", "status": "NOT_FOUND"}})
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            body = self._body()
+
+            if _CACHE_PATH.match(path):
+                return self._json(200, standin.create_cache(body))
+
+            match = _GENERATE_PATH.match(path)
+            if not match:
+                return self._json(404, {"error": {"code": 404, "message": f"Not found: {path}", "status": "NOT_FOUND"}})
+
+            if body.get("cachedContent") and body["cachedContent"] not in standin.caches:
+                return self._json(404, {"error": {"code": 404, "status": "NOT_FOUND",
+                                                  "message": "CachedContent not found"}})
+
+            delay, limited = standin._admit()
+            try:
+                time.sleep(delay)
+                if limited:
+                    return self._rate_limited()
+                text = standin.answer(body)
+                if match.group(2) == "generateContent":
+                    return self._json(200, standin.response(text))
+                self._stream(text)
+            finally:
+                standin._release()
+
+        def _stream(self, text: str):
+            """Server-sent events, one response object per chunk."""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            size = max(1, -(-len(text) // standin.config.stream_chunks))
+            pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+            for n, piece in enumerate(pieces):
+                last = n == len(pieces) - 1
+                payload = json.dumps(standin.response(piece, "STOP" if last else None))
+                self.wfile.write(f"data: {payload}\r\n\r\n".encode())
+                self.wfile.flush()
+            self.close_connection = True
+
+        def do_PATCH(self):
+            match = _CACHE_PATH.match(urlparse(self.path).path)
+            name = match.group(1) if match else ""
+            if name not in standin.caches:
+                return self._json(404, {"error": {"code": 404, "message": "CachedContent not found", "status": "NOT_FOUND"}})
+            ttl = float(str(self._body().get("ttl", "3600s")).rstrip("s") or 3600)
+            entry = standin.caches[name]
+            entry["expireTime"] = (datetime.now(timezone.utc) + timedelta(seconds=ttl)).isoformat()
+            self._json(200, {k: v for k, v in entry.items() if k != "contents"})
+
+        def do_DELETE(self):
+            match = _CACHE_PATH.match(urlparse(self.path).path)
+            standin.caches.pop(match.group(1) if match else "", None)
+            self._json(200, {})
+
+    return Handler
+
+
+def start_gemini_standin(port: int = 0, config: Optional[GeminiStandinConfig] = None,
+                         host: str = "127.0.0.1") -> Tuple[ThreadingHTTPServer, GeminiStandin]:
+    """
+    Start the stand-in on a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        config: Latency / rate-limit behaviour
+
+    Returns:
+        (server, standin); the base URL is f"http://{host}:{server.server_port}"
+        and server.shutdown() stops it
+    """
+    standin = GeminiStandin(config or GeminiStandinConfig())
+    server = ThreadingHTTPServer((host, port), _make_handler(standin))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, standin
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini API stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of a 429 per request")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Return 429 on every Nth request")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = GeminiStandinConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_limit_rate=args.rate_limit_rate,
+        rate_limit_every=args.rate_limit_every, seed=args.seed
+    )
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(GeminiStandin(config)))
+    print(f"Gemini stand-in on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""
+Supabase Stand-in Server
+A local HTTP server for the PostgREST and Storage calls in
+services/db_service.py, backed by memory:
+
+    python -m standins.supabase_server [--port 54321] [--seed-rows 1000]
+                                       [--latency-ms 20]
+
+Point the app at it with SUPABASE_URL = "http://127.0.0.1:54321" and
+SUPABASE_KEY = STANDIN_KEY in .streamlit/secrets.toml (or the
+environment). Rows get an integer id and created_at like the real table;
+uploaded files are served back from their public URL.
+
+Supported PostgREST syntax: select, order (col.asc/col.desc), limit,
+offset, the eq/neq/gt/gte/lt/lte/is/in/like/ilike filters, not.<op> and
+or=(...). Every other table name is created on first insert.
+"""
+
+import argparse
+import email
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import parse_qsl, unquote, urlparse
+
+from standins import fixtures
+
+DEFAULT_PORT = 54321
+
+# Any JWT-shaped string is accepted; this one passes the client's checks
+STANDIN_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.standin"
+
+_RESERVED_PARAMS = {"select", "order", "limit", "offset", "columns", "on_conflict"}
+
+
+# ============================================================================
+# POSTGREST FILTERS
+# ============================================================================
+
+def _coerce(raw: str):
+    """PostgREST filter value as the JSON type it is compared with."""
+    lowered = raw.lower()
+    if lowered in ("null", "true", "false"):
+        return {"null": None, "true": True, "false": False}[lowered]
+    try:
+        return int(raw)
+    except ValueError:
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+
+
+def _compare(op: str, value, target) -> bool:
+    if op == "is":
+        return value is target
+    if op == "in":
+        return value in target
+    if op in ("like", "ilike"):
+        pattern = re.escape(str(target)).replace("\\*", ".*").replace("%", ".*")
+        return value is not None and re.fullmatch(pattern, str(value), re.IGNORECASE if op == "ilike" else 0) is not None
+    if value is None:
+        return False
+    try:
+        return {
+            "eq": value == target, "neq": value != target,
+            "gt": value > target, "gte": value >= target,
+            "lt": value < target, "lte": value <= target,
+        }[op]
+    except TypeError:
+        return {"eq": str(value) == str(target), "neq": str(value) != str(target)}.get(op, False)
+
+
+def _parse_condition(column: str, expression: str) -> Callable[[dict], bool]:
+    """Predicate for `column=op.value` (optionally `not.op.value`)."""
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, raw = expression.partition(".")
+    if op == "in":
+        target = [_coerce(v.strip().strip('"')) for v in raw.strip("()").split(",") if v.strip()]
+    else:
+        target = _coerce(unquote(raw))
+
+    def predicate(row: dict) -> bool:
+        return _compare(op, row.get(column), target) != negate
+    return predicate
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas outside parentheses (for or=(...))."""
+    parts, depth, current = [], 0, ""
+    for ch in text:
+        if ch == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        depth += ch == "("
+        depth -= ch == ")"
+        current += ch
+    return parts + ([current] if current else [])
+
+
+def _parse_or(expression: str) -> Callable[[dict], bool]:
+    conditions = []
+    for item in _split_top_level(expression.strip("()")):
+        column, _, rest = item.partition(".")
+        conditions.append(_parse_condition(column, rest))
+    return lambda row: any(condition(row) for condition in conditions)
+
+
+def parse_filters(params: List[Tuple[str, str]]) -> List[Callable[[dict], bool]]:
+    filters = []
+    for key, value in params:
+        if key in _RESERVED_PARAMS:
+            continue
+        filters.append(_parse_or(value) if key == "or" else _parse_condition(key, value))
+    return filters
+
+
+def _select(rows: List[dict], columns: str) -> List[dict]:
+    names = [c.strip() for c in columns.split(",") if c.strip()]
+    if not names or "*" in names:
+        return rows
+    return [{name: row.get(name) for name in names} for row in rows]
+
+
+def _order(rows: List[dict], order: str) -> List[dict]:
+    for spec in reversed(order.split(",")):
+        column, *modifiers = spec.split(".")
+        descending = "desc" in modifiers
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: r[column], reverse=descending)
+        # PostgREST puts nulls first when descending, last when ascending
+        rows = missing + present if descending else present + missing
+    return rows
+
+
+# ============================================================================
+# STATE
+# ============================================================================
+
+class SupabaseStandin:
+    """Tables and storage objects shared by the server threads."""
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency_ms = latency_ms
+        self.tables: Dict[str, List[dict]] = {}
+        self.objects: Dict[str, Tuple[bytes, str]] = {}
+        self.requests = 0
+        self._next_id: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def insert(self, table: str, rows: List[dict]) -> List[dict]:
+        with self._lock:
+            stored = self.tables.setdefault(table, [])
+            now = datetime.now(timezone.utc)
+            inserted = []
+            for row in rows:
+                row_id = self._next_id.get(table, 1)
+                self._next_id[table] = row_id + 1
+                inserted.append({"id": row_id, "created_at": now.isoformat(), **row})
+            stored.extend(inserted)
+            return inserted
+
+    def query(self, table: str, params: List[Tuple[str, str]]) -> List[dict]:
+        query = dict(params)
+        filters = parse_filters(params)
+        with self._lock:
+            rows = [r for r in self.tables.get(table, []) if all(f(r) for f in filters)]
+        if "order" in query:
+            rows = _order(rows, query["order"])
+        offset = int(query.get("offset", 0))
+        limit = int(query["limit"]) if "limit" in query else None
+        rows = rows[offset:offset + limit if limit is not None else None]
+        return _select(rows, query.get("select", "*"))
+
+    def update(self, table: str, params: List[Tuple[str, str]], values: dict) -> List[dict]:
+        filters = parse_filters(params)
+        with self._lock:
+            rows = [r for r in self.tables.get(table, []) if all(f(r) for f in filters)]
+            for row in rows:
+                row.update(values)
+            return [dict(r) for r in rows]
+
+    def delete(self, table: str, params: List[Tuple[str, str]]) -> List[dict]:
+        filters = parse_filters(params)
+        with self._lock:
+            rows = self.tables.get(table, [])
+            removed = [r for r in rows if all(f(r) for f in filters)]
+            self.tables[table] = [r for r in rows if not all(f(r) for f in filters)]
+            return removed
+
+    def seed_registry(self, count: int, tracked_plants: int = 50, seed: int = 0):
+        """
+        Fill plants_registry with realistic scans (for benchmarks and load tests).
+
+        Args:
+            count: Rows to create
+            tracked_plants: Distinct tracking_ids the rows are spread over
+        """
+        rng = random.Random(seed)
+        start = datetime.now(timezone.utc) - timedelta(days=90)
+        rows = []
+        for i in range(count):
+            plant = fixtures.PLANTS[i % len(fixtures.PLANTS)]
+            analysis = fixtures.scan(plant)
+            health = max(0, min(100, plant["health"] + rng.randint(-15, 15)))
+            rows.append({
+                "plant_name": plant["common_name"],
+                "image_url": f"standin://plant-photos/scans/{i}.jpg",
+                "category": analysis["category"],
+                "health_status": analysis["health_status"],
+                "farm_name": "Main Field",
+                "analysis_json": analysis,
+                "tracking_id": f"track_{i % tracked_plants:012x}",
+                "device_id": f"device{i % 7}",
+                "health_percentage": health,
+                "disease_severity": plant["severity"],
+                "confidence": analysis["confidence"],
+                "metrics_version": 1,
+                "created_at": (start + timedelta(minutes=rng.randint(0, 90 * 24 * 60))).isoformat(),
+            })
+        with self._lock:
+            table = self.tables.setdefault("plants_registry", [])
+            next_id = self._next_id.get("plants_registry", 1)
+            for offset, row in enumerate(rows):
+                table.append({"id": next_id + offset, **row})
+            self._next_id["plants_registry"] = next_id + len(rows)
+
+
+def _uploaded_file(content_type: str, body: bytes) -> Tuple[bytes, str]:
+    """File bytes and type from a multipart upload (or a raw body)."""
+    if not content_type.startswith("multipart/form-data"):
+        return body, content_type or "application/octet-stream"
+    message = email.message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+    for part in message.walk():
+        if part.get_filename():
+            return part.get_payload(decode=True), part.get_content_type()
+    return b"", "application/octet-stream"
+
+
+def _make_handler(standin: SupabaseStandin):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, data: bytes, content_type: str = "application/json"):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _json(self, status: int, payload):
+            self._send(status, json.dumps(payload, default=str).encode())
+
+        def _body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        def _route(self) -> Tuple[str, str, List[Tuple[str, str]]]:
+            """(service, rest of the path, query params)."""
+            url = urlparse(self.path)
+            params = parse_qsl(url.query, keep_blank_values=True)
+            for service in ("/rest/v1/", "/storage/v1/"):
+                if url.path.startswith(service):
+                    return service.strip("/").split("/")[0], unquote(url.path[len(service):]), params
+            return "", url.path, params
+
+        def _begin(self):
+            with standin._lock:
+                standin.requests += 1
+            if standin.latency_ms:
+                time.sleep(standin.latency_ms / 1000)
+
+        def _returns_rows(self) -> bool:
+            return "return=representation" in (self.headers.get("Prefer") or "")
+
+        def do_GET(self):
+            self._begin()
+            service, path, params = self._route()
+            if service == "rest":
+                return self._json(200, standin.query(path, params))
+            if service == "storage" and path.startswith("object/public/"):
+                stored = standin.objects.get(path[len("object/public/"):])
+                if stored:
+                    return self._send(200, *stored)
+            self._json(404, {"message": "Not found", "statusCode": "404"})
+
+        def do_POST(self):
+            self._begin()
+            service, path, _ = self._route()
+            body = self._body()
+            if service == "rest":
+                payload = json.loads(body or b"[]")
+                rows = standin.insert(path, payload if isinstance(payload, list) else [payload])
+                return self._json(201, rows if self._returns_rows() else [])
+            if service == "storage" and path.startswith("object/"):
+                key = path[len("object/"):]
+                standin.objects[key] = _uploaded_file(self.headers.get("Content-Type", ""), body)
+                return self._json(200, {"Key": key, "Id": key})
+            self._json(404, {"message": "Not found", "statusCode": "404"})
+
+        def do_PATCH(self):
+            self._begin()
+            service, path, params = self._route()
+            if service != "rest":
+                return self._json(404, {"message": "Not found", "statusCode": "404"})
+            rows = standin.update(path, params, json.loads(self._body() or b"{}"))
+            self._json(200, rows if self._returns_rows() else [])
+
+        def do_DELETE(self):
+            self._begin()
+            service, path, params = self._route()
+            if service != "rest":
+                return self._json(404, {"message": "Not found", "statusCode": "404"})
+            rows = standin.delete(path, params)
+            self._json(200, rows if self._returns_rows() else [])
+
+    return Handler
+
+
+def start_supabase_standin(port: int = 0, seed_rows: int = 0, latency_ms: float = 0,
+                           host: str = "127.0.0.1") -> Tuple[ThreadingHTTPServer, SupabaseStandin]:
+    """
+    Start the stand-in on a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        seed_rows: plants_registry rows to create up front
+        latency_ms: Delay added to every request
+
+    Returns:
+        (server, standin); the URL is f"http://{host}:{server.server_port}"
+        and server.shutdown() stops it
+    """
+    standin = SupabaseStandin(latency_ms)
+    if seed_rows:
+        standin.seed_registry(seed_rows)
+    server = ThreadingHTTPServer((host, port), _make_handler(standin))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, standin
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Supabase (PostgREST + Storage) stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--seed-rows", type=int, default=0, help="plants_registry rows to create")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    standin = SupabaseStandin(args.latency_ms)
+    if args.seed_rows:
+        standin.seed_registry(args.seed_rows)
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(standin))
+    print(f"Supabase stand-in on http://{args.host}:{args.port} (key: {STANDIN_KEY})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()